@@ -0,0 +1,32 @@
+"""
+Modules as they were before the optimizations, loaded from git instead of vendored copies
+Benchmarks time them against the current code and regenerate the golden outputs in
+benchmarks/golden/ that the parity tests compare with. Needs a git checkout with history.
+"""
+import os
+import subprocess
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_REV = os.getenv('BASELINE_REV', 'e8a96c3')  # last commit before the performance work
+
+_loaded = {}
+
+
+def load_baseline(path: str, rev: str = BASELINE_REV) -> types.ModuleType:
+    """Import the file at `path` (repo-relative) as of `rev`; its imports resolve against the current tree"""
+    key = (path, rev)
+    if key not in _loaded:
+        source = subprocess.run(['git', 'show', f"{rev}:{path}"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout
+        name = f"baseline_{rev}_{path[:-3].replace('/', '_')}"
+        module = types.ModuleType(name)
+        module.__file__ = f"{rev}:{path}"
+        sys.modules[name] = module  # dataclasses look up their module
+        exec(compile(source, module.__file__, 'exec'), module.__dict__)
+        _loaded[key] = module
+    return _loaded[key]
+
+
+__all__ = ['BASELINE_REV', 'load_baseline']
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scan analysis wall time vs. worker count for the optional process pool
+500 symbols x 3 timeframes x 220 candles through all modules; also measures how long a
+ticker thread in the scanner process is stalled (a stand-in for the Telegram polling loop)
+"""
+
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmarks.bench_smc import random_walk
+from engine.batch_indicators import build_batches
+from engine.bias_resolver import bias_resolver
+from modules import volume, fibonacci, rsi_divergence, macd, smc, pump
+from scanner.analysis_pool import AnalysisPool, run_modules, smc_target_direction
+from scanner.candles import CandleSeries
+
+SYMBOLS = 500
+TIMEFRAMES = ['15m', '1h', '4h']
+CANDLES = 220
+WORKER_COUNTS = [1, 2, 4]
+MODULES = {'volume': volume, 'fibonacci': fibonacci, 'rsi_divergence': rsi_divergence,
+           'macd': macd, 'smc': smc, 'pump': pump}
+
+
+def make_units():
+    units = []
+    for i in range(SYMBOLS):
+        candles_by_tf = {}
+        for t, tf in enumerate(TIMEFRAMES):
+            df = random_walk(CANDLES, seed=i * 10 + t)
+            ohlcv = np.ascontiguousarray(df[['open', 'high', 'low', 'close', 'volume']].to_numpy().T)
+            candles_by_tf[tf] = CandleSeries(df['ts'].to_numpy(), ohlcv)
+        units.append((f"SYM{i}USDT", candles_by_tf))
+    return units
+
+
+def analyze_inline(units):
+    frames_by_tf = {tf: {symbol: c[tf].to_frame() for symbol, c in units} for tf in TIMEFRAMES}
+    batches = build_batches(frames_by_tf)
+    for symbol, candles_by_tf in units:
+        bias = bias_resolver.resolve_bias(symbol, candles_by_tf['4h'], candles_by_tf['1h'], candles_by_tf['15m'])
+        for tf in TIMEFRAMES:
+            run_modules(frames_by_tf[tf][symbol], batches[tf].context(symbol), MODULES, list(MODULES),
+                        smc_target_direction(bias['4h']))
+
+
+def measure(fn):
+    """Wall time of fn() and the worst 1 ms tick delay seen by another thread meanwhile"""
+    stalls = []
+    done = threading.Event()
+
+    def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            time.sleep(0.001)
+            stalls.append(time.perf_counter() - start - 0.001)
+
+    thread = threading.Thread(target=ticker)
+    thread.start()
+    start = time.perf_counter()
+    fn()
+    wall = time.perf_counter() - start
+    done.set()
+    thread.join()
+    return wall, max(stalls) * 1000, np.percentile(stalls, 99) * 1000
+
+
+def main():
+    units = make_units()
+    print(f"{SYMBOLS} symbols x {len(TIMEFRAMES)} TFs x {CANDLES} candles, {os.cpu_count()} CPUs")
+    print(f"{'mode':<14}{'wall':>9}{'tick p99':>12}{'tick max':>12}")
+
+    wall, worst, p99 = measure(lambda: analyze_inline(units))
+    print(f"{'inline':<14}{wall:>8.2f}s{p99:>10.1f}ms{worst:>10.1f}ms")
+
+    for workers in WORKER_COUNTS:
+        start = time.perf_counter()
+        pool = AnalysisPool(workers, MODULES)
+        warmup = time.perf_counter() - start
+        wall, worst, p99 = measure(lambda: pool.analyze(units, list(MODULES)))
+        pool.shutdown()
+        print(f"{f'{workers} workers':<14}{wall:>8.2f}s{p99:>10.1f}ms{worst:>10.1f}ms  (warm-up {warmup:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
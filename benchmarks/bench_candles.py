@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parse + DataFrame conversion of kline payloads
+Legacy list-of-dicts path vs. CandleSeries, time and retained memory per 1000 series
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks.fake_bitget import make_candle_rows, DEFAULT_NOW_MS
+from scanner.bitget_client import parse_candles
+
+SERIES = 1000
+CANDLES = 220
+
+
+def legacy_parse(data: dict) -> list:
+    """Pre-CandleSeries parse_candles"""
+    candles = []
+    for candle in data['data']:
+        if len(candle) >= 6:
+            candles.append({
+                'ts': int(candle[0]),
+                'open': float(candle[1]),
+                'high': float(candle[2]),
+                'low': float(candle[3]),
+                'close': float(candle[4]),
+                'volume': float(candle[5])
+            })
+    return list(reversed(candles))
+
+
+def legacy_frame(candles: list) -> pd.DataFrame:
+    """Pre-CandleSeries DataFrame rebuild from the runner"""
+    df = pd.DataFrame(candles)
+    df = df[['ts', 'open', 'high', 'low', 'close', 'volume']].copy()
+    df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
+    return df
+
+
+def measure(parse, payloads):
+    gc.collect()
+    start = time.perf_counter()
+    parsed = [parse(p) for p in payloads]
+    parse_time = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    kept = [parse(p) for p in payloads]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return parsed, parse_time, retained
+
+
+def main():
+    payloads = [
+        {'code': '00000', 'data': make_candle_rows(f"SYM{i}USDT", '15m', CANDLES, DEFAULT_NOW_MS)}
+        for i in range(SERIES)
+    ]
+    print(f"{SERIES} series x {CANDLES} candles")
+    print(f"{'path':<16}{'parse [ms]':>12}{'frame [ms]':>12}{'total [ms]':>12}{'memory [MB]':>13}")
+
+    for name, parse, frame in [
+        ('list of dicts', legacy_parse, legacy_frame),
+        ('CandleSeries', parse_candles, lambda series: series.to_frame()),
+    ]:
+        parsed, parse_time, retained = measure(parse, payloads)
+        start = time.perf_counter()
+        for series in parsed:
+            frame(series)
+        frame_time = time.perf_counter() - start
+        print(f"{name:<16}{parse_time * 1000:>12.1f}{frame_time * 1000:>12.1f}"
+              f"{(parse_time + frame_time) * 1000:>12.1f}{retained / 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQLite connection handling on a file-backed database
+- scan start: init_db (connect + full schema.sql) per scan vs. the pooled, migrated connection
+- concurrent access: bot handlers reading while the scanner writes, rollback journal with a
+  connection per handler call vs. WAL + synchronous=NORMAL with pooled connections
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import SCHEMA_PATH, get_pool
+from db.repo import Repo
+
+SCANS = 200
+READERS = 3
+SECONDS = 3.0
+
+
+def legacy_init_db(db_path: str) -> sqlite3.Connection:
+    """init_db before the connection manager: new connection, whole schema on every call"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    conn.commit()
+    return conn
+
+
+def seed(repo: Repo):
+    for i in range(200):
+        repo.save_active_setup('u1', f"SYM{i}USDT", '15m', 'bullish', 'IDEA', idea_score=60)
+
+
+def scan_start(legacy: bool, db_path: str) -> float:
+    start = time.perf_counter()
+    for _ in range(SCANS):
+        if legacy:
+            conn = legacy_init_db(db_path)
+        else:
+            conn = get_pool(db_path).connection()
+        Repo(conn).get_settings('u1')
+    return (time.perf_counter() - start) / SCANS * 1000
+
+
+def concurrent(legacy: bool, db_path: str):
+    stop = threading.Event()
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def connection():
+        return legacy_init_db(db_path) if legacy else get_pool(db_path).connection()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                conn = connection()  # handlers opened a connection per command
+                repo = Repo(conn)
+                repo.get_active_setups('u1')
+                repo.get_settings('u1')
+                with lock:
+                    counts['reads'] += 1
+            except sqlite3.OperationalError:
+                with lock:
+                    counts['errors'] += 1
+
+    def writer():
+        repo = Repo(connection())
+        i = 0
+        while not stop.is_set():
+            try:
+                repo.save_sent_signal('u1', f"k{i}", 'BTCUSDT', '15m', 'COMBO', i, 80, {'i': i})
+                repo.set_cursor('u1', i)
+                i += 1
+                with lock:
+                    counts['writes'] += 2
+            except sqlite3.OperationalError:
+                with lock:
+                    counts['errors'] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(READERS)] + [threading.Thread(target=writer)]
+    for t in threads:
+        t.start()
+    time.sleep(SECONDS)
+    stop.set()
+    for t in threads:
+        t.join()
+    return counts['reads'] / SECONDS, counts['writes'] / SECONDS, counts['errors']
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    print(f"scan start: {SCANS} scans, concurrent: {READERS} handler threads + 1 scanner writer for {SECONDS:.0f}s")
+    print(f"{'mode':<10}{'scan start [ms]':>17}{'reads/s':>10}{'writes/s':>10}{'errors':>8}")
+    for legacy in (True, False):
+        db_path = os.path.join(tmp, f"{'legacy' if legacy else 'pooled'}.db")
+        seed(Repo(legacy_init_db(db_path) if legacy else get_pool(db_path).connection()))
+        start_ms = scan_start(legacy, db_path)
+        reads, writes, errors = concurrent(legacy, db_path)
+        name = 'legacy' if legacy else 'pooled'
+        print(f"{name:<10}{start_ms:>17.2f}{reads:>10.0f}{writes:>10.0f}{errors:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chunk kline fetch wall-time vs. concurrency level
+Runs against the local fake Bitget server (no network needed)
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_bitget import start_fake_bitget
+from scanner.bitget_client import BitgetClient, AsyncBitgetClient
+
+TIMEFRAMES = ['15m', '1h', '4h']
+CHUNK_SIZE = 100
+LATENCY = 0.05  # simulated exchange round-trip (50 ms)
+
+
+def main():
+    server = start_fake_bitget(latency=LATENCY)
+    symbols = server.symbols[:CHUNK_SIZE]
+    batch = [(symbol, tf, 220) for symbol in symbols for tf in TIMEFRAMES]
+
+    print(f"Chunk: {len(symbols)} symbols x {len(TIMEFRAMES)} TFs = {len(batch)} requests, latency {LATENCY*1000:.0f} ms")
+    print(f"{'mode':<22}{'wall [s]':>10}{'req/s':>10}{'speedup':>10}")
+
+    sync_client = BitgetClient(base_url=server.base_url)
+    start = time.perf_counter()
+    for symbol, tf, limit in batch:
+        sync_client.get_klines(symbol, tf, limit)
+    baseline = time.perf_counter() - start
+    print(f"{'sequential (sync)':<22}{baseline:>10.2f}{len(batch)/baseline:>10.1f}{1.0:>10.1f}x")
+
+    for concurrency in [1, 5, 10, 20, 50]:
+        client = AsyncBitgetClient(base_url=server.base_url, max_concurrency=concurrency)
+        start = time.perf_counter()
+        results = client.get_klines_many(batch)
+        elapsed = time.perf_counter() - start
+        client.close()
+        assert all(len(r) == 220 for r in results)
+        print(f"{f'async x{concurrency}':<22}{elapsed:>10.2f}{len(batch)/elapsed:>10.1f}{baseline/elapsed:>10.1f}x")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
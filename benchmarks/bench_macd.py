@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MACD analyze() over a full symbol universe, loop implementation (baseline commit) vs. vectorized module
+500 symbols x 3 timeframes x 220 candles, one IndicatorContext per frame like the runner
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.baseline import load_baseline
+from benchmarks.bench_smc import random_walk
+from engine.indicators import IndicatorContext
+from modules import macd
+
+SYMBOLS = 500
+TIMEFRAMES = 3
+CANDLES = 220
+
+
+def main():
+    macd_reference = load_baseline('modules/macd.py')
+    frames = [random_walk(CANDLES, seed=seed) for seed in range(SYMBOLS * TIMEFRAMES)]
+    print(f"{len(frames)} frames ({SYMBOLS} symbols x {TIMEFRAMES} TFs) x {CANDLES} candles")
+
+    start = time.perf_counter()
+    for df in frames:
+        macd_reference.analyze(df)
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for df in frames:
+        macd.analyze(df, ctx=IndicatorContext(df))
+    vector = time.perf_counter() - start
+
+    print(f"{'loop reference':<16}{loop:>8.2f} s{loop / len(frames) * 1000:>8.2f} ms/frame")
+    print(f"{'vectorized':<16}{vector:>8.2f} s{vector / len(frames) * 1000:>8.2f} ms/frame  ({loop / vector:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Phase 1 selection over 2,000 candidate decisions with rotation checks
+- reference: engine/phase1_selector.py at the baseline commit - can_send_symbol (a SELECT) per candidate and set_last_sent (UPSERT + commit) per pick
+- preload: rotation state in one query, checks in memory, set_last_sent_many at the end
+Both run against the same file-backed database: 500 symbols, every (topic, symbol) pair sent
+within the last 24 hours, the top-scored half of the symbols within the rotation window (they
+show up every scan). Selector logging is discarded so only the selection itself is timed.
+Rows marked * use a rollback-journal, synchronous=FULL connection (as before WAL), where every
+commit is an fsync.
+"""
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import init_db, SCHEMA_PATH
+from db.repo import Repo
+from benchmarks.baseline import load_baseline
+from engine import phase1_selector
+
+CANDIDATES = 2000
+SYMBOLS = 500
+TOPICS = [('COMBO', 'TRADE_FREIGABE'), ('IDEA', 'WATCHLIST'), ('FIBONACCI', 'FIB_ALERT'),
+          ('LIQUIDITY', 'LIQ_ALERT'), ('PUMP', 'PUMP_ALERT')]
+
+
+def candidates(rng: random.Random):
+    decisions = []
+    for _ in range(CANDIDATES):
+        signal_type, message_type = rng.choice(TOPICS)
+        i = rng.randrange(SYMBOLS)
+        decisions.append({'symbol': f"SYM{i}USDT", 'timeframe': rng.choice(['15m', '1h', '4h']),
+                          'type': signal_type, 'message_type': message_type,
+                          'score_total': 400 - i * 300 // SYMBOLS + rng.randrange(50), 'side': 'long'})
+    return decisions
+
+
+def populate(repo: Repo, rng: random.Random, now: int):
+    repo.conn.executemany(
+        'INSERT INTO symbol_rotation(user_id, topic, symbol, last_sent_at) VALUES(?, ?, ?, ?)',
+        [('u1', topic, f"SYM{i}USDT", now - (rng.randrange(3600) if i < SYMBOLS // 2 else rng.randrange(24 * 3600)))
+         for topic, _ in TOPICS for i in range(SYMBOLS)]
+    )
+    repo.conn.commit()
+
+
+def legacy_conn(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=DELETE')
+    conn.execute('PRAGMA synchronous=FULL')
+    return conn
+
+
+def run(selector, db_path: str, decisions, repeats: int, legacy: bool = False):
+    best = None
+    for _ in range(repeats):
+        work = db_path + '.run'
+        shutil.copy(db_path, work)  # every run starts from the same rotation state
+        repo = Repo(legacy_conn(work) if legacy else init_db(work, SCHEMA_PATH))
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            selected = selector(decisions, repo, 'u1')
+        elapsed = time.perf_counter() - start
+        repo.conn.close()
+        os.remove(work)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, selected
+
+
+def main():
+    reference = load_baseline('engine/phase1_selector.py')
+    rng = random.Random(11)
+    now = int(time.time())
+    db_path = os.path.join(tempfile.mkdtemp(), 'bot.db')
+    repo = Repo(init_db(db_path, SCHEMA_PATH))
+    populate(repo, rng, now)
+    repo.conn.close()
+    decisions = candidates(rng)
+
+    print(f"Phase 1 selection: {CANDIDATES} candidates, {SYMBOLS * len(TOPICS)} rotation entries (file-backed SQLite)")
+    print(f"{'mode':<12}{'best [ms]':>11}{'per candidate [us]':>20}{'selected':>10}")
+    results = {}
+    for legacy in (False, True):
+        for name, selector in (('reference', reference.apply_phase1_selection),
+                               ('preload', phase1_selector.apply_phase1_selection)):
+            elapsed, selected = run(selector, db_path, decisions, repeats=5, legacy=legacy)
+            results[name] = [(d['symbol'], d['timeframe']) for d in selected]
+            label = name + (' *' if legacy else '')
+            print(f"{label:<12}{elapsed * 1000:>11.2f}{elapsed / CANDIDATES * 1e6:>20.2f}{len(selected):>10}")
+        assert results['reference'] == results['preload']
+
+
+if __name__ == '__main__':
+    main()
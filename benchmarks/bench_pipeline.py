@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one 100-symbol scan chunk, sequential phases vs. the staged pipeline
+fetch = simulated exchange latency per symbol batch, analyze = all modules inline,
+send = simulated Telegram round-trip per alert; reports wall time and time to first alert
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import bench_analysis_pool
+from benchmarks.bench_analysis_pool import analyze_inline, make_units
+from scanner.pipeline import Pipeline, Stage
+
+bench_analysis_pool.SYMBOLS = 100
+BATCH_SIZE = 25
+FETCH_LATENCY = 0.02   # per symbol (3 kline requests), ~0.5 s per batch
+SEND_LATENCY = 0.05    # per alert
+ALERTS_PER_SYMBOL = 1
+
+
+def fetch(batch):
+    time.sleep(FETCH_LATENCY * len(batch))  # I/O wait, releases the GIL
+    return batch
+
+
+def send(_):
+    time.sleep(SEND_LATENCY)
+
+
+def run_sequential(units):
+    start = time.perf_counter()
+    fetched = []
+    for i in range(0, len(units), BATCH_SIZE):
+        fetched.extend(fetch(units[i:i + BATCH_SIZE]))
+    analyze_inline(fetched)
+    first_alert = None
+    for _ in range(len(fetched) * ALERTS_PER_SYMBOL):
+        send(None)
+        if first_alert is None:
+            first_alert = time.perf_counter() - start
+    return time.perf_counter() - start, first_alert, None
+
+
+def run_pipeline(units):
+    start = time.perf_counter()
+    first_alert = []
+
+    def analyze_stage(batch):
+        analyze_inline(batch)
+        return [symbol for symbol, _ in batch for _ in range(ALERTS_PER_SYMBOL)]
+
+    def send_stage(alert):
+        send(alert)
+        if not first_alert:
+            first_alert.append(time.perf_counter() - start)
+
+    pipeline = Pipeline([
+        Stage('fetch', lambda batch: [fetch(batch)]),
+        Stage('analyze', analyze_stage),
+        Stage('send', send_stage, maxsize=100),
+    ])
+    pipeline.run(units[i:i + BATCH_SIZE] for i in range(0, len(units), BATCH_SIZE))
+    return time.perf_counter() - start, first_alert[0], pipeline
+
+
+def main():
+    units = make_units()
+    analyze_inline(units[:BATCH_SIZE])  # warm up imports and kernels
+
+    print(f"Chunk: {len(units)} symbols in batches of {BATCH_SIZE}, fetch {FETCH_LATENCY * 1000:.0f} ms/symbol, "
+          f"send {SEND_LATENCY * 1000:.0f} ms/alert")
+    print(f"{'mode':<14}{'wall [s]':>10}{'first alert [s]':>18}")
+    seq_wall, seq_first, _ = run_sequential(units)
+    print(f"{'sequential':<14}{seq_wall:>10.2f}{seq_first:>18.2f}")
+    pipe_wall, pipe_first, pipeline = run_pipeline(units)
+    print(f"{'pipeline':<14}{pipe_wall:>10.2f}{pipe_first:>18.2f}")
+    print(f"speedup {seq_wall / pipe_wall:.2f}x, first alert {seq_first / pipe_first:.1f}x sooner")
+    print()
+    for name, m in pipeline.metrics().items():
+        print(f"  {name:<8} {m['items']:>4} items {m['utilisation']:>6}% busy  "
+              f"blocked {m['blocked_seconds']:.2f}s  queue avg {m['queue_avg']} max {m['queue_max']}/{m['queue_size']}")
+
+
+if __name__ == '__main__':
+    main()
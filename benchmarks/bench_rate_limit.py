@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sustained kline throughput vs. client pacing rate
+The fake Bitget server enforces 20 requests/second and answers 429 above it
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_bitget import start_fake_bitget
+from engine.scan_debugger import get_scan_debugger
+from scanner.bitget_client import AsyncBitgetClient, RateLimiter, CANDLES_PATH
+
+SERVER_LIMIT = 20  # requests per second
+REQUESTS = 120
+
+
+def main():
+    debugger = get_scan_debugger()
+    print(f"Server limit: {SERVER_LIMIT} req/s, {REQUESTS} requests, concurrency 20")
+    print(f"{'client rate':<14}{'wall [s]':>10}{'ok req/s':>10}{'429s':>8}{'failed':>8}")
+
+    for rate in [10.0, 15.0, 18.0, 20.0, 30.0, 1000.0]:
+        server = start_fake_bitget(latency=0.02, rate_limit=SERVER_LIMIT, rate_window=1.0)
+        debugger.reset_metrics()
+        limiter = RateLimiter(limits={CANDLES_PATH: rate}, max_retries=6)
+        client = AsyncBitgetClient(base_url=server.base_url, max_concurrency=20, rate_limiter=limiter)
+
+        batch = [(f"SYM{i}USDT", '15m', 220) for i in range(REQUESTS)]
+        start = time.perf_counter()
+        results = client.get_klines_many(batch)
+        elapsed = time.perf_counter() - start
+        client.close()
+        server.shutdown()
+
+        ok = sum(1 for r in results if isinstance(r, list) and r)
+        label = "unlimited" if rate >= 1000 else f"{rate:.0f}/s"
+        print(f"{label:<14}{elapsed:>10.2f}{ok/elapsed:>10.1f}{debugger.rate_limit_hits:>8}{REQUESTS-ok:>8}")
+
+
+if __name__ == "__main__":
+    main()
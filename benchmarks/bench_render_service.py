@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chart rendering in the calling thread vs. the warm render service
+- inline: render_chart_bytes in the scanner thread (blocks the send path per chart)
+- service: jobs submitted to N worker processes, the caller only waits for the futures
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+
+from benchmarks.bench_renderer import make_candles, make_annotation
+from charts.renderer import render_chart_bytes
+from charts.render_service import ChartRenderService
+from scanner.candles import CandleSeries
+
+CHARTS = 24
+WORKERS = [1, 2, 4]
+
+
+def main():
+    candles = CandleSeries.from_dicts(make_candles())
+    annotation = make_annotation(make_candles())
+    print(f"{CHARTS} annotated charts, {os.cpu_count()} CPUs")
+    print(f"{'mode':<14}{'charts/s':>10}{'submit [ms]':>13}{'startup [s]':>13}")
+
+    render_chart_bytes('BTCUSDT', '15m', candles, annotation=annotation)  # warm-up
+    start = time.perf_counter()
+    for i in range(CHARTS):
+        render_chart_bytes(f"SYM{i}USDT", '15m', candles, annotation=annotation)
+    elapsed = time.perf_counter() - start
+    print(f"{'inline':<14}{CHARTS / elapsed:>10.2f}{elapsed * 1000:>13.0f}{0:>13.2f}")
+
+    for workers in WORKERS:
+        start = time.perf_counter()
+        service = ChartRenderService(workers, timeout=300)
+        startup = time.perf_counter() - start
+        start = time.perf_counter()
+        futures = [service.submit(f"SYM{i}USDT", '15m', candles, annotation=annotation) for i in range(CHARTS)]
+        submitted = time.perf_counter() - start
+        sizes = [len(f.result()) for f in futures]
+        elapsed = time.perf_counter() - start
+        assert all(sizes)
+        print(f"{f'{workers} workers':<14}{CHARTS / elapsed:>10.2f}{submitted * 1000:>13.1f}{startup:>13.2f}")
+        service.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: annotated chart rendering
+- reference: charts/renderer.py at the baseline commit - mplfinance savefig, reopen PNG with imread, annotate the bitmap, save again
+- single pass: returnfig=True, annotations drawn on the axes, one encode
+Each mode runs in its own process so peak RSS is measured separately.
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+CHARTS = 12
+
+
+def make_candles(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.6, n))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.4, n))
+    return [{'ts': 1700000000000 + i * 900000, 'open': float(open_[i]), 'close': float(close[i]),
+             'high': float(max(open_[i], close[i]) + spread[i]), 'low': float(min(open_[i], close[i]) - spread[i]),
+             'volume': float(rng.uniform(100, 1000))} for i in range(n)]
+
+
+def make_annotation(candles):
+    price = candles[-1]['close']
+    return {'direction': 'long', 'score': 8, 'reasons': ['Golden Zone', 'RSI Divergenz', 'Bullish OB'],
+            'tp_levels': [price * 1.02, price * 1.04], 'sl_level': price * 0.98}
+
+
+def run_mode(mode):
+    if mode == 'reference':
+        from benchmarks.baseline import load_baseline
+        render_chart_png = load_baseline('charts/renderer.py').render_chart_png
+    else:
+        from charts.renderer import render_chart_png
+    candles = make_candles()
+    annotation = make_annotation(candles)
+    out_dir = tempfile.mkdtemp()
+    render_chart_png('BTCUSDT', '15m', candles, out_dir=out_dir, annotation=annotation)  # warm-up
+    start = time.perf_counter()
+    for _ in range(CHARTS):
+        path = render_chart_png('BTCUSDT', '15m', candles, out_dir=out_dir, annotation=annotation)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode} {elapsed:.3f} {peak_mb:.1f} {os.path.getsize(path)}")
+
+
+def main():
+    print(f"{CHARTS} annotated charts (300 candles, TP/SL, reasons)")
+    print(f"{'mode':<14}{'charts/s':>10}{'ms/chart':>10}{'peak RSS [MB]':>15}{'PNG [KB]':>10}")
+    for mode in ('reference', 'single_pass'):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), mode],
+                             capture_output=True, text=True, check=True).stdout.split()
+        elapsed, peak_mb, size = float(out[-3]), float(out[-2]), int(out[-1])
+        print(f"{mode:<14}{CHARTS / elapsed:>10.2f}{elapsed / CHARTS * 1000:>10.0f}{peak_mb:>15.1f}{size / 1024:>10.0f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run_mode(sys.argv[1])
+    else:
+        main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: 1,000 setup + cooldown + rotation updates on a file-backed database
+- per call: every Repo mutator commits (also on a rollback-journal, synchronous=FULL connection
+  as before WAL, where each commit is an fsync)
+- batch: the same calls inside `with repo.batch()` (one commit)
+- bulk: save_active_setups / set_cooldowns / set_last_sent_many in one batch
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import init_db, SCHEMA_PATH
+from db.repo import Repo
+
+UPDATES = 1000
+
+
+def per_call(repo: Repo, offset: int):
+    for i in range(UPDATES):
+        symbol = f"SYM{offset + i}USDT"
+        repo.save_active_setup('u1', symbol, '15m', 'bullish', 'IDEA', idea_score=90)
+        repo.set_cooldown('u1', f"idea:{symbol}:15m", 1800)
+        repo.set_last_sent('u1', 'watchlist', symbol)
+
+
+def batched(repo: Repo, offset: int):
+    with repo.batch():
+        per_call(repo, offset)
+
+
+def bulk(repo: Repo, offset: int):
+    symbols = [f"SYM{offset + i}USDT" for i in range(UPDATES)]
+    with repo.batch():
+        repo.save_active_setups([{'user_id': 'u1', 'symbol': s, 'timeframe': '15m', 'side': 'bullish',
+                                  'status': 'IDEA', 'idea_score': 90} for s in symbols])
+        repo.set_cooldowns('u1', {f"idea:{s}:15m": 1800 for s in symbols})
+        repo.set_last_sent_many('u1', [('watchlist', s) for s in symbols])
+
+
+def legacy_repo(db_path: str) -> Repo:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    conn.execute('PRAGMA synchronous=FULL')
+    return Repo(conn)
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    print(f"{UPDATES} x (setup + cooldown + rotation), file-backed SQLite (WAL, synchronous=NORMAL)")
+    print(f"{'mode':<12}{'wall [s]':>10}{'writes/s':>12}{'commits':>9}")
+    repo = legacy_repo(os.path.join(tmp, 'legacy.db'))
+    start = time.perf_counter()
+    per_call(repo, 0)
+    elapsed = time.perf_counter() - start
+    print(f"{'per call *':<12}{elapsed:>10.3f}{UPDATES * 3 / elapsed:>12.0f}{UPDATES * 3:>9}")
+    for name, fn, commits in (('per call', per_call, UPDATES * 3), ('batch', batched, 1), ('bulk', bulk, 1)):
+        repo = Repo(init_db(os.path.join(tmp, f"{name.replace(' ', '_')}.db"), SCHEMA_PATH))
+        start = time.perf_counter()
+        fn(repo, 0)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12}{elapsed:>10.3f}{UPDATES * 3 / elapsed:>12.0f}{commits:>9}")
+    print("* rollback journal, synchronous=FULL")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: API calls per scan for "fetch all TFs" vs. "fetch 15m + resample"
+Simulates a cold start followed by warm scans every 15 minutes against the fake Bitget server
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_bitget import start_fake_bitget, DEFAULT_NOW_MS
+from db.database import init_db
+from db.candle_store import CandleStore
+from scanner.bitget_client import AsyncBitgetClient, RateLimiter, TF_MS
+from scanner.candle_sync import fetch_batch, sync_candles, sync_candles_resampled
+from scanner.resample import resample_candles
+
+SCHEMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db', 'schema.sql')
+TIMEFRAMES = ['15m', '1h', '4h']
+SYMBOLS = 100
+WARM_SCANS = 4
+
+
+def run_mode(mode: str, tmpdir: str):
+    server = start_fake_bitget(symbols=[f"SYM{i}USDT" for i in range(SYMBOLS)])
+    store = CandleStore(init_db(os.path.join(tmpdir, f"{mode}.db"), SCHEMA))
+    client = AsyncBitgetClient(base_url=server.base_url, max_concurrency=20, rate_limiter=RateLimiter(default_rate=1e6, limits={}))
+
+    calls = []
+    for scan in range(WARM_SCANS + 1):
+        now = DEFAULT_NOW_MS + scan * TF_MS['15m']
+        server.now_ms = now
+        before = server.request_count
+        if mode == 'resample':
+            sync_candles_resampled(client, store, server.symbols, TIMEFRAMES, window=220, now_ms=now)
+        else:
+            sync_candles(client, store, server.symbols, TIMEFRAMES, window=220, now_ms=now)
+        calls.append(server.request_count - before)
+
+    client.close()
+    store.conn.close()
+    server.shutdown()
+    return calls
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fetch_all = run_mode('fetch_all', tmpdir)
+        resample = run_mode('resample', tmpdir)
+
+    print(f"\n{SYMBOLS} symbols x {len(TIMEFRAMES)} TFs")
+    print(f"{'scan':<10}{'fetch_all':>12}{'resample':>12}{'saved':>10}")
+    for i, (a, b) in enumerate(zip(fetch_all, resample)):
+        label = "cold" if i == 0 else f"warm {i}"
+        print(f"{label:<10}{a:>12}{b:>12}{(1 - b / a) * 100:>9.0f}%")
+
+    # Resampling cost per symbol (15m -> 1h + 4h)
+    server = start_fake_bitget()
+    client = AsyncBitgetClient(base_url=server.base_url)
+    base = fetch_batch(client, [('BTCUSDT', '15m', 3536)])[0]
+    client.close()
+    server.shutdown()
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        resample_candles(base, '15m', '1h')
+        resample_candles(base, '15m', '4h')
+    per_symbol = (time.perf_counter() - start) / runs
+    print(f"\nResample 3536 x 15m -> 1h + 4h: {per_symbol * 1000:.2f} ms per symbol")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: RSI divergence detection over a long lookback, list-based implementation (baseline commit) vs. pivot matcher
+Pivot arrays come from the shared IndicatorContext, so the matcher cost is measured separately
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.baseline import load_baseline
+from benchmarks.bench_smc import random_walk
+from engine.indicators import IndicatorContext
+from modules import rsi_divergence
+
+BARS = 5000
+RUNS = 200
+
+
+def timed(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    rsi_divergence_reference = load_baseline('modules/rsi_divergence.py')
+    df = random_walk(BARS, seed=7, vol=0.02)
+    settings = rsi_divergence.RSIDivergenceSettings()
+    ctx = IndicatorContext(df)
+    rsi = ctx.rsi(settings.rsi_period)
+    price_pivots = ctx.pivots('close', 'low')
+    rsi_pivots = ctx.pivots('rsi', 'low', settings.rsi_period)
+    print(f"{BARS} bars, {len(price_pivots)} price lows, {len(rsi_pivots)} RSI lows")
+
+    rows = [
+        ('reference detect', timed(lambda: rsi_divergence_reference.detect_bullish_divergence(df['close'], rsi, settings), 5)),
+        ('pivot engine', timed(lambda: IndicatorContext(df).pivots('close', 'low'), RUNS)),
+        ('matcher', timed(lambda: rsi_divergence.match_divergences(price_pivots, rsi_pivots, 2), RUNS * 10)),
+        ('matcher newest', timed(lambda: rsi_divergence.match_divergences(price_pivots, rsi_pivots, 2, True), RUNS * 10)),
+        ('detect (ctx)', timed(lambda: rsi_divergence.detect_bullish_divergence(df['close'], rsi, settings, ctx), RUNS)),
+        ('analyze (cold)', timed(lambda: rsi_divergence.analyze(df, ctx=IndicatorContext(df)), RUNS // 4)),
+    ]
+    for label, ms in rows:
+        print(f"{label:<20}{ms:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
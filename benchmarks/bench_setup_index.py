@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: existing-IDEA lookups of the decision engine against 10,000 active setups
+- query: Repo.get_existing_idea, one SELECT per symbol x timeframe (as before)
+- index: ActiveSetupIndex loaded once and kept warm across scans, lookups in memory (load time
+  reported separately: it is paid once per process, not per scan)
+Plus the cost of expiring setups through the heap.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import init_db, SCHEMA_PATH
+from db.repo import Repo
+from db.setup_index import ActiveSetupIndex
+
+SETUPS = 10000
+LOOKUPS = 30000  # 100 scans of 100 symbols x 3 timeframes
+TIMEFRAMES = ['15m', '1h', '4h', '1d']
+
+
+def populate(repo: Repo):
+    """SETUPS live setups for u1 (a quarter TRADE, a tenth expired) plus as many of another user"""
+    symbols = [f"SYM{i}USDT" for i in range(SETUPS // len(TIMEFRAMES))]
+    with repo.batch():
+        for user in ('u1', 'u2'):
+            repo.save_active_setups([
+                {'user_id': user, 'symbol': s, 'timeframe': tf, 'side': 'bullish',
+                 'status': 'TRADE' if i % 4 == 0 else 'IDEA', 'idea_score': 80,
+                 'levels': {'entry': 1.0, 'sl': 0.9}, 'expires_in_minutes': -5 if i % 10 == 0 else 120}
+                for i, (s, tf) in enumerate((s, tf) for s in symbols for tf in TIMEFRAMES)
+            ])
+            repo.conn.execute("UPDATE active_setups SET setup_id = setup_id || user_id WHERE user_id = ?", (user,))
+    return symbols
+
+
+def main():
+    repo = Repo(init_db(os.path.join(tempfile.mkdtemp(), 'bot.db'), SCHEMA_PATH))
+    symbols = populate(repo)
+    rng = random.Random(7)
+    keys = [(rng.choice(symbols), rng.choice(TIMEFRAMES[:3])) for _ in range(LOOKUPS)]
+    print(f"{LOOKUPS} existing-IDEA lookups, {SETUPS} setups per user (2 users), file-backed SQLite")
+
+    start = time.perf_counter()
+    from_db = [repo.get_existing_idea('u1', s, tf) for s, tf in keys]
+    query_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = ActiveSetupIndex.load(repo.conn, 'u1')
+    load_s = time.perf_counter() - start
+    indexed = Repo(repo.conn, setup_index=index)
+    start = time.perf_counter()
+    from_index = [indexed.get_existing_idea('u1', s, tf) for s, tf in keys]
+    index_s = time.perf_counter() - start
+    assert [r and r['setup_id'] for r in from_db] == [r and r['setup_id'] for r in from_index]
+
+    print(f"{'mode':<8}{'total [ms]':>12}{'per lookup [us]':>17}")
+    print(f"{'query':<8}{query_s * 1000:>12.1f}{query_s / LOOKUPS * 1e6:>17.2f}")
+    print(f"{'index':<8}{index_s * 1000:>12.1f}{index_s / LOOKUPS * 1e6:>17.2f}")
+    print(f"index load ({len(index)} live setups, once per process): {load_s * 1000:.1f} ms")
+    print(f"per scan of 300 lookups: query {query_s / LOOKUPS * 300 * 1000:.2f} ms, "
+          f"index {index_s / LOOKUPS * 300 * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    removed = index.expire(int(time.time()) + 3 * 3600)
+    expire_s = time.perf_counter() - start
+    print(f"expire all {removed} setups via heap: {expire_s * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
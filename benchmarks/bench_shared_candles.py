@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: IPC cost per scan for the analysis pool, pickled DataFrames vs. shared-memory views
+500 symbols x 3 timeframes x 220 candles, chunks of 25 symbols per task
+"""
+
+import os
+import pickle
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+from benchmarks.bench_analysis_pool import MODULES, TIMEFRAMES, make_units
+from scanner.analysis_pool import AnalysisPool
+from scanner.shared_candles import SharedCandleBlock
+
+CHUNK = 25
+WORKERS = 2
+ROUNDS = 5
+
+
+def touch_frames(frames):
+    """Transport only: read every close column"""
+    return sum(float(df['close'].iloc[-1]) for _, by_tf in frames for df in by_tf.values())
+
+
+def touch_shared(name, total, index):
+    block = SharedCandleBlock.attach(name, total, index)
+    value = sum(float(block.get(symbol, tf).close[-1]) for symbol, tf in index)
+    block.close()
+    return value
+
+
+def frame_tasks(units):
+    for i in range(0, len(units), CHUNK):
+        yield [(symbol, {tf: c.to_frame() for tf, c in by_tf.items()}) for symbol, by_tf in units[i:i + CHUNK]]
+
+
+def shared_tasks(block, units):
+    for i in range(0, len(units), CHUNK):
+        yield block.handle((symbol, tf) for symbol, by_tf in units[i:i + CHUNK] for tf in by_tf)
+
+
+def transport(executor, units, shared):
+    """Seconds and pickled request bytes for one scan's worth of tasks (workers only read)"""
+    start = time.perf_counter()
+    if shared:
+        block = SharedCandleBlock.create(((s, tf), c) for s, by_tf in units for tf, c in by_tf.items())
+        tasks = list(shared_tasks(block, units))
+        list(f.result() for f in [executor.submit(touch_shared, *task) for task in tasks])
+        block.close()
+    else:
+        tasks = list(frame_tasks(units))
+        list(f.result() for f in [executor.submit(touch_frames, task) for task in tasks])
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(len(pickle.dumps(task, protocol=pickle.HIGHEST_PROTOCOL)) for task in tasks)
+
+
+def main():
+    units = make_units()
+    print(f"{len(units)} symbols x {len(TIMEFRAMES)} TFs, {CHUNK} symbols per task, {WORKERS} workers")
+
+    executor = ProcessPoolExecutor(WORKERS, mp_context=multiprocessing.get_context('spawn'))
+    transport(executor, units[:CHUNK * WORKERS], True)  # start the workers
+    print(f"\n{'transport only':<22}{'request bytes':>16}{'ms/scan':>10}")
+    for label, shared in [('pickled DataFrames', False), ('shared memory', True)]:
+        times = [transport(executor, units, shared) for _ in range(ROUNDS)]
+        print(f"{label:<22}{times[0][1]:>16,}{min(t for t, _ in times) * 1000:>10.1f}")
+    executor.shutdown()
+
+    print(f"\n{'full analysis':<22}{'result bytes':>16}{'s/scan':>10}")
+    for label, shared in [('pickled candles', False), ('shared memory', True)]:
+        pool = AnalysisPool(WORKERS, MODULES, chunk_size=CHUNK, shared_memory=shared)
+        start = time.perf_counter()
+        outcomes = pool.analyze(units, list(MODULES))
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+        result_bytes = len(pickle.dumps(outcomes, protocol=pickle.HIGHEST_PROTOCOL))
+        print(f"{label:<22}{result_bytes:>16,}{elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cooldown + dedup checks per decision with 1,000,000 signals in the dedup window
+- query: Repo.is_in_cooldown + Repo.has_dedup_key against cooldowns / signals_sent
+- memory: the same calls on a Repo with SignalState (TTL map + 64-bit hashed dedup set)
+Also reports the startup hydration time and memory of the dedup set, and the write-behind flush.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import init_db, SCHEMA_PATH
+from db.repo import Repo
+from db.signal_state import SignalState
+from engine.dedup import make_dedup_key
+
+SIGNALS = 1000000
+COOLDOWNS = 5000
+DECISIONS = 20000
+SYMBOLS = [f"SYM{i}USDT" for i in range(500)]
+TIMEFRAMES = ['15m', '1h', '4h']
+
+
+def populate(repo: Repo, now: int):
+    rows = (
+        ('u1', make_dedup_key('u1', SYMBOLS[i % 500], TIMEFRAMES[i % 3], 'WATCHLIST', now - i * 60, side='long'),
+         SYMBOLS[i % 500], TIMEFRAMES[i % 3], 'IDEA', now - i * 60, 70, '{}', now - i // 2)  # sent within the dedup window
+        for i in range(SIGNALS)
+    )
+    repo.conn.executemany(
+        'INSERT INTO signals_sent(tg_user_id,dedup_key,symbol,timeframe,signal_type,candle_ts,score_total,'
+        'payload_json,sent_at) VALUES(?,?,?,?,?,?,?,?,?)', rows)
+    repo.set_cooldowns('u1', {f"idea:{SYMBOLS[i % 500]}:{TIMEFRAMES[i % 3]}:{i}": 1800 for i in range(COOLDOWNS)})
+
+
+def checks(repo: Repo, keys):
+    start = time.perf_counter()
+    hits = 0
+    for cooldown_key, dedup_key in keys:
+        if repo.is_in_cooldown('u1', cooldown_key) or repo.has_dedup_key(dedup_key):
+            hits += 1
+    return time.perf_counter() - start, hits
+
+
+def main():
+    now = int(time.time())
+    repo = Repo(init_db(os.path.join(tempfile.mkdtemp(), 'bot.db'), SCHEMA_PATH))
+    start = time.perf_counter()
+    populate(repo, now)
+    print(f"{SIGNALS} signals_sent rows, {COOLDOWNS} cooldowns written in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(3)
+    keys = []
+    for _ in range(DECISIONS):
+        i = rng.randrange(SIGNALS * 2)  # half of the decisions were already sent
+        symbol, tf = SYMBOLS[i % 500], TIMEFRAMES[i % 3]
+        keys.append((f"idea:{symbol}:{tf}:{i % (COOLDOWNS * 2)}",
+                     make_dedup_key('u1', symbol, tf, 'WATCHLIST', now - i * 60, side='long')))
+
+    start = time.perf_counter()
+    state = SignalState.load(repo.conn)
+    hydrate_s = time.perf_counter() - start
+    query_s, query_hits = checks(repo, keys)
+    memory_s, memory_hits = checks(Repo(repo.conn, signal_state=state), keys)
+    assert query_hits == memory_hits
+
+    print(f"{DECISIONS} decisions (1 cooldown + 1 dedup check each), {query_hits} blocked")
+    print(f"{'mode':<8}{'total [ms]':>12}{'per decision [us]':>19}")
+    print(f"{'query':<8}{query_s * 1000:>12.1f}{query_s / DECISIONS * 1e6:>19.2f}")
+    print(f"{'memory':<8}{memory_s * 1000:>12.1f}{memory_s / DECISIONS * 1e6:>19.2f}")
+    stats = state.stats()
+    print(f"hydration: {hydrate_s:.2f}s for {stats['dedup_keys']} dedup keys "
+          f"({stats['dedup_mb']} MB) and {stats['cooldowns']} cooldowns")
+
+    indexed = Repo(repo.conn, signal_state=state)
+    for i in range(1000):
+        indexed.set_cooldown('u1', f"trade:NEW{i}USDT:15m:", 3600)
+        indexed.save_sent_signal('u1', f"new:{i}", f"NEW{i}USDT", '15m', 'COMBO', now, 80, {})
+    start = time.perf_counter()
+    flushed = indexed.flush_signal_state()
+    print(f"write-behind flush of {flushed} rows: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
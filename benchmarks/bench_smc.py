@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SMC analyze() latency, loop implementation (baseline commit) vs. vectorized engine
+Random-walk candles at 220, 1000 and 5000 bars
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.baseline import load_baseline
+from modules import smc
+
+SIZES = [220, 1000, 5000]
+
+
+def random_walk(n: int, seed: int = 7, vol: float = 0.01) -> pd.DataFrame:
+    """Synthetic OHLCV frame with enough structure to produce OBs and FVGs"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, vol / 3, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))
+    volume = rng.lognormal(3, 1, n)
+    return pd.DataFrame({'ts': np.arange(n) * 900_000, 'open': open_, 'high': high,
+                         'low': low, 'close': close, 'volume': volume})
+
+
+def per_call(fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    smc_reference = load_baseline('modules/smc.py')
+    print(f"{'candles':>8}{'loop [ms]':>12}{'vector [ms]':>13}{'speedup':>10}")
+    for n in SIZES:
+        df = random_walk(n)
+        loop = per_call(lambda: smc_reference.analyze(df), 1 if n > 1000 else 3)
+        vector = per_call(lambda: smc.analyze(df), 50)
+        print(f"{n:>8}{loop * 1000:>12.1f}{vector * 1000:>13.2f}{loop / vector:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
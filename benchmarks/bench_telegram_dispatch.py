@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: alert delivery through the Telegram dispatcher vs. the old thread-per-message sender
+Runs against the local fake Bot API server; reports sustained messages/second and
+enqueue-to-delivery latency (p50/p99), without and with Telegram-like flood limits
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import Bot
+from telegram.request import HTTPXRequest
+
+from benchmarks.fake_telegram import start_fake_telegram
+from engine.telegram_dispatcher import GLOBAL_RATE, TelegramDispatcher
+
+TOKEN = "123456:FAKE"
+LATENCY = 0.02  # Bot API round-trip
+UNLIMITED = 1e6
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def legacy_send(server, messages):
+    """main.py before the dispatcher: one thread + asyncio.run + new Bot per message, one lock for all"""
+    lock = threading.Lock()
+    latencies, failures = [], []
+
+    def run(chat_id, text, enqueued_at):
+        async def send():
+            with lock:  # held across the await like TelegramSender
+                bot = Bot(TOKEN, base_url=server.base_url)
+                await bot.send_message(chat_id=chat_id, text=text)
+        try:
+            asyncio.run(send())
+            latencies.append(time.perf_counter() - enqueued_at)
+        except Exception as e:
+            failures.append(e)
+
+    start = time.perf_counter()
+    threads = []
+    for chat_id, text in messages:
+        thread = threading.Thread(target=run, args=(chat_id, text, time.perf_counter()))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, len(failures)
+
+
+def dispatcher_send(server, messages, rate):
+    bot = Bot(TOKEN, base_url=server.base_url, request=HTTPXRequest(connection_pool_size=8))
+    dispatcher = TelegramDispatcher(bot, pool_size=8, global_rate=rate, chat_rate=UNLIMITED,
+                                    group_rate=UNLIMITED).start()
+    start = time.perf_counter()
+    futures = [dispatcher.submit(chat_id, text) for chat_id, text in messages]
+    dispatcher.flush()
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for f in futures if not f.result())
+    latencies = list(dispatcher.latencies)
+    dispatcher.close()
+    return elapsed, latencies, failed
+
+
+def report(name, elapsed, latencies, failed, server):
+    delivered = len(latencies)
+    print(f"{name:<22}{delivered / elapsed:>10.1f}{percentile(latencies, 0.5) * 1000:>10.0f}"
+          f"{percentile(latencies, 0.99) * 1000:>10.0f}{failed:>8}{server.throttled_count:>8}")
+
+
+def scenario(title, count, chats, global_limit, dispatcher_rate):
+    messages = [(str(1000 + i % chats), f"Alert {i}") for i in range(count)]
+    print(f"\n{title}: {count} messages to {chats} chats, latency {LATENCY * 1000:.0f} ms")
+    print(f"{'mode':<22}{'msg/s':>10}{'p50 [ms]':>10}{'p99 [ms]':>10}{'failed':>8}{'429s':>8}")
+    for name, send in (('thread per message', lambda server: legacy_send(server, messages)),
+                       ('dispatcher', lambda server: dispatcher_send(server, messages, dispatcher_rate))):
+        server = start_fake_telegram(latency=LATENCY, global_limit=global_limit)
+        with contextlib.redirect_stdout(io.StringIO()):  # per-message send logs
+            result = send(server)
+        report(name, *result, server)
+        server.shutdown()
+
+
+def main():
+    scenario("No flood limits", 200, 1, None, UNLIMITED)
+    scenario("Telegram limit 30 msg/s", 200, 50, 30, GLOBAL_RATE)
+
+
+if __name__ == '__main__':
+    main()
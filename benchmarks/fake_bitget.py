@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Local fake Bitget HTTP server for benchmarks and offline tests
+Serves deterministic tickers and candles with configurable latency
+and an optional per-endpoint rate limit that answers HTTP 429
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+GRANULARITY_MS = {
+    '15m': 15 * 60 * 1000,
+    '1H': 60 * 60 * 1000,
+    '4H': 4 * 60 * 60 * 1000,
+    '1D': 24 * 60 * 60 * 1000,
+}
+
+# Bitget caps candle pages at 1000 rows
+MAX_LIMIT = 1000
+
+# Fixed "now" so candle series are reproducible between runs
+DEFAULT_NOW_MS = 1767700800000
+
+
+def _base_candle(symbol: str, index: int) -> List[float]:
+    """15m candle number `index` since epoch; a pure function of (symbol, index)"""
+    base = 10 + (sum(map(ord, symbol)) % 100)
+
+    def price(k: int) -> float:
+        return base * (1 + 0.08 * math.sin(k / 37) + 0.03 * math.sin(k / 5.3) + 0.01 * math.sin(k / 1.7))
+
+    rng = random.Random(f"{symbol}:{index}")
+    open_, close = price(index), price(index + 1)
+    high = max(open_, close) * (1 + rng.random() * 0.004)
+    low = min(open_, close) * (1 - rng.random() * 0.004)
+    volume = 1000 + rng.random() * 5000
+    return [open_, high, low, close, volume]
+
+
+def make_candle_rows(
+    symbol: str, granularity: str, limit: int, now_ms: int = DEFAULT_NOW_MS, end_time: Optional[int] = None
+) -> List[list]:
+    """
+    Build Bitget-style candle rows (newest first, string values) for a symbol.
+    Higher timeframes are exact aggregates of the 15m series, like on the exchange.
+    """
+    step = GRANULARITY_MS[granularity]
+    base_step = GRANULARITY_MS['15m']
+    per_bar = step // base_step
+    last_open = now_ms - now_ms % step
+    if end_time is not None:
+        last_open = min(last_open, (end_time - 1) - (end_time - 1) % step)
+
+    rows = []
+    for i in range(limit):
+        ts = last_open - (limit - 1 - i) * step
+        first = ts // base_step
+        # the newest bar is still forming: only include 15m bars opened up to now
+        count = min(per_bar, (now_ms - ts) // base_step + 1)
+        parts = [_base_candle(symbol, first + j) for j in range(count)]
+        open_ = parts[0][0]
+        high = max(p[1] for p in parts)
+        low = min(p[2] for p in parts)
+        close = parts[-1][3]
+        volume = sum(p[4] for p in parts)
+        rows.append([str(ts), f"{open_:.6f}", f"{high:.6f}", f"{low:.6f}", f"{close:.6f}", f"{volume:.4f}", "0"])
+
+    return list(reversed(rows))
+
+
+class FakeBitgetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive so pooled clients can reuse connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        parsed = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+        with server.stats_lock:
+            server.request_count += 1
+            retry_after = server.check_rate_limit(parsed.path)
+            if retry_after is not None:
+                server.throttled_count += 1
+            else:
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        if retry_after is not None:
+            self._send_json(429, {"code": "429", "msg": "Too Many Requests"}, {"Retry-After": f"{retry_after:.3f}"})
+            return
+
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+
+            if parsed.path == "/api/v2/mix/market/tickers":
+                data = [{"symbol": s} for s in server.symbols]
+                self._send_json(200, {"code": "00000", "msg": "success", "data": data})
+            elif parsed.path == "/api/v2/mix/market/candles":
+                granularity = params.get("granularity", "15m")
+                if granularity not in GRANULARITY_MS:
+                    self._send_json(400, {"code": "40034", "msg": "Parameter granularity error"})
+                    return
+                limit = min(int(params.get("limit", "100")), MAX_LIMIT)
+                end_time = int(params["endTime"]) if "endTime" in params else None
+                rows = make_candle_rows(params.get("symbol", "BTCUSDT"), granularity, limit, server.now_ms, end_time)
+                self._send_json(200, {"code": "00000", "msg": "success", "data": rows})
+            else:
+                self._send_json(404, {"code": "40404", "msg": "Not found"})
+        finally:
+            with server.stats_lock:
+                server.in_flight -= 1
+
+
+class FakeBitgetServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        symbols: Optional[List[str]] = None,
+        now_ms: int = DEFAULT_NOW_MS,
+        rate_limit: Optional[int] = None,
+        rate_window: float = 1.0,
+    ):
+        super().__init__(("127.0.0.1", 0), FakeBitgetHandler)
+        self.latency = latency
+        self.rate_limit = rate_limit  # max requests per rate_window per endpoint
+        self.rate_window = rate_window
+        self.recent_requests: Dict[str, deque] = {}
+        self.throttled_count = 0
+        self.symbols = symbols or [f"SYM{i}USDT" for i in range(100)]
+        self.now_ms = now_ms
+        self.stats_lock = threading.Lock()
+        self.request_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def check_rate_limit(self, path: str) -> Optional[float]:
+        """Sliding-window limit; returns Retry-After seconds when the request must be rejected"""
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        window = self.recent_requests.setdefault(path, deque())
+        while window and now - window[0] >= self.rate_window:
+            window.popleft()
+        if len(window) >= self.rate_limit:
+            return self.rate_window - (now - window[0])
+        window.append(now)
+        return None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_fake_bitget(**kwargs) -> FakeBitgetServer:
+    """Start a fake Bitget server on a free local port in a background thread"""
+    server = FakeBitgetServer(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    srv = start_fake_bitget(latency=0.05)
+    print(f"Fake Bitget server listening on {srv.base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        srv.shutdown()
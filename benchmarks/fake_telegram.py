@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Local fake Telegram Bot API server for benchmarks and offline tests
+Answers getMe / sendMessage / sendPhoto with configurable latency and
+enforces per-chat and global flood limits with 429 + retry_after like Telegram
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from email.parser import BytesParser
+from email.policy import default as email_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _params(self) -> Dict[str, str]:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("application/json"):
+            return {k: str(v) for k, v in json.loads(body or b"{}").items()}
+        if content_type.startswith("multipart/form-data"):
+            message = BytesParser(policy=email_policy).parsebytes(
+                b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+            params = {}
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                if part.get_filename() is not None:
+                    self.upload = part.get_payload(decode=True)  # e.g. the sendPhoto image
+                else:
+                    params[name] = str(part.get_content())
+            return params
+        return {k: v[0] for k, v in parse_qs(body.decode()).items()}
+
+    def do_POST(self):
+        server = self.server
+        method = self.path.rsplit("/", 1)[-1]
+        self.upload = None
+        params = self._params()
+
+        if method == "getMe":
+            self._send_json(200, {"ok": True, "result": {
+                "id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_bot"}})
+            return
+
+        if method not in ("sendMessage", "sendPhoto"):
+            self._send_json(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+            return
+
+        chat_id = params.get("chat_id", "0")
+        with server.stats_lock:
+            retry_after = server.check_flood(chat_id)
+            if retry_after is not None:
+                server.throttled_count += 1
+            else:
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        if retry_after is not None:
+            self._send_json(429, {"ok": False, "error_code": 429,
+                                  "description": f"Too Many Requests: retry after {retry_after}",
+                                  "parameters": {"retry_after": retry_after}})
+            return
+
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+            text = params.get("text", params.get("caption", ""))
+            with server.stats_lock:
+                server.message_id += 1
+                message_id = server.message_id
+                server.received.append((chat_id, params.get("message_thread_id"), text))
+                if self.upload is not None:
+                    server.uploads.append(self.upload)
+            self._send_json(200, {"ok": True, "result": {
+                "message_id": message_id, "date": int(time.time()),
+                "chat": {"id": int(chat_id), "type": "supergroup" if chat_id.startswith("-") else "private"},
+                "text": text}})
+        finally:
+            with server.stats_lock:
+                server.in_flight -= 1
+
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0, global_limit: Optional[int] = None,
+                 chat_limit: Optional[int] = None, window: float = 1.0):
+        super().__init__(("127.0.0.1", 0), FakeTelegramHandler)
+        self.latency = latency
+        self.global_limit = global_limit  # max messages per window overall
+        self.chat_limit = chat_limit      # max messages per window per chat
+        self.window = window
+        self.recent: Dict[str, deque] = {}
+        self.stats_lock = threading.Lock()
+        self.received: List[tuple] = []
+        self.uploads: List[bytes] = []
+        self.message_id = 0
+        self.throttled_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _check(self, key: str, limit: Optional[int], now: float) -> Optional[int]:
+        if not limit:
+            return None
+        window = self.recent.setdefault(key, deque())
+        while window and now - window[0] >= self.window:
+            window.popleft()
+        if len(window) >= limit:
+            return max(1, int(self.window - (now - window[0]) + 0.999))
+        return None
+
+    def check_flood(self, chat_id: str) -> Optional[int]:
+        """Sliding-window flood control; returns retry_after seconds when the message is rejected"""
+        now = time.monotonic()
+        retry_after = self._check("*", self.global_limit, now) or self._check(chat_id, self.chat_limit, now)
+        if retry_after is None:
+            for key, limit in (("*", self.global_limit), (chat_id, self.chat_limit)):
+                if limit:
+                    self.recent[key].append(now)
+        return retry_after
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+
+def start_fake_telegram(**kwargs) -> FakeTelegramServer:
+    """Start a fake Bot API server on a free local port in a background thread"""
+    server = FakeTelegramServer(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Golden outputs of the pre-vectorization SMC, MACD and RSI divergence detectors
+The parity tests run the current modules over the same random-walk corpus and compare with
+benchmarks/golden/<name>.json. Regenerate from the baseline commit with:
+    python -m benchmarks.golden
+"""
+
+import json
+import os
+import sys
+from typing import Callable, Dict, List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_smc import random_walk
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+
+SMC_SETTINGS = [
+    {},
+    {'max_zones_per_type': 5, 'lookback_period': 3},
+    {'max_zones_per_type': 1, 'lookback_period': 30, 'fvg_min_range': 0.0},
+]
+MACD_SETTINGS = [{}, {'min_histogram_change': 0.0},
+                 {'fast_period': 3, 'slow_period': 6, 'signal_period': 2, 'max_signals_per_type': 5}]
+RSI_SETTINGS = [{}, {'min_rsi': 55, 'max_rsi': 45, 'min_price_change': 0.001, 'min_rsi_change': 1}]
+
+
+def result_key(results) -> list:
+    """Comparable form of a FeatureResult list, as it reads back from JSON"""
+    return json.loads(json.dumps([[r.direction, r.strength, r.score, r.reasons, r.levels] for r in results]))
+
+
+def smc_outputs(smc) -> Dict[str, list]:
+    outputs = {}
+    for seed in range(6):  # every (size, volatility) pair once
+        df = random_walk([60, 220][seed % 2], seed=seed, vol=[0.002, 0.01, 0.03][seed % 3])
+        for i, kwargs in enumerate(SMC_SETTINGS):
+            settings = smc.SMCSettings(**kwargs)
+            outputs[f"{seed}/{i}/ob"] = result_key(smc.detect_order_blocks(df, settings))
+            outputs[f"{seed}/{i}/bos"] = result_key(smc.detect_bos_choch(df, settings))
+            for direction in [None, 'long', 'short']:
+                outputs[f"{seed}/{i}/fvg/{direction}"] = result_key(smc.detect_fvg(df, settings, direction))
+                outputs[f"{seed}/{i}/analyze/{direction}"] = result_key(smc.analyze(df, settings, direction))
+    for n in [3, 5, 20, 22, 25]:
+        outputs[f"short/{n}"] = result_key(smc.analyze(random_walk(n, seed=n)))
+    return outputs
+
+
+def macd_outputs(macd) -> Dict[str, list]:
+    outputs = {}
+    for seed in range(60):
+        df = random_walk([36, 60, 220][seed % 3], seed=seed, vol=[0.001, 0.01, 0.03][seed % 3])
+        for i, kwargs in enumerate(MACD_SETTINGS):
+            outputs[f"{seed}/{i}"] = result_key(macd.analyze(df, macd.MACDSettings(**kwargs)))
+    return outputs
+
+
+def rsi_divergence_frames() -> List:
+    return [random_walk([60, 220, 500][seed % 3], seed=seed, vol=[0.005, 0.02, 0.04][seed % 3])
+            for seed in range(90)]
+
+
+def rsi_divergence_outputs(rsi_divergence, analyze: Callable = None) -> Dict[str, list]:
+    analyze = analyze or rsi_divergence.analyze
+    outputs = {}
+    for seed, df in enumerate(rsi_divergence_frames()):
+        for i, kwargs in enumerate(RSI_SETTINGS):
+            outputs[f"{seed}/{i}"] = result_key(analyze(df, kwargs))
+    return outputs
+
+
+GOLDEN = {
+    'smc': ('modules/smc.py', smc_outputs),
+    'macd': ('modules/macd.py', macd_outputs),
+    'rsi_divergence': ('modules/rsi_divergence.py', rsi_divergence_outputs),
+}
+
+
+def load_golden(name: str) -> Dict[str, list]:
+    with open(os.path.join(GOLDEN_DIR, f"{name}.json")) as f:
+        return json.load(f)
+
+
+def main():
+    from benchmarks.baseline import BASELINE_REV, load_baseline
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for name, (path, outputs) in GOLDEN.items():
+        golden = outputs(load_baseline(path))
+        with open(os.path.join(GOLDEN_DIR, f"{name}.json"), 'w') as f:
+            json.dump(golden, f, separators=(',', ':'), sort_keys=True)
+        hits = sum(bool(results) for results in golden.values())
+        print(f"{name}: {len(golden)} cases ({hits} with results) from {BASELINE_REV}:{path}")
+
+
+if __name__ == '__main__':
+    main()
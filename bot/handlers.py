@@ -101,10 +101,9 @@ async def watchlist_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         user_id = str(update.effective_user.id) if update.effective_user else '123456'
         
         # Import here to avoid circular imports
-        from db.database import init_db
+        from db.database import get_db
         from db.repo import Repo
-        conn = init_db('./data/bot.db', './db/schema.sql')
-        repo = Repo(conn)
+        repo = Repo(get_db('./data/bot.db'))
         
         # Get active setups from the database
         active_setups = repo.get_active_setups(user_id)
@@ -252,10 +251,9 @@ async def show_watchlist_menu(update: Update, context: ContextTypes.DEFAULT_TYPE
         user_id = str(update.effective_user.id) if update.effective_user else '123456'
         
         # Import here to avoid circular imports
-        from db.database import init_db
+        from db.database import get_db
         from db.repo import Repo
-        conn = init_db('./data/bot.db', './db/schema.sql')
-        repo = Repo(conn)
+        repo = Repo(get_db('./data/bot.db'))
         
         # Get active setups from the database
         active_setups = repo.get_active_setups(user_id)
@@ -0,0 +1,217 @@
+"""
+Content-addressed chart cache
+Charts are keyed by (symbol, tf, last candle ts, overlays/annotation hash), so a chart requested
+twice in one candle is rendered once. PNGs live in memory for the send path and on disk for the
+outbox; the disk cache is bounded by size and age and evicted least-recently-used first.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+CACHE_DIR = 'data/charts/cache'
+
+
+def chart_key(symbol: str, timeframe: str, candle_ts: int, overlays: Optional[dict] = None,
+              annotation: Optional[dict] = None) -> str:
+    """Stable key for one chart; any change to the overlays or annotation gives a new key"""
+    content = json.dumps([symbol, timeframe, int(candle_ts), overlays or {}, annotation or {}],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()[:32]
+
+
+class ChartCache:
+    """PNG bytes by chart key: small in-memory LRU in front of a size/age bounded directory"""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = 50 * 1024 * 1024,
+                 max_age_seconds: float = 24 * 3600, memory_items: int = 32):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.memory_items = memory_items
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._files: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (size, last access), oldest first
+        self._pending: Dict[str, Future] = {}
+        self.disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Index the files left by earlier runs; mtime is the last access"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.png'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for accessed, key, size in sorted(entries):
+            self._files[key] = (size, accessed)
+            self.disk_bytes += size
+        self.evict()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached PNG bytes or None; a hit refreshes the entry's LRU position"""
+        with self._lock:
+            png = self._memory.get(key)
+            if png is not None:
+                self._memory.move_to_end(key)
+            if key in self._files:
+                self._touch(key)
+        if png is not None:
+            return png
+        if key not in self._files:
+            return None
+        try:
+            with open(self.path(key), 'rb') as f:
+                png = f.read()
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+        self._remember(key, png)
+        return png
+
+    def put(self, key: str, png: bytes) -> str:
+        """Store a rendered chart and return its path on disk"""
+        path = self.path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(png)
+        os.replace(tmp, path)  # readers never see a partial file
+        self._remember(key, png)
+        with self._lock:
+            self._forget(key)
+            self._files[key] = (len(png), time.time())
+            self.disk_bytes += len(png)
+        self.evict()
+        return path
+
+    def get_or_render(self, key: str, render: Callable[[], Future]) -> Future:
+        """Future with the chart bytes: cached, already rendering, or rendered now via render()"""
+        png = self.get(key)
+        with self._lock:
+            if png is not None:
+                self.hits += 1
+                future: Future = Future()
+                future.set_result(png)
+                return future
+            if key in self._pending:
+                self.hits += 1  # same chart requested again while it renders
+                return self._pending[key]
+            self.misses += 1
+            future = Future()
+            self._pending[key] = future
+
+        def store(rendered: Future):
+            # Resolve only once the file is written, so the outbox can pick it up by path
+            try:
+                png = rendered.result()
+                self.put(key, png)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(png)
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+
+        try:
+            render().add_done_callback(store)
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(key, None)
+            future.set_exception(e)
+        return future
+
+    def evict(self) -> int:
+        """Drop files older than max_age, then least recently used ones until under max_bytes"""
+        expired = time.time() - self.max_age_seconds
+        removed = []
+        with self._lock:
+            for key, (size, accessed) in list(self._files.items()):
+                if accessed >= expired and self.disk_bytes <= self.max_bytes:
+                    break  # the rest was used more recently
+                self._forget(key)
+                self._memory.pop(key, None)
+                removed.append(key)
+            self.evicted += len(removed)
+        for key in removed:
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+        return len(removed)
+
+    def _touch(self, key: str):
+        size, _ = self._files[key]
+        self._files[key] = (size, time.time())
+        self._files.move_to_end(key)
+        try:
+            os.utime(self.path(key))  # keeps the LRU order across restarts
+        except OSError:
+            pass
+
+    def _forget(self, key: str):
+        entry = self._files.pop(key, None)
+        if entry is not None:
+            self.disk_bytes -= entry[0]
+
+    def _remember(self, key: str, png: bytes):
+        with self._lock:
+            self._memory[key] = png
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            'files': len(self._files),
+            'disk_mb': round(self.disk_bytes / 1024 / 1024, 2),
+            'evicted': self.evicted,
+        }
+
+
+def load_chart(path: Optional[str]) -> Optional[bytes]:
+    """Chart bytes for a stored chart path, from the shared cache's memory when possible"""
+    if not path:
+        return None
+    if _cache is not None and os.path.dirname(path) == _cache.cache_dir:
+        return _cache.get(os.path.basename(path)[:-4])
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+_cache: Optional[ChartCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_chart_cache() -> ChartCache:
+    """Shared chart cache (CHART_CACHE_MB, CHART_CACHE_HOURS)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ChartCache(
+                max_bytes=int(float(os.getenv('CHART_CACHE_MB', '50')) * 1024 * 1024),
+                max_age_seconds=float(os.getenv('CHART_CACHE_HOURS', '24')) * 3600,
+            )
+        return _cache
+
+
+__all__ = ['ChartCache', 'chart_key', 'get_chart_cache', 'load_chart', 'CACHE_DIR']
@@ -0,0 +1,151 @@
+"""
+Chart rendering service
+matplotlib is CPU-heavy and not thread-safe, so charts are rendered in warm worker processes
+(Agg backend, mplfinance imported and the chart style built once per worker). Callers get a
+Future with the PNG bytes that fails with TimeoutError when the job takes longer than its timeout.
+"""
+import atexit
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from charts.renderer import render_chart_bytes, chart_style
+
+# Candles the renderer keeps (render_chart_bytes plots the last 140)
+CHART_CANDLES = 140
+
+
+def _init_worker():
+    """Pin the Agg backend, import mplfinance and build the cached style once per worker"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot  # noqa: F401
+    import mplfinance  # noqa: F401
+    chart_style()
+
+
+def _warmup(_) -> int:
+    time.sleep(0.05)  # keep the task busy so every worker picks one up
+    return os.getpid()
+
+
+def _on_alarm(signum, frame):
+    raise TimeoutError('chart render timed out')
+
+
+def _render_job(symbol: str, timeframe: str, candles, overlays: Optional[dict], indicators: Optional[dict],
+                annotation: Optional[dict], timeout: float) -> bytes:
+    """Render in the worker; the alarm frees the worker when a render hangs"""
+    signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return render_chart_bytes(symbol, timeframe, candles, overlays, indicators, annotation)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ChartRenderService:
+    """Warm worker processes returning PNG bytes asynchronously"""
+
+    def __init__(self, workers: int = 2, timeout: float = 20.0):
+        self.workers = workers
+        self.timeout = timeout
+        # spawn: the bot process runs threads, forking it is not safe
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+        )
+        self._lock = threading.Lock()
+        self.rendered = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.render_seconds = 0.0
+        # Start all workers now so the first alert does not pay for the imports
+        pids = set(self.executor.map(_warmup, range(workers * 2)))
+        print(f"[CHART-RENDER] {workers} workers ready ({len(pids)} warmed up)")
+
+    def submit(self, symbol: str, timeframe: str, candles, overlays: Optional[dict] = None,
+               indicators: Optional[dict] = None, annotation: Optional[dict] = None,
+               timeout: Optional[float] = None) -> Future:
+        """Queue a render job; the future resolves to PNG bytes or fails after `timeout` seconds"""
+        timeout = timeout or self.timeout
+        candles = candles[-CHART_CANDLES:]  # only the plotted window is pickled
+        result: Future = Future()
+        submitted = time.perf_counter()
+        job = self.executor.submit(_render_job, symbol, timeframe, candles, overlays, indicators, annotation, timeout)
+        # The deadline covers queueing as well, the worker alarm only the render itself
+        timer = threading.Timer(timeout, self._expire, (result, job, symbol, timeframe, timeout))
+        timer.daemon = True
+        timer.start()
+
+        def done(job_future):
+            timer.cancel()
+            error = job_future.exception()
+            with self._lock:
+                if result.done():
+                    return  # already expired
+                if error is not None:
+                    self.failed += 1
+                    result.set_exception(error)
+                else:
+                    self.rendered += 1
+                    self.render_seconds += time.perf_counter() - submitted
+                    result.set_result(job_future.result())
+
+        job.add_done_callback(done)
+        return result
+
+    def _expire(self, result: Future, job: Future, symbol: str, timeframe: str, timeout: float):
+        with self._lock:
+            if result.done():
+                return
+            self.timed_out += 1
+            job.cancel()  # still queued: do not spend a worker on an alert that went out without chart
+            result.set_exception(TimeoutError(f"chart {symbol} {timeframe} not rendered within {timeout:.0f}s"))
+        print(f"[CHART-RENDER] timeout for {symbol} {timeframe}")
+
+    def render(self, symbol: str, timeframe: str, candles, overlays: Optional[dict] = None,
+               indicators: Optional[dict] = None, annotation: Optional[dict] = None) -> bytes:
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(symbol, timeframe, candles, overlays, indicators, annotation).result()
+
+    def stats(self) -> dict:
+        return {
+            'rendered': self.rendered,
+            'failed': self.failed,
+            'timed_out': self.timed_out,
+            'avg_ms': round(self.render_seconds / self.rendered * 1000, 1) if self.rendered else 0.0,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+_service: Optional[ChartRenderService] = None
+
+
+def get_chart_render_service() -> Optional[ChartRenderService]:
+    """Shared service when CHART_WORKERS > 0, otherwise None (alerts are sent without chart)"""
+    global _service
+    workers = int(os.getenv('CHART_WORKERS', '0'))
+    if workers <= 0:
+        return None
+    if _service is None or _service.workers != workers:
+        if _service is not None:
+            _service.shutdown()
+        _service = ChartRenderService(workers, float(os.getenv('CHART_TIMEOUT', '20')))
+    return _service
+
+
+@atexit.register
+def _shutdown_service():
+    if _service is not None:
+        _service.shutdown()
+
+
+__all__ = ['ChartRenderService', 'get_chart_render_service', 'CHART_CANDLES']
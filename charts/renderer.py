@@ -1,8 +1,25 @@
 from __future__ import annotations
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
 import pandas as pd
 import mplfinance as mpf
 
+
+@lru_cache(maxsize=1)
+def chart_style():
+    """Light theme style with enhanced candle colors, built once per process"""
+    mc = mpf.make_marketcolors(up="#22c55e", down="#ef4444", edge="#16a34a", wick="#16a34a", volume="#d1d5db")
+    return mpf.make_mpf_style(
+        base_mpf_style="default",
+        marketcolors=mc,
+        gridstyle="--",
+        facecolor="#ffffff",
+        figcolor="#ffffff",
+        rc={"axes.labelcolor":"#374151","xtick.color":"#6b7280","ytick.color":"#6b7280"}
+    )
+
+
 def render_chart_png(
     symbol: str,
     timeframe: str,
@@ -12,13 +29,37 @@ def render_chart_png(
     indicators: dict | None = None, # rsi/macd series
     annotation: dict | None = None, # signal annotation data
 ) -> str:
+    png = render_chart_bytes(symbol, timeframe, candles, overlays, indicators, annotation)
+    return save_chart_png(png, symbol, timeframe, out_dir)
+
+
+def save_chart_png(png: bytes, symbol: str, timeframe: str, out_dir: str = "data/charts") -> str:
+    """Write rendered PNG bytes to out_dir and return the path"""
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    # Create unique filename with timestamp to prevent overwriting
+    import time
+    timestamp = int(time.time() * 1000)  # Millisecond precision
+    file_path = Path(out_dir) / f"{symbol}_{timeframe}_{timestamp}.png"
+    file_path.write_bytes(png)
+    return str(file_path)
+
+
+def render_chart_bytes(
+    symbol: str,
+    timeframe: str,
+    candles,                        # candle dicts or a CandleSeries
+    overlays: dict | None = None,
+    indicators: dict | None = None,
+    annotation: dict | None = None,
+    dpi: int = 170,
+) -> bytes:
+    """Render the chart in memory and return the PNG bytes"""
     overlays = overlays or {}
     indicators = indicators or {}
     annotation = annotation or {}
 
-    Path(out_dir).mkdir(parents=True, exist_ok=True)
-
-    df = pd.DataFrame(candles)
+    df = candles.to_frame() if hasattr(candles, "to_frame") else pd.DataFrame(candles)
     for col in ["open","high","low","close","volume","ts"]:
         df[col] = pd.to_numeric(df[col], errors="coerce")
 
@@ -31,16 +72,7 @@ def render_chart_png(
     
     # Calculate current price for annotations
     current_price = df['Close'].iloc[-1] if not df.empty else 0
-    # Light theme style with enhanced candle colors
-    mc = mpf.make_marketcolors(up="#22c55e", down="#ef4444", edge="#16a34a", wick="#16a34a", volume="#d1d5db")
-    s = mpf.make_mpf_style(
-        base_mpf_style="default",
-        marketcolors=mc,
-        gridstyle="--",
-        facecolor="#ffffff",
-        figcolor="#ffffff",
-        rc={"axes.labelcolor":"#374151","xtick.color":"#6b7280","ytick.color":"#6b7280"}
-    )
+    s = chart_style()
 
     apds = []
 
@@ -89,11 +121,6 @@ def render_chart_png(
             alpha=0.9,
         )
 
-    # Create unique filename with timestamp to prevent overwriting
-    import time
-    timestamp = int(time.time() * 1000)  # Millisecond precision
-    file_path = Path(out_dir) / f"{symbol}_{timeframe}_{timestamp}.png"
-
     # Calculate number of panels based on indicators only (horizontal lines don't create new panels)
     indicator_panels = 0
     if "rsi" in indicators:
@@ -133,37 +160,18 @@ def render_chart_png(
     if alines:
         plot_kwargs['alines'] = alines
     
-    # Add savefig at the end
-    plot_kwargs['savefig'] = dict(fname=str(file_path), dpi=170, bbox_inches="tight")
-    
-    mpf.plot(*plot_args, **plot_kwargs)
-    
-    # Add annotation overlay using matplotlib if annotation data is provided
+    plot_kwargs['returnfig'] = True
+
+    fig, axes = mpf.plot(*plot_args, **plot_kwargs)
+    ax = axes[0]
+
+    # Annotations are drawn on the price axes so the figure is encoded only once
     if annotation:
-        import matplotlib.pyplot as plt
-        from matplotlib.patches import Rectangle
-        
-        # Reopen the saved image to add annotation
-        fig, ax = plt.subplots(figsize=(12, 8))
-        img = plt.imread(str(file_path))
-        ax.imshow(img)
-        ax.axis('off')
-        
-        # Add annotation box to the right side of the image, not blocking candles
-        img_height, img_width = img.shape[:2]
-        box_width, box_height = img_width * 0.35, img_height * 0.4  # Smaller box
-        # Position box on the right side, leaving main chart area clear
-        box_x, box_y = img_width * 0.63, (img_height - box_height) / 2
-        
+        from matplotlib.transforms import blended_transform_factory
+
         # Determine background color based on direction
         bg_color = '#fee2e2' if annotation.get('direction') == 'short' else '#dcfce7'  # Light red for short, light green for long
-        
-        # Create annotation box with direction-based background
-        rect = Rectangle((box_x, box_y), box_width, box_height, 
-                        linewidth=2, edgecolor='#374151', facecolor=bg_color, alpha=0.8)
-        ax.add_patch(rect)
-        
-        # Add annotation text
+
         annotation_text = []
         if annotation.get('direction'):
             direction_emoji = "🟥 SHORT" if annotation['direction'] == 'short' else "🟩 LONG"
@@ -174,49 +182,50 @@ def render_chart_png(
         if annotation.get('reasons'):
             for reason in annotation['reasons'][:4]:  # Limit to 4 reasons
                 annotation_text.append(f"{reason}")
-        
+
+        # Box on the right side of the price panel, leaving the latest candles visible
         if annotation_text:
-            full_text = "\n".join(annotation_text)
-            ax.text(box_x + box_width/2, box_y + box_height/2, full_text, 
-                   horizontalalignment='center', verticalalignment='center',
-                   fontsize=10, fontweight='bold', color='#1f2937')
-        
+            ax.text(0.80, 0.5, "\n".join(annotation_text), transform=ax.transAxes,
+                    horizontalalignment='center', verticalalignment='center',
+                    fontsize=10, fontweight='bold', color='#1f2937', zorder=5,
+                    bbox=dict(boxstyle='square,pad=0.8', facecolor=bg_color, alpha=0.8,
+                              edgecolor='#374151', linewidth=2))
+
         # Add current price box in top right corner
         if current_price > 0:
             price_text = f"Current: {current_price:.2f} USDT"
-            ax.text(img_width - 20, 20, price_text,
-                   horizontalalignment='right', verticalalignment='top',
-                   fontsize=10, fontweight='bold', color='#1f2937',
-                   bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8, edgecolor='#374151'))
-        
+            ax.text(0.99, 0.98, price_text, transform=ax.transAxes,
+                    horizontalalignment='right', verticalalignment='top',
+                    fontsize=10, fontweight='bold', color='#1f2937', zorder=5,
+                    bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8, edgecolor='#374151'))
+
         # Add watermark in bottom left corner
-        ax.text(20, img_height - 10, "@CryptoSignalHub",
-               horizontalalignment='left', verticalalignment='bottom',
-               fontsize=8, fontweight='normal', color='#9ca3af',
-               alpha=0.6)
-        
-        # Add TP/SL lines if provided in annotation
-        if 'tp_levels' in annotation or 'sl_level' in annotation:
-            # Draw horizontal lines for TP levels
-            for i, tp_level in enumerate(annotation.get('tp_levels', [])):
-                # Convert price to image coordinate (simplified approach)
-                # This is a simplified approach - in a real implementation, you'd need to map price to y-coord
-                # For now, just add text labels
-                ax.text(img_width - 50, 100 + i*30, f"TP{i+1}: {tp_level:.2f}",
-                       horizontalalignment='right', verticalalignment='top',
-                       fontsize=10, fontweight='bold', color='green',
-                       bbox=dict(boxstyle='round,pad=0.2', facecolor='lightgreen', alpha=0.7, edgecolor='green'))
-            
-            # Draw SL level
-            if 'sl_level' in annotation:
-                sl_level = annotation['sl_level']
-                ax.text(img_width - 50, 160, f"SL: {sl_level:.2f}",
-                       horizontalalignment='right', verticalalignment='top',
-                       fontsize=10, fontweight='bold', color='red',
-                       bbox=dict(boxstyle='round,pad=0.2', facecolor='lightcoral', alpha=0.7, edgecolor='red'))
-        
-        # Save the annotated image
-        plt.savefig(str(file_path), dpi=170, bbox_inches="tight")
-        plt.close()
-
-    return str(file_path)
\ No newline at end of file
+        fig.text(0.01, 0.01, "@CryptoSignalHub",
+                 horizontalalignment='left', verticalalignment='bottom',
+                 fontsize=8, fontweight='normal', color='#9ca3af', alpha=0.6)
+
+        # TP/SL lines at their real price, labelled at the right edge of the panel
+        levels = [(f"TP{i+1}", float(tp), 'green', 'lightgreen')
+                  for i, tp in enumerate(annotation.get('tp_levels') or []) if tp is not None]
+        if annotation.get('sl_level') is not None:
+            levels.append(("SL", float(annotation['sl_level']), 'red', 'lightcoral'))
+        if levels:
+            # mplfinance fixes the y-limits, widen them so every level stays on the chart
+            y_low, y_high = ax.get_ylim()
+            prices = [price for _, price, _, _ in levels]
+            pad = (max(y_high, *prices) - min(y_low, *prices)) * 0.02
+            ax.set_ylim(min(y_low, min(prices) - pad), max(y_high, max(prices) + pad))
+            label_transform = blended_transform_factory(ax.transAxes, ax.transData)
+            for name, price, color, face in levels:
+                ax.axhline(price, color=color, linestyle='--', linewidth=1.2, alpha=0.9)
+                ax.text(0.99, price, f"{name}: {price:.2f}", transform=label_transform,
+                        horizontalalignment='right', verticalalignment='bottom',
+                        fontsize=10, fontweight='bold', color=color, zorder=5,
+                        bbox=dict(boxstyle='round,pad=0.2', facecolor=face, alpha=0.7, edgecolor=color))
+
+    import matplotlib.pyplot as plt
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+
+    return buffer.getvalue()
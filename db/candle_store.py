@@ -0,0 +1,108 @@
+import os
+import time
+from typing import Optional, List, Dict, Iterable, Set, Tuple
+
+import numpy as np
+
+from scanner.candles import CandleSeries, as_candle_series
+
+# A missing range only counts as a real gap (halt, listing) once this many full-window fetches came
+# back without it, and it is fetched again after the TTL in case it was an exchange hiccup after all
+GAP_CONFIRMATIONS = 2
+GAP_TTL_SECONDS = int(os.getenv('CANDLE_GAP_TTL_HOURS', '24')) * 3600
+
+
+class CandleStore:
+    """Persistent (symbol, timeframe, ts) candle cache backed by the `candles` table"""
+
+    def __init__(self, conn, keep_candles: int = 500):
+        self.conn = conn
+        self.keep_candles = keep_candles  # default rows kept per series, older ones are pruned
+
+    def last_ts(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Open time of the newest stored candle"""
+        cur = self.conn.execute(
+            'SELECT MAX(ts) FROM candles WHERE symbol = ? AND timeframe = ?',
+            (symbol, timeframe)
+        )
+        row = cur.fetchone()
+        return int(row[0]) if row and row[0] is not None else None
+
+    def upsert_many(
+        self,
+        series: Iterable[Tuple[str, str, CandleSeries]],
+        tf_ms: Dict[str, int],
+        keep_candles: Optional[int] = None,
+    ) -> int:
+        """
+        Store several (symbol, timeframe, candles) series in one transaction.
+        Existing rows are overwritten because the newest candle may still have been forming.
+        """
+        keep = keep_candles or self.keep_candles
+        written = 0
+        for symbol, timeframe, candles in series:
+            if not len(candles):
+                continue
+            candles = as_candle_series(candles)
+            self.conn.executemany(
+                '''INSERT INTO candles (symbol, timeframe, ts, open, high, low, close, volume)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(symbol, timeframe, ts) DO UPDATE SET
+                   open=excluded.open, high=excluded.high, low=excluded.low,
+                   close=excluded.close, volume=excluded.volume''',
+                [(symbol, timeframe) + row for row in candles.rows()]
+            )
+            cutoff = int(candles.ts[-1]) - keep * tf_ms[timeframe]
+            self.conn.execute(
+                'DELETE FROM candles WHERE symbol = ? AND timeframe = ? AND ts <= ?',
+                (symbol, timeframe, cutoff)
+            )
+            self.conn.execute(
+                'DELETE FROM candle_gaps WHERE symbol = ? AND timeframe = ? AND end_ts <= ?',
+                (symbol, timeframe, cutoff)
+            )
+            written += len(candles)
+        self.conn.commit()
+        return written
+
+    def get_window(self, symbol: str, timeframe: str, limit: int) -> CandleSeries:
+        """Newest `limit` candles, oldest first (same contract as BitgetClient.get_klines)"""
+        cur = self.conn.execute(
+            '''SELECT ts, open, high, low, close, volume FROM candles
+               WHERE symbol = ? AND timeframe = ?
+               ORDER BY ts DESC LIMIT ?''',
+            (symbol, timeframe, limit)
+        )
+        return CandleSeries.from_rows(cur.fetchall(), newest_first=True)
+
+    def known_gaps(self, symbol: str, timeframe: str, now: Optional[int] = None) -> Set[Tuple[int, int]]:
+        """(start_ts, end_ts) ranges confirmed missing by GAP_CONFIRMATIONS full-window fetches, not expired"""
+        now = int(time.time()) if now is None else now
+        cur = self.conn.execute(
+            '''SELECT start_ts, end_ts FROM candle_gaps
+               WHERE symbol = ? AND timeframe = ? AND seen >= ? AND recorded_at > ?''',
+            (symbol, timeframe, GAP_CONFIRMATIONS, now - GAP_TTL_SECONDS)
+        )
+        return {(int(start), int(end)) for start, end in cur.fetchall()}
+
+    def record_gaps(self, gaps: Iterable[Tuple[str, str, int, int]], now: Optional[int] = None) -> int:
+        """Count one more full-window fetch without candles in these (symbol, timeframe, start_ts, end_ts) ranges"""
+        now = int(time.time()) if now is None else now
+        rows = [tuple(gap) + (now,) for gap in gaps]
+        if rows:
+            self.conn.executemany(
+                '''INSERT INTO candle_gaps (symbol, timeframe, start_ts, end_ts, seen, recorded_at)
+                   VALUES (?, ?, ?, ?, 1, ?)
+                   ON CONFLICT(symbol, timeframe, start_ts, end_ts) DO UPDATE SET
+                   seen = seen + 1, recorded_at = excluded.recorded_at''',
+                rows
+            )
+            self.conn.commit()
+        return len(rows)
+
+
+def find_gaps(candles: CandleSeries, step_ms: int) -> List[Tuple[int, int]]:
+    """(prev_ts, next_ts) pairs where consecutive candles are not exactly one step apart"""
+    ts = as_candle_series(candles).ts
+    idx = np.flatnonzero(np.diff(ts) != step_ms)
+    return [(int(ts[i]), int(ts[i + 1])) for i in idx]
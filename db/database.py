@@ -1,17 +1,150 @@
+import os
 import sqlite3
+import threading
 from pathlib import Path
+from typing import Dict, List, Tuple
+
+DB_PATH = './data/bot.db'
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.sql')
+
+# Versioned migrations on top of schema.sql (version 1), tracked in PRAGMA user_version.
+# Append (version, sql) pairs here; each runs once per database.
+MIGRATIONS: List[Tuple[int, str]] = [
+    # Ranges the exchange has no candles for (trading halts, before the listing) - not backfilled again
+    (2, '''CREATE TABLE IF NOT EXISTS candle_gaps (
+        symbol TEXT NOT NULL,
+        timeframe TEXT NOT NULL,
+        start_ts INTEGER NOT NULL,
+        end_ts INTEGER NOT NULL,
+        PRIMARY KEY (symbol, timeframe, start_ts, end_ts)
+    ) WITHOUT ROWID'''),
+    # signals_sent is pruned to the dedup window by sent_at (dedup_key is indexed by its UNIQUE constraint)
+    (3, 'CREATE INDEX IF NOT EXISTS idx_signals_sent_sent_at ON signals_sent(sent_at)'),
+    # A gap only counts once repeated full fetches confirmed it, and only until it expires
+    (4, '''ALTER TABLE candle_gaps ADD COLUMN seen INTEGER NOT NULL DEFAULT 1;
+        ALTER TABLE candle_gaps ADD COLUMN recorded_at INTEGER NOT NULL DEFAULT 0'''),
+]
+
+# Per-connection settings: WAL lets bot handlers read while the scanner writes,
+# synchronous=NORMAL skips the fsync per commit (WAL stays consistent), mmap avoids read copies
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA temp_store=MEMORY',
+)
+
+_migrated: Dict[str, int] = {}
+_migrate_lock = threading.Lock()
 
 
 def get_conn(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
+    # check_same_thread=False: pooled connections move between threads, one user at a time
+    conn = sqlite3.connect(db_path, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
+def migrate(db_path: str, schema_path: str = SCHEMA_PATH) -> int:
+    """Bring the database to the latest version once per process; returns the version"""
+    key = os.path.abspath(db_path)
+    with _migrate_lock:
+        if key in _migrated:
+            return _migrated[key]
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = get_conn(db_path)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')  # persistent, stored in the database file
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version < 1:
+                # schema.sql only uses IF NOT EXISTS, so databases from before versioning upgrade cleanly
+                with open(schema_path, 'r', encoding='utf-8') as f:
+                    conn.executescript(f.read())
+                version = 1
+                conn.execute(f'PRAGMA user_version={version}')
+            for target, sql in MIGRATIONS:
+                if target > version:
+                    conn.executescript(f'BEGIN; {sql}; PRAGMA user_version={target}; COMMIT;')
+                    print(f"[DB] migrated {db_path} to version {target}")
+                    version = target
+            conn.commit()
+        finally:
+            conn.close()
+        _migrated[key] = version
+        return version
+
+
 def init_db(db_path: str, schema_path: str) -> sqlite3.Connection:
-    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    conn = get_conn(db_path)
-    with open(schema_path, 'r', encoding='utf-8') as f:
-        conn.executescript(f.read())
-    conn.commit()
-    return conn
\ No newline at end of file
+    """Migrate (first call per process only) and return a new connection"""
+    migrate(db_path, schema_path)
+    return get_conn(db_path)
+
+
+class ConnectionPool:
+    """
+    Connections to one database, cached per thread. Long-lived threads (bot loop, scheduler)
+    keep theirs; short-lived ones (pipeline stages) release() it for the next thread.
+    """
+
+    def __init__(self, db_path: str, schema_path: str = SCHEMA_PATH, max_idle: int = 8):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        migrate(db_path, schema_path)
+        self._local = threading.local()
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    self.opened += 1
+            if conn is None:
+                conn = get_conn(self.db_path)
+            self._local.conn = conn
+        return conn
+
+    def release(self):
+        """Hand the calling thread's connection back to the pool"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close the idle connections (thread-bound ones close with their thread)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str = DB_PATH, schema_path: str = SCHEMA_PATH) -> ConnectionPool:
+    """Shared pool per database file (migrated on first use)"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(db_path, schema_path)
+        return _pools[key]
+
+
+def get_db(db_path: str = DB_PATH) -> sqlite3.Connection:
+    """The calling thread's pooled connection to the bot database"""
+    return get_pool(db_path).connection()
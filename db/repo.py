@@ -1,12 +1,67 @@
 import json
 import time
 import hashlib
-from typing import Optional, List, Dict, Any
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 
 
 class Repo:
-    def __init__(self, conn):
+    def __init__(self, conn, setup_index=None, signal_state=None):
         self.conn = conn
+        self._batch_depth = 0
+        self._deferred: Optional[List[Tuple[str, tuple]]] = None
+        # Optional db.setup_index.ActiveSetupIndex: answers get_existing_idea from memory,
+        # setup writes go through to it as well as to active_setups
+        self.setup_index = setup_index
+        # Optional db.signal_state.SignalState: cooldown/dedup lookups from memory, cooldowns and
+        # sent signals are written behind (flush_signal_state)
+        self.signal_state = signal_state
+
+    # ---------- unit of work ----------
+    @contextmanager
+    def batch(self) -> Iterator['Repo']:
+        """
+        Group writes into one transaction: mutators inside the block do not commit, the
+        outermost block commits once. On error the writes made so far are still committed
+        (as they would have been call by call) before the exception propagates.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                try:
+                    self.conn.commit()
+                except Exception:
+                    self.conn.rollback()
+                    if self.setup_index is not None:
+                        self.setup_index.stale = True  # holds setups that were never stored
+                    raise
+
+    @contextmanager
+    def deferred_setups(self) -> Iterator['Repo']:
+        """
+        Queue active_setups writes inside the block and run them in one short batch() on exit, so
+        no write transaction is held while decisions are computed. Needs a setup_index: it is
+        updated right away and answers the reads in between.
+        """
+        if self.setup_index is None or self._deferred is not None:
+            yield self
+            return
+        self._deferred = []
+        try:
+            yield self
+        finally:
+            queued, self._deferred = self._deferred, None
+            if queued:
+                with self.batch():
+                    for sql, params in queued:
+                        self.conn.execute(sql, params)
+
+    def _commit(self) -> None:
+        if self._batch_depth == 0:
+            self.conn.commit()
 
     # ---------- settings ----------
     def get_settings(self, tg_user_id: str) -> dict:
@@ -51,7 +106,7 @@ class Repo:
                 now,
             ),
         )
-        self.conn.commit()
+        self._commit()
 
     # ---------- active setups ----------
     def create_setup_id(self, symbol: str, timeframe: str, timestamp: int) -> str:
@@ -78,19 +133,62 @@ class Repo:
         
         levels_json = json.dumps(levels) if levels else None
         
-        self.conn.execute(
+        sql = '''INSERT INTO active_setups 
+               (user_id, symbol, timeframe, setup_id, side, status, 
+                idea_score, trade_score, levels_json, created_at, expires_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+        values = (user_id, symbol, timeframe, setup_id, side, status,
+                  idea_score, trade_score, levels_json, now, expires_at)
+        if self._deferred is not None:
+            self._deferred.append((sql, values))
+            self.setup_index.add(self._setup_row(None, values))
+            return setup_id
+        cur = self.conn.execute(sql, values)
+        self._commit()
+        if self.setup_index is not None:
+            self.setup_index.add(self._setup_row(cur.lastrowid, values))
+        return setup_id
+
+    @staticmethod
+    def _setup_row(row_id: Optional[int], values: tuple) -> Dict[str, Any]:
+        """active_setups row for the index from the inserted values"""
+        setup = dict(zip(
+            ('user_id', 'symbol', 'timeframe', 'setup_id', 'side', 'status',
+             'idea_score', 'trade_score', 'levels_json', 'created_at', 'expires_at'),
+            values,
+        ))
+        setup.update(id=row_id, confirmed_at=None, invalidated_at=None)
+        return setup
+
+    def save_active_setups(self, setups: List[Dict[str, Any]]) -> List[str]:
+        """Bulk save_active_setup: dicts with its arguments, one executemany; returns the setup ids"""
+        now = int(time.time())
+        rows = []
+        for setup in setups:
+            setup_id = self.create_setup_id(setup['symbol'], setup['timeframe'], now)
+            levels = setup.get('levels')
+            rows.append((
+                setup['user_id'], setup['symbol'], setup['timeframe'], setup_id, setup['side'], setup['status'],
+                setup.get('idea_score'), setup.get('trade_score'), json.dumps(levels) if levels else None,
+                now, now + setup.get('expires_in_minutes', 120) * 60,
+            ))
+        self.conn.executemany(
             '''INSERT INTO active_setups 
                (user_id, symbol, timeframe, setup_id, side, status, 
                 idea_score, trade_score, levels_json, created_at, expires_at)
                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            (user_id, symbol, timeframe, setup_id, side, status,
-             idea_score, trade_score, levels_json, now, expires_at)
+            rows
         )
-        self.conn.commit()
-        return setup_id
+        self._commit()
+        if self.setup_index is not None:
+            for row in rows:
+                self.setup_index.add(self._setup_row(None, row))
+        return [row[3] for row in rows]
 
     def get_active_setups(self, user_id: str, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get active setups for user, optionally filtered by status"""
+        if self.setup_index is not None and self.setup_index.covers(user_id):
+            return self.setup_index.get_active_setups(user_id, status)
         now = int(time.time())
         
         if status:
@@ -123,13 +221,20 @@ class Repo:
     def upgrade_setup_to_trade(self, setup_id: str, trade_score: Optional[int] = None) -> bool:
         """Upgrade IDEA setup to TRADE status"""
         now = int(time.time())
-        cur = self.conn.execute(
-            '''UPDATE active_setups 
+        sql = '''UPDATE active_setups 
                SET status = 'TRADE', trade_score = ?, confirmed_at = ?
-               WHERE setup_id = ? AND status = 'IDEA' AND invalidated_at IS NULL''',
-            (trade_score, now, setup_id)
-        )
-        self.conn.commit()
+               WHERE setup_id = ? AND status = 'IDEA' AND invalidated_at IS NULL'''
+        if self._deferred is not None:
+            # The index holds exactly the live setups, so it knows whether the UPDATE will match
+            if not self.setup_index.is_idea(setup_id):
+                return False
+            self._deferred.append((sql, (trade_score, now, setup_id)))
+            self.setup_index.upgrade(setup_id, trade_score, now)
+            return True
+        cur = self.conn.execute(sql, (trade_score, now, setup_id))
+        self._commit()
+        if self.setup_index is not None and cur.rowcount > 0:
+            self.setup_index.upgrade(setup_id, trade_score, now)
         return cur.rowcount > 0
 
     def invalidate_setup(self, setup_id: str) -> bool:
@@ -139,7 +244,9 @@ class Repo:
             'UPDATE active_setups SET invalidated_at = ? WHERE setup_id = ?',
             (now, setup_id)
         )
-        self.conn.commit()
+        self._commit()
+        if self.setup_index is not None:
+            self.setup_index.discard(setup_id)
         return cur.rowcount > 0
 
     def cleanup_expired_setups(self) -> int:
@@ -149,7 +256,9 @@ class Repo:
             'DELETE FROM active_setups WHERE expires_at < ? OR invalidated_at IS NOT NULL',
             (now,)
         )
-        self.conn.commit()
+        self._commit()
+        if self.setup_index is not None:
+            self.setup_index.expire(now)
         return cur.rowcount
     
     def cleanup_expired_setups_for_user(self, user_id: str) -> int:
@@ -160,11 +269,15 @@ class Repo:
                WHERE user_id = ? AND (expires_at < ? OR invalidated_at IS NOT NULL)''',
             (user_id, now)
         )
-        self.conn.commit()
+        self._commit()
+        if self.setup_index is not None:
+            self.setup_index.expire(now)
         return cur.rowcount
 
     def get_existing_idea(self, user_id: str, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
         """Check if there's already an active IDEA for this symbol/timeframe"""
+        if self.setup_index is not None and self.setup_index.covers(user_id):
+            return self.setup_index.get_existing_idea(user_id, symbol, timeframe)
         now = int(time.time())
         cur = self.conn.execute(
             '''SELECT * FROM active_setups 
@@ -185,6 +298,8 @@ class Repo:
 
     # ---------- dedup ----------
     def has_dedup_key(self, dedup_key: str) -> bool:
+        if self.signal_state is not None:
+            return self.signal_state.has_dedup_key(dedup_key)
         cur = self.conn.execute('SELECT 1 FROM signals_sent WHERE dedup_key=? LIMIT 1', (dedup_key,))
         return cur.fetchone() is not None
 
@@ -200,25 +315,161 @@ class Repo:
         payload: dict,
     ) -> None:
         now = int(time.time())
+        row = (
+            tg_user_id,
+            dedup_key,
+            symbol,
+            timeframe,
+            signal_type,
+            candle_ts,
+            score_total,
+            json.dumps(payload, ensure_ascii=False, default=str),
+            now,
+        )
+        if self.signal_state is not None:
+            self.signal_state.add_sent([dedup_key], [row])
+            return
         self.conn.execute(
             'INSERT INTO signals_sent(tg_user_id,dedup_key,symbol,timeframe,signal_type,candle_ts,score_total,payload_json,sent_at) '
             'VALUES(?,?,?,?,?,?,?,?,?)',
+            row,
+        )
+        self._commit()
+
+    def save_sent_signals(self, signals: List[Dict[str, Any]]) -> None:
+        """Bulk save_sent_signal: dicts with its arguments, one executemany"""
+        now = int(time.time())
+        rows = [
             (
-                tg_user_id,
-                dedup_key,
-                symbol,
-                timeframe,
-                signal_type,
-                candle_ts,
-                score_total,
-                json.dumps(payload, ensure_ascii=False, default=str),
-                now,
-            ),
+                s['tg_user_id'], s['dedup_key'], s['symbol'], s['timeframe'], s['signal_type'], s['candle_ts'],
+                s.get('score_total'), json.dumps(s.get('payload', {}), ensure_ascii=False, default=str), now,
+            )
+            for s in signals
+        ]
+        if self.signal_state is not None:
+            self.signal_state.add_sent([s['dedup_key'] for s in signals], rows)
+            return
+        self.conn.executemany(
+            'INSERT INTO signals_sent(tg_user_id,dedup_key,symbol,timeframe,signal_type,candle_ts,score_total,payload_json,sent_at) '
+            'VALUES(?,?,?,?,?,?,?,?,?)',
+            rows,
+        )
+        self._commit()
+
+    def flush_signal_state(self) -> int:
+        """Write the cooldowns and sent signals queued in signal_state (one transaction)"""
+        if self.signal_state is None:
+            return 0
+        if self._batch_depth:
+            raise RuntimeError('flush_signal_state() commits, call it outside repo.batch()')
+        return self.signal_state.flush(self.conn)
+
+    def prune_signal_state(self, window_seconds: int) -> int:
+        """Delete sent signals older than the dedup window and expired cooldowns; returns the rows deleted"""
+        now = int(time.time())
+        deleted = self.conn.execute('DELETE FROM signals_sent WHERE sent_at < ?', (now - window_seconds,)).rowcount
+        deleted += self.conn.execute('DELETE FROM cooldowns WHERE expires_at <= ?', (now,)).rowcount
+        self._commit()
+        return deleted
+
+    # ---------- outbox ----------
+    def enqueue_outbox(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Queue alerts in one transaction. Messages whose dedup_key was already sent
+        or is still queued are skipped; returns the number of queued rows.
+        """
+        if self.signal_state is not None:
+            # Known sent keys are dropped here; the NOT EXISTS below still covers the rest
+            messages = [m for m in messages if not self.signal_state.has_dedup_key(m['dedup_key'])]
+            if not messages:
+                return 0
+        now = int(time.time())
+        before = self.conn.total_changes
+        self.conn.executemany(
+            '''INSERT OR IGNORE INTO outbox
+               (tg_user_id, dedup_key, priority, symbol, timeframe, signal_type, candle_ts, score_total,
+                text, chart_path, signal_data_json, payload_json, next_attempt_at, created_at)
+               SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+               WHERE NOT EXISTS (SELECT 1 FROM signals_sent WHERE dedup_key = ?)''',
+            [
+                (
+                    m['tg_user_id'], m['dedup_key'], m.get('priority', 5), m['symbol'], m['timeframe'],
+                    m['signal_type'], m['candle_ts'], m.get('score_total'), m['text'], m.get('chart_path'),
+                    json.dumps(m.get('signal_data', {}), ensure_ascii=False, default=str),
+                    json.dumps(m.get('payload', {}), ensure_ascii=False, default=str),
+                    now, now, m['dedup_key'],
+                )
+                for m in messages
+            ],
+        )
+        self._commit()
+        return self.conn.total_changes - before
+
+    def claim_outbox(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Due pending messages in priority order, marked as 'sending'"""
+        now = int(time.time())
+        cur = self.conn.execute(
+            '''SELECT * FROM outbox WHERE status = 'pending' AND next_attempt_at <= ?
+               ORDER BY priority, id LIMIT ?''',
+            (now, limit)
+        )
+        rows = [dict(row) for row in cur.fetchall()]
+        self.conn.executemany(
+            "UPDATE outbox SET status = 'sending', attempts = attempts + 1 WHERE id = ?",
+            [(row['id'],) for row in rows]
         )
-        self.conn.commit()
+        self._commit()
+        for row in rows:
+            row['attempts'] += 1
+            row['status'] = 'sending'
+            row['signal_data'] = json.loads(row['signal_data_json'])
+        return rows
+
+    def complete_outbox(self, sent_ids: List[int], failed: List[Tuple[int, str]] = (),
+                        max_attempts: int = 5, retry_seconds: int = 60) -> None:
+        """Move delivered messages to signals_sent and reschedule (or give up on) failed ones"""
+        now = int(time.time())
+        sent_keys = []
+        if self.signal_state is not None:
+            for i in range(0, len(sent_ids), 500):
+                chunk = sent_ids[i:i + 500]
+                cur = self.conn.execute(
+                    f"SELECT dedup_key FROM outbox WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                )
+                sent_keys.extend(row[0] for row in cur.fetchall())
+        self.conn.executemany(
+            '''INSERT OR IGNORE INTO signals_sent
+               (tg_user_id, dedup_key, symbol, timeframe, signal_type, candle_ts, score_total, payload_json, sent_at)
+               SELECT tg_user_id, dedup_key, symbol, timeframe, signal_type, candle_ts, score_total, payload_json, ?
+               FROM outbox WHERE id = ?''',
+            [(now, outbox_id) for outbox_id in sent_ids]
+        )
+        self.conn.executemany('DELETE FROM outbox WHERE id = ?', [(outbox_id,) for outbox_id in sent_ids])
+        self.conn.executemany(
+            '''UPDATE outbox SET
+               status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+               last_error = ?, next_attempt_at = ? + attempts * ?
+               WHERE id = ?''',
+            [(max_attempts, error, now, retry_seconds, outbox_id) for outbox_id, error in failed]
+        )
+        self._commit()
+        if sent_keys:
+            self.signal_state.add_sent(sent_keys)  # already stored above
+
+    def reset_stale_outbox(self) -> int:
+        """After a restart: messages that were being sent are pending again (at-least-once)"""
+        cur = self.conn.execute("UPDATE outbox SET status = 'pending' WHERE status = 'sending'")
+        self._commit()
+        return cur.rowcount
+
+    def outbox_counts(self) -> Dict[str, int]:
+        cur = self.conn.execute('SELECT status, COUNT(*) AS n FROM outbox GROUP BY status')
+        return {row['status']: int(row['n']) for row in cur.fetchall()}
 
     # ---------- cooldown ----------
     def is_in_cooldown(self, tg_user_id: str, key: str) -> bool:
+        if self.signal_state is not None:
+            return self.signal_state.is_in_cooldown(tg_user_id, key)
         now = int(time.time())
         cur = self.conn.execute('SELECT expires_at FROM cooldowns WHERE tg_user_id=? AND key=?', (tg_user_id, key))
         row = cur.fetchone()
@@ -226,12 +477,28 @@ class Repo:
 
     def set_cooldown(self, tg_user_id: str, key: str, seconds: int) -> None:
         expires_at = int(time.time()) + seconds
+        if self.signal_state is not None:
+            self.signal_state.set_cooldowns(tg_user_id, {key: expires_at})
+            return
         self.conn.execute(
             'INSERT INTO cooldowns(tg_user_id,key,expires_at) VALUES(?,?,?) '
             'ON CONFLICT(tg_user_id,key) DO UPDATE SET expires_at=excluded.expires_at',
             (tg_user_id, key, expires_at),
         )
-        self.conn.commit()
+        self._commit()
+
+    def set_cooldowns(self, tg_user_id: str, cooldowns: Dict[str, int]) -> None:
+        """Bulk set_cooldown: {key: seconds}"""
+        now = int(time.time())
+        if self.signal_state is not None:
+            self.signal_state.set_cooldowns(tg_user_id, {key: now + seconds for key, seconds in cooldowns.items()})
+            return
+        self.conn.executemany(
+            'INSERT INTO cooldowns(tg_user_id,key,expires_at) VALUES(?,?,?) '
+            'ON CONFLICT(tg_user_id,key) DO UPDATE SET expires_at=excluded.expires_at',
+            [(tg_user_id, key, now + seconds) for key, seconds in cooldowns.items()],
+        )
+        self._commit()
 
     # ---------- scan cursor ----------
     def get_cursor(self, user_id: str) -> int:
@@ -253,7 +520,7 @@ class Repo:
                idx=excluded.idx, updated_at=excluded.updated_at''',
             (user_id, idx, now)
         )
-        self.conn.commit()
+        self._commit()
 
     # ---------- symbol rotation ----------
     def get_last_sent(self, user_id: str, topic: str, symbol: str) -> Optional[int]:
@@ -266,6 +533,17 @@ class Repo:
         row = cur.fetchone()
         return int(row['last_sent_at']) if row else None
 
+    def get_last_sent_map(self, user_id: str, since: Optional[int] = None) -> Dict[Tuple[str, str], int]:
+        """Last sent timestamps of a user by (topic, symbol) in one query; `since` skips older entries"""
+        cur = self.conn.cursor()
+        cur.row_factory = None  # plain tuples, the rows go straight into the dict
+        cur.execute(
+            '''SELECT topic, symbol, last_sent_at FROM symbol_rotation
+               WHERE user_id = ? AND last_sent_at >= ?''',
+            (user_id, since or 0)
+        )
+        return {(topic, symbol): int(last_sent_at) for topic, symbol, last_sent_at in cur.fetchall()}
+
     def set_last_sent(self, user_id: str, topic: str, symbol: str, timestamp: Optional[int] = None) -> None:
         """Set last sent timestamp for symbol in topic"""
         if timestamp is None:
@@ -277,7 +555,20 @@ class Repo:
                last_sent_at=excluded.last_sent_at''',
             (user_id, topic, symbol, timestamp)
         )
-        self.conn.commit()
+        self._commit()
+
+    def set_last_sent_many(self, user_id: str, entries: List[Tuple[str, str]], timestamp: Optional[int] = None) -> None:
+        """Bulk set_last_sent for (topic, symbol) pairs"""
+        if timestamp is None:
+            timestamp = int(time.time())
+        self.conn.executemany(
+            '''INSERT INTO symbol_rotation(user_id, topic, symbol, last_sent_at) 
+               VALUES(?, ?, ?, ?) 
+               ON CONFLICT(user_id, topic, symbol) DO UPDATE SET 
+               last_sent_at=excluded.last_sent_at''',
+            [(user_id, topic, symbol, timestamp) for topic, symbol in entries]
+        )
+        self._commit()
 
     def can_send_symbol(self, user_id: str, topic: str, symbol: str, rotation_hours: int) -> bool:
         """Check if symbol can be sent based on rotation policy"""
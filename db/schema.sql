@@ -70,3 +70,42 @@ CREATE TABLE IF NOT EXISTS symbol_rotation (
   last_sent_at INTEGER NOT NULL,
   PRIMARY KEY (user_id, topic, symbol)
 );
+
+-- Local candle store for incremental kline fetching
+CREATE TABLE IF NOT EXISTS candles (
+  symbol TEXT NOT NULL,
+  timeframe TEXT NOT NULL,
+  ts INTEGER NOT NULL,
+  open REAL NOT NULL,
+  high REAL NOT NULL,
+  low REAL NOT NULL,
+  close REAL NOT NULL,
+  volume REAL NOT NULL,
+  PRIMARY KEY (symbol, timeframe, ts)
+) WITHOUT ROWID;
+
+-- Durable alert outbox: decisions are queued here and drained by the Telegram dispatcher
+-- (at-least-once; delivered rows move to signals_sent, which also dedups new alerts)
+CREATE TABLE IF NOT EXISTS outbox (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  tg_user_id TEXT NOT NULL,
+  dedup_key TEXT NOT NULL UNIQUE,
+  priority INTEGER NOT NULL DEFAULT 5,
+  symbol TEXT NOT NULL,
+  timeframe TEXT NOT NULL,
+  signal_type TEXT NOT NULL,
+  candle_ts INTEGER NOT NULL,
+  score_total INTEGER,
+  text TEXT NOT NULL,
+  chart_path TEXT,
+  signal_data_json TEXT NOT NULL,
+  payload_json TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending', 'sending', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  next_attempt_at INTEGER NOT NULL,
+  created_at INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbox_pending
+ON outbox(status, priority, id);
@@ -0,0 +1,150 @@
+"""
+In-memory index of active setups
+The decision engine looks up the open IDEA for every symbol x timeframe it decides on. The index
+answers that from memory: setups by (user, symbol, timeframe, status), expiry via a min-heap on
+expires_at. It is loaded once per process and user with one query and then kept in sync by the
+Repo it is attached to (Repo(conn, setup_index=...)), which writes through to active_setups.
+"""
+import heapq
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+SetupKey = Tuple[str, str, str, str]
+
+
+class ActiveSetupIndex:
+    """Live (not expired, not invalidated) setups; not thread-safe, one decide stage uses it"""
+
+    def __init__(self, user_id: Optional[str] = None):
+        self.user_id = user_id  # None: all users
+        self._by_key: Dict[SetupKey, Dict[str, Dict[str, Any]]] = {}
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._expiry: List[Tuple[int, str]] = []  # (expires_at, setup_id), stale entries skipped on pop
+        self.lookups = 0
+        self.expired = 0
+        self.stale = False  # set when a write-through transaction was rolled back: reload
+
+    @classmethod
+    def load(cls, conn, user_id: Optional[str] = None, now: Optional[int] = None) -> 'ActiveSetupIndex':
+        """Index the live setups of one user (or all users) with a single query"""
+        now = int(time.time()) if now is None else now
+        index = cls(user_id)
+        if user_id is None:
+            cur = conn.execute(
+                'SELECT * FROM active_setups WHERE expires_at > ? AND invalidated_at IS NULL ORDER BY id',
+                (now,)
+            )
+        else:
+            cur = conn.execute(
+                '''SELECT * FROM active_setups
+                   WHERE user_id = ? AND expires_at > ? AND invalidated_at IS NULL ORDER BY id''',
+                (user_id, now)
+            )
+        columns = [desc[0] for desc in cur.description]
+        for row in cur.fetchall():
+            index.add(dict(zip(columns, row)))
+        return index
+
+    def covers(self, user_id: str) -> bool:
+        return self.user_id is None or self.user_id == user_id
+
+    def add(self, setup: Dict[str, Any]) -> None:
+        """Index a setup row (as stored in active_setups)"""
+        self.discard(setup['setup_id'])
+        key = (setup['user_id'], setup['symbol'], setup['timeframe'], setup['status'])
+        self._by_key.setdefault(key, {})[setup['setup_id']] = setup
+        self._by_id[setup['setup_id']] = setup
+        heapq.heappush(self._expiry, (int(setup['expires_at']), setup['setup_id']))
+
+    def discard(self, setup_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a setup (invalidated or deleted); its heap entry is dropped lazily"""
+        setup = self._by_id.pop(setup_id, None)
+        if setup is not None:
+            key = (setup['user_id'], setup['symbol'], setup['timeframe'], setup['status'])
+            bucket = self._by_key.get(key)
+            if bucket is not None:
+                bucket.pop(setup_id, None)
+                if not bucket:
+                    del self._by_key[key]
+        return setup
+
+    def expire(self, now: Optional[int] = None) -> int:
+        """Drop setups whose expires_at has passed; O(log n) per expired setup"""
+        now = int(time.time()) if now is None else now
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, setup_id = heapq.heappop(self._expiry)
+            setup = self._by_id.get(setup_id)
+            if setup is not None and int(setup['expires_at']) == expires_at:
+                self.discard(setup_id)
+                removed += 1
+        self.expired += removed
+        return removed
+
+    def get_existing_idea(self, user_id: str, symbol: str, timeframe: str,
+                          now: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Same result as Repo.get_existing_idea, without the query"""
+        self.lookups += 1
+        self.expire(now)
+        bucket = self._by_key.get((user_id, symbol, timeframe, 'IDEA'))
+        if not bucket:
+            return None
+        return self._copy(next(iter(bucket.values())))  # oldest first, like the unordered LIMIT 1 on the rowid
+
+    def get_active_setups(self, user_id: str, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Live setups of a user, newest first"""
+        self.expire()
+        setups = [self._copy(s) for s in self._by_id.values()
+                  if s['user_id'] == user_id and (status is None or s['status'] == status)]
+        setups.sort(key=lambda s: s['created_at'], reverse=True)
+        return setups
+
+    @staticmethod
+    def _copy(setup: Dict[str, Any]) -> Dict[str, Any]:
+        """Row as the Repo returns it; levels are parsed on read, callers may modify the copy"""
+        setup = dict(setup)
+        if setup['levels_json']:
+            setup['levels'] = json.loads(setup['levels_json'])
+        return setup
+
+    def is_idea(self, setup_id: str) -> bool:
+        setup = self._by_id.get(setup_id)
+        return setup is not None and setup['status'] == 'IDEA'
+
+    def upgrade(self, setup_id: str, trade_score: Optional[int], confirmed_at: int) -> None:
+        """IDEA -> TRADE: move the setup to its TRADE bucket"""
+        setup = self._by_id.get(setup_id)
+        if setup is None or setup['status'] != 'IDEA':
+            return
+        self.discard(setup_id)
+        setup = {**setup, 'status': 'TRADE', 'trade_score': trade_score, 'confirmed_at': confirmed_at}
+        key = (setup['user_id'], setup['symbol'], setup['timeframe'], 'TRADE')
+        self._by_key.setdefault(key, {})[setup_id] = setup
+        self._by_id[setup_id] = setup  # the heap entry (same expires_at) stays valid
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def stats(self) -> dict:
+        return {'setups': len(self._by_id), 'lookups': self.lookups, 'expired': self.expired}
+
+
+_indexes: Dict[str, ActiveSetupIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_setup_index(conn, user_id: str) -> ActiveSetupIndex:
+    """Warm index of a user's setups; loaded on first use and again after it went stale"""
+    with _indexes_lock:
+        index = _indexes.get(user_id)
+        if index is None or index.stale:
+            start = time.perf_counter()
+            index = _indexes[user_id] = ActiveSetupIndex.load(conn, user_id)
+            print(f"[SETUP-INDEX] {len(index)} active setups of {user_id} loaded "
+                  f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return index
+
+
+__all__ = ['ActiveSetupIndex', 'get_setup_index']
@@ -0,0 +1,211 @@
+"""
+In-memory cooldowns and sent-signal dedup keys
+Cooldowns live in a TTL map (dict + min-heap on expires_at), sent dedup keys as 64-bit hashes:
+a sorted int64 array for the history hydrated at startup (8 bytes per signal) plus a set for
+keys added since. Attached to a Repo (Repo(conn, signal_state=...)) the lookups are answered
+from memory and cooldown/sent-signal writes are persisted write-behind by flush().
+Only signals sent within DEDUP_WINDOW_SECONDS are kept (Repo.prune_signal_state).
+"""
+import hashlib
+import heapq
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from db.database import DB_PATH, get_pool
+
+# Keys added since hydration are merged into the sorted array once there are this many
+COMPACT_AFTER = 65536
+
+# Dedup keys contain the candle ts and the scanner only decides on the newest candles, so a key
+# cannot come back once its candle is a few hours old; the margin covers outbox retries and restarts
+DEDUP_WINDOW_SECONDS = int(os.getenv('DEDUP_WINDOW_DAYS', '7')) * 86400
+
+
+def dedup_hash(dedup_key: str) -> int:
+    """
+    Stable 64-bit hash of a make_dedup_key() key (collision odds ~n^2/2^65, 3e-8 for 1M keys).
+    blake2b instead of hash(): str hashes are salted per process, spawned workers would disagree.
+    """
+    return int.from_bytes(hashlib.blake2b(dedup_key.encode(), digest_size=8).digest(), 'little', signed=True)
+
+
+class CooldownMap:
+    """(user, key) -> expires_at; expired entries are dropped from the heap in O(log n)"""
+
+    def __init__(self):
+        self._expires: Dict[Tuple[str, str], int] = {}
+        self._heap: List[Tuple[int, str, str]] = []
+
+    def set(self, tg_user_id: str, key: str, expires_at: int) -> None:
+        self._expires[(tg_user_id, key)] = expires_at
+        heapq.heappush(self._heap, (expires_at, tg_user_id, key))
+
+    def active(self, tg_user_id: str, key: str, now: int) -> bool:
+        expires_at = self._expires.get((tg_user_id, key))
+        return expires_at is not None and expires_at > now
+
+    def expire(self, now: int) -> int:
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, tg_user_id, key = heapq.heappop(self._heap)
+            if self._expires.get((tg_user_id, key)) == expires_at:  # not extended since
+                del self._expires[(tg_user_id, key)]
+                removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+class DedupSet:
+    """Hashed dedup keys: sorted int64 history (binary search) + set of recent hashes"""
+
+    def __init__(self, hashes: Optional[np.ndarray] = None):
+        self._sorted = np.unique(hashes) if hashes is not None else np.empty(0, dtype=np.int64)
+        self._recent = set()
+
+    def add(self, dedup_key: str) -> None:
+        self._recent.add(dedup_hash(dedup_key))
+        if len(self._recent) >= COMPACT_AFTER:
+            self.compact()
+
+    def __contains__(self, dedup_key: str) -> bool:
+        h = dedup_hash(dedup_key)
+        if h in self._recent:
+            return True
+        i = int(self._sorted.searchsorted(h))
+        return i < len(self._sorted) and int(self._sorted[i]) == h
+
+    def compact(self) -> None:
+        recent = np.fromiter(self._recent, dtype=np.int64, count=len(self._recent))
+        self._sorted = np.union1d(self._sorted, recent)
+        self._recent = set()
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._recent)
+
+    @property
+    def nbytes(self) -> int:
+        return self._sorted.nbytes + len(self._recent) * 8
+
+
+class SignalState:
+    """Cooldowns and dedup keys of all users, shared by the scanner and the outbox drainer"""
+
+    def __init__(self):
+        self.cooldowns = CooldownMap()
+        self.dedup = DedupSet()
+        self._lock = threading.Lock()
+        self._pending_cooldowns: Dict[Tuple[str, str], int] = {}
+        self._pending_signals: List[tuple] = []
+
+    @classmethod
+    def load(cls, conn, batch_size: int = 100000) -> 'SignalState':
+        """Hydrate from cooldowns (live ones) and signals_sent (dedup keys within the window)"""
+        state = cls()
+        now = int(time.time())
+        for row in conn.execute('SELECT tg_user_id, key, expires_at FROM cooldowns WHERE expires_at > ?', (now,)):
+            state.cooldowns.set(row[0], row[1], int(row[2]))
+        chunks = []
+        cur = conn.cursor()
+        cur.row_factory = None  # plain tuples: a Row object per signal doubles the fetch time
+        cur.execute('SELECT dedup_key FROM signals_sent WHERE sent_at >= ?', (now - DEDUP_WINDOW_SECONDS,))
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            chunks.append(np.fromiter((dedup_hash(row[0]) for row in rows), dtype=np.int64, count=len(rows)))
+        if chunks:
+            state.dedup = DedupSet(np.concatenate(chunks))
+        return state
+
+    # ---------- lookups ----------
+    def is_in_cooldown(self, tg_user_id: str, key: str) -> bool:
+        with self._lock:
+            return self.cooldowns.active(tg_user_id, key, int(time.time()))
+
+    def has_dedup_key(self, dedup_key: str) -> bool:
+        with self._lock:
+            return dedup_key in self.dedup
+
+    # ---------- writes ----------
+    def set_cooldowns(self, tg_user_id: str, expires: Dict[str, int], persist: bool = True) -> None:
+        """{key: expires_at}; queued for the next flush unless already stored"""
+        with self._lock:
+            self.cooldowns.expire(int(time.time()))
+            for key, expires_at in expires.items():
+                self.cooldowns.set(tg_user_id, key, expires_at)
+                if persist:
+                    self._pending_cooldowns[(tg_user_id, key)] = expires_at
+
+    def add_sent(self, dedup_keys: List[str], rows: Optional[List[tuple]] = None) -> None:
+        """Remember sent dedup keys; `rows` (signals_sent values) are queued for the next flush"""
+        with self._lock:
+            for dedup_key in dedup_keys:
+                self.dedup.add(dedup_key)
+            if rows:
+                self._pending_signals.extend(rows)
+
+    def flush(self, conn) -> int:
+        """Persist the queued writes in one transaction; returns the number of rows written"""
+        with self._lock:
+            cooldowns, self._pending_cooldowns = self._pending_cooldowns, {}
+            signals, self._pending_signals = self._pending_signals, []
+        if not cooldowns and not signals:
+            return 0
+        try:
+            conn.executemany(
+                'INSERT INTO cooldowns(tg_user_id,key,expires_at) VALUES(?,?,?) '
+                'ON CONFLICT(tg_user_id,key) DO UPDATE SET expires_at=excluded.expires_at',
+                [(user, key, expires_at) for (user, key), expires_at in cooldowns.items()],
+            )
+            conn.executemany(
+                'INSERT OR IGNORE INTO signals_sent(tg_user_id,dedup_key,symbol,timeframe,signal_type,candle_ts,'
+                'score_total,payload_json,sent_at) VALUES(?,?,?,?,?,?,?,?,?)',
+                signals,
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            with self._lock:  # keep them for the next attempt
+                for key, expires_at in cooldowns.items():
+                    self._pending_cooldowns.setdefault(key, expires_at)
+                self._pending_signals[:0] = signals
+            raise
+        return len(cooldowns) + len(signals)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending_cooldowns) + len(self._pending_signals)
+
+    def stats(self) -> dict:
+        return {
+            'cooldowns': len(self.cooldowns),
+            'dedup_keys': len(self.dedup),
+            'dedup_mb': round(self.dedup.nbytes / 1024 / 1024, 2),
+            'pending': self.pending,
+        }
+
+
+_states: Dict[str, SignalState] = {}
+_states_lock = threading.Lock()
+
+
+def get_signal_state(db_path: str = DB_PATH) -> SignalState:
+    """Shared state per database file, hydrated on first use (call it at startup)"""
+    key = os.path.abspath(db_path)
+    with _states_lock:
+        if key not in _states:
+            start = time.perf_counter()
+            state = _states[key] = SignalState.load(get_pool(db_path).connection())
+            stats = state.stats()
+            print(f"[SIGNAL-STATE] hydrated {stats['dedup_keys']} dedup keys ({stats['dedup_mb']} MB), "
+                  f"{stats['cooldowns']} cooldowns in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return _states[key]
+
+
+__all__ = ['SignalState', 'CooldownMap', 'DedupSet', 'DEDUP_WINDOW_SECONDS', 'dedup_hash', 'get_signal_state']
@@ -0,0 +1,104 @@
+"""
+Batched indicators for all symbols of one timeframe
+Every indicator is computed once for the whole chunk over a (bars x symbols) matrix;
+IndicatorContext objects created via context() read their symbol's column from here
+"""
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+from engine.indicators import IndicatorContext
+
+
+class BatchIndicators:
+    """
+    Column-wise indicators over a symbols x bars tensor, NaN-padded at the front so every
+    symbol ends on the last row. Uses the same pandas kernels per column as IndicatorContext,
+    so the per-symbol results are bit-identical.
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], timeframe: str = "UNKNOWN"):
+        self.frames = frames
+        self.timeframe = timeframe
+        self.symbols = list(frames)
+        self.column = {symbol: i for i, symbol in enumerate(self.symbols)}
+        lengths = np.array([len(frames[symbol]) for symbol in self.symbols], dtype=np.int64)
+        self.bars = int(lengths.max()) if len(lengths) else 0
+        self.padding = self.bars - lengths
+        self.valid = np.arange(self.bars)[:, None] >= self.padding[None, :]
+        self._fields: Dict[str, pd.DataFrame] = {}
+        self._cache: Dict[Hashable, Any] = {}
+        self.computed = 0
+
+    def context(self, symbol: str) -> IndicatorContext:
+        return IndicatorContext(self.frames[symbol], symbol, self.timeframe, batch=self)
+
+    def field(self, name: str) -> pd.DataFrame:
+        """NaN-padded (bars x symbols) matrix of one candle column"""
+        if name not in self._fields:
+            matrix = np.full((self.bars, len(self.symbols)), np.nan)
+            for i, symbol in enumerate(self.symbols):
+                matrix[self.padding[i]:, i] = self.frames[symbol][name].to_numpy()
+            self._fields[name] = pd.DataFrame(matrix, copy=False)
+        return self._fields[name]
+
+    def lookup(self, ctx: IndicatorContext, key: Hashable) -> Optional[Any]:
+        """Per-symbol slice for an IndicatorContext memo key, None if not batchable"""
+        col = self.column.get(ctx.symbol)
+        if col is None or self.frames[ctx.symbol] is not ctx.df:
+            return None
+        if key not in self._cache:
+            matrices = self._compute(key)
+            if matrices is None:
+                return None
+            # symbols x bars, so each symbol's series is one contiguous row
+            self._cache[key] = tuple(np.ascontiguousarray(m.to_numpy().T) for m in matrices)
+            self.computed += 1
+        start = self.padding[col]
+        series = tuple(pd.Series(m[col, start:], index=ctx.df.index, copy=False) for m in self._cache[key])
+        return series if key[0] == 'macd' else series[0]
+
+    def _compute(self, key: Hashable):
+        name, args = key[0], key[1:]
+        if name == 'rsi':
+            return (self._rsi(*args),)
+        if name == 'ema':
+            return (self._ema(*args),)
+        if name == 'macd':
+            return self._macd(*args)
+        if name == 'volume_mean':
+            return (self.field('volume').rolling(window=args[0]).mean(),)
+        if name == 'rolling_high':
+            return (self.field('high').rolling(window=args[0]).max(),)
+        if name == 'rolling_low':
+            return (self.field('low').rolling(window=args[0]).min(),)
+        if name == 'price_change':
+            close = self.field('close')
+            past = close.shift(args[0])
+            return (((close - past) / past) * 100,)
+        return None
+
+    def _rsi(self, period: int) -> pd.DataFrame:
+        delta = self.field('close').diff()
+        # where() turns the padding into 0 - put the NaN back so it never counts as an observation
+        gain = delta.where(delta > 0, 0).where(self.valid).rolling(window=period).mean()
+        loss = (-delta.where(delta < 0, 0)).where(self.valid).rolling(window=period).mean()
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+    def _ema(self, span: int, source: str = 'close') -> pd.DataFrame:
+        return self.field(source).ewm(span=span).mean()
+
+    def _macd(self, fast: int, slow: int, signal: int):
+        macd_line = self._ema(fast) - self._ema(slow)
+        signal_line = macd_line.ewm(span=signal).mean()
+        return macd_line, signal_line, macd_line - signal_line
+
+
+def build_batches(frames_by_tf: Dict[str, Dict[str, pd.DataFrame]]) -> Dict[str, BatchIndicators]:
+    """One BatchIndicators per timeframe"""
+    return {tf: BatchIndicators(frames, tf) for tf, frames in frames_by_tf.items()}
+
+
+__all__ = ['BatchIndicators', 'build_batches']
@@ -0,0 +1,145 @@
+"""
+Shared indicator cache for the analysis modules
+One IndicatorContext per (symbol, timeframe, candle window) computes each indicator once
+"""
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from engine.scan_debugger import get_scan_debugger
+
+
+def rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    """RSI with simple moving averages of gains/losses (the formula all modules use)"""
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return pd.Series(100 - (100 / (1 + rs)))
+
+
+def pivot_indices(values: np.ndarray, kind: str = 'high', width: int = 2) -> np.ndarray:
+    """
+    Indices of strict pivots: values[i] above (kind='high') or below (kind='low')
+    all `width` neighbours on each side. NaN never forms or confirms a pivot.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n < 2 * width + 1:
+        return np.empty(0, dtype=np.int64)
+    center = values[width:n - width]
+    beats = np.greater if kind == 'high' else np.less
+    mask = np.ones(len(center), dtype=bool)
+    for k in range(1, width + 1):
+        mask &= beats(center, values[width - k:n - width - k]) & beats(center, values[width + k:n - width + k])
+    return np.flatnonzero(mask) + width
+
+
+class IndicatorContext:
+    """
+    Lazily computed, memoized indicators over one candle DataFrame.
+    Modules must treat returned Series as read-only - they are shared.
+    With a BatchIndicators source, batchable indicators are sliced from the chunk-wide pass.
+    """
+
+    def __init__(self, df: pd.DataFrame, symbol: str = "UNKNOWN", timeframe: str = "UNKNOWN", batch=None):
+        self.df = df
+        self.batch = batch
+        self.symbol = symbol
+        self.timeframe = timeframe
+        last_ts = int(df['ts'].iloc[-1]) if 'ts' in df.columns and len(df) else None
+        self.key = (symbol, timeframe, last_ts, len(df))
+        self._cache: Dict[Hashable, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _memo(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        debugger = get_scan_debugger()
+        if key in self._cache:
+            self.hits += 1
+            debugger.record_indicator_cache(hit=True)
+            return self._cache[key]
+        self.misses += 1
+        debugger.record_indicator_cache(hit=False)
+        value = self.batch.lookup(self, key) if self.batch is not None else None
+        if value is None:
+            value = compute()
+        self._cache[key] = value
+        return value
+
+    def _source(self, name: str, period: int = 14) -> pd.Series:
+        return self.rsi(period) if name == 'rsi' else self.df[name]
+
+    def rsi(self, period: int = 14) -> pd.Series:
+        return self._memo(('rsi', period), lambda: rsi(self.df['close'], period))
+
+    def ema(self, span: int, source: str = 'close') -> pd.Series:
+        return self._memo(('ema', span, source), lambda: self.df[source].ewm(span=span).mean())
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """(macd_line, signal_line, histogram)"""
+        def compute():
+            macd_line = self.ema(fast) - self.ema(slow)
+            signal_line = macd_line.ewm(span=signal).mean()
+            return macd_line, signal_line, macd_line - signal_line
+        return self._memo(('macd', fast, slow, signal), compute)
+
+    def volume_mean(self, window: int = 20) -> pd.Series:
+        return self._memo(('volume_mean', window), lambda: self.df['volume'].rolling(window=window).mean())
+
+    def rolling_high(self, window: int) -> pd.Series:
+        return self._memo(('rolling_high', window), lambda: self.df['high'].rolling(window=window).max())
+
+    def rolling_low(self, window: int) -> pd.Series:
+        return self._memo(('rolling_low', window), lambda: self.df['low'].rolling(window=window).min())
+
+    def price_change(self, periods: int) -> pd.Series:
+        """Close-to-close change over `periods` candles in percent"""
+        def compute():
+            past = self.df['close'].shift(periods)
+            return ((self.df['close'] - past) / past) * 100
+        return self._memo(('price_change', periods), compute)
+
+    def atr(self, period: int = 14) -> pd.Series:
+        """Average True Range (simple moving average of the true range)"""
+        def compute():
+            prev_close = self.df['close'].shift(1)
+            true_range = pd.concat([
+                self.df['high'] - self.df['low'],
+                (self.df['high'] - prev_close).abs(),
+                (self.df['low'] - prev_close).abs(),
+            ], axis=1).max(axis=1)
+            return true_range.rolling(window=period).mean()
+        return self._memo(('atr', period), compute)
+
+    def swing_highs(self, source: str = 'close', period: int = 14) -> pd.Series:
+        """Boolean mask of strict 2-bar pivot highs; source is a column name or 'rsi'"""
+        def compute():
+            s = self._source(source, period)
+            return (s > s.shift(1)) & (s > s.shift(-1)) & (s > s.shift(2)) & (s > s.shift(-2))
+        return self._memo(('swing_highs', source, period if source == 'rsi' else None), compute)
+
+    def swing_lows(self, source: str = 'close', period: int = 14) -> pd.Series:
+        """Boolean mask of strict 2-bar pivot lows; source is a column name or 'rsi'"""
+        def compute():
+            s = self._source(source, period)
+            return (s < s.shift(1)) & (s < s.shift(-1)) & (s < s.shift(2)) & (s < s.shift(-2))
+        return self._memo(('swing_lows', source, period if source == 'rsi' else None), compute)
+
+    def pivots(self, source: str = 'close', kind: str = 'high', period: int = 14) -> np.ndarray:
+        """Integer indices of strict 2-bar pivots (same pivots as swing_highs/swing_lows)"""
+        return self._memo(
+            ('pivots', source, kind, period if source == 'rsi' else None),
+            lambda: pivot_indices(self._source(source, period).to_numpy(), kind)
+        )
+
+
+def get_context(df: pd.DataFrame, ctx: Optional[IndicatorContext] = None) -> IndicatorContext:
+    """Use the scanner's shared context, or a private one when a module is called standalone"""
+    if ctx is not None and ctx.df is df:
+        return ctx
+    return IndicatorContext(df)
+
+
+__all__ = ['IndicatorContext', 'get_context', 'pivot_indices', 'rsi']
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Durable Alert Outbox
+Scans write their alerts to the `outbox` table in one transaction per send batch; a drainer
+thread hands due rows to the Telegram dispatcher and records deliveries in signals_sent.
+Rows that were in flight during a crash are sent again after the restart (at-least-once).
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from charts.chart_cache import load_chart
+from db.database import get_pool
+from db.repo import Repo
+from db.signal_state import get_signal_state
+
+
+class AlertOutbox:
+    """Outbox table + drainer thread feeding a TelegramDispatcher-like sender (submit() -> Future)"""
+
+    def __init__(self, db_path: str, dispatcher, batch_size: int = 100, poll_interval: float = 5.0,
+                 max_attempts: int = 5, retry_seconds: int = 60):
+        self.db_path = db_path
+        self.dispatcher = dispatcher
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self._results: "queue.Queue[Tuple[int, bool, Optional[str]]]" = queue.Queue()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.in_flight = 0
+        self.delivered = 0
+
+    def repo(self) -> Repo:
+        """Repo on the calling thread's pooled connection; known sent dedup keys are checked in memory"""
+        return Repo(get_pool(self.db_path).connection(), signal_state=get_signal_state(self.db_path))
+
+    def enqueue(self, messages: List[Dict[str, Any]]) -> int:
+        """Queue a batch of alerts (one transaction) and wake the drainer"""
+        if not messages:
+            return 0
+        queued = self.repo().enqueue_outbox(messages)
+        self._wakeup.set()
+        return queued
+
+    def recover(self) -> int:
+        """Call once at startup before start(): re-queue rows that were in flight"""
+        stale = self.repo().reset_stale_outbox()
+        if stale:
+            print(f"[OUTBOX] {stale} alerts were in flight at shutdown - sending again")
+        return stale
+
+    def drain_once(self) -> int:
+        """Record finished sends, then submit the next due rows; returns the number submitted"""
+        self._record_results()
+        capacity = self.batch_size - self.in_flight
+        if capacity <= 0:
+            return 0
+        rows = self.repo().claim_outbox(capacity)
+        for row in rows:
+            self.in_flight += 1
+            future = self.dispatcher.submit(row['tg_user_id'], row['text'], row['signal_data'],
+                                            chart=load_chart(row['chart_path']))
+            future.add_done_callback(lambda f, outbox_id=row['id']: self._on_done(outbox_id, f))
+        return len(rows)
+
+    def _on_done(self, outbox_id: int, future):
+        error = future.exception()
+        ok = error is None and bool(future.result())
+        self._results.put((outbox_id, ok, None if ok else str(error or 'send failed')))
+        self._wakeup.set()
+
+    def _record_results(self):
+        sent, failed = [], []
+        while True:
+            try:
+                outbox_id, ok, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self.in_flight -= 1
+            if ok:
+                sent.append(outbox_id)
+            else:
+                failed.append((outbox_id, error))
+        if sent or failed:
+            self.repo().complete_outbox(sent, failed, self.max_attempts, self.retry_seconds)
+            self.delivered += len(sent)
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                self.drain_once()
+            except Exception as e:
+                print(f"[OUTBOX] drain error: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+        self._record_results()
+
+    def start(self) -> 'AlertOutbox':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name='alert-outbox', daemon=True)
+            self._thread.start()
+        return self
+
+    def wait_idle(self, timeout: float = 30.0) -> bool:
+        """Block until nothing is pending or in flight (tests/benchmarks)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            counts = self.repo().outbox_counts()
+            if not counts.get('pending') and not counts.get('sending') and self.in_flight == 0:
+                return True
+            self._wakeup.set()
+            time.sleep(0.01)
+        return False
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_outbox: Optional[AlertOutbox] = None
+
+
+def get_alert_outbox() -> AlertOutbox:
+    """Shared outbox on the bot database, drained into the Telegram dispatcher"""
+    global _outbox
+    if _outbox is None:
+        from engine.telegram_dispatcher import get_telegram_dispatcher
+        _outbox = AlertOutbox('./data/bot.db', get_telegram_dispatcher(),
+                              poll_interval=float(os.getenv('OUTBOX_POLL_INTERVAL', '5')))
+        _outbox.recover()
+        _outbox.start()
+    return _outbox
+
+
+__all__ = ['AlertOutbox', 'get_alert_outbox']
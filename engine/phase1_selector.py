@@ -8,6 +8,7 @@ Includes symbol rotation for better diversity over time
 from typing import List, Dict, Optional
 from collections import defaultdict
 import json
+import time
 
 # Rotation policy (hours between same symbol in same topic)
 ROTATION_POLICY = {
@@ -70,11 +71,19 @@ class Phase1Selector:
     def select_signals_phase1(self, raw_decisions: List[Dict], repo=None, user_id: Optional[str] = None) -> List[Dict]:
         """
         Phase 1: Apply symbol and topic caps for immediate diversity
-        With optional rotation checking if repo and user_id provided
+        With optional rotation checking if repo and user_id provided: the rotation state is
+        loaded in one query, checked in memory and the new send times written in one transaction
         """
         if not raw_decisions:
             return []
         
+        # Rotation state: entries older than the longest rotation never block, skip loading them
+        now = int(time.time())
+        last_sent = {}
+        rotation_updates = []
+        if repo and user_id:
+            last_sent = repo.get_last_sent_map(user_id, since=now - max(ROTATION_POLICY.values()) * 3600)
+        
         # Sort by score descending for best selection
         sorted_decisions = sorted(
             raw_decisions,
@@ -96,7 +105,8 @@ class Phase1Selector:
             # Check rotation policy if repo is available
             if repo and user_id:
                 rotation_hours = ROTATION_POLICY.get(topic, 2)
-                if not repo.can_send_symbol(user_id, topic, symbol, rotation_hours):
+                sent_at = last_sent.get((topic, symbol))
+                if sent_at is not None and now - sent_at < rotation_hours * 3600:
                     print(f"[SELECTOR] Skipping {symbol} - rotation cooldown for {topic}")
                     rotation_skips += 1
                     continue
@@ -121,12 +131,16 @@ class Phase1Selector:
             topic_counts[topic] += 1
             selected_decisions.append(decision)
             
-            # Update rotation tracking if repo available
+            # Update rotation tracking if repo available (written after the loop)
             if repo and user_id:
-                repo.set_last_sent(user_id, topic, symbol)
+                last_sent[(topic, symbol)] = now
+                rotation_updates.append((topic, symbol))
             
             print(f"[SELECTOR] SELECTED {symbol} {decision['timeframe']} -> {topic} (score: {score})")
         
+        if rotation_updates:
+            repo.set_last_sent_many(user_id, rotation_updates, now)
+        
         print(f"[SELECTOR] Final selection: {len(selected_decisions)} signals")
         print(f"[SELECTOR] By topic: {dict(topic_counts)}")
         if rotation_skips > 0:
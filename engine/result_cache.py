@@ -0,0 +1,100 @@
+"""
+LRU cache of module results per closed candle
+Modules that declare CLOSED_BARS_ONLY are keyed by the last closed candle and only re-run when a
+new candle closed or their settings changed. All other modules read the forming candle (current
+price, live volume), which changes between almost every scan, so they are not cached at all.
+Decisions are still made on every scan.
+"""
+import copy
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Any, Collection, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from engine.scan_debugger import get_scan_debugger
+
+
+def settings_hash(**settings) -> str:
+    """Stable short digest of the keyword arguments a module is called with"""
+    return hashlib.md5(repr(sorted(settings.items())).encode()).hexdigest()[:12]
+
+
+def closed_bar_modules(registry: Dict[str, Any]) -> Set[str]:
+    """Names of the modules whose results only depend on closed candles"""
+    return {name for name, module in registry.items() if getattr(module, 'CLOSED_BARS_ONLY', False)}
+
+
+class ResultCache:
+    """
+    (symbol, timeframe, last closed candle ts, module, settings hash) -> FeatureResult list.
+    Only modules in closed_only are looked up and stored, the others are left to run.
+    Results are copied in and out, the scanner mutates the returned objects.
+    """
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, list]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(symbol: str, timeframe: str, candles, module: str, settings: Dict[str, str]) -> Hashable:
+        return symbol, timeframe, candles[-2]['ts'], module, settings.get(module, '')
+
+    def lookup(self, symbol: str, timeframe: str, candles, modules: Iterable[str],
+               settings: Dict[str, str], closed_only: Collection[str]) -> Dict[str, list]:
+        """Cached results of the closed-bar modules; modules without an entry are missing from the dict"""
+        debugger = get_scan_debugger()
+        found = {}
+        for module in modules:
+            if module not in closed_only:
+                continue
+            key = self._key(symbol, timeframe, candles, module, settings)
+            results = self._entries.get(key)
+            if results is None:
+                self.misses += 1
+                debugger.record_result_cache(module, hit=False)
+                continue
+            self._entries.move_to_end(key)
+            self.hits += 1
+            debugger.record_result_cache(module, hit=True)
+            found[module] = copy.deepcopy(results)
+        return found
+
+    def store(self, symbol: str, timeframe: str, candles,
+              outcomes: Iterable[Tuple[str, list, Optional[str]]], settings: Dict[str, str],
+              closed_only: Collection[str]):
+        """Remember freshly computed closed-bar module outcomes; failed modules are not cached"""
+        for module, results, error in outcomes:
+            if error is not None or module not in closed_only:
+                continue
+            key = self._key(symbol, timeframe, candles, module, settings)
+            self._entries[key] = copy.deepcopy(results)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Shared cache, None when disabled with RESULT_CACHE_SIZE=0"""
+    global _result_cache
+    size = int(os.getenv('RESULT_CACHE_SIZE', '20000'))
+    if size <= 0:
+        return None
+    if _result_cache is None or _result_cache.max_entries != size:
+        _result_cache = ResultCache(size)
+    return _result_cache
+
+
+__all__ = ['ResultCache', 'closed_bar_modules', 'get_result_cache', 'settings_hash']
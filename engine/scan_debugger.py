@@ -29,6 +29,14 @@ class ScanDebugger:
         self.api_errors = 0
         self.timeout_errors = 0
         self.rate_limit_hits = 0
+        self.indicator_cache_hits = 0
+        self.indicator_cache_misses = 0
+        self.result_cache_hits = 0
+        self.result_cache_misses = 0
+        self.result_cache_by_module = defaultdict(lambda: [0, 0])  # module -> [hits, misses]
+        self.pipeline_stages = {}
+        self.first_alert_seconds = None
+        self.chart_cache = {}
     
     def set_total_symbols(self, count: int):
         """Set the expected total symbol count"""
@@ -66,12 +74,53 @@ class ScanDebugger:
         elif 'rate' in error_type.lower() or '429' in error_type:
             self.rate_limit_hits += 1
     
+    def record_indicator_cache(self, hit: bool):
+        """Record an IndicatorContext lookup"""
+        if hit:
+            self.indicator_cache_hits += 1
+        else:
+            self.indicator_cache_misses += 1
+
+    def record_indicator_cache_counts(self, hits: int, misses: int):
+        """Add IndicatorContext lookups counted elsewhere (analysis worker processes)"""
+        self.indicator_cache_hits += hits
+        self.indicator_cache_misses += misses
+    
+    def record_result_cache(self, module: str, hit: bool):
+        """Record a module result cache lookup"""
+        if hit:
+            self.result_cache_hits += 1
+        else:
+            self.result_cache_misses += 1
+        self.result_cache_by_module[module][0 if hit else 1] += 1
+    
+    def record_first_alert(self):
+        """Record the time from scan start to the first sent alert"""
+        if self.first_alert_seconds is None:
+            self.first_alert_seconds = round(time.time() - self.scan_start_time, 2)
+    
+    def record_pipeline(self, stages: Dict[str, Dict]):
+        """Record per-stage pipeline metrics (items, utilisation, queue depth)"""
+        self.pipeline_stages = stages
+    
+    def record_chart_cache(self, hits: int, misses: int, files: int, disk_mb: float):
+        """Record chart cache hits/renders of this scan and the on-disk cache size"""
+        lookups = hits + misses
+        self.chart_cache = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups * 100, 1) if lookups else 0.0,
+            'files': files,
+            'disk_mb': disk_mb,
+        }
+    
     def generate_debug_report(self) -> Dict:
         """Generate comprehensive debug report"""
         duration = time.time() - self.scan_start_time
         
         # Top 10 symbols by alert count
         top_symbols = self.symbols_alert_count.most_common(10)
+        result_lookups = self.result_cache_hits + self.result_cache_misses
         
         report = {
             'scan_duration_seconds': round(duration, 2),
@@ -89,7 +138,25 @@ class ScanDebugger:
                 'api_errors': self.api_errors,
                 'timeout_errors': self.timeout_errors,
                 'rate_limit_hits': self.rate_limit_hits
-            }
+            },
+            'indicator_cache': {
+                'hits': self.indicator_cache_hits,
+                'misses': self.indicator_cache_misses
+            },
+            'result_cache': {
+                'hits': self.result_cache_hits,
+                'misses': self.result_cache_misses,
+                'hit_rate': round(self.result_cache_hits / result_lookups * 100, 1) if result_lookups else 0.0,
+                'by_module': {
+                    module: {'hits': hits, 'misses': misses, 'hit_rate': round(hits / (hits + misses) * 100, 1)}
+                    for module, (hits, misses) in sorted(self.result_cache_by_module.items())
+                }
+            },
+            'pipeline': {
+                'first_alert_seconds': self.first_alert_seconds,
+                'stages': self.pipeline_stages
+            },
+            'chart_cache': self.chart_cache
         }
         
         return report
@@ -97,6 +164,10 @@ class ScanDebugger:
     def generate_simple_summary(self) -> str:
         """Generate simple console summary"""
         report = self.generate_debug_report()
+        result_modules = ''.join(
+            f"\n  {module}: {c['hits']} hits, {c['misses']} computed ({c['hit_rate']}% hit rate)"
+            for module, c in report['result_cache']['by_module'].items()
+        )
         
         summary = f"""
 [SCAN-DEBUG-REPORT]
@@ -104,9 +175,19 @@ Duration: {report['scan_duration_seconds']}s
 Symbols: {report['symbols_processed_ok']}/{report['symbols_total']} processed ({report['processing_success_rate']}%)
 Failed: {report['symbols_failed']} symbols
 Unique symbols with alerts: {report['unique_symbols_sent']}
-
-Errors:
+Indicator cache: {report['indicator_cache']['hits']} hits, {report['indicator_cache']['misses']} computed
+Result cache (closed-bar modules): {report['result_cache']['hits']} hits, {report['result_cache']['misses']} computed ({report['result_cache']['hit_rate']}% hit rate){result_modules}
+First alert after: {report['pipeline']['first_alert_seconds']}s
 """
+        if report['chart_cache']:
+            c = report['chart_cache']
+            summary += f"Chart cache: {c['hits']} hits, {c['misses']} rendered ({c['hit_rate']}% hit rate), {c['files']} files, {c['disk_mb']} MB on disk\n"
+        if report['pipeline']['stages']:
+            summary += "Pipeline stages:\n"
+            for stage, m in report['pipeline']['stages'].items():
+                summary += f"  {stage}: {m['items']} items, {m['utilisation']}% busy, queue avg {m['queue_avg']} max {m['queue_max']}/{m['queue_size']}\n"
+        
+        summary += "\nErrors:\n"
         for reason, count in report['error_reasons'].items():
             summary += f"  {reason}: {count}\n"
         
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Telegram Dispatcher - one long-lived sender for all outgoing alerts
+Messages wait in a priority queue (TRADE_FREIGABE first) and are sent from a single event loop
+thread over one pooled Bot connection, paced by per-chat and global token buckets
+"""
+
+import asyncio
+import collections
+import itertools
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from datetime import timedelta
+from io import BytesIO
+from typing import Dict, Optional
+
+from telegram import Bot
+from telegram.error import NetworkError, RetryAfter, TimedOut
+from telegram.request import HTTPXRequest
+
+from engine.rate_limit import TokenBucket
+from engine.topic_router import route_message
+
+# Lower value = sent first
+MESSAGE_PRIORITY = {
+    'TRADE_FREIGABE': 0,
+    'PUMP_ALERT': 1,
+    'LIQ_ALERT': 2,
+    'FIB_ALERT': 3,
+    'WATCHLIST': 4,
+}
+DEFAULT_PRIORITY = 5
+
+# Telegram Bot API limits: ~30 messages/s overall, 1/s per chat, 20/min per group.
+# Pacing slightly below the global limit keeps any 1s window under it.
+GLOBAL_RATE = 28.0
+CHAT_RATE = 1.0
+GROUP_RATE = 20 / 60
+
+
+@dataclass(order=True)
+class OutgoingMessage:
+    priority: int
+    seq: int
+    chat_id: str = field(compare=False)
+    text: str = field(compare=False)
+    signal_data: dict = field(compare=False, default_factory=dict)
+    chart_path: Optional[str] = field(compare=False, default=None)
+    chart: Optional[bytes] = field(compare=False, default=None)  # PNG bytes, preferred over chart_path
+    enqueued_at: float = field(compare=False, default=0.0)
+    attempts: int = field(compare=False, default=0)
+    future: Future = field(compare=False, default_factory=Future)
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # int retry_after is deprecated in PTB 22.2
+        value = error.retry_after
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+class TelegramDispatcher:
+    """Priority outbox drained by one dispatcher task on a dedicated event loop thread"""
+
+    def __init__(self, bot: Bot, chat_id: Optional[str] = None, pool_size: int = 8,
+                 global_rate: float = GLOBAL_RATE, chat_rate: float = CHAT_RATE,
+                 group_rate: float = GROUP_RATE, max_retries: int = 5):
+        self.bot = bot
+        self.chat_id = chat_id  # forum group all topics are posted to (overrides the caller's chat)
+        self.pool_size = pool_size
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_buckets: Dict[str, TokenBucket] = {}
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._task = None
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+        self._pending = 0
+        self._idle: Optional[asyncio.Event] = None
+        # Metrics
+        self.sent = 0
+        self.failed = 0
+        self.retry_after_hits = 0
+        self.latencies = collections.deque(maxlen=10000)
+
+    def start(self) -> 'TelegramDispatcher':
+        with self._start_lock:
+            if self._thread is not None:
+                return self
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run_loop, name='telegram-dispatcher', daemon=True)
+            self._thread.start()
+            self._ready.wait()
+        return self
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.PriorityQueue()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task = self._loop.create_task(self._dispatch())
+        self._ready.set()
+        self._loop.run_forever()
+
+    def submit(self, chat_id: str, text: str, signal_data: Optional[dict] = None,
+               chart_path: Optional[str] = None, chart: Optional[bytes] = None) -> Future:
+        """Queue a message from any thread; the future resolves when Telegram accepted it"""
+        if self._thread is None:
+            self.start()  # lazily, e.g. for callers that never called start()
+        signal_data = signal_data or {}
+        message = OutgoingMessage(
+            priority=MESSAGE_PRIORITY.get(signal_data.get('message_type', ''), DEFAULT_PRIORITY),
+            seq=next(self._seq),
+            chat_id=str(self.chat_id or chat_id),
+            text=text,
+            signal_data=signal_data,
+            chart_path=chart_path,
+            chart=chart,
+            enqueued_at=time.perf_counter(),
+        )
+        self._loop.call_soon_threadsafe(self._enqueue, message)
+        return message.future
+
+    def _enqueue(self, message: OutgoingMessage):
+        self._pending += 1
+        self._idle.clear()
+        self._queue.put_nowait(message)
+
+    def _done(self):
+        self._pending -= 1
+        if self._pending == 0:
+            self._idle.set()
+
+    def chat_bucket(self, chat_id: str) -> TokenBucket:
+        if chat_id not in self.chat_buckets:
+            rate = self.group_rate if chat_id.startswith('-') else self.chat_rate
+            self.chat_buckets[chat_id] = TokenBucket(rate)
+        return self.chat_buckets[chat_id]
+
+    async def _dispatch(self):
+        """Pop messages in priority order; at most pool_size sends are in flight"""
+        await self.bot.initialize()
+        slots = asyncio.Semaphore(self.pool_size)
+        while True:
+            # Take a slot first so queued messages can still be overtaken until one is free
+            await slots.acquire()
+            message = await self._queue.get()
+            task = asyncio.create_task(self._send(message))
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _send(self, message: OutgoingMessage):
+        chat_bucket = self.chat_bucket(message.chat_id)
+        try:
+            await chat_bucket.acquire_async()
+            await self.global_bucket.acquire_async()
+            message.attempts += 1
+            topic_type, thread_id = route_message(message.text, message.signal_data)
+            print(f"📤 Routing signal to {topic_type.value} topic (Thread {thread_id})")
+            if message.chart is not None:
+                await self.bot.send_photo(chat_id=message.chat_id, photo=BytesIO(message.chart),
+                                          caption=message.text, message_thread_id=thread_id)
+            elif message.chart_path and os.path.exists(message.chart_path):
+                with open(message.chart_path, 'rb') as chart_file:
+                    await self.bot.send_photo(chat_id=message.chat_id, photo=chart_file,
+                                              caption=message.text, message_thread_id=thread_id)
+            else:
+                await self.bot.send_message(chat_id=message.chat_id, text=message.text,
+                                            message_thread_id=thread_id)
+        except RetryAfter as e:
+            # Flood control: pause this chat and the global bucket, the message keeps its place
+            self.retry_after_hits += 1
+            wait = retry_after_seconds(e)
+            print(f"[TG-DISPATCH] RetryAfter {wait:.1f}s for chat {message.chat_id}")
+            chat_bucket.block_for(wait)
+            self.global_bucket.block_for(wait)
+            self._retry_or_fail(message, e)
+            return
+        except (TimedOut, NetworkError) as e:
+            self._retry_or_fail(message, e, delay=min(8.0, 0.5 * 2 ** message.attempts))
+            return
+        except Exception as e:
+            self._fail(message, e)
+            return
+        self.sent += 1
+        self.latencies.append(time.perf_counter() - message.enqueued_at)
+        print(f"✅ Message sent successfully to {topic_type.value} topic")
+        message.future.set_result(True)
+        self._done()
+
+    def _retry_or_fail(self, message: OutgoingMessage, error: Exception, delay: float = 0.0):
+        if message.attempts > self.max_retries:
+            self._fail(message, error)
+        else:
+            self._loop.call_later(delay, self._queue.put_nowait, message)
+
+    def _fail(self, message: OutgoingMessage, error: Exception):
+        self.failed += 1
+        print(f"❌ Failed to send message: {error}")
+        message.future.set_result(False)
+        self._done()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued message was sent or failed"""
+        if self._thread is None:
+            return True  # never started, nothing was queued
+
+        async def wait_idle():
+            await self._idle.wait()
+        try:
+            asyncio.run_coroutine_threadsafe(wait_idle(), self._loop).result(timeout)
+            return True
+        except FutureTimeoutError:  # not the builtin TimeoutError before Python 3.11
+            return False
+
+    def stats(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 3) if latencies else 0.0
+
+        return {
+            'queued': self._pending,
+            'sent': self.sent,
+            'failed': self.failed,
+            'retry_after': self.retry_after_hits,
+            'latency_p50': percentile(0.5),
+            'latency_p99': percentile(0.99),
+        }
+
+    def close(self, timeout: float = 30.0):
+        """Send what is queued, then shut down the Bot session and the loop"""
+        if self._thread is None:
+            return
+        self.flush(timeout)
+
+        async def shutdown():
+            self._task.cancel()
+            await self.bot.shutdown()
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+
+_dispatcher: Optional[TelegramDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_telegram_dispatcher() -> TelegramDispatcher:
+    """Shared, started dispatcher for BOT_TOKEN / CHAT_ID"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            bot_token = os.getenv("BOT_TOKEN")
+            chat_id = os.getenv("CHAT_ID")
+            if not bot_token or not chat_id:
+                raise ValueError("Missing BOT_TOKEN or CHAT_ID in environment")
+            pool_size = int(os.getenv('TELEGRAM_POOL_SIZE', '8'))
+            bot = Bot(token=bot_token, request=HTTPXRequest(connection_pool_size=pool_size))
+            _dispatcher = TelegramDispatcher(
+                bot, chat_id, pool_size=pool_size,
+                global_rate=float(os.getenv('TELEGRAM_GLOBAL_RATE', GLOBAL_RATE)),
+                chat_rate=float(os.getenv('TELEGRAM_CHAT_RATE', CHAT_RATE)),
+                group_rate=float(os.getenv('TELEGRAM_GROUP_RATE', GROUP_RATE)),
+            ).start()
+        return _dispatcher
+
+
+__all__ = ['TelegramDispatcher', 'OutgoingMessage', 'get_telegram_dispatcher', 'MESSAGE_PRIORITY', 'DEFAULT_PRIORITY']
@@ -10,11 +10,12 @@ from telegram.ext import Application
 from telegram import Update, BotCommand
 from dotenv import load_dotenv
 
-from db.database import init_db
+from db.database import get_db
+from db.signal_state import get_signal_state
 from db.repo import Repo
-from scanner.scheduler import scheduler_loop
+from scanner.scheduler import scheduler_loop, aligned_scheduler_loop
 from scanner.runner import run_scan_for_user
-from scanner.bitget_client import BitgetClient
+from scanner.bitget_client import AsyncBitgetClient
 
 # Import aller Module
 from modules import volume
@@ -32,13 +33,13 @@ def main():
     """Main entry point with both bot and scanner"""
     print("🚀 Starte den ultimativen Crypto-Signal Hub-Bot mit Scanner...")
     
-    # Initialize database
-    conn = init_db('./data/bot.db', './db/schema.sql')
-    scanner_repo = Repo(conn)
+    # Initialize database (migrations run once here, connections are pooled per thread)
+    scanner_repo = Repo(get_db('./data/bot.db'))
+    get_signal_state('./data/bot.db')  # hydrate cooldowns and sent dedup keys before the first scan
     print("✅ Datenbank initialisiert")
 
     # Initialize Bitget client
-    scanner_bitget = BitgetClient(base_url='https://api.bitget.com')
+    scanner_bitget = AsyncBitgetClient(base_url='https://api.bitget.com', max_concurrency=10)
     print("✅ Bitget Client initialisiert")
 
     # Initialize Telegram bot application
@@ -57,43 +58,28 @@ def main():
     # Start scanner in background thread
     import threading
     def start_scanner():
-        def scan_all_users():
+        def scan_all_users(timeframes=None, forming=False):
             # MVP: erstmal nur du (später: aus DB alle user laden)
             users = [os.getenv("CHAT_ID", "<DEIN_TG_USER_ID>")]  # Changed from TELEGRAM_CHAT_ID to CHAT_ID to match .env
             for u in users:
                 if u and u != "<DEIN_TG_USER_ID>":
-                    # Import the new routing system
-                    from engine.telegram_sender import get_telegram_sender
+                    # All alerts go through one long-lived dispatcher (priority queue + rate limits)
+                    from engine.telegram_dispatcher import get_telegram_dispatcher
                     
                     def telegram_send_fn(chat_id: str, text: str, **kwargs):
-                        """Send message via Telegram bot with hard topic routing"""
+                        """Queue the message for the Telegram dispatcher (returns immediately)"""
                         # Extract parameters
                         chart_path = kwargs.pop('chart_path', None)
+                        chart = kwargs.pop('chart', None)
                         signal_data = kwargs.pop('signal_data', {})
                         
-                        # Use the new async sender with hard routing
-                        async def send_with_routing():
-                            try:
-                                sender = get_telegram_sender()
-                                result = await sender.send_message(text, signal_data, chart_path)
-                                if result:
-                                    print(f"✅ Nachricht mit Routing erfolgreich gesendet")
-                                else:
-                                    print(f"❌ Fehler beim Senden der Nachricht mit Routing")
-                            except Exception as e:
-                                print(f"❌ Fehler im Routing-Sender: {e}")
+                        def report(future):
+                            if future.result():
+                                print(f"✅ Nachricht mit Routing erfolgreich gesendet")
+                            else:
+                                print(f"❌ Fehler beim Senden der Nachricht mit Routing")
                         
-                        # Run in thread with proper async handling
-                        import threading
-                        def run_in_thread():
-                            try:
-                                import asyncio
-                                asyncio.run(send_with_routing())
-                            except RuntimeError as e:
-                                print(f"Fehler im Nachrichtenversand-Thread: {e}")
-                        
-                        thread = threading.Thread(target=run_in_thread)
-                        thread.start()
+                        get_telegram_dispatcher().submit(chat_id, text, signal_data, chart_path, chart).add_done_callback(report)
                     
                     # Register all modules
                     modules_registry = {
@@ -105,9 +91,31 @@ def main():
                         'pump': pump
                     }
                     
-                    run_scan_for_user(scanner_repo, u, scanner_bitget, telegram_send_fn, modules_registry)
+                    if forming:
+                        # Fast path on the forming 15m bar: only the pump module
+                        modules_registry = {'pump': pump}
+                    # Alerts go through the durable outbox unless ALERT_OUTBOX=0
+                    outbox = None
+                    if os.getenv('ALERT_OUTBOX', '1') != '0':
+                        from engine.outbox import get_alert_outbox
+                        outbox = get_alert_outbox()
+                    run_scan_for_user(scanner_repo, u, scanner_bitget, telegram_send_fn, modules_registry,
+                                      timeframes=timeframes, forming=forming, outbox=outbox)
+        
+        if os.getenv('ALERT_OUTBOX', '1') != '0' and os.getenv("CHAT_ID"):
+            # Deliver alerts that were still queued when the bot stopped
+            from engine.outbox import get_alert_outbox
+            get_alert_outbox()
         
-        scheduler_loop(scan_all_users, interval_seconds=300)
+        if os.getenv('SCAN_SCHEDULE', 'interval') == 'aligned':
+            # Scan each timeframe right after its candle closes
+            forming_fn = None
+            if os.getenv('FORMING_BAR_PUMP') == '1':
+                forming_fn = lambda: scan_all_users(['15m'], forming=True)
+            aligned_scheduler_loop(scan_all_users, forming_fn=forming_fn,
+                                   forming_interval=int(os.getenv('FORMING_BAR_INTERVAL', '60')))
+        else:
+            scheduler_loop(scan_all_users, interval_seconds=300)
     
     scanner_thread = threading.Thread(target=start_scanner, daemon=True)
     scanner_thread.start()
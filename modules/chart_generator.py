@@ -10,6 +10,7 @@ import os
 from typing import Dict, List, Optional
 
 from engine.types import FeatureResult
+from engine.indicators import rsi as shared_rsi
 
 
 def create_tradingview_chart(df: pd.DataFrame, symbol: str, timeframe: str, 
@@ -110,12 +111,7 @@ def create_tradingview_chart(df: pd.DataFrame, symbol: str, timeframe: str,
 
 def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     """Calculate RSI indicator"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return pd.Series(rsi)
+    return shared_rsi(prices, period)
 
 
 def add_fibonacci_levels(ax, df: pd.DataFrame):
@@ -9,6 +9,7 @@ import numpy as np
 from datetime import datetime
 
 from engine.types import FeatureResult, Direction, Strength
+from engine.indicators import IndicatorContext, get_context, rsi as shared_rsi
 
 
 @dataclass
@@ -27,12 +28,7 @@ class FibonacciSettings:
 
 def calculate_rsi(close_prices: pd.Series, window: int = 14) -> pd.Series:
     """Calculate RSI indicator"""
-    delta = close_prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return pd.Series(rsi)  # Ensure return type is Series
+    return shared_rsi(close_prices, window)
 
 
 def find_recent_swings(df: pd.DataFrame) -> Tuple[Optional[float], Optional[float]]:
@@ -67,12 +63,13 @@ def find_recent_swings(df: pd.DataFrame) -> Tuple[Optional[float], Optional[floa
     return swing_high, swing_low
 
 
-def fibonacci_analysis(df: pd.DataFrame, settings: FibonacciSettings) -> List[FeatureResult]:
+def fibonacci_analysis(df: pd.DataFrame, settings: FibonacciSettings, ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """
     Analyze price action around Fibonacci levels with consistent Golden Zone labeling
     """
     if len(df) < 50 or settings.enabled is False:
         return []
+    ctx = get_context(df, ctx)
     
     results = []
     
@@ -115,8 +112,7 @@ def fibonacci_analysis(df: pd.DataFrame, settings: FibonacciSettings) -> List[Fe
             
             if settings.rsi_confirmation and len(df) > 14:
                 # Calculate RSI
-                close_series = pd.Series(df['close'])
-                rsi = calculate_rsi(close_series, 14)
+                rsi = ctx.rsi(14)
                 current_rsi = rsi.iloc[-1] if hasattr(rsi, 'iloc') else rsi[-1] if isinstance(rsi, (list, np.ndarray)) else rsi
                 
                 # RSI confirmation based on direction
@@ -127,7 +123,7 @@ def fibonacci_analysis(df: pd.DataFrame, settings: FibonacciSettings) -> List[Fe
             
             if settings.volume_confirmation and len(df) > 20:
                 volume_series = df['volume']
-                avg_volume = float(volume_series.rolling(window=20).mean().iloc[-1])
+                avg_volume = float(ctx.volume_mean(20).iloc[-1])
                 current_volume = float(volume_series.iloc[-1])
                 volume_confirmed = current_volume > avg_volume * 0.8  # At least 80% of average
             
@@ -167,19 +163,20 @@ def fibonacci_analysis(df: pd.DataFrame, settings: FibonacciSettings) -> List[Fe
     return results
 
 
-def detect_golden_ratio_patterns(df: pd.DataFrame) -> List[FeatureResult]:
+def detect_golden_ratio_patterns(df: pd.DataFrame, ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """
     Specialized function to detect Golden Ratio (0.618, 1.618) specific patterns
     """
     if len(df) < 100:
         return []
+    ctx = get_context(df, ctx)
     
     results = []
     current_price = df['close'].iloc[-1]
     
     # Calculate based on highest high and lowest low in the period
-    highest_high = df['high'].rolling(window=50).max()
-    lowest_low = df['low'].rolling(window=50).min()
+    highest_high = ctx.rolling_high(50)
+    lowest_low = ctx.rolling_low(50)
     
     for i in range(len(df)-10, len(df)):  # Check last 10 candles
         hh = highest_high.iloc[i]
@@ -234,7 +231,7 @@ def detect_golden_ratio_patterns(df: pd.DataFrame) -> List[FeatureResult]:
     return results
 
 
-def analyze(df: pd.DataFrame, settings: Optional[Dict] = None) -> List[FeatureResult]:
+def analyze(df: pd.DataFrame, settings: Optional[Dict] = None, ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """
     Main analysis function for the Fibonacci module
     """
@@ -247,12 +244,13 @@ def analyze(df: pd.DataFrame, settings: Optional[Dict] = None) -> List[FeatureRe
         # If it's a dict, create FibonacciSettings with those values
         fib_settings = FibonacciSettings(**settings)
     
+    ctx = get_context(df, ctx)
     all_results = []
     
     # Standard Fibonacci analysis
-    all_results.extend(fibonacci_analysis(df, fib_settings))
+    all_results.extend(fibonacci_analysis(df, fib_settings, ctx))
     
     # Golden ratio specific patterns
-    all_results.extend(detect_golden_ratio_patterns(df))
+    all_results.extend(detect_golden_ratio_patterns(df, ctx))
     
     return all_results
\ No newline at end of file
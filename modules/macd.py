@@ -9,6 +9,10 @@ import numpy as np
 from datetime import datetime
 
 from engine.types import FeatureResult, Direction, Strength
+from engine.indicators import IndicatorContext, get_context
+
+# Signals come from the last 10 closed candles only, results are cached per closed candle
+CLOSED_BARS_ONLY = True
 
 
 @dataclass
@@ -23,199 +27,131 @@ class MACDSettings:
     max_signals_per_type: int = 2  # Maximum signals to return per type
 
 
-def calculate_macd(df: pd.DataFrame, settings: MACDSettings):
-    """Calculate MACD values"""
-    close_prices = df['close']
-    
-    # Calculate EMAs
-    ema_fast = close_prices.ewm(span=settings.fast_period).mean()
-    ema_slow = close_prices.ewm(span=settings.slow_period).mean()
-    
-    # Calculate MACD line
-    macd_line = ema_fast - ema_slow
-    
-    # Calculate signal line
-    signal_line = macd_line.ewm(span=settings.signal_period).mean()
-    
-    # Calculate histogram
-    histogram = macd_line - signal_line
-    
-    return macd_line, signal_line, histogram
+def calculate_macd(df: pd.DataFrame, settings: MACDSettings, ctx: Optional[IndicatorContext] = None):
+    """Calculate MACD values (macd_line, signal_line, histogram)"""
+    return get_context(df, ctx).macd(settings.fast_period, settings.slow_period, settings.signal_period)
+
+
+def _recent_window(n: int) -> np.ndarray:
+    """Bar indices checked for fresh signals: the last 10 closed candles"""
+    return np.arange(max(n - 10, 1), n - 1)
+
+
+def _sign_flips(values: np.ndarray, i: np.ndarray):
+    """(up, down) masks over i: values[i-1] < 0 < values[i] and values[i-1] > 0 > values[i]"""
+    flips = np.diff(np.sign(values[i[0] - 1:i[-1] + 1]))
+    return flips == 2, flips == -2
+
+
+def _prior_trend(histogram: np.ndarray, i: np.ndarray):
+    """(has_downtrend, has_uptrend) - over 60% of the previous min(20, i) bars on one side of zero"""
+    lookback = np.minimum(20, i)
+    negative = np.concatenate(([0], np.cumsum(histogram < 0)))
+    positive = np.concatenate(([0], np.cumsum(histogram > 0)))
+    return (negative[i] - negative[i - lookback] > lookback * 0.6,
+            positive[i] - positive[i - lookback] > lookback * 0.6)
 
 
-def detect_macd_crossovers(df: pd.DataFrame, settings: MACDSettings) -> List[FeatureResult]:
+def _macd_levels(macd_line: np.ndarray, signal_line: np.ndarray, histogram: np.ndarray, i: int) -> Dict:
+    return {'macd_value': float(macd_line[i]), 'signal_value': float(signal_line[i]), 'histogram': float(histogram[i])}
+
+
+def detect_macd_crossovers(df: pd.DataFrame, settings: MACDSettings, ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """Detect MACD crossovers (signal line crosses MACD line)"""
     if len(df) < max(settings.fast_period, settings.slow_period, settings.signal_period) + 10:
         return []
 
-    macd_line, signal_line, histogram = calculate_macd(df, settings)
+    macd_line, signal_line, histogram = (s.to_numpy() for s in calculate_macd(df, settings, ctx))
+    close = df['close'].to_numpy()
+    i = _recent_window(len(df))
     
-    crossovers = []
-    current_price = df['close'].iloc[-1]
+    # Histogram sign change confirmed by the lines themselves
+    hist_up, hist_down = _sign_flips(histogram, i)
+    bullish = hist_up & (macd_line[i-1] <= signal_line[i-1]) & (macd_line[i] > signal_line[i])
+    bearish = hist_down & (macd_line[i-1] >= signal_line[i-1]) & (macd_line[i] < signal_line[i])
+    # Was there a clear trend before for a meaningful reversal?
+    has_downtrend, has_uptrend = _prior_trend(histogram, i)
+    histogram_change = np.abs(histogram[i] - histogram[i-1])
     
-    # Look for crossovers in recent candles to avoid false signals
-    for i in range(len(df)-10, len(df)-1):  # Check last 10 candles
-        # Bullish crossover: MACD line crosses above signal line
-        if (i > 0 and 
-            histogram.iloc[i-1] < 0 and  # Was negative (bearish)
-            histogram.iloc[i] > 0 and   # Now positive (bullish)
-            macd_line.iloc[i-1] <= signal_line.iloc[i-1] and  # MACD below signal before
-            macd_line.iloc[i] > signal_line.iloc[i]):         # MACD above signal now
-            
-            # Check if there was sufficient downtrend before for a meaningful reversal
-            lookback = min(20, i)
-            prev_macd_values = histogram.iloc[i-lookback:i]
-            has_downtrend = (prev_macd_values < 0).sum() > lookback * 0.6  # 60% were negative
-            
-            # Calculate distance to current price based on signal significance
-            histogram_change = abs(histogram.iloc[i] - histogram.iloc[i-1])
-            distance = 0.01  # Default distance for MACD
-            
-            score = 60
+    crossovers = []
+    for k in np.flatnonzero(bullish | bearish):
+        bar = int(i[k])
+        score = 60
+        strength = 'medium'
+        if histogram_change[k] > settings.min_histogram_change * 2:
+            score = 80
+            strength = 'strong'
+        elif histogram_change[k] > settings.min_histogram_change:
+            score = 70
             strength = 'medium'
-            if histogram_change > settings.min_histogram_change * 2:
-                score = 80
-                strength = 'strong'
-            elif histogram_change > settings.min_histogram_change:
-                score = 70
-                strength = 'medium'
-            
-            # Boost score if there was a clear downtrend before
-            if has_downtrend:
-                score += 15
-                if strength == 'medium':
-                    strength = 'strong'
-            
-            crossovers.append(FeatureResult(
-                module='macd',
-                symbol='',
-                timeframe='',
-                candle_ts=0,
-                direction='long',
-                strength=strength,
-                score=score,
-                reasons=[f"Bullish MACD crossover at {df['close'].iloc[i]:.5f}"],
-                levels={'macd_value': float(macd_line.iloc[i]), 'signal_value': float(signal_line.iloc[i]), 'histogram': float(histogram.iloc[i])}
-            ))
         
-        # Bearish crossover: MACD line crosses below signal line
-        if (i > 0 and 
-            histogram.iloc[i-1] > 0 and  # Was positive (bullish)
-            histogram.iloc[i] < 0 and   # Now negative (bearish)
-            macd_line.iloc[i-1] >= signal_line.iloc[i-1] and  # MACD above signal before
-            macd_line.iloc[i] < signal_line.iloc[i]):         # MACD below signal now
-            
-            # Check if there was sufficient uptrend before for a meaningful reversal
-            lookback = min(20, i)
-            prev_macd_values = histogram.iloc[i-lookback:i]
-            has_uptrend = (prev_macd_values > 0).sum() > lookback * 0.6  # 60% were positive
-            
-            # Calculate distance to current price based on signal significance
-            histogram_change = abs(histogram.iloc[i-1] - histogram.iloc[i])
-            distance = 0.01  # Default distance for MACD
-            
-            score = 60
-            strength = 'medium'
-            if histogram_change > settings.min_histogram_change * 2:
-                score = 80
+        # Boost score if there was a clear opposite trend before
+        if has_downtrend[k] if bullish[k] else has_uptrend[k]:
+            score += 15
+            if strength == 'medium':
                 strength = 'strong'
-            elif histogram_change > settings.min_histogram_change:
-                score = 70
-                strength = 'medium'
-            
-            # Boost score if there was a clear uptrend before
-            if has_uptrend:
-                score += 15
-                if strength == 'medium':
-                    strength = 'strong'
-            
-            crossovers.append(FeatureResult(
-                module='macd',
-                symbol='',
-                timeframe='',
-                candle_ts=0,
-                direction='short',
-                strength=strength,
-                score=score,
-                reasons=[f"Bearish MACD crossover at {df['close'].iloc[i]:.5f}"],
-                levels={'macd_value': float(macd_line.iloc[i]), 'signal_value': float(signal_line.iloc[i]), 'histogram': float(histogram.iloc[i])}
-            ))
+        
+        side = "Bullish" if bullish[k] else "Bearish"
+        crossovers.append(FeatureResult(
+            module='macd',
+            symbol='',
+            timeframe='',
+            candle_ts=0,
+            direction='long' if bullish[k] else 'short',
+            strength=strength,
+            score=score,
+            reasons=[f"{side} MACD crossover at {close[bar]:.5f}"],
+            levels=_macd_levels(macd_line, signal_line, histogram, bar)
+        ))
     
     # Sort by most recent and return top signals
     crossovers.sort(key=lambda x: x.score, reverse=True)
     return crossovers[:settings.max_signals_per_type]
 
 
-def detect_zero_line_crossovers(df: pd.DataFrame, settings: MACDSettings) -> List[FeatureResult]:
+def detect_zero_line_crossovers(df: pd.DataFrame, settings: MACDSettings, ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """Detect MACD line crossing zero line (for momentum shifts)"""
     if len(df) < max(settings.fast_period, settings.slow_period, settings.signal_period) + 10:
         return []
 
-    macd_line, signal_line, histogram = calculate_macd(df, settings)
+    macd_line, signal_line, histogram = (s.to_numpy() for s in calculate_macd(df, settings, ctx))
+    close = df['close'].to_numpy()
+    i = _recent_window(len(df))
+    bullish, bearish = _sign_flips(macd_line, i)
     
     zero_crossings = []
-    
-    for i in range(len(df)-10, len(df)-1):  # Check last 10 candles
-        # Bullish zero line cross: MACD line crosses from negative to positive
-        if (i > 0 and 
-            macd_line.iloc[i-1] < 0 and  # Was negative
-            macd_line.iloc[i] > 0):      # Now positive
-            
-            score = 50
-            strength = 'weak'
-            # Check histogram for strength
-            if histogram.iloc[i] > settings.min_histogram_change:
-                score = 70
-                strength = 'medium'
-            elif histogram.iloc[i] > settings.min_histogram_change * 2:
-                score = 85
-                strength = 'strong'
-            
-            zero_crossings.append(FeatureResult(
-                module='macd',
-                symbol='',
-                timeframe='',
-                candle_ts=0,
-                direction='long',
-                strength=strength,
-                score=score,
-                reasons=[f"MACD bullish zero line cross at {df['close'].iloc[i]:.5f}"],
-                levels={'macd_value': float(macd_line.iloc[i]), 'signal_value': float(signal_line.iloc[i]), 'histogram': float(histogram.iloc[i])}
-            ))
+    for k in np.flatnonzero(bullish | bearish):
+        bar = int(i[k])
+        # Check histogram for strength (against the move's direction for bearish crosses)
+        strength_value = histogram[bar] if bullish[k] else abs(histogram[bar])
+        score = 50
+        strength = 'weak'
+        if strength_value > settings.min_histogram_change:
+            score = 70
+            strength = 'medium'
+        elif strength_value > settings.min_histogram_change * 2:
+            score = 85
+            strength = 'strong'
         
-        # Bearish zero line cross: MACD line crosses from positive to negative
-        if (i > 0 and 
-            macd_line.iloc[i-1] > 0 and  # Was positive
-            macd_line.iloc[i] < 0):      # Now negative
-            
-            score = 50
-            strength = 'weak'
-            # Check histogram for strength
-            if abs(histogram.iloc[i]) > settings.min_histogram_change:
-                score = 70
-                strength = 'medium'
-            elif abs(histogram.iloc[i]) > settings.min_histogram_change * 2:
-                score = 85
-                strength = 'strong'
-            
-            zero_crossings.append(FeatureResult(
-                module='macd',
-                symbol='',
-                timeframe='',
-                candle_ts=0,
-                direction='short',
-                strength=strength,
-                score=score,
-                reasons=[f"MACD bearish zero line cross at {df['close'].iloc[i]:.5f}"],
-                levels={'macd_value': float(macd_line.iloc[i]), 'signal_value': float(signal_line.iloc[i]), 'histogram': float(histogram.iloc[i])}
-            ))
+        side = "bullish" if bullish[k] else "bearish"
+        zero_crossings.append(FeatureResult(
+            module='macd',
+            symbol='',
+            timeframe='',
+            candle_ts=0,
+            direction='long' if bullish[k] else 'short',
+            strength=strength,
+            score=score,
+            reasons=[f"MACD {side} zero line cross at {close[bar]:.5f}"],
+            levels=_macd_levels(macd_line, signal_line, histogram, bar)
+        ))
     
     # Sort by most recent and return top signals
     zero_crossings.sort(key=lambda x: x.score, reverse=True)
     return zero_crossings[:settings.max_signals_per_type]
 
 
-def analyze(df: pd.DataFrame, settings: Optional[Dict] = None) -> List[FeatureResult]:
+def analyze(df: pd.DataFrame, settings: Optional[Dict] = None, ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """Analyze DataFrame for MACD patterns"""
     if settings is None:
         macd_settings = MACDSettings()
@@ -225,11 +161,12 @@ def analyze(df: pd.DataFrame, settings: Optional[Dict] = None) -> List[FeatureRe
         # If it's a dict, create MACDSettings with those values
         macd_settings = MACDSettings(**settings)
 
+    ctx = get_context(df, ctx)
     all_results = []
     
     # Detect MACD patterns
-    all_results.extend(detect_macd_crossovers(df, macd_settings))
-    all_results.extend(detect_zero_line_crossovers(df, macd_settings))
+    all_results.extend(detect_macd_crossovers(df, macd_settings, ctx))
+    all_results.extend(detect_zero_line_crossovers(df, macd_settings, ctx))
     
     # Sort by score (highest first) and return only the top ones
     all_results.sort(key=lambda x: x.score, reverse=True)
@@ -9,6 +9,7 @@ import numpy as np
 from datetime import datetime
 
 from engine.types import FeatureResult, Direction, Strength
+from engine.indicators import IndicatorContext, get_context, rsi as shared_rsi
 
 
 @dataclass
@@ -27,7 +28,7 @@ class PumpSettings:
             self.timeframe_windows = ['5m', '15m']
 
 
-def calculate_price_changes(df: pd.DataFrame, windows: List[str]) -> Dict[str, float]:
+def calculate_price_changes(df: pd.DataFrame, windows: List[str], ctx: Optional[IndicatorContext] = None) -> Dict[str, float]:
     """Calculate price changes over different time windows"""
     changes = {}
     
@@ -42,7 +43,9 @@ def calculate_price_changes(df: pd.DataFrame, windows: List[str]) -> Dict[str, f
         else:
             candles = 4  # default 15m equivalent
         
-        if len(df) > candles:
+        if len(df) > candles and ctx is not None:
+            changes[window_str] = ctx.price_change(candles).iloc[-1]
+        elif len(df) > candles:
             current_price = df['close'].iloc[-1]
             past_price = df['close'].iloc[-(candles + 1)]
             change_pct = ((current_price - past_price) / past_price) * 100
@@ -53,13 +56,13 @@ def calculate_price_changes(df: pd.DataFrame, windows: List[str]) -> Dict[str, f
     return changes
 
 
-def calculate_volume_metrics(df: pd.DataFrame, lookback: int = 20) -> Dict[str, float]:
+def calculate_volume_metrics(df: pd.DataFrame, lookback: int = 20, ctx: Optional[IndicatorContext] = None) -> Dict[str, float]:
     """Calculate volume-related metrics"""
     if len(df) < lookback:
         return {'current_volume': 0, 'avg_volume': 0, 'volume_ratio': 0}
     
     current_volume = float(df['volume'].iloc[-1])
-    avg_volume = float(df['volume'].rolling(window=lookback).mean().iloc[-1])
+    avg_volume = float(get_context(df, ctx).volume_mean(lookback).iloc[-1])
     volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0
     
     return {
@@ -69,29 +72,28 @@ def calculate_volume_metrics(df: pd.DataFrame, lookback: int = 20) -> Dict[str,
     }
 
 
-def calculate_rsi(close_prices: pd.Series, window: int = 14) -> float:
+def calculate_rsi(close_prices: pd.Series, window: int = 14, ctx: Optional[IndicatorContext] = None) -> float:
     """Calculate current RSI value"""
     if len(close_prices) < window + 1:
         return 50.0
     
-    delta = close_prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
+    rsi = ctx.rsi(window) if ctx is not None else shared_rsi(close_prices, window)
     
     return float(rsi.iloc[-1]) if not pd.isna(rsi.iloc[-1]) else 50.0
 
 
-def detect_breakout(df: pd.DataFrame, lookback: int = 20) -> Optional[Dict]:
+def detect_breakout(df: pd.DataFrame, lookback: int = 20, ctx: Optional[IndicatorContext] = None) -> Optional[Dict]:
     """Detect breakout from range"""
     if len(df) < lookback:
         return None
     
     # Calculate recent range
-    recent_high = df['high'].iloc[-lookback:].max()
-    recent_low = df['low'].iloc[-lookback:].min()
+    if ctx is not None:
+        recent_high = ctx.rolling_high(lookback).iloc[-1]
+        recent_low = ctx.rolling_low(lookback).iloc[-1]
+    else:
+        recent_high = df['high'].iloc[-lookback:].max()
+        recent_low = df['low'].iloc[-lookback:].min()
     current_price = df['close'].iloc[-1]
     
     # Check for breakout
@@ -113,16 +115,18 @@ def detect_breakout(df: pd.DataFrame, lookback: int = 20) -> Optional[Dict]:
     return None
 
 
-def detect_pump_signal(df: pd.DataFrame, settings: PumpSettings, symbol: str, timeframe: str) -> Optional[FeatureResult]:
+def detect_pump_signal(df: pd.DataFrame, settings: PumpSettings, symbol: str, timeframe: str,
+                       ctx: Optional[IndicatorContext] = None) -> Optional[FeatureResult]:
     """Main pump detection function"""
     if len(df) < 20 or not settings.enabled:
         return None
+    ctx = get_context(df, ctx)
     
     # Calculate metrics
-    price_changes = calculate_price_changes(df, settings.timeframe_windows)
-    volume_metrics = calculate_volume_metrics(df)
-    current_rsi = calculate_rsi(df['close'])
-    breakout_info = detect_breakout(df)
+    price_changes = calculate_price_changes(df, settings.timeframe_windows, ctx)
+    volume_metrics = calculate_volume_metrics(df, ctx=ctx)
+    current_rsi = calculate_rsi(df['close'], ctx=ctx)
+    breakout_info = detect_breakout(df, ctx=ctx)
     
     # Check for pump conditions
     pump_signals = []
@@ -183,7 +187,8 @@ def detect_pump_signal(df: pd.DataFrame, settings: PumpSettings, symbol: str, ti
     return None
 
 
-def analyze(df: pd.DataFrame, settings: Optional[Dict] = None, symbol: str = "UNKNOWN", timeframe: str = "UNKNOWN") -> List[FeatureResult]:
+def analyze(df: pd.DataFrame, settings: Optional[Dict] = None, symbol: str = "UNKNOWN", timeframe: str = "UNKNOWN",
+            ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """Main analysis function for Pump module"""
     # Handle settings
     if settings is None:
@@ -194,7 +199,7 @@ def analyze(df: pd.DataFrame, settings: Optional[Dict] = None, symbol: str = "UN
         pump_settings = PumpSettings(**settings)
     
     # Detect pump signal
-    pump_result = detect_pump_signal(df, pump_settings, symbol, timeframe)
+    pump_result = detect_pump_signal(df, pump_settings, symbol, timeframe, ctx)
     
     return [pump_result] if pump_result else []
 
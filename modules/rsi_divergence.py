@@ -9,6 +9,7 @@ import numpy as np
 from datetime import datetime
 
 from engine.types import FeatureResult, Direction, Strength
+from engine.indicators import IndicatorContext, get_context, pivot_indices, rsi as shared_rsi
 
 
 @dataclass
@@ -21,182 +22,137 @@ class RSIDivergenceSettings:
     min_price_change: float = 0.02  # Minimum 2% price change to qualify
     min_rsi_change: int = 15  # Minimum RSI change to qualify
     lookback_period: int = 50  # Look back this many candles for swing points
+    pivot_tolerance: int = 0  # RSI pivot may sit this many bars away from the price pivot
+    newest_pivot_only: bool = False  # Live mode (scanner: RSI_NEWEST_PIVOT_ONLY=1): newest pivot vs the one before only
 
 
 def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     """Calculate RSI indicator"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return pd.Series(rsi)
-
+    return shared_rsi(prices, period)
+
+
+def match_divergences(price_pivots: np.ndarray, rsi_pivots: np.ndarray, tolerance: int = 0,
+                      newest_only: bool = False):
+    """
+    Pair consecutive price pivots and find the nearest RSI pivot within `tolerance` bars of each.
+    Returns (prev_idx, cur_idx, prev_rsi_idx, cur_rsi_idx) index arrays of the matched pairs.
+    """
+    if newest_only:
+        price_pivots = price_pivots[-2:]
+    prev_idx, cur_idx = price_pivots[:-1], price_pivots[1:]
+    if not len(cur_idx) or not len(rsi_pivots):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty
+
+    def nearest(idx):
+        after = np.searchsorted(rsi_pivots, idx)  # first RSI pivot at or after idx
+        after_idx = rsi_pivots[np.minimum(after, len(rsi_pivots) - 1)]
+        before_idx = rsi_pivots[np.maximum(after - 1, 0)]
+        dist_after = np.where(after < len(rsi_pivots), after_idx - idx, np.iinfo(np.int64).max)
+        dist_before = np.where(after > 0, idx - before_idx, np.iinfo(np.int64).max)
+        use_after = dist_after < dist_before  # an exact match always wins
+        return np.where(use_after, after_idx, before_idx), np.minimum(dist_after, dist_before) <= tolerance
+
+    prev_rsi, prev_ok = nearest(prev_idx)
+    cur_rsi, cur_ok = nearest(cur_idx)
+    ok = prev_ok & cur_ok
+    return prev_idx[ok], cur_idx[ok], prev_rsi[ok], cur_rsi[ok]
+
+
+def _divergences(prices: pd.Series, rsi_values: pd.Series, settings: RSIDivergenceSettings,
+                 ctx: Optional[IndicatorContext], kind: str):
+    """Matched pivot pairs as (prev_idx, cur_idx, prev_price, cur_price, prev_rsi, cur_rsi, price_change)"""
+    price = prices.to_numpy(dtype=float)
+    rsi = rsi_values.to_numpy(dtype=float)
+    if ctx is not None:
+        price_pivots = ctx.pivots('close', kind)
+        rsi_pivots = ctx.pivots('rsi', kind, settings.rsi_period)
+    else:
+        price_pivots = pivot_indices(price, kind)
+        rsi_pivots = pivot_indices(rsi, kind)
 
-def find_swing_highs_lows(series: pd.Series, window: int = 5) -> pd.DataFrame:
-    """Find swing highs and lows in a series"""
-    df = pd.DataFrame({'value': series})
-    
-    # Find local maxima (swing highs)
-    df['swing_high'] = (
-        (df['value'] > df['value'].shift(1)) & 
-        (df['value'] > df['value'].shift(-1)) &
-        (df['value'] > df['value'].shift(2)) & 
-        (df['value'] > df['value'].shift(-2))
+    prev_idx, cur_idx, prev_rsi_idx, cur_rsi_idx = match_divergences(
+        price_pivots, rsi_pivots, settings.pivot_tolerance, settings.newest_pivot_only
     )
-    
-    # Find local minima (swing lows)  
-    df['swing_low'] = (
-        (df['value'] < df['value'].shift(1)) & 
-        (df['value'] < df['value'].shift(-1)) &
-        (df['value'] < df['value'].shift(2)) & 
-        (df['value'] < df['value'].shift(-2))
-    )
-    
-    return df
+    prev_price, cur_price = price[prev_idx], price[cur_idx]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_change = (cur_price - prev_price) / prev_price
+    return prev_idx, cur_idx, prev_price, cur_price, rsi[prev_rsi_idx], rsi[cur_rsi_idx], price_change
 
 
 def detect_bullish_divergence(prices: pd.Series, rsi_values: pd.Series, 
-                             settings: RSIDivergenceSettings) -> List[FeatureResult]:
+                             settings: RSIDivergenceSettings,
+                             ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """Detect bullish divergence (price makes lower low, RSI makes higher low)"""
-    results = []
-    
-    # Find swing lows in both price and RSI
-    price_swings = find_swing_lows(prices)
-    rsi_swings = find_swing_lows(rsi_values)
+    prev_idx, cur_idx, prev_price, cur_price, prev_rsi, cur_rsi, price_change = \
+        _divergences(prices, rsi_values, settings, ctx, 'low')
+    rsi_change = cur_rsi - prev_rsi
     
-    # Look for pairs of swing lows to compare
-    swing_lows = price_swings[price_swings['swing_low']].index.tolist()
-    rsi_lows = rsi_swings[rsi_swings['swing_low']].index.tolist()
+    # Lower price low, higher RSI low, RSI in oversold zone, both moves large enough
+    hits = ((cur_price < prev_price) & (cur_rsi > prev_rsi) & (cur_rsi < settings.min_rsi) &
+            (np.abs(price_change) >= settings.min_price_change) & (rsi_change >= settings.min_rsi_change))
     
-    for i in range(1, len(swing_lows)):
-        # Current and previous swing low in price
-        current_price_idx = swing_lows[i]
-        prev_price_idx = swing_lows[i-1]
-        
-        if current_price_idx in rsi_lows and prev_price_idx in rsi_lows:
-            current_price = prices.iloc[current_price_idx]
-            prev_price = prices.iloc[prev_price_idx]
-            current_rsi = rsi_values.iloc[current_price_idx]
-            prev_rsi = rsi_values.iloc[prev_price_idx]
-            
-            # Bullish divergence: price makes lower low, RSI makes higher low
-            if (current_price < prev_price and  # Lower price low
-                current_rsi > prev_rsi and      # Higher RSI low
-                current_rsi < settings.min_rsi): # RSI in oversold zone
-                
-                price_change = (current_price - prev_price) / prev_price
-                rsi_change = current_rsi - prev_rsi
-                
-                if abs(price_change) >= settings.min_price_change and rsi_change >= settings.min_rsi_change:
-                    results.append(FeatureResult(
-                        module="rsi_divergence",
-                        symbol="UNKNOWN",  # Will be filled by the scanner
-                        timeframe="UNKNOWN",  # Will be filled by the scanner
-                        candle_ts=int(datetime.now().timestamp()),
-                        direction="long",
-                        strength="strong",
-                        score=85,
-                        reasons=[f"🟢 BULLISH DIVERGENCE: Price made lower low ({prev_price:.4f} → {current_price:.4f}) but RSI made higher low ({prev_rsi:.1f} → {current_rsi:.1f})"],
-                        levels={
-                            'price_change': price_change,
-                            'rsi_change': rsi_change,
-                            'current_price_idx': int(current_price_idx),
-                            'prev_price_idx': int(prev_price_idx),
-                            'current_rsi': current_rsi,
-                            'prev_rsi': prev_rsi
-                        }
-                    ))
+    results = []
+    for k in np.flatnonzero(hits):
+        results.append(FeatureResult(
+            module="rsi_divergence",
+            symbol="UNKNOWN",  # Will be filled by the scanner
+            timeframe="UNKNOWN",  # Will be filled by the scanner
+            candle_ts=int(datetime.now().timestamp()),
+            direction="long",
+            strength="strong",
+            score=85,
+            reasons=[f"🟢 BULLISH DIVERGENCE: Price made lower low ({prev_price[k]:.4f} → {cur_price[k]:.4f}) but RSI made higher low ({prev_rsi[k]:.1f} → {cur_rsi[k]:.1f})"],
+            levels={
+                'price_change': price_change[k],
+                'rsi_change': rsi_change[k],
+                'current_price_idx': int(cur_idx[k]),
+                'prev_price_idx': int(prev_idx[k]),
+                'current_rsi': cur_rsi[k],
+                'prev_rsi': prev_rsi[k]
+            }
+        ))
     
     return results
 
 
 def detect_bearish_divergence(prices: pd.Series, rsi_values: pd.Series, 
-                             settings: RSIDivergenceSettings) -> List[FeatureResult]:
+                             settings: RSIDivergenceSettings,
+                             ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """Detect bearish divergence (price makes higher high, RSI makes lower high)"""
-    results = []
-    
-    # Find swing highs in both price and RSI
-    price_swings = find_swing_highs(prices)
-    rsi_swings = find_swing_highs(rsi_values)
+    prev_idx, cur_idx, prev_price, cur_price, prev_rsi, cur_rsi, price_change = \
+        _divergences(prices, rsi_values, settings, ctx, 'high')
+    rsi_change = prev_rsi - cur_rsi
     
-    # Look for pairs of swing highs to compare
-    swing_highs = price_swings[price_swings['swing_high']].index.tolist()
-    rsi_highs = rsi_swings[rsi_swings['swing_high']].index.tolist()
+    # Higher price high, lower RSI high, RSI in overbought zone, both moves large enough
+    hits = ((cur_price > prev_price) & (cur_rsi < prev_rsi) & (cur_rsi > settings.max_rsi) &
+            (np.abs(price_change) >= settings.min_price_change) & (rsi_change >= settings.min_rsi_change))
     
-    for i in range(1, len(swing_highs)):
-        # Current and previous swing high in price
-        current_price_idx = swing_highs[i]
-        prev_price_idx = swing_highs[i-1]
-        
-        if current_price_idx in rsi_highs and prev_price_idx in rsi_highs:
-            current_price = prices.iloc[current_price_idx]
-            prev_price = prices.iloc[prev_price_idx]
-            current_rsi = rsi_values.iloc[current_price_idx]
-            prev_rsi = rsi_values.iloc[prev_price_idx]
-            
-            # Bearish divergence: price makes higher high, RSI makes lower high
-            if (current_price > prev_price and  # Higher price high
-                current_rsi < prev_rsi and      # Lower RSI high
-                current_rsi > settings.max_rsi): # RSI in overbought zone
-                
-                price_change = (current_price - prev_price) / prev_price
-                rsi_change = prev_rsi - current_rsi
-                
-                if abs(price_change) >= settings.min_price_change and rsi_change >= settings.min_rsi_change:
-                    results.append(FeatureResult(
-                        module="rsi_divergence",
-                        symbol="UNKNOWN",  # Will be filled by the scanner
-                        timeframe="UNKNOWN",  # Will be filled by the scanner
-                        candle_ts=int(datetime.now().timestamp()),
-                        direction="short",
-                        strength="strong",
-                        score=85,
-                        reasons=[f"🔴 BEARISH DIVERGENCE: Price made higher high ({prev_price:.4f} → {current_price:.4f}) but RSI made lower high ({prev_rsi:.1f} → {current_rsi:.1f})"],
-                        levels={
-                            'price_change': price_change,
-                            'rsi_change': rsi_change,
-                            'current_price_idx': int(current_price_idx),
-                            'prev_price_idx': int(prev_price_idx),
-                            'current_rsi': current_rsi,
-                            'prev_rsi': prev_rsi
-                        }
-                    ))
+    results = []
+    for k in np.flatnonzero(hits):
+        results.append(FeatureResult(
+            module="rsi_divergence",
+            symbol="UNKNOWN",  # Will be filled by the scanner
+            timeframe="UNKNOWN",  # Will be filled by the scanner
+            candle_ts=int(datetime.now().timestamp()),
+            direction="short",
+            strength="strong",
+            score=85,
+            reasons=[f"🔴 BEARISH DIVERGENCE: Price made higher high ({prev_price[k]:.4f} → {cur_price[k]:.4f}) but RSI made lower high ({prev_rsi[k]:.1f} → {cur_rsi[k]:.1f})"],
+            levels={
+                'price_change': price_change[k],
+                'rsi_change': rsi_change[k],
+                'current_price_idx': int(cur_idx[k]),
+                'prev_price_idx': int(prev_idx[k]),
+                'current_rsi': cur_rsi[k],
+                'prev_rsi': prev_rsi[k]
+            }
+        ))
     
     return results
 
 
-def find_swing_highs(series: pd.Series, window: int = 5) -> pd.DataFrame:
-    """Find swing highs in a series"""
-    df = pd.DataFrame({'value': series})
-    
-    # Find local maxima (swing highs)
-    df['swing_high'] = (
-        (df['value'] > df['value'].shift(1)) & 
-        (df['value'] > df['value'].shift(-1)) &
-        (df['value'] > df['value'].shift(2)) & 
-        (df['value'] > df['value'].shift(-2))
-    )
-    
-    return df
-
-
-def find_swing_lows(series: pd.Series, window: int = 5) -> pd.DataFrame:
-    """Find swing lows in a series"""
-    df = pd.DataFrame({'value': series})
-    
-    # Find local minima (swing lows)  
-    df['swing_low'] = (
-        (df['value'] < df['value'].shift(1)) & 
-        (df['value'] < df['value'].shift(-1)) &
-        (df['value'] < df['value'].shift(2)) & 
-        (df['value'] < df['value'].shift(-2))
-    )
-    
-    return df
-
-
-def analyze(df: pd.DataFrame, settings: Optional[Dict] = None) -> List[FeatureResult]:
+def analyze(df: pd.DataFrame, settings: Optional[Dict] = None, ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """Main analysis function for the RSI Divergence module"""
     if settings is None:
         rsi_settings = RSIDivergenceSettings()
@@ -210,16 +166,17 @@ def analyze(df: pd.DataFrame, settings: Optional[Dict] = None) -> List[FeatureRe
         return []
     
     results = []
+    ctx = get_context(df, ctx)
     
     # Calculate RSI
-    rsi = calculate_rsi(df['close'], rsi_settings.rsi_period)
+    rsi = ctx.rsi(rsi_settings.rsi_period)
     
     # Detect bullish divergences
-    bullish_divs = detect_bullish_divergence(df['close'], rsi, rsi_settings)
+    bullish_divs = detect_bullish_divergence(df['close'], rsi, rsi_settings, ctx)
     results.extend(bullish_divs)
     
     # Detect bearish divergences
-    bearish_divs = detect_bearish_divergence(df['close'], rsi, rsi_settings)
+    bearish_divs = detect_bearish_divergence(df['close'], rsi, rsi_settings, ctx)
     results.extend(bearish_divs)
     
     return results
\ No newline at end of file
@@ -9,6 +9,7 @@ import numpy as np
 from datetime import datetime
 
 from engine.types import FeatureResult, Direction, Strength
+from engine.indicators import IndicatorContext, get_context
 
 
 @dataclass
@@ -22,107 +23,94 @@ class SMCSettings:
     max_zones_per_type: int = 2  # Maximum zones to return per type
 
 
-def detect_order_blocks(df: pd.DataFrame, settings: SMCSettings) -> List[FeatureResult]:
+def _hlcv(df: pd.DataFrame):
+    return tuple(df[column].to_numpy(dtype=float) for column in ('high', 'low', 'close', 'volume'))
+
+
+def _rank_by_distance(candidates, limit: int):
+    """
+    Closest-first (index, direction, distance) over per-direction candidate arrays.
+    Ties keep the scan order of the old loops: candle index first, then long before short.
+    """
+    idx = np.concatenate([c[0] for c in candidates])
+    if not len(idx):
+        return []
+    kind = np.concatenate([np.full(len(c[0]), k) for k, c in enumerate(candidates)])
+    dist = np.concatenate([c[1] for c in candidates])
+    order = np.lexsort((kind, idx, dist))[:limit]
+    return [(int(idx[j]), candidates[kind[j]][2], dist[j]) for j in order]
+
+
+def _distance_tier(distance: float, base: int, near: int, mid: int):
+    """Score/strength from distance to the current price (within 2% / 5%)"""
+    if distance < 0.02:
+        return near, 'strong'
+    if distance < 0.05:
+        return mid, 'medium'
+    return base, 'weak'
+
+
+def detect_order_blocks(df: pd.DataFrame, settings: SMCSettings, ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """Detect Order Blocks (high-probability reversal zones)"""
     if len(df) < settings.lookback_period or settings.lookback_period < 3:
         return []
+    avg_vol = get_context(df, ctx).volume_mean(20).to_numpy()
 
-    order_blocks = []
-    current_price = df['close'].iloc[-1]
+    high, low, close, volume = _hlcv(df)
+    current_price = close[-1]
+    i = np.arange(settings.lookback_period, len(df) - 2)
     
-    # Look for potential order blocks by finding swing points
-    for i in range(settings.lookback_period, len(df)-2):
-        # Bullish order block: price made a low, then reversed up strongly
-        if (df['low'].iloc[i] <= df['low'].iloc[i-2:i+2].min() and 
-            df['close'].iloc[i+1] > df['high'].iloc[i] and
-            (df['high'].iloc[i] - df['low'].iloc[i]) / df['low'].iloc[i] >= settings.order_block_min_range):
-            
-            # Calculate distance to current price
-            distance = abs(current_price - df['high'].iloc[i]) / current_price
-            
-            score = 50
-            strength = 'weak'
-            if distance < 0.02:  # Within 2%
-                score = 80
-                strength = 'strong'
-            elif distance < 0.05:  # Within 5%
-                score = 70
-                strength = 'medium'
-            
-            # Check volume confirmation
-            avg_vol_series = df['volume'].rolling(20).mean()
-            avg_vol_val = avg_vol_series.iloc[i] if isinstance(avg_vol_series, pd.Series) else avg_vol_series[i]
-            if avg_vol_val > 0 and df['volume'].iloc[i+1] > avg_vol_val * settings.min_volume_confirmation:
-                score += 20
-                if strength == 'weak':
-                    strength = 'medium'
-                elif strength == 'medium':
-                    strength = 'strong'
-            
-            order_blocks.append(FeatureResult(
-                module='smc',
-                symbol='',
-                timeframe='',
-                candle_ts=0,
-                direction='long',
-                strength=strength,
-                score=score,
-                reasons=[f"Bullish Order Block at {df['high'].iloc[i]:.5f}"],
-                levels={
-                    'order_block_high': float(df['high'].iloc[i]), 
-                    'distance': distance,
-                    'sweep_high': float(df['high'].iloc[i]),
-                    'reclaim_close': True  # Since it reversed up strongly
-                }
-            ))
+    # Swing point that reversed strongly on the next candle, with a meaningful range
+    wide = (high[i] - low[i]) / low[i] >= settings.order_block_min_range
+    bullish = (low[i] <= np.minimum.reduce([low[i-2], low[i-1], low[i], low[i+1]])) & (close[i+1] > high[i]) & wide
+    bearish = (high[i] >= np.maximum.reduce([high[i-2], high[i-1], high[i], high[i+1]])) & (close[i+1] < low[i]) & wide
+    
+    top = _rank_by_distance([
+        (i[bullish], np.abs(current_price - high[i[bullish]]) / current_price, 'long'),
+        (i[bearish], np.abs(current_price - low[i[bearish]]) / current_price, 'short'),
+    ], settings.max_zones_per_type)
+
+    order_blocks = []
+    for k, direction, distance in top:
+        score, strength = _distance_tier(distance, 50, 80, 70)
         
-        # Bearish order block: price made a high, then reversed down strongly
-        if (df['high'].iloc[i] >= df['high'].iloc[i-2:i+2].max() and 
-            df['close'].iloc[i+1] < df['low'].iloc[i] and
-            (df['high'].iloc[i] - df['low'].iloc[i]) / df['low'].iloc[i] >= settings.order_block_min_range):
-            
-            # Calculate distance to current price
-            distance = abs(current_price - df['low'].iloc[i]) / current_price
-            
-            score = 50
-            strength = 'weak'
-            if distance < 0.02:  # Within 2%
-                score = 80
-                strength = 'strong'
-            elif distance < 0.05:  # Within 5%
-                score = 70
+        # Check volume confirmation
+        if avg_vol[k] > 0 and volume[k+1] > avg_vol[k] * settings.min_volume_confirmation:
+            score += 20
+            if strength == 'weak':
                 strength = 'medium'
-            
-            # Check volume confirmation
-            avg_vol_series = df['volume'].rolling(20).mean()
-            avg_vol_val = avg_vol_series.iloc[i] if isinstance(avg_vol_series, pd.Series) else avg_vol_series[i]
-            if avg_vol_val > 0 and df['volume'].iloc[i+1] > avg_vol_val * settings.min_volume_confirmation:
-                score += 20
-                if strength == 'weak':
-                    strength = 'medium'
-                elif strength == 'medium':
-                    strength = 'strong'
-            
-            order_blocks.append(FeatureResult(
-                module='smc',
-                symbol='',
-                timeframe='',
-                candle_ts=0,
-                direction='short',
-                strength=strength,
-                score=score,
-                reasons=[f"Bearish Order Block at {df['low'].iloc[i]:.5f}"],
-                levels={
-                    'order_block_low': float(df['low'].iloc[i]), 
-                    'distance': distance,
-                    'sweep_low': float(df['low'].iloc[i]),
-                    'reclaim_close': True  # Since it reversed down strongly
-                }
-            ))
+            elif strength == 'medium':
+                strength = 'strong'
+        
+        if direction == 'long':
+            reason = f"Bullish Order Block at {high[k]:.5f}"
+            levels = {
+                'order_block_high': float(high[k]), 
+                'distance': distance,
+                'sweep_high': float(high[k]),
+                'reclaim_close': True  # Since it reversed up strongly
+            }
+        else:
+            reason = f"Bearish Order Block at {low[k]:.5f}"
+            levels = {
+                'order_block_low': float(low[k]), 
+                'distance': distance,
+                'sweep_low': float(low[k]),
+                'reclaim_close': True  # Since it reversed down strongly
+            }
+        order_blocks.append(FeatureResult(
+            module='smc',
+            symbol='',
+            timeframe='',
+            candle_ts=0,
+            direction=direction,
+            strength=strength,
+            score=score,
+            reasons=[reason],
+            levels=levels
+        ))
     
-    # Sort by distance to current price (closest first) and return top N
-    order_blocks.sort(key=lambda x: x.levels['distance'] if x.levels and 'distance' in x.levels else float('inf'))
-    return order_blocks[:settings.max_zones_per_type]
+    return order_blocks
 
 
 def detect_fvg(df: pd.DataFrame, settings: SMCSettings, target_direction: Optional[str] = None) -> List[FeatureResult]:
@@ -130,74 +118,49 @@ def detect_fvg(df: pd.DataFrame, settings: SMCSettings, target_direction: Option
     if len(df) < settings.lookback_period:
         return []
 
-    fvgs = []
-    current_price = df['close'].iloc[-1]
+    high, low, close, _ = _hlcv(df)
+    current_price = close[-1]
+    i = np.arange(max(settings.lookback_period, 1), len(df) - 2)
     
-    for i in range(settings.lookback_period, len(df)-2):
-        # FVG: gap between high of one candle and low of the next (or vice versa)
-        # Bullish FVG: gap between previous candle's high and next candle's low
-        if i > 0 and df['low'].iloc[i-1] > df['high'].iloc[i+1]:  # Gap down
-            gap_size = (df['low'].iloc[i-1] - df['high'].iloc[i+1]) / df['high'].iloc[i+1]
-            if gap_size >= settings.fvg_min_range:
-                # Only add if direction matches target_direction or no target_direction specified
-                if target_direction is None or target_direction == 'long':
-                    # Calculate distance to current price
-                    distance = abs(current_price - (df['low'].iloc[i-1] + df['high'].iloc[i+1]) / 2) / current_price
-                    
-                    score = 40
-                    strength = 'weak'
-                    if distance < 0.02:  # Within 2%
-                        score = 70
-                        strength = 'strong'
-                    elif distance < 0.05:  # Within 5%
-                        score = 60
-                        strength = 'medium'
-                    
-                    fvgs.append(FeatureResult(
-                        module='smc',
-                        symbol='',
-                        timeframe='',
-                        candle_ts=0,
-                        direction='long',
-                        strength=strength,
-                        score=score,
-                        reasons=[f"Bullish FVG: {df['high'].iloc[i+1]:.5f} - {df['low'].iloc[i-1]:.5f}"],
-                        levels={'fvg_low': float(df['high'].iloc[i+1]), 'fvg_high': float(df['low'].iloc[i-1]), 'distance': distance}
-                    ))
-        
-        # Bearish FVG: gap between previous candle's low and next candle's high
-        elif i > 0 and df['high'].iloc[i-1] < df['low'].iloc[i+1]:  # Gap up
-            gap_size = (df['low'].iloc[i+1] - df['high'].iloc[i-1]) / df['high'].iloc[i-1]
-            if gap_size >= settings.fvg_min_range:
-                # Only add if direction matches target_direction or no target_direction specified
-                if target_direction is None or target_direction == 'short':
-                    # Calculate distance to current price
-                    distance = abs(current_price - (df['high'].iloc[i-1] + df['low'].iloc[i+1]) / 2) / current_price
-                    
-                    score = 40
-                    strength = 'weak'
-                    if distance < 0.02:  # Within 2%
-                        score = 70
-                        strength = 'strong'
-                    elif distance < 0.05:  # Within 5%
-                        score = 60
-                        strength = 'medium'
-                    
-                    fvgs.append(FeatureResult(
-                        module='smc',
-                        symbol='',
-                        timeframe='',
-                        candle_ts=0,
-                        direction='short',
-                        strength=strength,
-                        score=score,
-                        reasons=[f"Bearish FVG: {df['high'].iloc[i-1]:.5f} - {df['low'].iloc[i+1]:.5f}"],
-                        levels={'fvg_low': float(df['high'].iloc[i-1]), 'fvg_high': float(df['low'].iloc[i+1]), 'distance': distance}
-                    ))
+    # Bullish FVG: previous candle's low above the next candle's high (gap down)
+    bullish = (low[i-1] > high[i+1]) & ((low[i-1] - high[i+1]) / high[i+1] >= settings.fvg_min_range)
+    # Bearish FVG: previous candle's high below the next candle's low (gap up)
+    bearish = (high[i-1] < low[i+1]) & ((low[i+1] - high[i-1]) / high[i-1] >= settings.fvg_min_range)
+    
+    # Only keep gaps matching target_direction (if given)
+    if target_direction not in (None, 'long'):
+        bullish[:] = False
+    if target_direction not in (None, 'short'):
+        bearish[:] = False
+    
+    bi, si = i[bullish], i[bearish]
+    top = _rank_by_distance([
+        (bi, np.abs(current_price - (low[bi-1] + high[bi+1]) / 2) / current_price, 'long'),
+        (si, np.abs(current_price - (high[si-1] + low[si+1]) / 2) / current_price, 'short'),
+    ], settings.max_zones_per_type)
+
+    fvgs = []
+    for k, direction, distance in top:
+        score, strength = _distance_tier(distance, 40, 70, 60)
+        if direction == 'long':
+            reason = f"Bullish FVG: {high[k+1]:.5f} - {low[k-1]:.5f}"
+            levels = {'fvg_low': float(high[k+1]), 'fvg_high': float(low[k-1]), 'distance': distance}
+        else:
+            reason = f"Bearish FVG: {high[k-1]:.5f} - {low[k+1]:.5f}"
+            levels = {'fvg_low': float(high[k-1]), 'fvg_high': float(low[k+1]), 'distance': distance}
+        fvgs.append(FeatureResult(
+            module='smc',
+            symbol='',
+            timeframe='',
+            candle_ts=0,
+            direction=direction,
+            strength=strength,
+            score=score,
+            reasons=[reason],
+            levels=levels
+        ))
     
-    # Sort by distance to current price (closest first) and return top N
-    fvgs.sort(key=lambda x: x.levels['distance'] if x.levels and 'distance' in x.levels else float('inf'))
-    return fvgs[:settings.max_zones_per_type]
+    return fvgs
 
 
 def detect_bos_choch(df: pd.DataFrame, settings: SMCSettings) -> List[FeatureResult]:
@@ -205,79 +168,56 @@ def detect_bos_choch(df: pd.DataFrame, settings: SMCSettings) -> List[FeatureRes
     if len(df) < settings.lookback_period:
         return []
 
-    bos_choch_signals = []
-    current_price = df['close'].iloc[-1]
+    high, low, close, _ = _hlcv(df)
+    current_price = close[-1]
+    # Pivots need two candles on each side; earlier windows never qualified in the loop version either
+    i = np.arange(max(settings.lookback_period, 2), len(df) - 5)
     
-    # Simplified detection of swing highs/lows
-    for i in range(settings.lookback_period, len(df)-5):
-        # Find swing high (BOS up / CHoCH down)
-        if (df['high'].iloc[i] >= df['high'].iloc[i-2:i+3].max() and 
-            df['high'].iloc[i+2] > df['high'].iloc[i]):  # Break of swing high
-            distance = abs(current_price - df['high'].iloc[i]) / current_price
-            score = 35
-            strength = 'weak'
-            if distance < 0.02:
-                score = 65
-                strength = 'strong'
-            elif distance < 0.05:
-                score = 55
-                strength = 'medium'
-                
-            bos_choch_signals.append(FeatureResult(
-                module='smc',
-                symbol='',
-                timeframe='',
-                candle_ts=0,
-                direction='long',
-                strength=strength,
-                score=score,
-                reasons=[f"BOS up at {df['high'].iloc[i]:.5f}"],
-                levels={
-                    'bos_high': float(df['high'].iloc[i]), 
-                    'distance': distance,
-                    'choch_confirmed': True,
-                    'broken_level': float(df['high'].iloc[i]),
-                    'break_and_close': True
-                }
-            ))
-        
-        # Find swing low (BOS down / CHoCH up)
-        if (df['low'].iloc[i] <= df['low'].iloc[i-2:i+3].min() and 
-            df['low'].iloc[i+2] < df['low'].iloc[i]):  # Break of swing low
-            distance = abs(current_price - df['low'].iloc[i]) / current_price
-            score = 35
-            strength = 'weak'
-            if distance < 0.02:
-                score = 65
-                strength = 'strong'
-            elif distance < 0.05:
-                score = 55
-                strength = 'medium'
-                
-            bos_choch_signals.append(FeatureResult(
-                module='smc',
-                symbol='',
-                timeframe='',
-                candle_ts=0,
-                direction='short',
-                strength=strength,
-                score=score,
-                reasons=[f"BOS down at {df['low'].iloc[i]:.5f}"],
-                levels={
-                    'bos_low': float(df['low'].iloc[i]), 
-                    'distance': distance,
-                    'choch_confirmed': True,
-                    'broken_level': float(df['low'].iloc[i]),
-                    'break_and_close': True
-                }
-            ))
+    # Swing high broken two candles later (BOS up / CHoCH down)
+    window_high = np.maximum.reduce([high[i-2], high[i-1], high[i], high[i+1], high[i+2]])
+    bos_up = (high[i] >= window_high) & (high[i+2] > high[i])
+    # Swing low broken two candles later (BOS down / CHoCH up)
+    window_low = np.minimum.reduce([low[i-2], low[i-1], low[i], low[i+1], low[i+2]])
+    bos_down = (low[i] <= window_low) & (low[i+2] < low[i])
+    
+    top = _rank_by_distance([
+        (i[bos_up], np.abs(current_price - high[i[bos_up]]) / current_price, 'long'),
+        (i[bos_down], np.abs(current_price - low[i[bos_down]]) / current_price, 'short'),
+    ], settings.max_zones_per_type)
+
+    bos_choch_signals = []
+    for k, direction, distance in top:
+        score, strength = _distance_tier(distance, 35, 65, 55)
+        level = float(high[k]) if direction == 'long' else float(low[k])
+        if direction == 'long':
+            reason = f"BOS up at {high[k]:.5f}"
+            levels = {'bos_high': level}
+        else:
+            reason = f"BOS down at {low[k]:.5f}"
+            levels = {'bos_low': level}
+        levels.update({
+            'distance': distance,
+            'choch_confirmed': True,
+            'broken_level': level,
+            'break_and_close': True
+        })
+        bos_choch_signals.append(FeatureResult(
+            module='smc',
+            symbol='',
+            timeframe='',
+            candle_ts=0,
+            direction=direction,
+            strength=strength,
+            score=score,
+            reasons=[reason],
+            levels=levels
+        ))
     
-    # Sort by distance to current price (closest first) and return top N
-    bos_choch_signals.sort(key=lambda x: x.levels['distance'] if x.levels and 'distance' in x.levels else float('inf'))
-    return bos_choch_signals[:settings.max_zones_per_type]
+    return bos_choch_signals
 
 
-def analyze(df: pd.DataFrame, settings: Optional[Dict] = None, target_direction: Optional[str] = None) -> List[FeatureResult]:
+def analyze(df: pd.DataFrame, settings: Optional[Dict] = None, target_direction: Optional[str] = None,
+            ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """Analyze DataFrame for SMC patterns"""
     if settings is None:
         smc_settings = SMCSettings()
@@ -290,7 +230,7 @@ def analyze(df: pd.DataFrame, settings: Optional[Dict] = None, target_direction:
     all_results = []
     
     # Detect all SMC patterns
-    all_results.extend(detect_order_blocks(df, smc_settings))
+    all_results.extend(detect_order_blocks(df, smc_settings, ctx))
     all_results.extend(detect_fvg(df, smc_settings, target_direction))
     all_results.extend(detect_bos_choch(df, smc_settings))
     
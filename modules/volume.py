@@ -9,6 +9,7 @@ import numpy as np
 from datetime import datetime
 
 from engine.types import FeatureResult, Direction, Strength
+from engine.indicators import IndicatorContext, get_context
 
 
 @dataclass
@@ -20,15 +21,16 @@ class VolumeSettings:
     lookback_period: int = 20  # Look back this many candles for average volume
 
 
-def detect_unusual_volume(df: pd.DataFrame, settings: VolumeSettings) -> List[FeatureResult]:
+def detect_unusual_volume(df: pd.DataFrame, settings: VolumeSettings, ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """Detect unusual volume activity"""
     if len(df) < settings.lookback_period or settings.enabled is False:
         return []
+    ctx = get_context(df, ctx)
     
     results = []
     
     # Calculate average volume
-    avg_volume = df['volume'].rolling(window=settings.lookback_period).mean()
+    avg_volume = ctx.volume_mean(settings.lookback_period)
     current_volume = df['volume'].iloc[-1]
     current_close = df['close'].iloc[-1]
     current_high = df['high'].iloc[-1]
@@ -63,10 +65,10 @@ def detect_unusual_volume(df: pd.DataFrame, settings: VolumeSettings) -> List[Fe
             reasons.append(f"{action} price action: {price_change:+.2%}")
         
         # Detect potential breakouts
-        if current_high == df['high'].rolling(5).max().iloc[-1]:
+        if current_high == ctx.rolling_high(5).iloc[-1]:
             reasons.append("Potential bullish breakout")
             direction = "long"
-        elif current_low == df['low'].rolling(5).min().iloc[-1]:
+        elif current_low == ctx.rolling_low(5).iloc[-1]:
             reasons.append("Potential bearish breakdown")
             direction = "short"
         
@@ -90,7 +92,7 @@ def detect_unusual_volume(df: pd.DataFrame, settings: VolumeSettings) -> List[Fe
     return results
 
 
-def analyze(df: pd.DataFrame, settings: Optional[Dict] = None) -> List[FeatureResult]:
+def analyze(df: pd.DataFrame, settings: Optional[Dict] = None, ctx: Optional[IndicatorContext] = None) -> List[FeatureResult]:
     """Main analysis function for the Volume module"""
     if settings is None:
         vol_settings = VolumeSettings()
@@ -103,6 +105,6 @@ def analyze(df: pd.DataFrame, settings: Optional[Dict] = None) -> List[FeatureRe
     all_results = []
     
     # Detect unusual volume
-    all_results.extend(detect_unusual_volume(df, vol_settings))
+    all_results.extend(detect_unusual_volume(df, vol_settings, ctx))
     
     return all_results
\ No newline at end of file
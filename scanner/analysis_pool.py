@@ -0,0 +1,218 @@
+"""
+Module analysis for the scanner, inline or in an optional process pool
+With ANALYSIS_WORKERS=N the module CPU work runs in N worker processes, so the bot process
+only does I/O, decisions and sending and keeps the GIL free for the Telegram loop.
+Candles reach the workers through shared memory, only FeatureResults are pickled back
+"""
+import atexit
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from engine.batch_indicators import build_batches
+from engine.bias_resolver import bias_resolver
+from engine.indicators import IndicatorContext
+from engine.scan_debugger import get_scan_debugger
+from scanner.shared_candles import SharedCandleBlock, CandleIndex
+
+MIN_CANDLES = 80
+
+# (module_name, results, error message or None) per module, in registry order
+ModuleOutcome = Tuple[str, list, Optional[str]]
+# (symbol, tf) -> modules whose results are already cached in the scanner process
+SkipMap = Dict[Tuple[str, str], Set[str]]
+# Worker result: outcomes per (symbol, tf) and the (hits, misses) of its IndicatorContexts
+ChunkResult = Tuple[Dict[Tuple[str, str], List[ModuleOutcome]], Tuple[int, int]]
+
+
+def smc_target_direction(htf_bias) -> Optional[str]:
+    """SMC only reports FVGs in the direction of the 4h bias"""
+    if htf_bias and htf_bias.value == 'BEAR':
+        return 'short'
+    if htf_bias and htf_bias.value == 'BULL':
+        return 'long'
+    return None
+
+
+def module_kwargs(module_name: str, target_direction: Optional[str] = None) -> dict:
+    """Extra analyze() arguments per module (also part of the result cache key)"""
+    if module_name == 'smc':
+        return {'target_direction': target_direction}
+    if module_name == 'rsi_divergence' and os.getenv('RSI_NEWEST_PIVOT_ONLY') == '1':
+        # Live mode: only the newest pivot against the one before, not every pair in the window
+        return {'settings': {'newest_pivot_only': True}}
+    return {}
+
+
+def run_modules(df, ctx: IndicatorContext, modules_registry: dict, enabled: List[str],
+                target_direction: Optional[str] = None, skip: Iterable[str] = ()) -> List[ModuleOutcome]:
+    """Run the enabled modules on one (symbol, tf) frame, except those in `skip` (cached results)"""
+    outcomes = []
+    for module_name, module in modules_registry.items():
+        if module_name not in enabled or module_name in skip:
+            continue
+        try:
+            results = module.analyze(df, ctx=ctx, **module_kwargs(module_name, target_direction))
+            outcomes.append((module_name, list(results or []), None))
+        except Exception as e:
+            outcomes.append((module_name, [], str(e)))
+    return outcomes
+
+
+# Worker process state
+_worker_registry: Dict[str, object] = {}
+
+
+def _init_worker(module_paths: Dict[str, str]):
+    """Import pandas/numpy and the analysis modules once per worker"""
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    for name, path in module_paths.items():
+        _worker_registry[name] = importlib.import_module(path)
+
+
+def _warmup(_) -> int:
+    time.sleep(0.05)  # keep the task busy so every worker picks one up
+    return os.getpid()
+
+
+def _analyze_chunk(units, enabled: List[str], timeframes: Optional[List[str]] = None,
+                   skip: Optional[SkipMap] = None) -> ChunkResult:
+    """
+    Analyze [(symbol, {tf: CandleSeries})] in one worker call; all TFs feed the bias.
+    The indicator cache counters go back with the outcomes - the worker's scan debugger is not reported.
+    """
+    frames_by_tf: Dict[str, Dict[str, object]] = {}
+    for symbol, candles_by_tf in units:
+        for tf, candles in candles_by_tf.items():
+            if (timeframes is None or tf in timeframes) and len(candles) >= MIN_CANDLES:
+                frames_by_tf.setdefault(tf, {})[symbol] = candles.to_frame()
+    batches = build_batches(frames_by_tf)
+
+    outcomes = {}
+    hits = misses = 0
+    for symbol, candles_by_tf in units:
+        try:
+            bias = bias_resolver.resolve_bias(symbol, candles_by_tf.get('4h', []),
+                                              candles_by_tf.get('1h', []), candles_by_tf.get('15m', []))
+        except Exception:
+            continue  # the scanner process skips this symbol as well
+        direction = smc_target_direction(bias.get('4h'))
+        for tf, frames in frames_by_tf.items():
+            if symbol in frames:
+                ctx = batches[tf].context(symbol)
+                outcomes[(symbol, tf)] = run_modules(frames[symbol], ctx, _worker_registry, enabled, direction,
+                                                     (skip or {}).get((symbol, tf), ()))
+                hits += ctx.hits
+                misses += ctx.misses
+    return outcomes, (hits, misses)
+
+
+def _analyze_shared_chunk(name: str, total: int, index: CandleIndex, enabled: List[str],
+                          timeframes: Optional[List[str]] = None,
+                          skip: Optional[SkipMap] = None) -> ChunkResult:
+    """Attach to the scan's shared candle block and analyze the symbols in `index`"""
+    block = SharedCandleBlock.attach(name, total, index)
+    try:
+        units: Dict[str, Dict[str, object]] = {}
+        for symbol, tf in index:
+            units.setdefault(symbol, {})[tf] = block.get(symbol, tf)
+        return _analyze_chunk(list(units.items()), enabled, timeframes, skip)
+    finally:
+        units = None
+        block.close()
+
+
+class AnalysisPool:
+    """Warm worker processes analyzing symbol chunks"""
+
+    def __init__(self, workers: int, modules_registry: dict, chunk_size: int = 25, shared_memory: bool = True):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        # Candles go through one shared-memory block per scan instead of being pickled per task
+        self.shared_memory = shared_memory
+        self.module_paths = {name: module.__name__ for name, module in modules_registry.items()}
+        # spawn: the bot process runs threads, forking it is not safe
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.module_paths,),
+        )
+        # Start all workers now so the first scan does not pay for the imports
+        pids = set(self.executor.map(_warmup, range(workers * 2)))
+        print(f"[ANALYSIS-POOL] {workers} workers ready ({len(pids)} warmed up)")
+
+    def analyze(self, units, enabled: List[str], timeframes: Optional[List[str]] = None,
+                skip: Optional[SkipMap] = None) -> Dict[Tuple[str, str], List[ModuleOutcome]]:
+        """Submit the chunk in slices of up to chunk_size symbols (at least one per worker) and merge the results"""
+        size = max(1, min(self.chunk_size, -(-len(units) // self.workers)))
+        slices = [units[i:i + size] for i in range(0, len(units), size)]
+
+        def part_skip(part):
+            symbols = {symbol for symbol, _ in part}
+            return {key: names for key, names in (skip or {}).items() if key[0] in symbols}
+
+        if not self.shared_memory:
+            return self._collect([self.executor.submit(_analyze_chunk, part, enabled, timeframes, part_skip(part))
+                                  for part in slices])
+
+        block = SharedCandleBlock.create(
+            ((symbol, tf), candles) for symbol, candles_by_tf in units for tf, candles in candles_by_tf.items()
+        )
+        try:
+            return self._collect([
+                self.executor.submit(_analyze_shared_chunk, *block.handle(
+                    (symbol, tf) for symbol, candles_by_tf in part for tf in candles_by_tf
+                ), enabled, timeframes, part_skip(part))
+                for part in slices
+            ])
+        finally:
+            block.close()
+
+    @staticmethod
+    def _collect(futures) -> Dict[Tuple[str, str], List[ModuleOutcome]]:
+        """Merge the worker outcomes and add their indicator cache counters to this process' debugger"""
+        outcomes = {}
+        hits = misses = 0
+        for future in futures:
+            part, (part_hits, part_misses) = future.result()
+            outcomes.update(part)
+            hits += part_hits
+            misses += part_misses
+        get_scan_debugger().record_indicator_cache_counts(hits, misses)
+        return outcomes
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pool: Optional[AnalysisPool] = None
+
+
+def get_analysis_pool(modules_registry: dict) -> Optional[AnalysisPool]:
+    """Shared pool when ANALYSIS_WORKERS > 0, otherwise None (inline analysis)"""
+    global _pool
+    workers = int(os.getenv('ANALYSIS_WORKERS', '0'))
+    if workers <= 0:
+        return None
+    module_paths = {name: module.__name__ for name, module in modules_registry.items()}
+    # A subset of the pool's modules (e.g. the forming-bar pump path) reuses the warm workers
+    if _pool is None or _pool.workers != workers or not module_paths.items() <= _pool.module_paths.items():
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = AnalysisPool(workers, modules_registry, int(os.getenv('ANALYSIS_CHUNK_SIZE', '25')),
+                             os.getenv('ANALYSIS_SHARED_MEMORY', '1') != '0')
+    return _pool
+
+
+@atexit.register
+def _shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown()
+
+
+__all__ = ['AnalysisPool', 'get_analysis_pool', 'module_kwargs', 'run_modules', 'smc_target_direction', 'MIN_CANDLES']
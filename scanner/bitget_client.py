@@ -1,23 +1,158 @@
+import asyncio
+import random
+import threading
+import time
 import requests
-from typing import List, Dict, Any
+import httpx
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+
+from engine.rate_limit import TokenBucket
+from engine.scan_debugger import get_scan_debugger
+from scanner.candles import CandleSeries
+
+# Convert timeframe to Bitget format for the candles endpoint
+TF_MAP = {
+    '15m': '15m',
+    '1h': '1H',
+    '4h': '4H',
+    '1d': '1D'
+}
+
+# Candle duration in milliseconds
+TF_MS = {
+    '15m': 15 * 60 * 1000,
+    '1h': 60 * 60 * 1000,
+    '4h': 4 * 60 * 60 * 1000,
+    '1d': 24 * 60 * 60 * 1000
+}
+
+# Largest page the candles endpoint returns
+MAX_KLINE_LIMIT = 1000
+
+# get_klines(*request) arguments: (symbol, timeframe, limit), or with end_time when paging backwards
+KlineRequest = Union[Tuple[str, str, int], Tuple[str, str, int, Optional[int]]]
+
+CANDLES_PATH = "/api/v2/mix/market/candles"
+TICKERS_PATH = "/api/v2/mix/market/tickers"
+
+# Bitget public market endpoints allow 20 requests/second per IP.
+# Pacing at 18/s with a burst of 1 keeps any 1s window below the limit.
+BITGET_RATE_LIMITS = {
+    CANDLES_PATH: 18.0,
+    TICKERS_PATH: 18.0,
+}
+
+
+class BitgetRateLimitError(Exception):
+    """Raised when a request is still throttled after all retries"""
+
+
+class RateLimiter:
+    """Per-endpoint token buckets plus retry policy shared by all Bitget clients"""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, float]] = None,
+        default_rate: float = 10.0,
+        max_retries: int = 4,
+        base_backoff: float = 0.5,
+        max_backoff: float = 8.0,
+    ):
+        self.limits = dict(BITGET_RATE_LIMITS if limits is None else limits)
+        self.default_rate = default_rate
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        with self._lock:
+            if endpoint not in self._buckets:
+                self._buckets[endpoint] = TokenBucket(self.limits.get(endpoint, self.default_rate))
+            return self._buckets[endpoint]
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Retry-After if the server sent one, otherwise jittered exponential backoff"""
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    def record_error(self, error_type: str) -> None:
+        get_scan_debugger().record_api_error(error_type)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds (HTTP dates are ignored)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+# Shared limiter - Bitget limits are per IP, not per client instance
+_rate_limiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide Bitget rate limiter"""
+    return _rate_limiter
+
+
+def parse_candles(data: dict) -> Optional[CandleSeries]:
+    """Convert a Bitget candles payload into an oldest-first CandleSeries (None if the payload is an error)"""
+    # Handle the actual data structure for candles: code is '00000' and data is a direct list
+    if not (str(data.get('code')) == '00000' and 'data' in data and isinstance(data['data'], list)):
+        return None
+
+    # Format: [timestamp, open, high, low, close, volume, ...], newest first
+    return CandleSeries.from_rows(data['data'], newest_first=True)
 
 
 class BitgetClient:
-    def __init__(self, base_url: str = "https://api.bitget.com"):
+    def __init__(self, base_url: str = "https://api.bitget.com", rate_limiter: Optional[RateLimiter] = None):
         self.base_url = base_url.rstrip('/')
         self.session = requests.Session()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
+    def _get_json(self, path: str, params: Dict[str, str]) -> dict:
+        """GET with rate limiting, 429/Retry-After handling and backoff on timeouts and 5xx"""
+        limiter = self.rate_limiter
+        bucket = limiter.bucket(path)
+        for attempt in range(limiter.max_retries + 1):
+            bucket.acquire()
+            retry_after = None
+            try:
+                response = self.session.get(f"{self.base_url}{path}", params=params, timeout=10)
+            except requests.exceptions.Timeout:
+                limiter.record_error('timeout')
+                if attempt == limiter.max_retries:
+                    raise
+            else:
+                if response.status_code == 429:
+                    limiter.record_error('rate_limit_429')
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if attempt == limiter.max_retries:
+                        raise BitgetRateLimitError(f"Rate limited on {path} after {attempt + 1} attempts")
+                    bucket.block_for(limiter.backoff_delay(attempt, retry_after))
+                    continue
+                if response.status_code >= 500 and attempt < limiter.max_retries:
+                    limiter.record_error(f'http_{response.status_code}')
+                else:
+                    response.raise_for_status()
+                    return response.json()
+            time.sleep(limiter.backoff_delay(attempt, retry_after))
 
     def list_usdt_perp_symbols(self) -> List[str]:
         """Get all USDT perpetual symbols from Bitget"""
         try:
-            url = f"{self.base_url}/api/v2/mix/market/tickers"
             params = {
                 "productType": "USDT-FUTURES"  # USDT perpetual futures
             }
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get_json(TICKERS_PATH, params)
             
             # Handle the actual data structure: code is '00000' and data is a direct list
             if str(data.get('code')) == '00000' and 'data' in data and isinstance(data['data'], list):
@@ -37,54 +172,145 @@ class BitgetClient:
             print(f"Error fetching symbols: {e}")
             return []
 
-    def get_klines(self, symbol: str, timeframe: str, limit: int = 200) -> List[Dict[str, Any]]:
-        """Get klines/candles for a symbol and timeframe"""
-        # Convert timeframe to Bitget format for the candles endpoint
-        # Different endpoints may have different formats
-        tf_map = {
-            '15m': '15m',  # Try the original format
-            '1h': '1H',    # Try uppercase H
-            '4h': '4H',    # Try uppercase H
-            '1d': '1D'     # Try uppercase D
-        }
-        
-        bitget_tf = tf_map.get(timeframe)
+    def _klines_params(self, symbol: str, timeframe: str, limit: int, end_time: Optional[int] = None) -> Dict[str, str]:
+        bitget_tf = TF_MAP.get(timeframe)
         if not bitget_tf:
             raise ValueError(f"Unsupported timeframe: {timeframe}")
-        
+
+        params = {
+            "symbol": symbol,  # Use the symbol as-is (e.g., BTCUSDT)
+            "productType": "USDT-FUTURES",
+            "granularity": bitget_tf,
+            "limit": str(limit)
+        }
+        if end_time is not None:
+            params["endTime"] = str(end_time)  # page backwards: candles opened before end_time
+        return params
+
+    def get_klines(self, symbol: str, timeframe: str, limit: int = 200, end_time: Optional[int] = None) -> CandleSeries:
+        """
+        Get klines/candles for a symbol and timeframe.
+        Raises BitgetRateLimitError when throttling persists so it is not mistaken for "no data".
+        """
+        params = self._klines_params(symbol, timeframe, limit, end_time)
+
         try:
-            url = f"{self.base_url}/api/v2/mix/market/candles"
-            params = {
-                "symbol": symbol,  # Use the symbol as-is (e.g., BTCUSDT)
-                "productType": "USDT-FUTURES",
-                "granularity": bitget_tf,
-                "limit": str(limit)
-            }
-            
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            # Handle the actual data structure for candles: code is '00000' and data is a direct list
-            if str(data.get('code')) == '00000' and 'data' in data and isinstance(data['data'], list):
-                candles_data = data['data']
-                candles = []
-                for candle in candles_data:
-                    # Format: [timestamp, open, high, low, close, volume, ...]
-                    if len(candle) >= 6:
-                        candles.append({
-                            'ts': int(candle[0]),
-                            'open': float(candle[1]),
-                            'high': float(candle[2]),
-                            'low': float(candle[3]),
-                            'close': float(candle[4]),
-                            'volume': float(candle[5])
-                        })
-                # Reverse to get oldest first
-                return list(reversed(candles))
+            data = self._get_json(CANDLES_PATH, params)
+            candles = parse_candles(data)
+            if candles is None:
+                print(f"API Error for {symbol} {timeframe}: {data}")
+                return CandleSeries.empty()
+            return candles
+        except BitgetRateLimitError:
+            raise
+        except Exception as e:
+            print(f"Error fetching klines for {symbol} {timeframe}: {e}")
+            return CandleSeries.empty()
+
+
+class AsyncBitgetClient(BitgetClient):
+    """BitgetClient with concurrent kline fetching over one pooled async HTTP session"""
+
+    def __init__(
+        self,
+        base_url: str = "https://api.bitget.com",
+        max_concurrency: int = 10,
+        timeout: float = 10.0,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        super().__init__(base_url, rate_limiter)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            )
+            self._client = httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=self.timeout)
+        return self._client
+
+    async def _get_json_async(self, path: str, params: Dict[str, str]) -> dict:
+        """Async counterpart of _get_json sharing the same buckets and retry policy"""
+        limiter = self.rate_limiter
+        bucket = limiter.bucket(path)
+        for attempt in range(limiter.max_retries + 1):
+            await bucket.acquire_async()
+            retry_after = None
+            try:
+                response = await self._get_async_client().get(path, params=params)
+            except httpx.TimeoutException:
+                limiter.record_error('timeout')
+                if attempt == limiter.max_retries:
+                    raise
             else:
+                if response.status_code == 429:
+                    limiter.record_error('rate_limit_429')
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if attempt == limiter.max_retries:
+                        raise BitgetRateLimitError(f"Rate limited on {path} after {attempt + 1} attempts")
+                    bucket.block_for(limiter.backoff_delay(attempt, retry_after))
+                    continue
+                if response.status_code >= 500 and attempt < limiter.max_retries:
+                    limiter.record_error(f'http_{response.status_code}')
+                else:
+                    response.raise_for_status()
+                    return response.json()
+            await asyncio.sleep(limiter.backoff_delay(attempt, retry_after))
+
+    async def get_klines_async(
+        self, symbol: str, timeframe: str, limit: int = 200, end_time: Optional[int] = None
+    ) -> CandleSeries:
+        """Async version of get_klines with the same candle contract"""
+        params = self._klines_params(symbol, timeframe, limit, end_time)
+
+        try:
+            data = await self._get_json_async(CANDLES_PATH, params)
+            candles = parse_candles(data)
+            if candles is None:
                 print(f"API Error for {symbol} {timeframe}: {data}")
-                return []
+                return CandleSeries.empty()
+            return candles
+        except BitgetRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching klines for {symbol} {timeframe}: {e}")
-            return []
\ No newline at end of file
+            return CandleSeries.empty()
+
+    async def get_klines_many_async(self, batch: Sequence[KlineRequest]) -> List[CandleSeries]:
+        """
+        Fetch many (symbol, timeframe, limit[, end_time]) requests concurrently, results in request order.
+        A request that stays rate limited yields its BitgetRateLimitError instead of a CandleSeries.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_one(request: KlineRequest) -> CandleSeries:
+            async with semaphore:
+                return await self.get_klines_async(*request)
+
+        return await asyncio.gather(*(fetch_one(request) for request in batch), return_exceptions=True)
+
+    def get_klines_many(self, batch: Sequence[KlineRequest]) -> List[CandleSeries]:
+        """
+        Blocking batch fetch for the scanner thread.
+        Runs on a client-owned event loop so pooled connections survive between scans.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            return self._loop.run_until_complete(self.get_klines_many_async(batch))
+
+    def close(self) -> None:
+        """Close the pooled async session and its event loop"""
+        with self._loop_lock:
+            if self._loop is None:
+                return
+            if self._client is not None:
+                self._loop.run_until_complete(self._client.aclose())
+                self._client = None
+            self._loop.close()
+            self._loop = None
@@ -0,0 +1,177 @@
+"""
+Incremental kline sync between Bitget and the local candle store
+Only candles newer than the last stored one (plus the forming candle) are downloaded
+"""
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from db.candle_store import CandleStore, find_gaps
+from engine.scan_debugger import get_scan_debugger
+from scanner.bitget_client import TF_MS, MAX_KLINE_LIMIT, KlineRequest
+from scanner.candles import CandleSeries
+from scanner.resample import resample_candles, base_window_for
+
+KLINE_MODE_FETCH_ALL = 'fetch_all'  # one request per timeframe
+KLINE_MODE_RESAMPLE = 'resample'    # fetch the base timeframe only and aggregate the rest
+
+
+def plan_fetch_limit(last_ts: Optional[int], timeframe: str, window: int, now_ms: int) -> int:
+    """How many of the newest candles must be fetched to bring a stored series up to date"""
+    if last_ts is None:
+        return window
+
+    step = TF_MS[timeframe]
+    current_open = now_ms - now_ms % step
+    # Re-fetch the newest stored candle (it was still forming) and everything opened since
+    missing = (current_open - last_ts) // step + 1
+    return int(min(window, max(1, missing)))
+
+
+def missing_ranges(candles: CandleSeries, step_ms: int, window: int) -> List[Tuple[int, int]]:
+    """Gaps inside the window, plus (0, first ts) when it holds fewer than `window` candles"""
+    ranges = find_gaps(candles, step_ms)
+    if len(candles) < window:
+        ranges.append((0, int(candles.ts[0])))
+    return ranges
+
+
+def _fetch_round(bitget, batch: Sequence[KlineRequest]) -> List[Any]:
+    debugger = get_scan_debugger()
+    for _ in batch:
+        debugger.record_api_call()
+
+    if hasattr(bitget, 'get_klines_many'):
+        return bitget.get_klines_many(batch)
+
+    results = []
+    for request in batch:
+        try:
+            results.append(bitget.get_klines(*request))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def fetch_batch(bitget, batch: Sequence[Tuple[str, str, int]]) -> List[Any]:
+    """
+    Fetch a batch through get_klines_many if available, exceptions are returned in place.
+    Requests above MAX_KLINE_LIMIT are paged backwards with end_time.
+    """
+    results = _fetch_round(bitget, [(symbol, tf, min(limit, MAX_KLINE_LIMIT)) for symbol, tf, limit in batch])
+
+    pending = [
+        i for i, (_, _, limit) in enumerate(batch)
+        if limit > MAX_KLINE_LIMIT and isinstance(results[i], CandleSeries) and len(results[i]) == MAX_KLINE_LIMIT
+    ]
+    while pending:
+        pages = [
+            (batch[i][0], batch[i][1], min(batch[i][2] - len(results[i]), MAX_KLINE_LIMIT), int(results[i].ts[0]))
+            for i in pending
+        ]
+        next_pending = []
+        for i, page_request, page in zip(pending, pages, _fetch_round(bitget, pages)):
+            if isinstance(page, Exception):
+                results[i] = page
+                continue
+            older = page.before(results[i].ts[0])
+            results[i] = CandleSeries.concat([older, results[i]])
+            # a full page means there may be more history to walk back into
+            if older and len(page) == page_request[2] and len(results[i]) < batch[i][2]:
+                next_pending.append(i)
+        pending = next_pending
+    return results
+
+
+def sync_candles(
+    bitget,
+    store: CandleStore,
+    symbols: Sequence[str],
+    timeframes: Sequence[str],
+    window: int = 220,
+    now_ms: Optional[int] = None,
+) -> Dict[Tuple[str, str], Any]:
+    """
+    Bring the store up to date for every (symbol, timeframe) and return the newest `window`
+    candles per series. Series with gaps are backfilled with one full-window request.
+    Gaps still there after a full-window fetch are counted in the store; once repeated fetches
+    confirmed them (halts, recent listings) they are not backfilled again until they expire.
+    Values are CandleSeries, or the exception raised while fetching that series.
+    """
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+
+    batch = [
+        (symbol, tf, plan_fetch_limit(store.last_ts(symbol, tf), tf, window, now_ms))
+        for symbol in symbols for tf in timeframes
+    ]
+    results = fetch_batch(bitget, batch)
+    keep = window + 100
+    store.upsert_many(
+        ((symbol, tf, res) for (symbol, tf, _), res in zip(batch, results) if isinstance(res, CandleSeries)),
+        TF_MS, keep
+    )
+
+    windows: Dict[Tuple[str, str], Any] = {}
+    backfill = []
+    real_gaps = []  # left after a full-window fetch: the exchange may have no candles there
+    skipped = 0
+    for (symbol, tf, limit), res in zip(batch, results):
+        if isinstance(res, Exception) or not res:
+            windows[(symbol, tf)] = res  # don't serve stale candles when the update failed
+            continue
+        candles = store.get_window(symbol, tf, window)
+        ranges = missing_ranges(candles, TF_MS[tf], window)
+        if ranges and limit >= window:
+            real_gaps.extend((symbol, tf, start, end) for start, end in ranges)
+        elif ranges and not set(ranges) <= store.known_gaps(symbol, tf, now_ms // 1000):
+            backfill.append((symbol, tf, window))
+        elif ranges:
+            skipped += 1
+        windows[(symbol, tf)] = candles
+
+    if backfill:
+        backfill_results = fetch_batch(bitget, backfill)
+        store.upsert_many(
+            ((symbol, tf, res) for (symbol, tf, _), res in zip(backfill, backfill_results) if isinstance(res, CandleSeries)),
+            TF_MS, keep
+        )
+        for (symbol, tf, _), res in zip(backfill, backfill_results):
+            candles = store.get_window(symbol, tf, window)
+            if isinstance(res, CandleSeries):
+                real_gaps.extend((symbol, tf, start, end) for start, end in missing_ranges(candles, TF_MS[tf], window))
+            windows[(symbol, tf)] = candles
+    store.record_gaps(real_gaps, now_ms // 1000)
+
+    downloaded = sum(len(res) for res in results if isinstance(res, CandleSeries))
+    print(f"[CANDLES] {len(batch)} series synced, {downloaded} candles downloaded "
+          f"(full refetch: {len(batch) * window}), {len(backfill)} backfilled, {skipped} with known gaps")
+    return windows
+
+
+def sync_candles_resampled(
+    bitget,
+    store: CandleStore,
+    symbols: Sequence[str],
+    timeframes: Sequence[str],
+    base_tf: str = '15m',
+    window: int = 220,
+    now_ms: Optional[int] = None,
+) -> Dict[Tuple[str, str], Any]:
+    """
+    Like sync_candles, but only `base_tf` is fetched; every other timeframe is
+    resampled from the stored base series. Same return contract as sync_candles.
+    """
+    base_window = base_window_for(list(timeframes), base_tf, window)
+    base = sync_candles(bitget, store, symbols, [base_tf], window=base_window, now_ms=now_ms)
+
+    windows: Dict[Tuple[str, str], Any] = {}
+    for symbol in symbols:
+        candles = base[(symbol, base_tf)]
+        for tf in timeframes:
+            if isinstance(candles, Exception) or not candles:
+                windows[(symbol, tf)] = candles
+            elif tf == base_tf:
+                windows[(symbol, tf)] = candles[-window:]
+            else:
+                windows[(symbol, tf)] = resample_candles(candles, base_tf, tf)[-window:]
+    return windows
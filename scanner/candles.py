@@ -0,0 +1,130 @@
+"""
+Compact OHLCV container
+One int64 timestamp array plus one contiguous float64 block (open/high/low/close/volume rows),
+built from the Bitget payload or SQLite rows in a single NumPy conversion
+"""
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+CANDLE_FIELDS = ('ts',) + OHLCV_FIELDS
+
+
+class CandleSeries:
+    """
+    Oldest-first candles. Behaves like the old list of candle dicts for existing callers
+    (len, candles[-2]['ts'], slicing, iteration) without storing a dict per candle.
+    """
+
+    __slots__ = ('ts', 'ohlcv')
+
+    def __init__(self, ts: np.ndarray, ohlcv: np.ndarray):
+        self.ts = ts        # int64, shape (n,)
+        self.ohlcv = ohlcv  # float64, shape (5, n) - each field is a contiguous row
+
+    @classmethod
+    def empty(cls) -> 'CandleSeries':
+        return cls(np.empty(0, dtype=np.int64), np.empty((5, 0), dtype=np.float64))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]], newest_first: bool = False) -> 'CandleSeries':
+        """Build from [ts, open, high, low, close, volume, ...] rows (strings or numbers)"""
+        if len(rows) == 0:
+            return cls.empty()
+        try:
+            table = np.array(rows, dtype=np.float64)
+        except ValueError:
+            # Ragged payload - drop short rows and extra columns
+            table = np.array([row[:6] for row in rows if len(row) >= 6], dtype=np.float64)
+        if table.ndim != 2 or table.shape[1] < 6:
+            return cls.empty()
+        if newest_first:
+            table = table[::-1]
+        ts = table[:, 0].astype(np.int64)  # ms epochs are exact in float64
+        return cls(ts, np.ascontiguousarray(table[:, 1:6].T))
+
+    @classmethod
+    def from_dicts(cls, candles: Sequence[Dict[str, Any]]) -> 'CandleSeries':
+        """Build from the legacy list-of-dicts format"""
+        return cls.from_rows([[c[field] for field in CANDLE_FIELDS] for c in candles])
+
+    @classmethod
+    def concat(cls, parts: Sequence['CandleSeries']) -> 'CandleSeries':
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        return cls(np.concatenate([p.ts for p in parts]), np.concatenate([p.ohlcv for p in parts], axis=1))
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.ohlcv[0]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.ohlcv[1]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.ohlcv[2]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.ohlcv[3]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.ohlcv[4]
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return CandleSeries(self.ts[key], self.ohlcv[:, key])  # views, no copy
+        o, h, l, c, v = self.ohlcv[:, key].tolist()
+        return {'ts': int(self.ts[key]), 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.to_dicts())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CandleSeries):
+            return np.array_equal(self.ts, other.ts) and np.array_equal(self.ohlcv, other.ohlcv)
+        if isinstance(other, list):
+            return self.to_dicts() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return "CandleSeries(0 candles)"
+        return f"CandleSeries({len(self)} candles, {self.ts[0]}..{self.ts[-1]})"
+
+    def before(self, ts: int) -> 'CandleSeries':
+        """Candles opened strictly before `ts`"""
+        return self[:int(np.searchsorted(self.ts, ts, side='left'))]
+
+    def rows(self) -> List[tuple]:
+        """(ts, open, high, low, close, volume) tuples, e.g. for executemany"""
+        return list(zip(self.ts.tolist(), *self.ohlcv.tolist()))
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [dict(zip(CANDLE_FIELDS, row)) for row in self.rows()]
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame view over the arrays with the columns the modules expect"""
+        data = {'ts': self.ts}
+        data.update(zip(OHLCV_FIELDS, self.ohlcv))
+        return pd.DataFrame(data, copy=False)
+
+
+def as_candle_series(candles: Optional[Any]) -> CandleSeries:
+    """Accept a CandleSeries or a legacy list of candle dicts"""
+    if isinstance(candles, CandleSeries):
+        return candles
+    if not candles:
+        return CandleSeries.empty()
+    return CandleSeries.from_dicts(candles)
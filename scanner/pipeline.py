@@ -0,0 +1,129 @@
+"""
+Staged scan pipeline (fetch -> analyze -> decide -> send)
+Every stage runs in its own thread and hands work to the next one through a bounded queue,
+so a slow stage blocks its producer (backpressure) instead of buffering the whole chunk
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline step: fn(item) returns the items for the next stage (or None).
+    With batch=True fn gets a list of everything queued at that moment (group commit).
+    on_error(item, exc) is told about an item whose fn raised, its outputs are lost.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any], Optional[Iterable[Any]]], maxsize: int = 4,
+                 on_close: Optional[Callable[[], None]] = None, batch: bool = False,
+                 on_error: Optional[Callable[[Any, Exception], None]] = None):
+        self.name = name
+        self.fn = fn
+        self.on_close = on_close  # runs in the stage thread, e.g. to close its DB connection
+        self.on_error = on_error  # runs in the stage thread, e.g. to report the symbols of a failed batch
+        self.batch = batch
+        self.inbox: queue.Queue = queue.Queue(maxsize)
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0  # waiting for room in the next stage's queue
+        self.depth_total = 0
+        self.depth_max = 0
+
+    def metrics(self, wall_seconds: float) -> Dict[str, Any]:
+        return {
+            'items': self.items,
+            'errors': self.errors,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'blocked_seconds': round(self.blocked_seconds, 3),
+            'utilisation': round(self.busy_seconds / wall_seconds * 100, 1) if wall_seconds > 0 else 0.0,
+            'queue_avg': round(self.depth_total / self.items, 2) if self.items else 0.0,
+            'queue_max': self.depth_max,
+            'queue_size': self.inbox.maxsize,
+        }
+
+
+class Pipeline:
+    """Linear chain of stages; run() feeds the first stage and waits until all are drained"""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        self.wall_seconds = 0.0
+
+    def _run_stage(self, index: int):
+        stage = self.stages[index]
+        downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        try:
+            done = False
+            while not done:
+                depth = stage.inbox.qsize()
+                item = stage.inbox.get()
+                if item is _DONE:
+                    break
+                stage.items += 1
+                stage.depth_total += depth
+                stage.depth_max = max(stage.depth_max, depth)
+                if stage.batch:
+                    item = [item]
+                    while not stage.inbox.empty():
+                        extra = stage.inbox.get()
+                        if extra is _DONE:
+                            done = True
+                            break
+                        stage.items += 1
+                        item.append(extra)
+                start = time.perf_counter()
+                try:
+                    outputs = list(stage.fn(item) or ())
+                except Exception as e:
+                    print(f"[PIPELINE] {stage.name} error: {e}")
+                    stage.errors += 1
+                    outputs = []
+                    if stage.on_error is not None:
+                        try:
+                            stage.on_error(item, e)
+                        except Exception as report_error:
+                            print(f"[PIPELINE] {stage.name} on_error failed: {report_error}")
+                stage.busy_seconds += time.perf_counter() - start
+                if downstream is not None:
+                    start = time.perf_counter()
+                    for output in outputs:
+                        downstream.inbox.put(output)
+                    stage.blocked_seconds += time.perf_counter() - start
+        finally:
+            if downstream is not None:
+                downstream.inbox.put(_DONE)
+            if stage.on_close is not None:
+                stage.on_close()
+
+    def run(self, items: Iterable[Any]):
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._run_stage, args=(i,), name=f"pipeline-{stage.name}", daemon=True)
+            for i, stage in enumerate(self.stages)
+        ]
+        for thread in threads:
+            thread.start()
+        for item in items:
+            self.stages[0].inbox.put(item)
+        self.stages[0].inbox.put(_DONE)
+        for thread in threads:
+            thread.join()
+        self.wall_seconds = time.perf_counter() - start
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {stage.name: stage.metrics(self.wall_seconds) for stage in self.stages}
+
+    def summary(self) -> str:
+        parts = [
+            f"{name} {m['items']} items {m['utilisation']}% busy, queue avg {m['queue_avg']} max {m['queue_max']}/{m['queue_size']}"
+            for name, m in self.metrics().items()
+        ]
+        return f"[PIPELINE] {self.wall_seconds:.2f}s: " + " | ".join(parts)
+
+
+__all__ = ['Pipeline', 'Stage']
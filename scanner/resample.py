@@ -0,0 +1,47 @@
+"""
+OHLCV resampling engine
+Builds higher timeframes (1h, 4h) from a 15m base series, aligned on UTC boundaries like Bitget
+"""
+from typing import List
+
+import numpy as np
+
+from scanner.bitget_client import TF_MS
+from scanner.candles import CandleSeries, as_candle_series
+
+
+def resample_candles(candles: CandleSeries, source_tf: str, target_tf: str) -> CandleSeries:
+    """
+    Aggregate oldest-first candles of `source_tf` into `target_tf` bars.
+    Incomplete buckets are dropped, except the newest one, which is the still-forming bar.
+    """
+    source_ms = TF_MS[source_tf]
+    target_ms = TF_MS[target_tf]
+    if target_ms % source_ms:
+        raise ValueError(f"Cannot resample {source_tf} into {target_tf}")
+    candles = as_candle_series(candles)
+    if not len(candles):
+        return CandleSeries.empty()
+
+    ts = candles.ts
+    buckets = ts - ts % target_ms  # epoch-aligned = UTC session boundaries
+    bucket_ts, starts, counts = np.unique(buckets, return_index=True, return_counts=True)
+    ends = starts + counts - 1
+
+    complete = counts == target_ms // source_ms
+    complete[-1] = True  # forming bar
+    keep = np.flatnonzero(complete)
+
+    ohlcv = np.empty((5, len(keep)), dtype=np.float64)
+    ohlcv[0] = candles.open[starts[keep]]
+    ohlcv[1] = np.maximum.reduceat(candles.high, starts)[keep]
+    ohlcv[2] = np.minimum.reduceat(candles.low, starts)[keep]
+    ohlcv[3] = candles.close[ends[keep]]
+    ohlcv[4] = np.add.reduceat(candles.volume, starts)[keep]
+    return CandleSeries(bucket_ts[keep], ohlcv)
+
+
+def base_window_for(timeframes: List[str], base_tf: str, window: int) -> int:
+    """Base candles needed so every target timeframe gets `window` bars"""
+    ratio = max(TF_MS[tf] // TF_MS[base_tf] for tf in timeframes)
+    return window * ratio + ratio  # one extra bucket covers a partial leading bar
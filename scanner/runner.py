@@ -1,12 +1,17 @@
+import threading
 import time
 import os
 from engine.decision import decide_signal, decide_signal_with_states
 from engine.dedup import make_dedup_key
 from engine.message_builder import build_message
+from engine.telegram_dispatcher import MESSAGE_PRIORITY, DEFAULT_PRIORITY
 from engine.presets import PRESETS
 from engine.bias_resolver import bias_resolver
-import pandas as pd
-from charts.renderer import render_chart_png
+from engine.batch_indicators import build_batches
+from engine.result_cache import closed_bar_modules, get_result_cache, settings_hash
+from scanner.analysis_pool import get_analysis_pool, module_kwargs, run_modules, smc_target_direction, MIN_CANDLES
+from charts.chart_cache import chart_key, get_chart_cache
+from charts.render_service import get_chart_render_service
 
 TIMEFRAMES = ['15m', '1h', '4h']
 
@@ -33,9 +38,52 @@ def get_symbol_chunk(symbols, start_idx, chunk_size):
         next_idx = end_idx - n
     return chunk, next_idx
 
-def run_scan_for_user(repo, tg_user_id: str, bitget, telegram_send_fn, modules_registry: dict):
+def get_scan_symbols(symbols, cursor, chunk_size, timeframes=None, forming=False):
+    """
+    Symbols for one scan and the next cursor position (None: keep the cursor).
+    Candle-close scans (`timeframes` given) cover every symbol, so each symbol is analyzed once
+    per close of each due TF; the interval loop and the forming-bar fast path rotate through chunks.
+    """
+    if timeframes is not None and not forming:
+        return list(symbols), None
+    return get_symbol_chunk(symbols, cursor, chunk_size)
+
+def cooldown_for(decision, default_seconds: int):
+    """(cooldown key, seconds) of a decision, by message type"""
+    symbol, tf = decision['symbol'], decision['timeframe']
+    if decision.get('message_type') == 'FIB_ALERT':
+        # FIB alerts get their own cooldown logic
+        return f"fib_alert:{symbol}:{tf}", 90 * 60  # 90 minutes base cooldown
+    if decision.get('message_type') == 'WATCHLIST':
+        return f"idea:{symbol}:{tf}:{decision.get('setup_id', '')}", 30 * 60  # 30 minutes for IDEA
+    if decision.get('message_type') == 'TRADE_FREIGABE':
+        return f"trade:{symbol}:{tf}:{decision.get('setup_id', '')}", 60 * 60  # 60 minutes for TRADE
+    return f"{decision['type']}:{symbol}:{tf}", default_seconds
+
+
+def dedup_key_for(tg_user_id: str, decision, forming: bool = False) -> str:
+    """
+    Outbox dedup key of a decision. On the forming-bar path the levels (e.g. the pump %) move with
+    every scan of the same candle; the key is only symbol, timeframe, candle and side there.
+    """
+    levels = None if forming else decision.get('levels')
+    return make_dedup_key(tg_user_id, decision['symbol'], decision['timeframe'], decision.get('message_type', 'UNKNOWN'),
+                          decision['candle_ts'], levels, decision.get('side'))
+
+
+def run_scan_for_user(repo, tg_user_id: str, bitget, telegram_send_fn, modules_registry: dict,
+                      timeframes=None, forming: bool = False, outbox=None):
+    """
+    Scan the next symbol chunk, or all symbols after a candle close. `timeframes` limits the
+    analysis to the TFs whose candle just closed (all TFs are still synced for the bias);
+    `forming` is the intra-candle fast path: results refer to the forming candle and it rotates
+    through the chunks with its own cursor.
+    With an `outbox` (engine.outbox.AlertOutbox) alerts are queued durably instead of
+    being passed to telegram_send_fn.
+    """
     start_time = time.time()  # Track scan start time for duration logging
-    print(f"[SCAN] start {start_time}")
+    scan_timeframes = [tf for tf in TIMEFRAMES if timeframes is None or tf in timeframes]
+    print(f"[SCAN] start {start_time} timeframes={','.join(scan_timeframes)}{' (forming)' if forming else ''}")
     
     # Initialize scan debugger
     from engine.scan_debugger import get_scan_debugger
@@ -45,11 +93,16 @@ def run_scan_for_user(repo, tg_user_id: str, bitget, telegram_send_fn, modules_r
     # Initialize Phase 1 selector
     from engine.phase1_selector import apply_phase1_selection
     
-    # Create a new database connection for this thread
-    from db.database import init_db
+    # Pooled connection of this thread (schema migrated once at startup)
+    from db.database import get_pool
     from db.repo import Repo
-    conn = init_db('./data/bot.db', './db/schema.sql')
-    thread_repo = Repo(conn)
+    from db.setup_index import get_setup_index
+    from db.signal_state import DEDUP_WINDOW_SECONDS, get_signal_state
+    db_pool = get_pool('./data/bot.db')
+    # Cooldowns and sent dedup keys in memory, their writes are flushed at the end of the scan
+    thread_repo = Repo(db_pool.connection(), signal_state=get_signal_state('./data/bot.db'))
+    # Open setups of this user, kept in memory across scans: the decide stage looks up existing IDEAs there
+    setup_index = get_setup_index(thread_repo.conn, tg_user_id)
     
     # Get settings using the thread-specific repo
     settings = thread_repo.get_settings(tg_user_id)
@@ -80,272 +133,238 @@ def run_scan_for_user(repo, tg_user_id: str, bitget, telegram_send_fn, modules_r
     # CHUNKING CONFIGURATION
     CHUNK_SIZE = 100  # Process 100 symbols per scan tick
     
-    # Get current cursor position
-    cursor = thread_repo.get_cursor(tg_user_id)
+    # Get current cursor position (the forming-bar fast path has its own)
+    cursor_key = f"{tg_user_id}:forming" if forming else tg_user_id
+    cursor = thread_repo.get_cursor(cursor_key)
     print(f"[SCAN] Current cursor position: {cursor}")
     
-    # Get symbol chunk for this scan
-    chunk_symbols, next_cursor = get_symbol_chunk(symbols, cursor, CHUNK_SIZE)
-    print(f"[SCAN] Processing chunk: {len(chunk_symbols)} symbols (index {cursor}-{(cursor + CHUNK_SIZE - 1) % len(symbols)})")
+    # Get symbol chunk for this scan (candle-close scans: all symbols)
+    chunk_symbols, next_cursor = get_scan_symbols(symbols, cursor, CHUNK_SIZE, timeframes, forming)
+    if next_cursor is None:
+        print(f"[SCAN] Processing all {len(chunk_symbols)} symbols (candle close)")
+    else:
+        print(f"[SCAN] Processing chunk: {len(chunk_symbols)} symbols (index {cursor}-{(cursor + CHUNK_SIZE - 1) % len(symbols)})")
     print(f"[SCAN] First symbol: {chunk_symbols[0] if chunk_symbols else 'None'}")
     print(f"[SCAN] Last symbol: {chunk_symbols[-1] if chunk_symbols else 'None'}")
     
     # Update cursor for next scan
-    thread_repo.set_cursor(tg_user_id, next_cursor)
+    if next_cursor is not None:
+        thread_repo.set_cursor(cursor_key, next_cursor)
     
-    # COLLECT ALL DECISIONS FIRST (don't send yet)
+    # COLLECT ALL DECISIONS (sent as they come, selection is bypassed)
     all_raw_decisions = []
     
     print(f"[SCAN-START] Expected to scan {len(chunk_symbols)} symbols in this chunk")
-    print(f"[DEBUG] Starting symbol loop...")
-    
-    # SINGLE PASS - scan chunk symbols exactly once
-    symbol_counter = 0
-    for i, symbol in enumerate(chunk_symbols):
-        symbol_counter += 1
-        print(f"[DEBUG] Processing symbol {symbol_counter}/{len(chunk_symbols)}: {symbol}")
-        
-        # Progress logging every 25 symbols
-        if i % 25 == 0 and i > 0:
-            print(f"[SCAN-PROGRESS] {i}/{len(chunk_symbols)} chunk symbols processed. Last: {symbol}")
-            print(f"[DEBUG] Current position in chunk: {i}/{len(chunk_symbols)}")
-        
+
+    # Staged pipeline: fetch -> analyze -> decide -> send, each stage in its own thread with a
+    # bounded queue in between - analysis of one batch overlaps the download of the next.
+    # The fetch and decide stages use a pooled connection and hand it back when they finish.
+    from db.candle_store import CandleStore
+    from scanner.candle_sync import sync_candles, sync_candles_resampled, KLINE_MODE_FETCH_ALL, KLINE_MODE_RESAMPLE
+    from scanner.pipeline import Pipeline, Stage
+    kline_mode = os.getenv('KLINE_MODE', KLINE_MODE_FETCH_ALL)
+    batch_size = max(1, int(os.getenv('PIPELINE_BATCH_SIZE', '25')))
+    queue_size = max(1, int(os.getenv('PIPELINE_QUEUE_SIZE', '4')))
+    symbol_batches = [chunk_symbols[i:i + batch_size] for i in range(0, len(chunk_symbols), batch_size)]
+
+    enabled_modules = [name for name in modules_registry if settings.get(f"module_{name}", True)]
+
+    # Module results per candle state - unchanged series are not re-analyzed (decisions still run)
+    result_cache = None if forming else get_result_cache()
+    closed_only = closed_bar_modules(modules_registry)  # keyed by the closed candle, the rest also by the forming one
+    analysis_pool = get_analysis_pool(modules_registry)
+    # Charts render in worker processes while the pipeline keeps going (CHART_WORKERS=0: no charts)
+    chart_service = get_chart_render_service()
+    # Charts by (symbol, tf, candle, overlays/annotation): rendered once per candle, bounded on disk
+    chart_cache = get_chart_cache() if chart_service is not None else None
+    chart_stats_start = chart_cache.stats() if chart_cache is not None else None
+
+    def module_settings(symbol):
+        """SMC target direction from the 4h bias and the settings hash per module"""
+        target_direction = smc_target_direction(bias_resolver.bias_cache.get(symbol, {}).get('4h', None))
+        return target_direction, {name: settings_hash(**module_kwargs(name, target_direction)) for name in enabled_modules}
+
+    def fetch_stage(batch_symbols):
+        """Sync one symbol batch into the local candle store - only new candles are downloaded"""
+        fetch_start = time.time()
+        candle_store = CandleStore(db_pool.connection())
         try:
-            # Fetch all timeframes for bias calculation
-            all_candles = {}
-            for tf in TIMEFRAMES:
-                all_candles[tf] = bitget.get_klines(symbol, tf, limit=220)
-                kline_calls += 1
-                debugger.record_api_call()
-            
-            # Calculate bias for this symbol
-            candles_4h = all_candles.get('4h', [])
-            candles_1h = all_candles.get('1h', [])
-            candles_15m = all_candles.get('15m', [])
-            
-            bias_result = bias_resolver.resolve_bias(symbol, candles_4h, candles_1h, candles_15m)
-            
-            # Record successful processing
-            debugger.record_symbol_success(symbol)
-            scanned_symbols += 1
-            
+            if kline_mode == KLINE_MODE_RESAMPLE:
+                # Fetch 15m only, 1h/4h are aggregated locally
+                prefetched = sync_candles_resampled(bitget, candle_store, batch_symbols, TIMEFRAMES, base_tf='15m', window=220)
+            else:
+                prefetched = sync_candles(bitget, candle_store, batch_symbols, TIMEFRAMES, window=220)
         except Exception as e:
-            print(f"[SCAN-ERROR] Failed to process {symbol}: {e}")
-            debugger.record_symbol_failure(symbol, str(e)[:50])
-            scan_errors += 1
-            continue
-            
-        for tf in TIMEFRAMES:
-            print(f"[SCAN] fetching {symbol} {tf}")
-            candles = all_candles[tf]
-            if len(candles) < 80:
-                continue
+            # Reported per symbol by the analyze stage
+            prefetched = {(symbol, tf): e for symbol in batch_symbols for tf in TIMEFRAMES}
+        print(f"[SCAN] Synced {len(prefetched)} kline series ({kline_mode}) in {time.time() - fetch_start:.2f}s")
+        return [(batch_symbols, prefetched)]
 
-            # Convert candles to DataFrame for the new modules
-            df = pd.DataFrame(candles)
-            df = df[['ts', 'open', 'high', 'low', 'close', 'volume']].copy()
-            df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
-            
-            # Log candle info
-            if len(candles) > 1:
-                print(f"{symbol} {tf} {len(candles)} {candles[-2]['ts']} {candles[-2]['volume']}")
-            
-            features = []
-            for module_name, module in modules_registry.items():
-                if not settings.get(f"module_{module_name}", True):
-                    continue  # Skip disabled modules
-                
-                # Use the new analyze function with DataFrame
-                try:
-                    # For SMC module, pass the target direction to filter FVG appropriately
-                    if module_name == 'smc':
-                        # Determine target direction based on bias for FVG filtering
-                        bias_data = bias_resolver.bias_cache.get(symbol, {})
-                        htf_bias = bias_data.get('4h', None)
-                        
-                        # If bias is BEAR and we're looking for short signals, only include bearish FVG
-                        # If bias is BULL and we're looking for long signals, only include bullish FVG
-                        target_direction = None
-                        if htf_bias and htf_bias.value == 'BEAR':
-                            target_direction = 'short'
-                        elif htf_bias and htf_bias.value == 'BULL':
-                            target_direction = 'long'
-                        
-                        module_results = module.analyze(df, target_direction=target_direction)
-                    else:
-                        module_results = module.analyze(df)
-                    print(f"feature {module_name} => {len(module_results) if module_results else 0}")
-                    for result in module_results:
-                        # Update the result with actual values
-                        result.symbol = symbol
-                        result.timeframe = tf
-                        result.candle_ts = candles[-2]['ts']  # Use stable candle
-                        features.append(result)
-                except Exception as e:
-                    print(f"Error in {module_name} module: {e}")
-                    continue
+    error_lock = threading.Lock()  # analyze and decide report from their own threads
 
-            # Apply feature reduction: Top-K per module with specific limits
-            max_per_module_map = {
-                'volume': 1,
-                'rsi_divergence': 1,
-                'macd': 2,
-                'fibonacci': 2,
-                'smc': 2
-            }
-            
-            # Process each module separately with its specific limit
-            reduced_features = []
-            by_mod = {}
-            for f in features:
-                by_mod.setdefault(f.module, []).append(f)
-            
-            for mod, arr in by_mod.items():
-                max_per_mod = max_per_module_map.get(mod, 1)
-                arr_sorted = sorted(arr, key=lambda x: x.score, reverse=True)
-                reduced_features.extend(arr_sorted[:max_per_mod])
+    def report_failed(symbols, e):
+        """Count symbols whose analysis or decisions were lost to an error as failed"""
+        nonlocal scan_errors
+        with error_lock:
+            for symbol in symbols:
+                print(f"[SCAN-ERROR] Failed to process {symbol}: {e}")
+                debugger.record_symbol_failure(symbol, str(e)[:50])
+                scan_errors += 1
+
+    symbol_counter = 0
+
+    def analyze_stage(batch):
+        """Bias and module analysis for one batch, one item per symbol for the decide stage"""
+        nonlocal symbol_counter, scanned_symbols, kline_calls
+        batch_symbols, prefetched = batch
+        cached_results = {}
+        pool_outcomes = None
+        if analysis_pool is not None:
+            # Module analysis in the worker processes, this thread only waits for the results
+            analysis_start = time.time()
+            units = []
+            for symbol in batch_symbols:
+                candles_by_tf = {tf: prefetched[(symbol, tf)] for tf in TIMEFRAMES}
+                if not any(isinstance(c, Exception) for c in candles_by_tf.values()):
+                    units.append((symbol, candles_by_tf))
+            if result_cache is not None:
+                for symbol, candles_by_tf in units:
+                    try:
+                        bias_resolver.resolve_bias(symbol, candles_by_tf['4h'], candles_by_tf['1h'], candles_by_tf['15m'])
+                    except Exception:
+                        continue  # reported in the symbol loop
+                    _, hashes = module_settings(symbol)
+                    for tf in scan_timeframes:
+                        candles = candles_by_tf[tf]
+                        if len(candles) >= MIN_CANDLES:
+                            cached_results[(symbol, tf)] = result_cache.lookup(symbol, tf, candles, enabled_modules, hashes, closed_only)
+            skip = {key: set(hits) for key, hits in cached_results.items() if hits}
+            pool_outcomes = analysis_pool.analyze(units, enabled_modules, scan_timeframes, skip)
+            print(f"[SCAN] Analyzed {len(pool_outcomes)} frames in {analysis_pool.workers} worker processes in {time.time() - analysis_start:.2f}s")
+        else:
+            # Indicators for the whole batch: one vectorized pass per timeframe, sliced per symbol
+            frames_by_tf = {tf: {} for tf in scan_timeframes}
+            for (symbol, tf), candles in prefetched.items():
+                if tf in frames_by_tf and not isinstance(candles, Exception) and len(candles) >= MIN_CANDLES:
+                    # DataFrame view over the candle arrays for the new modules
+                    frames_by_tf[tf][symbol] = candles.to_frame()
+            batches = build_batches(frames_by_tf)
+
+        analyzed = []
+        for symbol in batch_symbols:
+            symbol_counter += 1
+            print(f"[DEBUG] Processing symbol {symbol_counter}/{len(chunk_symbols)}: {symbol}")
             
-            features = reduced_features
+            # Progress logging every 25 symbols
+            if symbol_counter % 25 == 1 and symbol_counter > 1:
+                print(f"[SCAN-PROGRESS] {symbol_counter - 1}/{len(chunk_symbols)} chunk symbols processed. Last: {symbol}")
             
-            print(f"features_count {len(features)}")
+            try:
+                # Fetch all timeframes for bias calculation
+                all_candles = {}
+                for tf in TIMEFRAMES:
+                    candles = prefetched[(symbol, tf)]
+                    if isinstance(candles, Exception):
+                        raise candles  # e.g. still rate limited after retries
+                    all_candles[tf] = candles
+                    kline_calls += 1
+                
+                # Calculate bias for this symbol
+                candles_4h = all_candles.get('4h', [])
+                candles_1h = all_candles.get('1h', [])
+                candles_15m = all_candles.get('15m', [])
+                
+                bias_result = bias_resolver.resolve_bias(symbol, candles_4h, candles_1h, candles_15m)
+                
+                # Record successful processing
+                debugger.record_symbol_success(symbol)
+                scanned_symbols += 1
+                
+            except Exception as e:
+                report_failed([symbol], e)
+                continue
             
-            # Decision making
-            if features:
-                # Check for pure Fibonacci alerts first - LOOSEN criteria
-                fib_features = [f for f in features if f.module == 'fibonacci']
-                # Changed from >= 2 to >= 1 to catch more fib alerts
-                if fib_features and len(fib_features) >= 1:
-                    # Create pure Fibonacci alert
-                    fib_alert = {
-                        'symbol': symbol,
-                        'timeframe': tf,
-                        'type': 'FIBONACCI',  # Explicit FIBONACCI type
-                        'message_type': 'FIB_ALERT',  # Dedicated alert type
-                        'score_total': sum(f.score for f in fib_features[:2]),  # Sum top 2 fib scores
-                        'side': fib_features[0].direction,
-                        'reasons': [f.reasons[0] if f.reasons else f"Golden Zone touch at {f.levels.get('actual_level', 'N/A')}" for f in fib_features[:2]],
-                        'levels': {k: v for f in fib_features for k, v in f.levels.items()},
-                        'setup_id': f"fib_{symbol}_{tf}_{int(time.time())}"
-                    }
-                    print(f"[FIB-ALERT] {symbol} {tf} score={fib_alert['score_total']}")
-                    all_raw_decisions.append(fib_alert)
-                    continue  # Skip regular decision logic for pure fib alerts
+            try:
+                frames = []
+                for tf in scan_timeframes:
+                    print(f"[SCAN] fetching {symbol} {tf}")
+                    candles = all_candles[tf]
+                    if len(candles) < MIN_CANDLES:
+                        continue
                 
-                # NEW: Check for pure Liquidity alerts
-                liq_features = [f for f in features if f.module == 'smc']
-                if liq_features and len(liq_features) >= 1:
-                    # Create pure Liquidity alert
-                    liq_alert = {
-                        'symbol': symbol,
-                        'timeframe': tf,
-                        'type': 'LIQUIDITY',  # Explicit LIQUIDITY type
-                        'message_type': 'LIQ_ALERT',  # Dedicated alert type
-                        'score_total': sum(f.score for f in liq_features[:2]),
-                        'side': liq_features[0].direction,
-                        'reasons': [f.reasons[0] if f.reasons else f"Liquidity event at {f.event}" for f in liq_features[:2]],
-                        'levels': {k: v for f in liq_features for k, v in f.levels.items()},
-                        'setup_id': f"liq_{symbol}_{tf}_{int(time.time())}"
-                    }
-                    print(f"[LIQ-ALERT] {symbol} {tf} score={liq_alert['score_total']}")
-                    all_raw_decisions.append(liq_alert)
-                    continue  # Skip regular decision logic for pure liq alerts
+                    # Log candle info
+                    if len(candles) > 1:
+                        print(f"{symbol} {tf} {len(candles)} {candles[-2]['ts']} {candles[-2]['volume']}")
                 
-                # NEW: Check for pure Pump alerts  
-                pump_features = [f for f in features if f.module == 'pump']
-                if pump_features and len(pump_features) >= 1:
-                    # Create pure Pump alert
-                    pump_alert = {
-                        'symbol': symbol,
-                        'timeframe': tf,
-                        'type': 'PUMP',  # Explicit PUMP type
-                        'message_type': 'PUMP_ALERT',  # Dedicated alert type
-                        'score_total': sum(f.score for f in pump_features[:2]),
-                        'side': pump_features[0].direction,
-                        'reasons': [f.reasons[0] if f.reasons else f"Pump detected: {f.event}" for f in pump_features[:2]],
-                        'levels': {k: v for f in pump_features for k, v in f.levels.items()},
-                        'setup_id': f"pump_{symbol}_{tf}_{int(time.time())}"
-                    }
-                    print(f"[PUMP-ALERT] {symbol} {tf} score={pump_alert['score_total']}")
-                    all_raw_decisions.append(pump_alert)
-                    continue  # Skip regular decision logic for pure pump alerts
+                    # For SMC, pass the target direction from the 4h bias to filter FVG appropriately
+                    target_direction, hashes = module_settings(symbol)
+                    if pool_outcomes is not None:
+                        cached = cached_results.get((symbol, tf), {})
+                        computed = pool_outcomes.get((symbol, tf), [])
+                    else:
+                        cached = result_cache.lookup(symbol, tf, candles, enabled_modules, hashes, closed_only) if result_cache is not None else {}
+                        df = frames_by_tf[tf][symbol]
+                        # Indicators shared by all modules for this (symbol, tf, window)
+                        indicator_ctx = batches[tf].context(symbol)
+                        computed = run_modules(df, indicator_ctx, modules_registry, enabled_modules, target_direction, skip=cached)
+                    if result_cache is not None:
+                        result_cache.store(symbol, tf, candles, computed, hashes, closed_only)
                 
-                # Use the new state-based decision engine with IDEA vs TRADE for non-Fib setups
-                decision = decide_signal_with_states(features, combo_min_score, thread_repo, tg_user_id, settings.get('preset', 'normal'))
-                if decision:
-                    print(f"decision {decision['type'] if decision else None} {decision.get('score_total') if decision else None}")
-                    
-                    # COLLECT ALL DECISIONS - don't send yet
-                    all_raw_decisions.append(decision)
-                    
-                    # Validate setup consistency with higher timeframe bias
-                    setup_direction = decision.get('side', 'both')
-                    is_consistent, validation_reason = bias_resolver.validate_setup_consistency(symbol, setup_direction, tf)
-                    
-                    if not is_consistent:
-                        # For countertrend setups, downgrade to IDEA or skip based on settings
-                        if decision.get('message_type') == 'TRADE_FREIGABE':
-                            print(f"DOWNGRADE: {validation_reason} -> converting to IDEA")
-                            decision['message_type'] = 'WATCHLIST'
-                            decision['type'] = 'IDEA'
-                            decision['reasons'].append(f"⚠️ Countertrend: {validation_reason}")
-                        else:
-                            print(f"SKIPPED: {validation_reason}")
-                            continue
-    
-    # DEBUG: Show completion status
-    print(f"[DEBUG] Symbol loop completed!")
-    print(f"[DEBUG] Total symbols processed: {symbol_counter}")
-    print(f"[DEBUG] Expected symbols: {expected_symbols}")
-    print(f"[DEBUG] Raw decisions collected: {len(all_raw_decisions)}")
-    
-    # CATEGORIZATION DEBUG - prove the separation rules
-    decisions_combo = len([d for d in all_raw_decisions if d.get('type') == 'COMBO'])
-    decisions_idea = len([d for d in all_raw_decisions if d.get('type') == 'IDEA'])
-    alerts_fib = len([d for d in all_raw_decisions if d.get('message_type') == 'FIB_ALERT'])
-    alerts_liq = len([d for d in all_raw_decisions if d.get('message_type') == 'LIQ_ALERT'])
-    alerts_pump = len([d for d in all_raw_decisions if d.get('message_type') == 'PUMP_ALERT'])
-    
-    print(f"[DEBUG-COUNT] decisions_found: combo={decisions_combo} idea={decisions_idea}")
-    print(f"[DEBUG-COUNT] alerts_found: fib_alert={alerts_fib} liq_alert={alerts_liq} pump_alert={alerts_pump}")
-    
-    # TEMPORARY: Bypass selection to debug - send ALL raw decisions
-    print(f"[DEBUG] BYPASSING SELECTION - sending ALL {len(all_raw_decisions)} raw decisions")
-    selected_decisions = all_raw_decisions[:]  # Make a copy
-    
-    # Alternative: Very loose selection (comment out if above works)
-    # selected_decisions = apply_phase1_selection(all_raw_decisions, thread_repo, tg_user_id)
-    
-    print(f"[SELECTION] Selected {len(selected_decisions)} signals for sending")
-    
-    # PROOF LOGS - show what gets selected per category
-    selected_combo = len([d for d in selected_decisions if d.get('type') == 'COMBO'])
-    selected_idea = len([d for d in selected_decisions if d.get('type') == 'IDEA'])
-    selected_fib = len([d for d in selected_decisions if d.get('message_type') == 'FIB_ALERT'])
-    selected_liq = len([d for d in selected_decisions if d.get('message_type') == 'LIQ_ALERT'])
-    selected_pump = len([d for d in selected_decisions if d.get('message_type') == 'PUMP_ALERT'])
-    
-    print(f"[DEBUG-SELECTED] selected: combo={selected_combo} idea={selected_idea} fib_alert={selected_fib} liq_alert={selected_liq} pump_alert={selected_pump}")
-    
-    # SEND ONLY SELECTED DECISIONS
-    print(f"[DEBUG] Starting to send {len(selected_decisions)} selected decisions...")
-    for i, decision in enumerate(selected_decisions):
-        print(f"[DEBUG] Sending decision {i+1}/{len(selected_decisions)}: {decision['symbol']} {decision['timeframe']}")
-        
-        symbol = decision['symbol']
-        tf = decision['timeframe']
-        
-        # PROOF LOG - critical for verification
-        signal_kind = decision.get('type', 'UNKNOWN')
-        message_type = decision.get('message_type', 'UNKNOWN')
-        print(f"[SEND-PROOF] kind={signal_kind} message_type={message_type} symbol={symbol} tf={tf}")
-        
-        # Build and send message (existing logic)
-        message = build_message(symbol, tf, decision)
-        print(f"send_to {tg_user_id} msglen {len(message)}")
-        
-        # Prepare chart overlays and indicators from features
+                    # Cached and fresh module results in registry order
+                    by_module = {name: (name, results, None) for name, results in cached.items()}
+                    by_module.update((outcome[0], outcome) for outcome in computed)
+                    outcomes = [by_module[name] for name in enabled_modules if name in by_module]
+                    candle_ts = candles[-1]['ts'] if forming else candles[-2]['ts']  # Use stable candle
+                    frames.append((tf, candle_ts, outcomes, candles))
+            except Exception as e:
+                # A failing frame drops only this symbol, not the rest of the batch
+                report_failed([symbol], e)
+                continue
+            analyzed.append((symbol, frames))
+        return analyzed
+
+    def decide_stage(items):
+        """Decisions for the symbols queued so far; their setup writes land in one short transaction at the end"""
+        decide_repo = Repo(db_pool.connection(), setup_index=setup_index, signal_state=thread_repo.signal_state)
+        decisions = []
+        with decide_repo.deferred_setups():
+            for symbol, frames in items:
+                try:
+                    decisions.extend(decide_symbol(symbol, frames, decide_repo))
+                except Exception as e:
+                    print(f"[PIPELINE] decide error: {e}")
+                    report_failed([symbol], e)
+        return decisions
+
+    def decide_symbol(symbol, frames, decide_repo):
+        """Feature reduction and decisions for all analyzed timeframes of one symbol"""
+        decisions = []
+        for tf, candle_ts, outcomes, candles in frames:
+            decision = decide_frame(symbol, tf, candle_ts, outcomes, decide_repo)
+            if decision is not None:
+                # Checked in memory (signal state), set by the send stage once the alert is handed off
+                cooldown_key, _ = cooldown_for(decision, cooldown_seconds)
+                if decide_repo.is_in_cooldown(tg_user_id, cooldown_key):
+                    print(f"[COOLDOWN] {symbol} {tf} skipped ({cooldown_key})")
+                    continue
+                decision.setdefault('candle_ts', candle_ts)  # part of the outbox dedup key
+                all_raw_decisions.append(decision)
+                decisions.append((decision, submit_chart(decision, candles)))
+        return decisions
+
+    def submit_chart(decision, candles):
+        """Queue the chart render job (or reuse the cached chart); the send stage picks up the PNG bytes"""
+        if chart_service is None:
+            return None
+        symbol, tf = decision['symbol'], decision['timeframe']
+        overlays, annotation_data = chart_overlays(decision)
+        key = chart_key(symbol, tf, decision['candle_ts'], overlays, annotation_data)
+        return key, chart_cache.get_or_render(key, lambda: chart_service.submit(
+            symbol, tf, candles, overlays=overlays, annotation=annotation_data))
+
+    def chart_overlays(decision):
+        """Horizontal levels and annotation data for the chart of a decision"""
         overlays = {}
-        indicators = {}
         
         # Extract horizontal levels (zones) from features
         hlevels = []
@@ -371,7 +390,6 @@ def run_scan_for_user(repo, tg_user_id: str, bitget, telegram_send_fn, modules_r
         
         # Add TP/SL levels if available in decision data
         if decision.get('message_type') == 'TRADE_FREIGABE':
-            levels = decision.get('levels', {})
             if 'tp_levels' in levels:
                 annotation_data['tp_levels'] = levels['tp_levels']
             elif 'take_profit_levels' in levels:
@@ -380,27 +398,171 @@ def run_scan_for_user(repo, tg_user_id: str, bitget, telegram_send_fn, modules_r
                 annotation_data['sl_level'] = levels['stop_loss_level']
             elif 'stop_level' in levels:
                 annotation_data['sl_level'] = levels['stop_level']
+        return overlays, annotation_data
+
+    def resolve_chart(decision, chart):
+        """Wait for the rendered chart (bounded by the job timeout); (png, cache path) or text-only on failure"""
+        if chart is None:
+            return None, None
+        key, future = chart
+        try:
+            return future.result(), chart_cache.path(key)
+        except Exception as e:
+            print(f"[CHART-RENDER] no chart for {decision['symbol']} {decision['timeframe']}: {e}")
+            return None, None
+
+    def decide_frame(symbol, tf, candle_ts, outcomes, decide_repo):
+        features = []
+        for module_name, module_results, error in outcomes:
+            if error is not None:
+                print(f"Error in {module_name} module: {error}")
+                continue
+            print(f"feature {module_name} => {len(module_results)}")
+            for result in module_results:
+                # Update the result with actual values
+                result.symbol = symbol
+                result.timeframe = tf
+                result.candle_ts = candle_ts
+                features.append(result)
+
+        # Apply feature reduction: Top-K per module with specific limits
+        max_per_module_map = {
+            'volume': 1,
+            'rsi_divergence': 1,
+            'macd': 2,
+            'fibonacci': 2,
+            'smc': 2
+        }
         
-        # Render chart (simplified - would need original candles/features)
-        chart_path = None  # Placeholder - would need to reconstruct
+        # Process each module separately with its specific limit
+        reduced_features = []
+        by_mod = {}
+        for f in features:
+            by_mod.setdefault(f.module, []).append(f)
         
-        # Handle cooldown differently based on message type
-        if decision.get('message_type') == 'FIB_ALERT':
-            # FIB alerts get their own cooldown logic
-            cooldown_key = f"fib_alert:{symbol}:{tf}"
-            current_cooldown = 90 * 60  # 90 minutes base cooldown
-        elif decision.get('message_type') == 'WATCHLIST':
-            cooldown_key = f"idea:{symbol}:{tf}:{decision.get('setup_id', '')}"
-            current_cooldown = 30 * 60  # 30 minutes for IDEA
-        elif decision.get('message_type') == 'TRADE_FREIGABE':
-            cooldown_key = f"trade:{symbol}:{tf}:{decision.get('setup_id', '')}"
-            current_cooldown = 60 * 60  # 60 minutes for TRADE
-        else:
-            cooldown_key = f"{decision['type']}:{symbol}:{tf}"
-            current_cooldown = cooldown_seconds
+        for mod, arr in by_mod.items():
+            max_per_mod = max_per_module_map.get(mod, 1)
+            arr_sorted = sorted(arr, key=lambda x: x.score, reverse=True)
+            reduced_features.extend(arr_sorted[:max_per_mod])
+        
+        features = reduced_features
+        
+        print(f"features_count {len(features)}")
+        
+        # Decision making
+        if not features:
+            return None
+
+        # Check for pure Fibonacci alerts first - LOOSEN criteria
+        fib_features = [f for f in features if f.module == 'fibonacci']
+        # Changed from >= 2 to >= 1 to catch more fib alerts
+        if fib_features and len(fib_features) >= 1:
+            # Create pure Fibonacci alert
+            fib_alert = {
+                'symbol': symbol,
+                'timeframe': tf,
+                'type': 'FIBONACCI',  # Explicit FIBONACCI type
+                'message_type': 'FIB_ALERT',  # Dedicated alert type
+                'score_total': sum(f.score for f in fib_features[:2]),  # Sum top 2 fib scores
+                'side': fib_features[0].direction,
+                'reasons': [f.reasons[0] if f.reasons else f"Golden Zone touch at {f.levels.get('actual_level', 'N/A')}" for f in fib_features[:2]],
+                'levels': {k: v for f in fib_features for k, v in f.levels.items()},
+                'setup_id': f"fib_{symbol}_{tf}_{int(time.time())}"
+            }
+            print(f"[FIB-ALERT] {symbol} {tf} score={fib_alert['score_total']}")
+            return fib_alert  # Skip regular decision logic for pure fib alerts
+        
+        # NEW: Check for pure Liquidity alerts
+        liq_features = [f for f in features if f.module == 'smc']
+        if liq_features and len(liq_features) >= 1:
+            # Create pure Liquidity alert
+            liq_alert = {
+                'symbol': symbol,
+                'timeframe': tf,
+                'type': 'LIQUIDITY',  # Explicit LIQUIDITY type
+                'message_type': 'LIQ_ALERT',  # Dedicated alert type
+                'score_total': sum(f.score for f in liq_features[:2]),
+                'side': liq_features[0].direction,
+                'reasons': [f.reasons[0] if f.reasons else f"Liquidity event at {f.event}" for f in liq_features[:2]],
+                'levels': {k: v for f in liq_features for k, v in f.levels.items()},
+                'setup_id': f"liq_{symbol}_{tf}_{int(time.time())}"
+            }
+            print(f"[LIQ-ALERT] {symbol} {tf} score={liq_alert['score_total']}")
+            return liq_alert  # Skip regular decision logic for pure liq alerts
+        
+        # NEW: Check for pure Pump alerts  
+        pump_features = [f for f in features if f.module == 'pump']
+        if pump_features and len(pump_features) >= 1:
+            # Create pure Pump alert
+            pump_alert = {
+                'symbol': symbol,
+                'timeframe': tf,
+                'type': 'PUMP',  # Explicit PUMP type
+                'message_type': 'PUMP_ALERT',  # Dedicated alert type
+                'score_total': sum(f.score for f in pump_features[:2]),
+                'side': pump_features[0].direction,
+                'reasons': [f.reasons[0] if f.reasons else f"Pump detected: {f.event}" for f in pump_features[:2]],
+                'levels': {k: v for f in pump_features for k, v in f.levels.items()},
+                'setup_id': f"pump_{symbol}_{tf}_{int(time.time())}"
+            }
+            print(f"[PUMP-ALERT] {symbol} {tf} score={pump_alert['score_total']}")
+            return pump_alert  # Skip regular decision logic for pure pump alerts
+        
+        # Use the new state-based decision engine with IDEA vs TRADE for non-Fib setups
+        decision = decide_signal_with_states(features, combo_min_score, decide_repo, tg_user_id, settings.get('preset', 'normal'))
+        if decision:
+            print(f"decision {decision['type'] if decision else None} {decision.get('score_total') if decision else None}")
+            
+            # Validate setup consistency with higher timeframe bias
+            setup_direction = decision.get('side', 'both')
+            is_consistent, validation_reason = bias_resolver.validate_setup_consistency(symbol, setup_direction, tf)
+            
+            if not is_consistent:
+                # For countertrend setups, downgrade to IDEA or skip based on settings
+                if decision.get('message_type') == 'TRADE_FREIGABE':
+                    print(f"DOWNGRADE: {validation_reason} -> converting to IDEA")
+                    decision['message_type'] = 'WATCHLIST'
+                    decision['type'] = 'IDEA'
+                    decision['reasons'].append(f"⚠️ Countertrend: {validation_reason}")
+                else:
+                    # Already collected - logged only, the decision is still sent
+                    print(f"SKIPPED: {validation_reason}")
+        return decision
+
+    sent_counter = 0
+
+    def send_stage(decisions):
+        """Send the decisions decided so far; with an outbox they are queued in one transaction"""
+        outbox_rows = [] if outbox is not None else None
+        for decision, chart in decisions:
+            send_decision(decision, outbox_rows, chart)
+        if outbox_rows:
+            queued = outbox.enqueue(outbox_rows)
+            print(f"[OUTBOX] queued {queued}/{len(outbox_rows)} alerts ({len(outbox_rows) - queued} duplicates)")
+            debugger.record_first_alert()
+
+    def send_decision(decision, outbox_rows=None, chart=None):
+        nonlocal sent_counter
+        sent_counter += 1
+        print(f"[DEBUG] Sending decision {sent_counter}: {decision['symbol']} {decision['timeframe']}")
+        
+        symbol = decision['symbol']
+        tf = decision['timeframe']
+        
+        # PROOF LOG - critical for verification
+        signal_kind = decision.get('type', 'UNKNOWN')
+        message_type = decision.get('message_type', 'UNKNOWN')
+        print(f"[SEND-PROOF] kind={signal_kind} message_type={message_type} symbol={symbol} tf={tf}")
+        
+        # Build and send message (existing logic)
+        message = build_message(symbol, tf, decision)
+        print(f"send_to {tg_user_id} msglen {len(message)}")
         
-        # Add to cooldown and dedup (would need to reconstruct original logic)
-        # thread_repo.set_cooldown(tg_user_id, cooldown_key, current_cooldown)
+        # Chart rendered in the background since the decide stage
+        chart_png, chart_path = resolve_chart(decision, chart)
+        
+        # Handle cooldown differently based on message type
+        cooldown_key, current_cooldown = cooldown_for(decision, cooldown_seconds)
         
         # Send via Telegram with chart
         try:
@@ -413,16 +575,90 @@ def run_scan_for_user(repo, tg_user_id: str, bitget, telegram_send_fn, modules_r
                 'side': decision.get('side', ''),
                 'setup_id': decision.get('setup_id', '')
             }
+            if outbox_rows is not None:
+                outbox_rows.append({
+                    'tg_user_id': tg_user_id,
+                    'dedup_key': dedup_key_for(tg_user_id, decision, forming),
+                    'priority': MESSAGE_PRIORITY.get(message_type, DEFAULT_PRIORITY),
+                    'symbol': symbol,
+                    'timeframe': tf,
+                    'signal_type': signal_kind,
+                    'candle_ts': decision['candle_ts'],
+                    'score_total': decision.get('score_total'),
+                    'text': message,
+                    'chart_path': chart_path,
+                    'signal_data': signal_data,
+                    'payload': decision,
+                })
+                # In memory (signal state), persisted by flush_signal_state at the end of the scan
+                thread_repo.set_cooldown(tg_user_id, cooldown_key, current_cooldown)
+                debugger.record_alert_sent(decision.get('type', 'unknown'))
+                return
             telegram_send_fn(
                 chat_id=tg_user_id, 
                 text=message, 
                 chart_path=chart_path,
+                chart=chart_png,
                 signal_data=signal_data
             )
+            thread_repo.set_cooldown(tg_user_id, cooldown_key, current_cooldown)
             debugger.record_alert_sent(decision.get('type', 'unknown'))
+            debugger.record_first_alert()
         except Exception as e:
             print(f"Telegram send error: {e}")
-            continue
+
+    print(f"[DEBUG] Starting symbol pipeline ({len(symbol_batches)} batches of up to {batch_size} symbols)...")
+    pipeline = Pipeline([
+        Stage('fetch', fetch_stage, queue_size, on_close=db_pool.release),
+        Stage('analyze', analyze_stage, queue_size, on_error=lambda batch, e: report_failed(batch[0], e)),
+        Stage('decide', decide_stage, queue_size * batch_size, on_close=db_pool.release, batch=True,
+              on_error=lambda items, e: report_failed([symbol for symbol, _ in items], e)),
+        Stage('send', send_stage, queue_size * batch_size, on_close=db_pool.release, batch=True),
+    ])
+    pipeline.run(symbol_batches)
+    debugger.record_pipeline(pipeline.metrics())
+    print(pipeline.summary())
+    if chart_service is not None:
+        print(f"[CHART-RENDER] {chart_service.stats()}")
+        chart_stats = chart_cache.stats()
+        debugger.record_chart_cache(chart_stats['hits'] - chart_stats_start['hits'],
+                                    chart_stats['misses'] - chart_stats_start['misses'],
+                                    chart_stats['files'], chart_stats['disk_mb'])
+    
+    # DEBUG: Show completion status
+    print(f"[DEBUG] Symbol loop completed!")
+    print(f"[DEBUG] Total symbols processed: {symbol_counter}")
+    print(f"[DEBUG] Expected symbols: {expected_symbols}")
+    print(f"[DEBUG] Raw decisions collected: {len(all_raw_decisions)}")
+    
+    # CATEGORIZATION DEBUG - prove the separation rules
+    decisions_combo = len([d for d in all_raw_decisions if d.get('type') == 'COMBO'])
+    decisions_idea = len([d for d in all_raw_decisions if d.get('type') == 'IDEA'])
+    alerts_fib = len([d for d in all_raw_decisions if d.get('message_type') == 'FIB_ALERT'])
+    alerts_liq = len([d for d in all_raw_decisions if d.get('message_type') == 'LIQ_ALERT'])
+    alerts_pump = len([d for d in all_raw_decisions if d.get('message_type') == 'PUMP_ALERT'])
+    
+    print(f"[DEBUG-COUNT] decisions_found: combo={decisions_combo} idea={decisions_idea}")
+    print(f"[DEBUG-COUNT] alerts_found: fib_alert={alerts_fib} liq_alert={alerts_liq} pump_alert={alerts_pump}")
+    
+    # TEMPORARY: Bypass selection to debug - ALL raw decisions were streamed to the send stage
+    # (re-enabling selection means collecting all decisions before the send stage again)
+    print(f"[DEBUG] BYPASSING SELECTION - sent ALL {len(all_raw_decisions)} raw decisions")
+    selected_decisions = all_raw_decisions[:]  # Make a copy
+    
+    # Alternative: Very loose selection (comment out if above works)
+    # selected_decisions = apply_phase1_selection(all_raw_decisions, thread_repo, tg_user_id)
+    
+    print(f"[SELECTION] Selected {len(selected_decisions)} signals for sending")
+    
+    # PROOF LOGS - show what gets selected per category
+    selected_combo = len([d for d in selected_decisions if d.get('type') == 'COMBO'])
+    selected_idea = len([d for d in selected_decisions if d.get('type') == 'IDEA'])
+    selected_fib = len([d for d in selected_decisions if d.get('message_type') == 'FIB_ALERT'])
+    selected_liq = len([d for d in selected_decisions if d.get('message_type') == 'LIQ_ALERT'])
+    selected_pump = len([d for d in selected_decisions if d.get('message_type') == 'PUMP_ALERT'])
+    
+    print(f"[DEBUG-SELECTED] selected: combo={selected_combo} idea={selected_idea} fib_alert={selected_fib} liq_alert={selected_liq} pump_alert={selected_pump}")
     
     # FINAL MONITORING LOGS - EXACTLY AS REQUESTED
     print("[DEBUG] Preparing final monitoring logs...")
@@ -443,6 +679,13 @@ def run_scan_for_user(repo, tg_user_id: str, bitget, telegram_send_fn, modules_r
     print(f"TOPICS: {' '.join([f'{k}={v}' for k, v in topic_counts.items()])}")
     print("==========================")
     
+    flushed = thread_repo.flush_signal_state()
+    if flushed:
+        print(f"[SIGNAL-STATE] flushed {flushed} cooldown/signal rows")
+    pruned = thread_repo.prune_signal_state(DEDUP_WINDOW_SECONDS)
+    if pruned:
+        print(f"[SIGNAL-STATE] pruned {pruned} sent signals/cooldowns outside the dedup window")
+
     # Scan completion summary
     print(f"[SCAN-END] expected={len(chunk_symbols)} scanned={scanned_symbols} errors={scan_errors}")
     print(debugger.generate_simple_summary())
@@ -1,42 +1,136 @@
 import time
-from db.database import init_db
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence
+from db.database import get_db
 from db.repo import Repo
 
 # Global scan lock to prevent overlapping scans
 SCAN_RUNNING = False
 
-def scheduler_loop(scan_fn, interval_seconds: int = 300, cleanup_interval: int = 3600):  # Cleanup every hour
+# Candle length per timeframe - Bitget candles close on UTC epoch multiples
+TF_SECONDS = {'15m': 15 * 60, '1h': 60 * 60, '4h': 4 * 60 * 60}
+
+
+def _run_locked(fn: Callable, *args) -> bool:
+    """Run fn under the scan lock; False if a scan is still running"""
     global SCAN_RUNNING
+    if SCAN_RUNNING:
+        print("[SCHED] SKIP: previous scan still running")
+        return False
+    SCAN_RUNNING = True
+    try:
+        fn(*args)
+    except Exception as e:
+        print(f'[SCHED] scan_fn error: {e}')
+    finally:
+        SCAN_RUNNING = False
+    return True
+
+
+def _cleanup_expired_setups():
+    """Periodic cleanup of expired setups"""
+    try:
+        repo = Repo(get_db('./data/bot.db'))
+        cleaned_count = repo.cleanup_expired_setups()
+        if cleaned_count > 0:
+            print(f'🧹 Auto-cleanup: {cleaned_count} abgelaufene Setups entfernt')
+        return True
+    except Exception as cleanup_e:
+        print(f'Cleanup error: {cleanup_e}')
+        return False
+
+
+def scheduler_loop(scan_fn, interval_seconds: int = 300, cleanup_interval: int = 3600):  # Cleanup every hour
     last_cleanup = time.time()
     
     while True:
         start = time.time()
         
         # Scan lock - skip if previous scan still running
-        if SCAN_RUNNING:
-            print("[SCHED] SKIP: previous scan still running")
-        else:
-            SCAN_RUNNING = True
-            try:
-                scan_fn()
-            except Exception as e:
-                print(f'[SCHED] scan_fn error: {e}')
-            finally:
-                SCAN_RUNNING = False
+        _run_locked(scan_fn)
 
         # Periodic cleanup of expired setups
         now = time.time()
-        if now - last_cleanup >= cleanup_interval:
-            try:
-                conn = init_db('./data/bot.db', './db/schema.sql')
-                repo = Repo(conn)
-                cleaned_count = repo.cleanup_expired_setups()
-                if cleaned_count > 0:
-                    print(f'🧹 Auto-cleanup: {cleaned_count} abgelaufene Setups entfernt')
-                conn.close()
-                last_cleanup = now
-            except Exception as cleanup_e:
-                print(f'Cleanup error: {cleanup_e}')
+        if now - last_cleanup >= cleanup_interval and _cleanup_expired_setups():
+            last_cleanup = now
                 
         duration = time.time() - start
-        time.sleep(max(1, interval_seconds - int(duration)))
\ No newline at end of file
+        time.sleep(max(1, interval_seconds - int(duration)))
+
+
+def last_close(tf: str, now: float) -> float:
+    """Open time of the candle that is forming at `now` = close time of the previous one"""
+    return now - now % TF_SECONDS[tf]
+
+
+class AlignedScheduler:
+    """
+    Runs scan_fn(timeframes) right after candle closes: 15m work every 15m close, 1h on the hour,
+    4h every 4h. Between closes forming_fn() (e.g. pump on the forming bar) runs every
+    forming_interval seconds. Reports the lag from candle close to finished analysis per TF.
+    """
+
+    def __init__(self, scan_fn: Callable[[List[str]], None], timeframes: Sequence[str] = ('15m', '1h', '4h'),
+                 settle_seconds: float = 5, forming_fn: Optional[Callable[[], None]] = None,
+                 forming_interval: float = 60, cleanup_interval: float = 3600):
+        self.scan_fn = scan_fn
+        self.timeframes = list(timeframes)
+        self.settle_seconds = settle_seconds  # give the exchange time to finalize the closed candle
+        self.forming_fn = forming_fn
+        self.forming_interval = forming_interval
+        self.cleanup_interval = cleanup_interval
+        self.handled: Dict[str, float] = {}  # tf -> last close that was analyzed
+        self.last_forming = 0.0
+        self.last_cleanup = time.time()
+        self.lag_stats: Dict[str, deque] = {tf: deque(maxlen=100) for tf in self.timeframes}  # recent lags
+
+    def due_timeframes(self, now: float) -> List[str]:
+        return [tf for tf in self.timeframes
+                if last_close(tf, now - self.settle_seconds) > self.handled.get(tf, -1)]
+
+    def seconds_until_next(self, now: float) -> float:
+        """Time to the next settled candle close, or the next forming-bar run if earlier"""
+        if self.due_timeframes(now):
+            return 0.0  # skipped because of the scan lock - retry
+        wake = min(last_close(tf, now - self.settle_seconds) + TF_SECONDS[tf] + self.settle_seconds
+                   for tf in self.timeframes)
+        if self.forming_fn is not None:
+            wake = min(wake, self.last_forming + self.forming_interval)
+        return max(0.0, wake - now)
+
+    def tick(self, now: Optional[float] = None, clock: Callable[[], float] = time.time) -> float:
+        """One scheduling step; returns how long to sleep before the next one"""
+        now = clock() if now is None else now
+        due = self.due_timeframes(now)
+        if due:
+            closes = {tf: last_close(tf, now - self.settle_seconds) for tf in due}
+            if _run_locked(self.scan_fn, due):
+                done = clock()
+                for tf in due:
+                    self.handled[tf] = closes[tf]
+                    self.lag_stats[tf].append(done - closes[tf])
+                self.report_lag(due)
+        elif self.forming_fn is not None and now - self.last_forming >= self.forming_interval:
+            self.last_forming = now
+            _run_locked(self.forming_fn)
+
+        now = clock()
+        if now - self.last_cleanup >= self.cleanup_interval and _cleanup_expired_setups():
+            self.last_cleanup = now
+        return self.seconds_until_next(clock())
+
+    def report_lag(self, timeframes: List[str]):
+        parts = []
+        for tf in timeframes:
+            lags = self.lag_stats[tf]
+            parts.append(f"{tf}={lags[-1]:.1f}s (avg {sum(lags) / len(lags):.1f}s, max {max(lags):.1f}s)")
+        print(f"[SCHED-LAG] close -> analysis done: {' '.join(parts)}")
+
+    def run(self):
+        while True:
+            time.sleep(max(1.0, self.tick()))
+
+
+def aligned_scheduler_loop(scan_fn, timeframes: Sequence[str] = ('15m', '1h', '4h'), settle_seconds: float = 5,
+                           forming_fn=None, forming_interval: float = 60, cleanup_interval: float = 3600):
+    AlignedScheduler(scan_fn, timeframes, settle_seconds, forming_fn, forming_interval, cleanup_interval).run()
@@ -0,0 +1,80 @@
+"""
+Shared-memory candle buffers for the analysis workers
+All candles of a scan chunk live in one shared block (ts row + OHLCV rows, one column per candle);
+workers attach by name and get CandleSeries views through a small (symbol, tf) -> (start, length) index
+"""
+import gc
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from scanner.candles import CandleSeries
+
+# (symbol, tf) -> (start column, candle count)
+CandleIndex = Dict[Tuple[str, str], Tuple[int, int]]
+
+
+class SharedCandleBlock:
+    """
+    One contiguous block: int64 ts[total] followed by float64 ohlcv[5, total].
+    The creating process owns it (unlink); workers only attach and close.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, total: int, index: CandleIndex, owner: bool):
+        self.shm = shm
+        self.total = total
+        self.index = index
+        self.owner = owner
+        self.ts = np.ndarray((total,), dtype=np.int64, buffer=shm.buf)
+        self.ohlcv = np.ndarray((5, total), dtype=np.float64, buffer=shm.buf, offset=total * 8)
+
+    @staticmethod
+    def nbytes(total: int) -> int:
+        return max(total * 6 * 8, 1)
+
+    @classmethod
+    def create(cls, series: Iterable[Tuple[Tuple[str, str], CandleSeries]]) -> 'SharedCandleBlock':
+        series = list(series)
+        total = sum(len(candles) for _, candles in series)
+        shm = shared_memory.SharedMemory(create=True, size=cls.nbytes(total))
+        block = cls(shm, total, {}, owner=True)
+        start = 0
+        for key, candles in series:
+            n = len(candles)
+            block.ts[start:start + n] = candles.ts
+            block.ohlcv[:, start:start + n] = candles.ohlcv
+            block.index[key] = (start, n)
+            start += n
+        return block
+
+    @classmethod
+    def attach(cls, name: str, total: int, index: CandleIndex) -> 'SharedCandleBlock':
+        return cls(shared_memory.SharedMemory(name=name), total, index, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def handle(self, keys: Optional[Iterable[Tuple[str, str]]] = None) -> Tuple[str, int, CandleIndex]:
+        """Picklable (name, total, index) for workers, optionally only for some (symbol, tf) keys"""
+        index = self.index if keys is None else {key: self.index[key] for key in keys if key in self.index}
+        return self.shm.name, self.total, index
+
+    def get(self, symbol: str, tf: str) -> CandleSeries:
+        """Zero-copy CandleSeries view"""
+        start, n = self.index[(symbol, tf)]
+        return CandleSeries(self.ts[start:start + n], self.ohlcv[:, start:start + n])
+
+    def close(self):
+        self.ts = self.ohlcv = None
+        try:
+            self.shm.close()
+        except BufferError:
+            gc.collect()  # views held by reference cycles (e.g. DataFrames) - free them first
+            self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+__all__ = ['SharedCandleBlock', 'CandleIndex']
@@ -8,8 +8,8 @@ def install_packages():
     print("🚀 Installation des ultimativen Crypto-Signal-Bots...")
     
     # Überprüfe Python-Version
-    if sys.version_info < (3, 8):
-        print("❌ Python 3.8 oder höher wird benötigt")
+    if sys.version_info < (3, 10):
+        print("❌ Python 3.10 oder höher wird benötigt")
         return False
     
     print(f"✅ Python {sys.version} gefunden")
@@ -28,6 +28,7 @@ def install_packages():
         "numpy",
         "matplotlib",
         "python-telegram-bot",
+        "httpx",
         "pandas_ta",
         "plotly",
         "python-dotenv"
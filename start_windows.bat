@@ -4,7 +4,7 @@ echo 🚀 Starte den ultimativen Crypto-Signal-Bot...
 REM Überprüfe, ob Python installiert ist
 python --version >nul 2>&1
 if errorlevel 1 (
-    echo ❌ Python ist nicht installiert. Bitte installiere Python 3.8+ zuerst.
+    echo ❌ Python ist nicht installiert. Bitte installiere Python 3.10+ zuerst.
     pause
     exit /b 1
 )
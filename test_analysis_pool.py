@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test that the process-pool analysis (shared-memory and pickled candles) matches inline analysis
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.bench_analysis_pool import MODULES, TIMEFRAMES, make_units
+from engine.batch_indicators import build_batches
+from engine.bias_resolver import bias_resolver
+from engine.scan_debugger import get_scan_debugger
+from scanner.analysis_pool import AnalysisPool, run_modules, smc_target_direction
+from scanner.shared_candles import SharedCandleBlock
+
+
+def _key(outcomes):
+    return [(name, [(r.direction, r.score, r.reasons, r.levels) for r in results], error)
+            for name, results, error in outcomes]
+
+
+def _key_all(outcomes):
+    return {key: _key(value) for key, value in outcomes.items()}
+
+
+def test_shared_block_views():
+    units = make_units()[:3]
+    block = SharedCandleBlock.create(((symbol, tf), c[tf]) for symbol, c in units for tf in TIMEFRAMES)
+    worker_side = SharedCandleBlock.attach(*block.handle([('SYM1USDT', '1h')]))
+    view = worker_side.get('SYM1USDT', '1h')
+    assert view == units[1][1]['1h']
+    assert view.ohlcv.base is not None  # a view into the shared buffer, not a copy
+    assert list(worker_side.index) == [('SYM1USDT', '1h')]
+    view = None
+    worker_side.close()
+    block.close()
+
+
+def test_pool_matches_inline():
+    units = make_units()[:12]
+    enabled = [name for name in MODULES if name != 'volume']
+    debugger = get_scan_debugger()
+    pool = AnalysisPool(2, MODULES, chunk_size=5)
+    try:
+        debugger.reset_metrics()
+        outcomes = pool.analyze(units, enabled)
+        pooled_counts = (debugger.indicator_cache_hits, debugger.indicator_cache_misses)
+        pool.shared_memory = False
+        assert _key_all(pool.analyze(units, enabled)) == _key_all(outcomes)
+    finally:
+        pool.shutdown()
+
+    frames_by_tf = {tf: {symbol: c[tf].to_frame() for symbol, c in units} for tf in TIMEFRAMES}
+    batches = build_batches(frames_by_tf)
+    assert len(outcomes) == len(units) * len(TIMEFRAMES)
+    debugger.reset_metrics()
+    for symbol, candles_by_tf in units:
+        bias = bias_resolver.resolve_bias(symbol, candles_by_tf['4h'], candles_by_tf['1h'], candles_by_tf['15m'])
+        for tf in TIMEFRAMES:
+            expected = run_modules(frames_by_tf[tf][symbol], batches[tf].context(symbol), MODULES, enabled,
+                                   smc_target_direction(bias['4h']))
+            assert _key(outcomes[(symbol, tf)]) == _key(expected)
+            assert [name for name, _, _ in expected] == enabled
+    # Counted in the workers, reported in this process like inline analysis
+    assert pooled_counts == (debugger.indicator_cache_hits, debugger.indicator_cache_misses)
+    assert pooled_counts[0] > 0 and pooled_counts[1] > 0
+
+
+if __name__ == "__main__":
+    test_shared_block_views()
+    test_pool_matches_inline()
+    print("✅ Analysis pool tests passed")
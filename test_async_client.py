@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test AsyncBitgetClient against the local fake Bitget server
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.fake_bitget import start_fake_bitget
+from scanner.bitget_client import BitgetClient, AsyncBitgetClient
+
+
+def test_get_klines_many_matches_sync_contract():
+    server = start_fake_bitget()
+    try:
+        sync_client = BitgetClient(base_url=server.base_url)
+        client = AsyncBitgetClient(base_url=server.base_url, max_concurrency=4)
+        batch = [(s, tf, 50) for s in server.symbols[:5] for tf in ['15m', '1h', '4h']]
+
+        results = client.get_klines_many(batch)
+        client.close()
+
+        assert len(results) == len(batch)
+        for (symbol, tf, limit), candles in zip(batch, results):
+            assert candles == sync_client.get_klines(symbol, tf, limit)
+            assert len(candles) == limit
+            assert candles[0]['ts'] < candles[-1]['ts']  # oldest first
+            assert set(candles[0]) == {'ts', 'open', 'high', 'low', 'close', 'volume'}
+    finally:
+        server.shutdown()
+
+
+def test_get_klines_many_respects_concurrency_limit():
+    server = start_fake_bitget(latency=0.02)
+    try:
+        client = AsyncBitgetClient(base_url=server.base_url, max_concurrency=3)
+        client.get_klines_many([(s, '15m', 10) for s in server.symbols[:12]])
+        client.close()
+        assert server.max_in_flight <= 3
+    finally:
+        server.shutdown()
+
+
+def test_get_klines_many_returns_empty_list_on_error():
+    client = AsyncBitgetClient(base_url="http://127.0.0.1:1", timeout=2.0)  # nothing listens here
+    results = client.get_klines_many([('BTCUSDT', '15m', 10), ('ETHUSDT', '1h', 10)])
+    client.close()
+    assert results == [[], []]
+
+
+if __name__ == "__main__":
+    test_get_klines_many_matches_sync_contract()
+    test_get_klines_many_respects_concurrency_limit()
+    test_get_klines_many_returns_empty_list_on_error()
+    print("✅ AsyncBitgetClient tests passed")
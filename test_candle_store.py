@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test the local candle store and incremental (delta) kline sync
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.fake_bitget import start_fake_bitget, DEFAULT_NOW_MS
+from db.database import init_db
+from db.candle_store import GAP_TTL_SECONDS, CandleStore, find_gaps
+from scanner.bitget_client import BitgetClient, TF_MS
+from scanner.candle_sync import plan_fetch_limit, sync_candles
+from scanner.candles import CandleSeries
+
+SCHEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db', 'schema.sql')
+STEP = TF_MS['15m']
+
+
+def _store(tmpdir):
+    return CandleStore(init_db(os.path.join(tmpdir, 'test.db'), SCHEMA))
+
+
+def test_plan_fetch_limit():
+    now = DEFAULT_NOW_MS
+    current_open = now - now % STEP
+    assert plan_fetch_limit(None, '15m', 220, now) == 220
+    assert plan_fetch_limit(current_open, '15m', 220, now) == 1          # only the forming candle
+    assert plan_fetch_limit(current_open - 2 * STEP, '15m', 220, now) == 3
+    assert plan_fetch_limit(current_open - 1000 * STEP, '15m', 220, now) == 220
+
+
+def test_delta_sync_matches_full_fetch():
+    server = start_fake_bitget()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        try:
+            store = _store(tmpdir)
+            client = BitgetClient(base_url=server.base_url)
+            symbols = server.symbols[:3]
+
+            first = sync_candles(client, store, symbols, ['15m', '1h'], window=220, now_ms=server.now_ms)
+            assert all(len(c) == 220 for c in first.values())
+
+            # Two 15m candles later only the delta is requested
+            server.now_ms += 2 * STEP
+            requests_before = server.request_count
+            second = sync_candles(client, store, symbols, ['15m', '1h'], window=220, now_ms=server.now_ms)
+            assert server.request_count - requests_before == len(symbols) * 2
+
+            for symbol in symbols:
+                assert second[(symbol, '15m')] == client.get_klines(symbol, '15m', 220)
+                assert second[(symbol, '1h')] == client.get_klines(symbol, '1h', 220)
+            store.conn.close()
+        finally:
+            server.shutdown()
+
+
+def test_gap_is_backfilled():
+    server = start_fake_bitget()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        try:
+            store = _store(tmpdir)
+            client = BitgetClient(base_url=server.base_url)
+            sync_candles(client, store, ['BTCUSDT'], ['15m'], window=220, now_ms=server.now_ms)
+
+            window = store.get_window('BTCUSDT', '15m', 220)
+            store.conn.execute('DELETE FROM candles WHERE ts IN (?, ?)', (window[50]['ts'], window[51]['ts']))
+            store.conn.commit()
+            assert find_gaps(store.get_window('BTCUSDT', '15m', 220), STEP)
+
+            result = sync_candles(client, store, ['BTCUSDT'], ['15m'], window=220, now_ms=server.now_ms)
+            candles = result[('BTCUSDT', '15m')]
+            assert len(candles) == 220
+            assert find_gaps(candles, STEP) == []
+            store.conn.close()
+        finally:
+            server.shutdown()
+
+
+class HaltedExchange:
+    """150 candles since the listing, 3 of them missing (trading halt); records requested limits"""
+
+    def __init__(self, now_ms):
+        current_open = now_ms - now_ms % STEP
+        rows = [[current_open - (149 - i) * STEP, 1, 2, 0.5, 1.5, 10] for i in range(150)]
+        del rows[100:103]
+        self.candles = CandleSeries.from_rows(rows)
+        self.limits = []
+
+    def get_klines(self, symbol, timeframe, limit):
+        self.limits.append(limit)
+        return self.candles[-limit:]
+
+
+def test_real_gaps_are_not_backfilled_again():
+    exchange = HaltedExchange(DEFAULT_NOW_MS)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = _store(tmpdir)
+        first = sync_candles(exchange, store, ['NEWUSDT'], ['15m'], window=220, now_ms=DEFAULT_NOW_MS)
+        assert len(first[('NEWUSDT', '15m')]) == 147
+        assert exchange.limits == [220]
+        halt = find_gaps(first[('NEWUSDT', '15m')], STEP)
+        assert len(halt) == 1
+        gaps = {halt[0], (0, int(exchange.candles.ts[0]))}
+        now = DEFAULT_NOW_MS // 1000
+        assert store.known_gaps('NEWUSDT', '15m', now) == set()  # one fetch may have been a short page
+
+        # Next scan: still missing after another full-window fetch, now the gaps are confirmed
+        sync_candles(exchange, store, ['NEWUSDT'], ['15m'], window=220, now_ms=DEFAULT_NOW_MS)
+        assert exchange.limits == [220, 1, 220]
+        assert store.known_gaps('NEWUSDT', '15m', now) == gaps
+
+        # Then only the forming candle is fetched, the known halt and listing start are not backfilled
+        second = sync_candles(exchange, store, ['NEWUSDT'], ['15m'], window=220, now_ms=DEFAULT_NOW_MS)
+        assert exchange.limits == [220, 1, 220, 1]
+        assert second[('NEWUSDT', '15m')] == first[('NEWUSDT', '15m')]
+
+        # A hole that was not there before is still backfilled
+        store.conn.execute('DELETE FROM candles WHERE ts = ?', (int(exchange.candles.ts[20]),))
+        store.conn.commit()
+        third = sync_candles(exchange, store, ['NEWUSDT'], ['15m'], window=220, now_ms=DEFAULT_NOW_MS)
+        assert exchange.limits == [220, 1, 220, 1, 1, 220]
+        assert third[('NEWUSDT', '15m')] == first[('NEWUSDT', '15m')]
+
+        # Confirmed gaps expire, then the next scan backfills them once more
+        assert store.known_gaps('NEWUSDT', '15m', now + GAP_TTL_SECONDS - 1) == gaps
+        assert store.known_gaps('NEWUSDT', '15m', now + GAP_TTL_SECONDS) == set()
+        store.conn.close()
+
+
+def test_failed_backfill_records_no_gap():
+    exchange = HaltedExchange(DEFAULT_NOW_MS)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = _store(tmpdir)
+        sync_candles(exchange, store, ['NEWUSDT'], ['15m'], window=220, now_ms=DEFAULT_NOW_MS)
+
+        def backfill_fails(symbol, timeframe, limit):
+            if limit == 220:
+                raise ConnectionError('exchange unavailable')
+            return exchange.candles[-limit:]
+        exchange.get_klines = backfill_fails
+        sync_candles(exchange, store, ['NEWUSDT'], ['15m'], window=220, now_ms=DEFAULT_NOW_MS)
+        sync_candles(exchange, store, ['NEWUSDT'], ['15m'], window=220, now_ms=DEFAULT_NOW_MS)
+        assert store.known_gaps('NEWUSDT', '15m', DEFAULT_NOW_MS // 1000) == set()
+        store.conn.close()
+
+
+if __name__ == "__main__":
+    test_plan_fetch_limit()
+    test_delta_sync_matches_full_fetch()
+    test_gap_is_backfilled()
+    test_real_gaps_are_not_backfilled_again()
+    test_failed_backfill_records_no_gap()
+    print("✅ Candle store tests passed")
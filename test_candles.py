@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test the NumPy-backed CandleSeries container
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from benchmarks.fake_bitget import make_candle_rows, DEFAULT_NOW_MS
+from benchmarks.bench_candles import legacy_parse, legacy_frame
+from scanner.bitget_client import parse_candles
+from scanner.candles import CandleSeries
+
+
+def _payload(limit=50):
+    return {'code': '00000', 'data': make_candle_rows('BTCUSDT', '15m', limit, DEFAULT_NOW_MS)}
+
+
+def test_parse_matches_legacy_dicts():
+    payload = _payload()
+    series = parse_candles(payload)
+    legacy = legacy_parse(payload)
+    assert len(series) == 50
+    assert series == legacy
+    assert series[-2] == legacy[-2]
+    assert series[-2]['ts'] == legacy[-2]['ts'] and isinstance(series[-2]['ts'], int)
+    assert [c['close'] for c in series[-10:]] == [c['close'] for c in legacy[-10:]]
+    assert parse_candles({'code': '40001', 'msg': 'error'}) is None
+
+
+def test_frame_matches_legacy_frame():
+    payload = _payload()
+    frame = parse_candles(payload).to_frame()
+    legacy = legacy_frame(legacy_parse(payload))
+    assert list(frame.columns) == list(legacy.columns)
+    assert list(frame.dtypes) == list(legacy.dtypes)
+    assert frame.equals(legacy)
+
+
+def test_slices_are_views():
+    series = parse_candles(_payload())
+    tail = series[-20:]
+    assert len(tail) == 20
+    assert np.shares_memory(tail.close, series.close)
+    assert tail.ts[0] == series.ts[-20]
+    assert series.before(int(series.ts[10])) == series[:10]
+    assert CandleSeries.concat([series[:10], series[10:]]) == series
+
+
+def test_ragged_and_empty_rows():
+    rows = make_candle_rows('BTCUSDT', '15m', 3, DEFAULT_NOW_MS)
+    rows[1] = rows[1][:4]  # truncated row is skipped like before
+    series = CandleSeries.from_rows(rows, newest_first=True)
+    assert len(series) == 2
+    assert CandleSeries.from_rows([]) == []
+    assert not CandleSeries.empty()
+
+
+if __name__ == "__main__":
+    test_parse_matches_legacy_dicts()
+    test_frame_matches_legacy_frame()
+    test_slices_are_views()
+    test_ragged_and_empty_rows()
+    print("✅ CandleSeries tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed chart cache: render once per key, LRU/age eviction, restart
+"""
+
+import sys
+import os
+import tempfile
+import time
+from concurrent.futures import Future
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from charts.chart_cache import ChartCache, chart_key
+
+
+def _png(n, size=1000):
+    return bytes([n % 256]) * size
+
+
+def test_key_depends_on_candle_and_annotation():
+    base = chart_key('BTCUSDT', '15m', 1700000000000, {'hlevels': [1.0]}, {'direction': 'long'})
+    assert base == chart_key('BTCUSDT', '15m', 1700000000000, {'hlevels': [1.0]}, {'direction': 'long'})
+    assert base != chart_key('BTCUSDT', '15m', 1700000900000, {'hlevels': [1.0]}, {'direction': 'long'})
+    assert base != chart_key('BTCUSDT', '15m', 1700000000000, {'hlevels': [1.0]}, {'direction': 'short'})
+
+
+def test_same_chart_renders_once():
+    cache = ChartCache(tempfile.mkdtemp())
+    pending = Future()
+    renders = []
+
+    def render():
+        renders.append(1)
+        return pending
+
+    first = cache.get_or_render('k', render)
+    second = cache.get_or_render('k', render)  # still rendering
+    pending.set_result(_png(1))
+    assert first.result(1) == second.result(1) == _png(1)
+    assert os.path.exists(cache.path('k'))
+    assert cache.get_or_render('k', render).result(1) == _png(1)
+    assert len(renders) == 1
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 1
+
+
+def test_failed_render_is_not_cached():
+    cache = ChartCache(tempfile.mkdtemp())
+    failed = Future()
+    failed.set_exception(TimeoutError('slow'))
+    assert isinstance(cache.get_or_render('k', lambda: failed).exception(1), TimeoutError)
+    assert cache.get('k') is None and cache.stats()['files'] == 0
+
+
+def test_size_bound_evicts_least_recently_used():
+    cache = ChartCache(tempfile.mkdtemp(), max_bytes=3000, memory_items=0)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, _png(1))
+    assert cache.get('a') is not None  # 'b' is now the least recently used
+    cache.put('d', _png(2))
+    assert not os.path.exists(cache.path('b'))
+    assert cache.get('b') is None and cache.get('a') is not None
+    assert cache.stats()['files'] == 3 and cache.disk_bytes == 3000
+
+
+def test_age_bound_and_restart():
+    cache_dir = tempfile.mkdtemp()
+    cache = ChartCache(cache_dir, max_age_seconds=3600)
+    cache.put('old', _png(1))
+    cache.put('new', _png(2))
+    stale = time.time() - 7200
+    os.utime(cache.path('old'), (stale, stale))
+    reopened = ChartCache(cache_dir, max_age_seconds=3600)  # index rebuilt from the files
+    assert reopened.get('old') is None and not os.path.exists(cache.path('old'))
+    assert reopened.get('new') == _png(2)
+    assert reopened.stats()['files'] == 1
+
+
+if __name__ == "__main__":
+    test_key_depends_on_candle_and_annotation()
+    test_same_chart_renders_once()
+    test_failed_render_is_not_cached()
+    test_size_bound_evicts_least_recently_used()
+    test_age_bound_and_restart()
+    print("✅ Chart cache tests passed")
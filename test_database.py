@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test the connection manager: one-time versioned migrations, WAL, per-thread pooled connections
+"""
+
+import sys
+import os
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import db.database as database
+from db.database import ConnectionPool, get_conn, migrate
+
+
+def _path():
+    return os.path.join(tempfile.mkdtemp(), 'data', 'bot.db')
+
+
+def test_migrations_run_once_and_set_wal():
+    path = _path()
+    versions = [version for version, _ in database.MIGRATIONS]
+    assert versions == sorted(set(versions)) and all(version > 1 for version in versions)
+    # One above the registered migrations, so the test keeps working as migrations are added
+    latest = versions[-1] + 1 if versions else 2
+    database.MIGRATIONS.append((latest, 'CREATE TABLE extra (id INTEGER PRIMARY KEY)'))
+    try:
+        assert migrate(path) == latest
+        conn = get_conn(path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == latest
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        assert {'user_settings', 'outbox', 'extra'} <= tables
+        conn.execute('DROP TABLE extra')
+        conn.commit()
+        assert migrate(path) == latest  # cached for this process, not re-applied
+        assert 'extra' not in {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    finally:
+        database.MIGRATIONS.pop()
+
+
+def test_pool_caches_per_thread_and_reuses_released():
+    pool = ConnectionPool(_path())
+    main = pool.connection()
+    assert pool.connection() is main
+    seen = {}
+
+    def stage():
+        seen['conn'] = pool.connection()
+        seen['conn'].execute("INSERT INTO scan_cursor (user_id, idx, updated_at) VALUES ('u1', 3, 0)")
+        seen['conn'].commit()
+        pool.release()
+
+    t = threading.Thread(target=stage)
+    t.start()
+    t.join()
+    assert seen['conn'] is not main
+    assert main.execute('SELECT idx FROM scan_cursor').fetchone()[0] == 3
+
+    t = threading.Thread(target=lambda: seen.update(second=pool.connection()))
+    t.start()
+    t.join()
+    assert seen['second'] is seen['conn']  # released connection handed to the next thread
+    assert pool.opened == 2
+    pool.close()
+
+
+if __name__ == "__main__":
+    test_migrations_run_once_and_set_wal()
+    test_pool_caches_per_thread_and_reuses_released()
+    print("✅ Database tests passed")
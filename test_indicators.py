@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test the shared IndicatorContext cache used by the analysis modules
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_bitget import make_candle_rows, DEFAULT_NOW_MS
+from engine.indicators import IndicatorContext, pivot_indices
+from engine.scan_debugger import get_scan_debugger
+from scanner.candles import CandleSeries
+from modules import volume, fibonacci, rsi_divergence, macd, smc
+
+
+def _frame(symbol='BTCUSDT', limit=220):
+    rows = make_candle_rows(symbol, '15m', limit, DEFAULT_NOW_MS)
+    return CandleSeries.from_rows(rows, newest_first=True).to_frame()
+
+
+def test_indicators_match_module_formulas():
+    df = _frame()
+    ctx = IndicatorContext(df, 'BTCUSDT', '15m')
+
+    delta = df['close'].diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    pd.testing.assert_series_equal(ctx.rsi(14), 100 - (100 / (1 + gain / loss)), check_names=False)
+
+    macd_line = df['close'].ewm(span=12).mean() - df['close'].ewm(span=26).mean()
+    pd.testing.assert_series_equal(ctx.macd()[0], macd_line, check_names=False)
+    pd.testing.assert_series_equal(ctx.volume_mean(20), df['volume'].rolling(20).mean())
+    pd.testing.assert_series_equal(ctx.rolling_high(50), df['high'].rolling(50).max())
+
+    expected_lows = pivot_indices(df['close'].to_numpy(), 'low')
+    assert np.flatnonzero(ctx.swing_lows('close').to_numpy()).tolist() == expected_lows.tolist()
+    assert ctx.atr(14).iloc[-1] > 0
+
+
+def test_memoization_counts_hits():
+    df = _frame()
+    ctx = IndicatorContext(df)
+    first = ctx.rsi(14)
+    assert ctx.rsi(14) is first
+    assert (ctx.hits, ctx.misses) == (1, 1)
+    ctx.rsi(7)
+    assert ctx.misses == 2
+
+
+def test_modules_share_one_context():
+    debugger = get_scan_debugger()
+    for symbol in ['SYM1USDT', 'SYM2USDT', 'SYM3USDT']:
+        df = _frame(symbol)
+        ctx = IndicatorContext(df, symbol, '15m')
+        for module in [volume, fibonacci, rsi_divergence, macd, smc]:
+            with_ctx = module.analyze(df, ctx=ctx)
+            standalone = module.analyze(df)
+            assert [(r.direction, r.score, r.reasons) for r in with_ctx] == \
+                   [(r.direction, r.score, r.reasons) for r in standalone]
+        assert ctx.hits > 0
+
+    debugger.reset_metrics()
+    ctx = IndicatorContext(_frame())
+    macd.analyze(ctx.df, ctx=ctx)
+    assert debugger.indicator_cache_hits == 1  # second detector reuses the MACD lines
+    assert 'Indicator cache' in debugger.generate_simple_summary()
+
+
+if __name__ == "__main__":
+    test_indicators_match_module_formulas()
+    test_memoization_counts_hits()
+    test_modules_share_one_context()
+    print("✅ Indicator context tests passed")
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Test that the vectorized MACD detectors match the golden outputs of the loop implementation
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.bench_smc import random_walk
+from benchmarks.golden import load_golden, macd_outputs
+from engine.indicators import IndicatorContext
+from modules import macd
+
+
+def test_detectors_match_golden():
+    expected = load_golden('macd')
+    outputs = macd_outputs(macd)
+    assert outputs.keys() == expected.keys()
+    assert [case for case in expected if outputs[case] != expected[case]] == []
+    assert any(expected.values())
+
+
+def test_flat_series_has_no_crossings():
+    df = random_walk(220, seed=1)
+    df['close'] = 100.0
+    assert macd.analyze(df) == []
+
+
+def test_macd_computed_once_per_analyze():
+    df = random_walk(220, seed=3)
+    ctx = IndicatorContext(df)
+    macd.analyze(df, ctx=ctx)
+    assert ctx.misses == 3  # two EMAs + one MACD entry, the second detector is a cache hit
+    assert ctx.hits == 1
+
+
+if __name__ == "__main__":
+    test_detectors_match_golden()
+    test_flat_series_has_no_crossings()
+    test_macd_computed_once_per_analyze()
+    print("✅ Vectorized MACD tests passed")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test the durable alert outbox: dedup, priority order, retries and restart recovery
+"""
+
+import sys
+import os
+import tempfile
+from concurrent.futures import Future
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.database import init_db
+from db.repo import Repo
+from engine.outbox import AlertOutbox
+
+SCHEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db', 'schema.sql')
+
+
+class FakeSender:
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.sent = []
+
+    def submit(self, chat_id, text, signal_data=None, chart_path=None, chart=None):
+        self.sent.append(text)
+        future = Future()
+        future.set_result(self.ok)
+        return future
+
+
+def _db():
+    path = os.path.join(tempfile.mkdtemp(), 'bot.db')
+    return path, Repo(init_db(path, SCHEMA))
+
+
+def _alert(key, priority=5, text=None):
+    return {'tg_user_id': 'u1', 'dedup_key': key, 'priority': priority, 'symbol': 'BTCUSDT',
+            'timeframe': '15m', 'signal_type': 'COMBO', 'candle_ts': 1700000000, 'score_total': 80,
+            'text': text or key, 'signal_data': {'message_type': 'WATCHLIST'}, 'payload': {'side': 'long'}}
+
+
+def test_enqueue_dedups_queued_and_sent():
+    _, repo = _db()
+    assert repo.enqueue_outbox([_alert('a'), _alert('b'), _alert('a')]) == 2
+    repo.save_sent_signal('u1', 'c', 'BTCUSDT', '15m', 'COMBO', 1700000000, 80, {})
+    assert repo.enqueue_outbox([_alert('b'), _alert('c'), _alert('d')]) == 1
+    assert repo.outbox_counts() == {'pending': 3}
+
+
+def test_claim_in_priority_order_and_complete():
+    _, repo = _db()
+    repo.enqueue_outbox([_alert('idea', 4), _alert('trade', 0), _alert('fib', 3)])
+    rows = repo.claim_outbox(10)
+    assert [row['dedup_key'] for row in rows] == ['trade', 'fib', 'idea']
+    assert rows[0]['signal_data'] == {'message_type': 'WATCHLIST'}
+    assert repo.claim_outbox(10) == []  # already in flight
+    repo.complete_outbox([rows[0]['id'], rows[1]['id']], [(rows[2]['id'], 'timeout')], retry_seconds=0)
+    assert repo.has_dedup_key('trade') and repo.has_dedup_key('fib')
+    assert repo.outbox_counts() == {'pending': 1}
+    retry = repo.claim_outbox(10)
+    assert retry[0]['dedup_key'] == 'idea' and retry[0]['attempts'] == 2
+    assert retry[0]['last_error'] == 'timeout'
+
+
+def test_gives_up_after_max_attempts():
+    _, repo = _db()
+    repo.enqueue_outbox([_alert('x')])
+    for _ in range(2):
+        row = repo.claim_outbox(1)[0]
+        repo.complete_outbox([], [(row['id'], 'bad request')], max_attempts=2, retry_seconds=0)
+    assert repo.outbox_counts() == {'failed': 1}
+
+
+def test_restart_recovers_in_flight_alerts():
+    path, repo = _db()
+    repo.enqueue_outbox([_alert(f"k{i}") for i in range(5)])
+    repo.claim_outbox(3)  # crash while these were being sent
+    sender = FakeSender()
+    outbox = AlertOutbox(path, sender, poll_interval=0.01)
+    assert outbox.recover() == 3
+    outbox.start()
+    assert outbox.wait_idle(5)
+    outbox.stop()
+    assert sorted(sender.sent) == [f"k{i}" for i in range(5)]
+    assert repo.conn.execute('SELECT COUNT(*) FROM signals_sent').fetchone()[0] == 5
+    assert repo.outbox_counts() == {}
+
+
+def test_failed_sends_stay_queued():
+    path, repo = _db()
+    outbox = AlertOutbox(path, FakeSender(ok=False), poll_interval=0.01, retry_seconds=3600)
+    assert outbox.enqueue([_alert('a')]) == 1
+    outbox.drain_once()
+    outbox.drain_once()  # records the failed result
+    assert repo.outbox_counts() == {'pending': 1}
+    assert not repo.has_dedup_key('a')
+
+
+if __name__ == "__main__":
+    test_enqueue_dedups_queued_and_sent()
+    test_claim_in_priority_order_and_complete()
+    test_gives_up_after_max_attempts()
+    test_restart_recovers_in_flight_alerts()
+    test_failed_sends_stay_queued()
+    print("✅ Outbox tests passed")
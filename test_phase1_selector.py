@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test Phase 1 selection with preloaded rotation state and the batched rotation update
+"""
+
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.database import init_db, SCHEMA_PATH
+from db.repo import Repo
+from engine.phase1_selector import apply_phase1_selection
+
+# symbol_rotation rows written by the baseline selector for _decisions() after _seed()
+GOLDEN_ROTATION = [('COMBO', 'ETHUSDT'), ('IDEA', 'SOLUSDT'), ('PUMP', 'XRPUSDT')]
+
+
+class CountingConn:
+    """Connection wrapper counting statements and commits"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.statements = 0
+        self.commits = 0
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def execute(self, *args):
+        self.statements += 1
+        return self.conn.execute(*args)
+
+    def executemany(self, *args):
+        self.statements += 1
+        return self.conn.executemany(*args)
+
+    def cursor(self):
+        self.statements += 1
+        return self.conn.cursor()
+
+    def commit(self):
+        self.commits += 1
+        self.conn.commit()
+
+
+def _repo():
+    return Repo(init_db(os.path.join(tempfile.mkdtemp(), 'bot.db'), SCHEMA_PATH))
+
+
+def _decisions():
+    return [
+        {'symbol': 'BTCUSDT', 'timeframe': '1h', 'type': 'COMBO', 'message_type': 'TRADE_FREIGABE', 'score_total': 400},
+        {'symbol': 'ETHUSDT', 'timeframe': '1h', 'type': 'COMBO', 'message_type': 'TRADE_FREIGABE', 'score_total': 390},
+        {'symbol': 'ETHUSDT', 'timeframe': '4h', 'type': 'IDEA', 'message_type': 'WATCHLIST', 'score_total': 380},
+        {'symbol': 'SOLUSDT', 'timeframe': '15m', 'type': 'IDEA', 'message_type': 'WATCHLIST', 'score_total': 300},
+        {'symbol': 'SOLUSDT', 'timeframe': '1h', 'type': 'IDEA', 'message_type': 'WATCHLIST', 'score_total': 290},
+        {'symbol': 'XRPUSDT', 'timeframe': '1h', 'type': 'PUMP', 'message_type': 'PUMP_ALERT', 'score_total': 200},
+    ]
+
+
+def _seed(repo, now):
+    repo.set_last_sent('u1', 'COMBO', 'BTCUSDT', now - 3600)        # within the 6h rotation
+    repo.set_last_sent('u1', 'IDEA', 'ETHUSDT', now - 4 * 3600)     # 3h rotation passed
+    repo.set_last_sent('u1', 'PUMP', 'XRPUSDT', now - 7 * 24 * 3600)  # not loaded at all
+
+
+def test_rotation_matches_golden():
+    """Expected picks and rotation writes as produced by the per-decision query selector"""
+    now = int(time.time())
+    repo = _repo()
+    _seed(repo, now)
+    selected = apply_phase1_selection(_decisions(), repo, 'u1')
+    rotation = repo.conn.execute(
+        'SELECT topic, symbol FROM symbol_rotation WHERE last_sent_at >= ? ORDER BY topic, symbol', (now,)
+    ).fetchall()
+    assert [(d['symbol'], d['timeframe']) for d in selected] == [('ETHUSDT', '1h'), ('SOLUSDT', '15m'), ('XRPUSDT', '1h')]
+    assert [tuple(row) for row in rotation] == GOLDEN_ROTATION
+
+
+def test_one_query_and_one_commit():
+    repo = _repo()
+    _seed(repo, int(time.time()))
+    counting = CountingConn(repo.conn)
+    apply_phase1_selection(_decisions() * 50, Repo(counting), 'u1')
+    assert counting.statements == 2  # rotation preload + set_last_sent_many
+    assert counting.commits == 1
+
+
+if __name__ == "__main__":
+    test_rotation_matches_golden()
+    test_one_query_and_one_commit()
+    print("✅ Phase 1 selector tests passed")
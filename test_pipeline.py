@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test the staged scan pipeline: ordering, bounded queues, error isolation and metrics
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scanner.pipeline import Pipeline, Stage
+
+
+def test_items_flow_in_order():
+    sent = []
+    pipeline = Pipeline([
+        Stage('fetch', lambda batch: [batch]),
+        Stage('analyze', lambda batch: [x * 10 for x in batch]),
+        Stage('send', sent.append),
+    ])
+    pipeline.run([[1, 2], [3], [4, 5, 6]])
+    assert sent == [10, 20, 30, 40, 50, 60]
+    metrics = pipeline.metrics()
+    assert metrics['fetch']['items'] == 3
+    assert metrics['analyze']['items'] == 3
+    assert metrics['send']['items'] == 6
+
+
+def test_stages_overlap():
+    """The second batch is fetched while the first one is analyzed"""
+    def fetch(batch):
+        time.sleep(0.05)
+        return [batch]
+
+    def analyze(batch):
+        time.sleep(0.05)
+
+    pipeline = Pipeline([Stage('fetch', fetch), Stage('analyze', analyze)])
+    start = time.perf_counter()
+    pipeline.run(range(4))
+    assert time.perf_counter() - start < 0.35  # sequential would be 0.4s
+    assert pipeline.metrics()['analyze']['utilisation'] > 50
+
+
+def test_bounded_queue_backpressure():
+    release = threading.Event()
+
+    def slow_send(item):
+        release.wait(1)
+
+    pipeline = Pipeline([Stage('decide', lambda x: [x]), Stage('send', slow_send, maxsize=2)])
+    runner = threading.Thread(target=pipeline.run, args=(range(10),))
+    runner.start()
+    time.sleep(0.1)
+    # send holds one item, its queue two - the decide stage is blocked on the third
+    assert pipeline.stages[0].items <= 4
+    release.set()
+    runner.join()
+    metrics = pipeline.metrics()
+    assert metrics['send']['items'] == 10
+    assert metrics['send']['queue_max'] <= 2
+    assert metrics['decide']['blocked_seconds'] > 0
+
+
+def test_errors_are_isolated():
+    sent = []
+
+    def analyze(x):
+        if x == 2:
+            raise ValueError("boom")
+        return [x]
+
+    pipeline = Pipeline([Stage('analyze', analyze), Stage('send', sent.append)])
+    pipeline.run(range(5))
+    assert sent == [0, 1, 3, 4]
+    assert pipeline.metrics()['analyze']['errors'] == 1
+
+
+def test_failed_items_are_reported():
+    failed = []
+
+    def analyze(batch):
+        if 'BAD' in batch:
+            raise ValueError("boom")
+        return batch
+
+    def decide(items):
+        if 'ETH' in items:
+            raise RuntimeError("commit failed")
+
+    pipeline = Pipeline([
+        Stage('analyze', analyze, on_error=lambda batch, e: failed.extend((symbol, str(e)) for symbol in batch)),
+        Stage('decide', decide, maxsize=10, batch=True,
+              on_error=lambda items, e: failed.extend((symbol, str(e)) for symbol in items)),
+    ])
+    pipeline.run([['BTC', 'BAD'], ['ETH']])
+    assert ('BTC', 'boom') in failed and ('BAD', 'boom') in failed
+    assert ('ETH', 'commit failed') in failed
+    assert len(failed) == 3
+    assert pipeline.metrics()['analyze']['errors'] == 1 and pipeline.metrics()['decide']['errors'] == 1
+
+
+def test_batch_stage_gets_queued_items_together():
+    release = threading.Event()
+    batches = []
+
+    def decide(x):
+        if x == 0:
+            release.wait(1)  # let the rest pile up behind the first item
+        return [x]
+
+    pipeline = Pipeline([Stage('decide', decide), Stage('send', batches.append, maxsize=10, batch=True)])
+    runner = threading.Thread(target=pipeline.run, args=(range(5),))
+    runner.start()
+    release.set()
+    runner.join()
+    assert sum(batches, []) == [0, 1, 2, 3, 4]
+    assert pipeline.metrics()['send']['items'] == 5
+
+
+def test_on_close_runs_in_stage_thread():
+    names = []
+    pipeline = Pipeline([
+        Stage('fetch', lambda x: [x], on_close=lambda: names.append(threading.current_thread().name)),
+        Stage('send', lambda x: None),
+    ])
+    pipeline.run([1])
+    assert names == ['pipeline-fetch']
+    assert 'fetch' in pipeline.summary()
+
+
+if __name__ == "__main__":
+    test_items_flow_in_order()
+    test_stages_overlap()
+    test_bounded_queue_backpressure()
+    test_errors_are_isolated()
+    test_failed_items_are_reported()
+    test_batch_stage_gets_queued_items_together()
+    test_on_close_runs_in_stage_thread()
+    print("✅ Pipeline tests passed")
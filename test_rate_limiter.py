@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test the Bitget rate limiter against a local stub server that enforces limits
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.fake_bitget import start_fake_bitget
+from engine.rate_limit import TokenBucket
+from engine.scan_debugger import get_scan_debugger
+from scanner.bitget_client import AsyncBitgetClient, BitgetClient, BitgetRateLimitError, CANDLES_PATH, RateLimiter
+
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.18
+
+
+def test_paced_client_is_never_throttled():
+    server = start_fake_bitget(rate_limit=12, rate_window=0.5)
+    try:
+        limiter = RateLimiter(limits={CANDLES_PATH: 20.0})
+        client = AsyncBitgetClient(base_url=server.base_url, max_concurrency=10, rate_limiter=limiter)
+        results = client.get_klines_many([(s, '15m', 20) for s in server.symbols[:30]])
+        client.close()
+        assert server.throttled_count == 0
+        assert all(len(r) == 20 for r in results)
+    finally:
+        server.shutdown()
+
+
+def test_429_is_retried_and_recorded():
+    debugger = get_scan_debugger()
+    debugger.reset_metrics()
+    server = start_fake_bitget(rate_limit=5, rate_window=0.25)
+    try:
+        limiter = RateLimiter(limits={CANDLES_PATH: 1000.0}, max_retries=6, base_backoff=0.05)
+        client = AsyncBitgetClient(base_url=server.base_url, max_concurrency=10, rate_limiter=limiter)
+        results = client.get_klines_many([(s, '15m', 20) for s in server.symbols[:20]])
+        client.close()
+        assert server.throttled_count > 0
+        assert debugger.rate_limit_hits == server.throttled_count
+        assert all(len(r) == 20 for r in results)
+    finally:
+        server.shutdown()
+
+
+def test_persistent_throttling_is_not_silent():
+    server = start_fake_bitget(rate_limit=1, rate_window=5.0)
+    try:
+        limiter = RateLimiter(limits={CANDLES_PATH: 1000.0}, max_retries=0)
+        client = BitgetClient(base_url=server.base_url, rate_limiter=limiter)
+        assert len(client.get_klines('BTCUSDT', '15m', 10)) == 10
+        try:
+            client.get_klines('BTCUSDT', '15m', 10)
+            assert False, "expected BitgetRateLimitError"
+        except BitgetRateLimitError:
+            pass
+
+        async_client = AsyncBitgetClient(base_url=server.base_url, rate_limiter=limiter)
+        results = async_client.get_klines_many([('ETHUSDT', '15m', 10)])
+        async_client.close()
+        assert isinstance(results[0], BitgetRateLimitError)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_token_bucket_paces_requests()
+    test_paced_client_is_never_throttled()
+    test_429_is_retried_and_recorded()
+    test_persistent_throttling_is_not_silent()
+    print("✅ Rate limiter tests passed")
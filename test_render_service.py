@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Test the chart render service: PNG bytes from the worker pool, per-job timeout
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.bench_renderer import make_candles, make_annotation
+from charts.render_service import ChartRenderService
+from scanner.candles import CandleSeries
+
+
+def test_renders_png_bytes_and_times_out():
+    service = ChartRenderService(workers=1, timeout=60)
+    try:
+        candles = make_candles(200)
+        future = service.submit('BTCUSDT', '15m', CandleSeries.from_dicts(candles),
+                                overlays={'hlevels': [candles[-1]['close']]}, annotation=make_annotation(candles))
+        png = future.result(60)
+        assert png[:8] == b'\x89PNG\r\n\x1a\n'
+
+        late = service.submit('ETHUSDT', '1h', candles, timeout=0.01)
+        try:
+            late.result(30)
+            assert False, "expected a timeout"
+        except TimeoutError:
+            pass
+        stats = service.stats()
+        assert stats['rendered'] == 1 and stats['timed_out'] == 1
+
+        # The worker is free again after the timed-out job
+        assert service.render('BTCUSDT', '4h', candles)[:4] == b'\x89PNG'
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    test_renders_png_bytes_and_times_out()
+    print("✅ Render service tests passed")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the single-pass chart renderer: one encode, TP/SL drawn at their price
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+from benchmarks.bench_renderer import make_candles, make_annotation
+from charts.renderer import render_chart_png
+
+
+def test_annotated_chart_is_encoded_once():
+    candles = make_candles(150)
+    saves = []
+    original = Figure.savefig
+
+    def counting_savefig(self, *args, **kwargs):
+        saves.append(args[0])
+        return original(self, *args, **kwargs)
+
+    Figure.savefig = counting_savefig
+    try:
+        path = render_chart_png('BTCUSDT', '15m', candles, out_dir=tempfile.mkdtemp(),
+                                annotation=make_annotation(candles))
+    finally:
+        Figure.savefig = original
+    assert len(saves) == 1
+    assert os.path.getsize(path) > 0
+    assert plt.get_fignums() == []  # figure closed after encoding
+
+
+def test_levels_outside_price_range_stay_visible():
+    candles = make_candles(150)
+    price = candles[-1]['close']
+    annotation = {'direction': 'short', 'tp_levels': [price * 0.5], 'sl_level': price * 1.5}
+    captured = {}
+    original = Figure.savefig
+
+    def capture(self, *args, **kwargs):
+        captured['ylim'] = self.axes[0].get_ylim()
+        return original(self, *args, **kwargs)
+
+    Figure.savefig = capture
+    try:
+        render_chart_png('BTCUSDT', '1h', candles, out_dir=tempfile.mkdtemp(), annotation=annotation)
+    finally:
+        Figure.savefig = original
+    low, high = captured['ylim']
+    assert low < price * 0.5 and high > price * 1.5
+
+
+if __name__ == "__main__":
+    test_annotated_chart_is_encoded_once()
+    test_levels_outside_price_range_stay_visible()
+    print("✅ Renderer tests passed")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test Repo unit of work (repo.batch()) and the executemany bulk variants
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.database import init_db, get_conn, SCHEMA_PATH
+from db.repo import Repo
+
+
+def _repo():
+    path = os.path.join(tempfile.mkdtemp(), 'bot.db')
+    return path, Repo(init_db(path, SCHEMA_PATH))
+
+
+def _count(path, table):
+    conn = get_conn(path)  # separate connection: only sees committed rows
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_batch_commits_once_at_the_end():
+    path, repo = _repo()
+    with repo.batch():
+        repo.set_cooldown('u1', 'a', 60)
+        with repo.batch():  # nested blocks join the outer transaction
+            repo.set_last_sent('u1', 'watchlist', 'BTCUSDT')
+        repo.set_cursor('u1', 5)
+        assert _count(path, 'cooldowns') == 0
+        assert repo.is_in_cooldown('u1', 'a')  # own writes are visible inside the batch
+    assert _count(path, 'cooldowns') == 1
+    assert _count(path, 'symbol_rotation') == 1
+    assert _count(path, 'scan_cursor') == 1
+
+
+def test_batch_flushes_writes_before_an_error():
+    path, repo = _repo()
+    try:
+        with repo.batch():
+            repo.set_cooldown('u1', 'a', 60)
+            repo.save_sent_signal('u1', 'k1', 'BTCUSDT', '15m', 'COMBO', 1, 80, {})
+            repo.save_sent_signal('u1', 'k1', 'BTCUSDT', '15m', 'COMBO', 1, 80, {})  # duplicate dedup_key
+        assert False, "expected an IntegrityError"
+    except Exception as e:
+        assert 'UNIQUE' in str(e)
+    assert _count(path, 'cooldowns') == 1
+    assert _count(path, 'signals_sent') == 1
+    assert not repo.conn.in_transaction
+
+
+def test_bulk_variants():
+    path, repo = _repo()
+    ids = repo.save_active_setups([
+        {'user_id': 'u1', 'symbol': 'BTCUSDT', 'timeframe': '15m', 'side': 'bullish', 'status': 'IDEA',
+         'idea_score': 90, 'levels': {'zone_low': 1.0}},
+        {'user_id': 'u1', 'symbol': 'ETHUSDT', 'timeframe': '1h', 'side': 'bearish', 'status': 'TRADE', 'trade_score': 80},
+    ])
+    assert len(set(ids)) == 2
+    assert repo.get_existing_idea('u1', 'BTCUSDT', '15m')['levels'] == {'zone_low': 1.0}
+    repo.set_cooldowns('u1', {'a': 60, 'b': -1})
+    assert repo.is_in_cooldown('u1', 'a') and not repo.is_in_cooldown('u1', 'b')
+    repo.set_last_sent_many('u1', [('watchlist', 'BTCUSDT'), ('fib', 'ETHUSDT')], timestamp=123)
+    assert repo.get_last_sent('u1', 'fib', 'ETHUSDT') == 123
+    repo.save_sent_signals([{'tg_user_id': 'u1', 'dedup_key': f"k{i}", 'symbol': 'BTCUSDT', 'timeframe': '15m',
+                             'signal_type': 'COMBO', 'candle_ts': i, 'payload': {}} for i in range(3)])
+    assert repo.has_dedup_key('k2')
+    assert _count(path, 'signals_sent') == 3
+
+
+def test_deferred_setups_write_in_one_transaction_at_the_end():
+    from db.setup_index import ActiveSetupIndex
+    path, repo = _repo()
+    repo.setup_index = ActiveSetupIndex.load(repo.conn, 'u1')
+    with repo.deferred_setups():
+        setup_id = repo.save_active_setup('u1', 'BTCUSDT', '15m', 'bullish', 'IDEA', idea_score=90)
+        assert not repo.conn.in_transaction  # no write lock while decisions are still computed
+        assert repo.get_existing_idea('u1', 'BTCUSDT', '15m')['setup_id'] == setup_id
+        assert repo.upgrade_setup_to_trade(setup_id, 85)
+        assert not repo.upgrade_setup_to_trade(setup_id, 85)  # already TRADE
+        assert not repo.upgrade_setup_to_trade('missing', 85)
+        assert _count(path, 'active_setups') == 0
+    assert not repo.conn.in_transaction
+    row = get_conn(path).execute('SELECT status, trade_score FROM active_setups').fetchone()
+    assert tuple(row) == ('TRADE', 85)
+
+
+if __name__ == "__main__":
+    test_batch_commits_once_at_the_end()
+    test_batch_flushes_writes_before_an_error()
+    test_bulk_variants()
+    test_deferred_setups_write_in_one_transaction_at_the_end()
+    print("✅ Repo batch tests passed")
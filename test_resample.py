@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test resampling 15m candles into 1h/4h bars
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.fake_bitget import start_fake_bitget
+from db.database import init_db
+from db.candle_store import CandleStore
+from scanner.bitget_client import BitgetClient, TF_MS
+from scanner.candle_sync import sync_candles_resampled
+from scanner.resample import resample_candles
+from validate_resample import compare_series
+
+SCHEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db', 'schema.sql')
+STEP = TF_MS['15m']
+
+
+def test_resample_matches_exchange_bars():
+    server = start_fake_bitget()
+    try:
+        client = BitgetClient(base_url=server.base_url)
+        base = client.get_klines('BTCUSDT', '15m', 1000)
+        for tf in ['1h', '4h']:
+            exchange = client.get_klines('BTCUSDT', tf, 200)
+            compared, mismatches, _ = compare_series(resample_candles(base, '15m', tf), exchange, 1e-6)
+            assert compared > 0
+            assert mismatches == 0
+    finally:
+        server.shutdown()
+
+
+def test_incomplete_buckets_dropped():
+    start = 1767700800000  # 4h aligned
+    candles = [
+        {'ts': start + i * STEP, 'open': i, 'high': i + 1, 'low': i - 1, 'close': i + 0.5, 'volume': 1.0}
+        for i in range(2, 11)  # first hour partial, last hour forming
+    ]
+    bars = resample_candles(candles, '15m', '1h')
+    assert [b['ts'] for b in bars] == [start + TF_MS['1h'], start + 2 * TF_MS['1h']]
+    assert bars[0] == {'ts': start + TF_MS['1h'], 'open': 4, 'high': 8, 'low': 3, 'close': 7.5, 'volume': 4.0}
+    assert bars[1]['volume'] == 3.0  # forming bar is kept
+
+    try:
+        resample_candles(candles, '1h', '15m')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_resampled_sync_fetches_base_only():
+    server = start_fake_bitget()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        try:
+            store = CandleStore(init_db(os.path.join(tmpdir, 'test.db'), SCHEMA))
+            client = BitgetClient(base_url=server.base_url)
+            symbols = server.symbols[:2]
+
+            first = sync_candles_resampled(client, store, symbols, ['15m', '1h', '4h'], window=220, now_ms=server.now_ms)
+            assert all(len(c) == 220 for c in first.values())
+
+            server.now_ms += STEP
+            requests_before = server.request_count
+            second = sync_candles_resampled(client, store, symbols, ['15m', '1h', '4h'], window=220, now_ms=server.now_ms)
+            assert server.request_count - requests_before == len(symbols)
+            assert second[(symbols[0], '15m')] == client.get_klines(symbols[0], '15m', 220)
+            store.conn.close()
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    test_resample_matches_exchange_bars()
+    test_incomplete_buckets_dropped()
+    test_resampled_sync_fetches_base_only()
+    print("✅ Resample tests passed")
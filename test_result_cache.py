@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test the per-candle-state module result cache
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.bench_smc import random_walk
+from engine.indicators import IndicatorContext
+from engine.result_cache import ResultCache, closed_bar_modules, settings_hash
+from engine.scan_debugger import get_scan_debugger
+from engine.types import FeatureResult
+from modules import macd, rsi_divergence, smc, volume
+from scanner.analysis_pool import run_modules
+from scanner.candles import CandleSeries
+
+REGISTRY = {'rsi_divergence': rsi_divergence, 'macd': macd, 'smc': smc}
+HASHES = {name: settings_hash() for name in REGISTRY}
+CLOSED = set(REGISTRY)  # treated as closed-bar modules by the cache tests
+
+
+def _candles(closed_ts, close=100.0, volume=10.0):
+    """Two candles: the closed one at closed_ts and the forming one after it"""
+    return CandleSeries.from_rows([[closed_ts, 100, 101, 99, 100, 10],
+                                   [closed_ts + 1, 100, max(close, 101), 99, close, volume]])
+
+
+def _frame_candles(df):
+    return CandleSeries.from_rows(df[['ts', 'open', 'high', 'low', 'close', 'volume']].values.tolist())
+
+
+def _result(score=50):
+    return FeatureResult(module="macd", symbol="UNKNOWN", timeframe="UNKNOWN", candle_ts=0,
+                         direction="long", strength="medium", score=score, reasons=["x"], levels={'a': 1.0})
+
+
+def test_hit_returns_copy_and_counts():
+    debugger = get_scan_debugger()
+    debugger.reset_metrics()
+    cache = ResultCache()
+    cache.store('BTCUSDT', '1h', _candles(1000), [('macd', [_result()], None), ('smc', [], 'boom')], HASHES, CLOSED)
+    found = cache.lookup('BTCUSDT', '1h', _candles(1000), ['macd', 'smc'], HASHES, CLOSED)
+    assert list(found) == ['macd']  # failed modules are not cached
+    found['macd'][0].symbol = 'BTCUSDT'
+    found['macd'][0].reasons.append('mutated')
+    again = cache.lookup('BTCUSDT', '1h', _candles(1000), ['macd'], HASHES, CLOSED)['macd'][0]
+    assert again.symbol == 'UNKNOWN' and again.reasons == ['x']
+    assert (cache.hits, cache.misses) == (2, 1)
+    report = debugger.generate_debug_report()['result_cache']
+    assert report == {'hits': 2, 'misses': 1, 'hit_rate': 66.7, 'by_module': {
+        'macd': {'hits': 2, 'misses': 0, 'hit_rate': 100.0},
+        'smc': {'hits': 0, 'misses': 1, 'hit_rate': 0.0},
+    }}
+    assert 'smc: 0 hits, 1 computed (0.0% hit rate)' in debugger.generate_simple_summary()
+
+
+def test_new_close_or_settings_miss():
+    cache = ResultCache()
+    cache.store('BTCUSDT', '1h', _candles(1000), [('smc', [_result()], None)], {'smc': settings_hash(target_direction='long')}, CLOSED)
+    assert cache.lookup('BTCUSDT', '1h', _candles(2000), ['smc'], {'smc': settings_hash(target_direction='long')}, CLOSED) == {}
+    assert cache.lookup('BTCUSDT', '1h', _candles(1000), ['smc'], {'smc': settings_hash(target_direction='short')}, CLOSED) == {}
+    assert cache.lookup('BTCUSDT', '4h', _candles(1000), ['smc'], {'smc': settings_hash(target_direction='long')}, CLOSED) == {}
+    assert 'smc' in cache.lookup('BTCUSDT', '1h', _candles(1000), ['smc'], {'smc': settings_hash(target_direction='long')}, CLOSED)
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=3)
+    for ts in range(3):
+        cache.store('BTCUSDT', '15m', _candles(ts), [('macd', [], None)], HASHES, CLOSED)
+    cache.lookup('BTCUSDT', '15m', _candles(0), ['macd'], HASHES, CLOSED)  # refresh the oldest entry
+    cache.store('BTCUSDT', '15m', _candles(3), [('macd', [], None)], HASHES, CLOSED)
+    assert len(cache) == 3 and cache.evictions == 1
+    assert cache.lookup('BTCUSDT', '15m', _candles(1), ['macd'], HASHES, CLOSED) == {}
+    assert cache.lookup('BTCUSDT', '15m', _candles(0), ['macd'], HASHES, CLOSED) == {'macd': []}
+
+
+def test_cached_modules_are_skipped():
+    df = random_walk(220, seed=5, vol=0.02)
+    first = run_modules(df, IndicatorContext(df), REGISTRY, list(REGISTRY))
+    cache = ResultCache()
+    cache.store('SYM', '1h', _candles(1), first, HASHES, CLOSED)
+    cached = cache.lookup('SYM', '1h', _candles(1), list(REGISTRY), HASHES, CLOSED)
+    ctx = IndicatorContext(df)
+    assert run_modules(df, ctx, REGISTRY, list(REGISTRY), skip=cached) == []
+    assert ctx.misses == 0  # nothing was recomputed
+    key = lambda results: [(r.direction, r.score, r.reasons) for r in results]
+    assert {name: key(results) for name, results, _ in first} == {name: key(r) for name, r in cached.items()}
+
+
+def test_live_modules_are_not_cached():
+    registry = {'macd': macd, 'volume': volume}
+    hashes = {name: settings_hash() for name in registry}
+    closed_only = closed_bar_modules(registry)
+    assert closed_only == {'macd'}
+    df = random_walk(220, seed=9, vol=0.01)
+    df['volume'] = 100.0
+    before = run_modules(df, IndicatorContext(df), registry, list(registry))
+    cache = ResultCache()
+    cache.store('SYM', '15m', _frame_candles(df), before, hashes, closed_only)
+    assert len(cache) == 1  # volume reads the forming candle: never stored, never looked up
+    assert list(cache.lookup('SYM', '15m', _frame_candles(df), list(registry), hashes, closed_only)) == ['macd']
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    # Same closed candles, the forming candle spikes: volume must re-run, MACD stays cached
+    df.loc[df.index[-1], 'close'] *= 1.05
+    df.loc[df.index[-1], 'high'] = df['close'].iloc[-1]
+    df.loc[df.index[-1], 'volume'] = 2000.0
+    cached = cache.lookup('SYM', '15m', _frame_candles(df), list(registry), hashes, closed_only)
+    assert list(cached) == ['macd']
+    after = dict((name, results) for name, results, _ in
+                 run_modules(df, IndicatorContext(df), registry, list(registry), skip=cached))
+    assert list(after) == ['volume']
+    assert dict((name, results) for name, results, _ in before)['volume'] == []
+    assert [(r.direction, r.score) for r in after['volume']] == [('long', 95)]
+
+
+if __name__ == "__main__":
+    test_hit_returns_copy_and_counts()
+    test_new_close_or_settings_miss()
+    test_lru_eviction()
+    test_cached_modules_are_skipped()
+    test_live_modules_are_not_cached()
+    print("✅ Result cache tests passed")
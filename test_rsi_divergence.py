@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the pivot engine and divergence matcher against the golden outputs of the list-based implementation
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from benchmarks.bench_smc import random_walk
+from benchmarks.golden import load_golden, rsi_divergence_outputs
+from engine.indicators import IndicatorContext, pivot_indices
+from modules import rsi_divergence
+
+LOOSE = {'min_rsi': 55, 'max_rsi': 45, 'min_price_change': 0.001, 'min_rsi_change': 1}
+
+
+def _key(results):
+    return [(r.direction, r.strength, r.score, r.reasons, r.levels) for r in results]
+
+
+def test_pivots_match_swing_masks():
+    df = random_walk(500, seed=11, vol=0.02)
+    ctx = IndicatorContext(df)
+    for source in ['close', 'rsi']:
+        for kind, mask in [('high', ctx.swing_highs(source)), ('low', ctx.swing_lows(source))]:
+            assert ctx.pivots(source, kind).tolist() == np.flatnonzero(mask.to_numpy()).tolist()
+
+
+def test_matcher_matches_golden():
+    expected = load_golden('rsi_divergence')
+    standalone = rsi_divergence_outputs(rsi_divergence)
+    shared_ctx = rsi_divergence_outputs(rsi_divergence, lambda df, kwargs: rsi_divergence.analyze(df, kwargs, ctx=IndicatorContext(df)))
+    assert standalone.keys() == expected.keys()
+    assert [case for case in expected if standalone[case] != expected[case]] == []
+    assert shared_ctx == standalone
+    assert any(expected.values())
+
+
+def test_tolerance_window():
+    price_pivots = np.array([10, 20, 30])
+    rsi_pivots = np.array([9, 22, 30])
+    prev, cur, prev_rsi, cur_rsi = rsi_divergence.match_divergences(price_pivots, rsi_pivots)
+    assert cur.tolist() == []  # exact matching: only bar 30 has an RSI pivot
+    prev, cur, prev_rsi, cur_rsi = rsi_divergence.match_divergences(price_pivots, rsi_pivots, tolerance=2)
+    assert prev.tolist() == [10, 20] and cur.tolist() == [20, 30]
+    assert prev_rsi.tolist() == [9, 22] and cur_rsi.tolist() == [22, 30]
+
+
+def test_newest_pivot_only_is_last_full_result():
+    checked = 0
+    for seed in range(100):
+        df = random_walk(500, seed=seed, vol=0.04)
+        full = rsi_divergence.analyze(df, dict(LOOSE, pivot_tolerance=1))
+        newest = rsi_divergence.analyze(df, dict(LOOSE, pivot_tolerance=1, newest_pivot_only=True))
+        last_idx = {'long': pivot_indices(df['close'].to_numpy(), 'low')[-1],
+                    'short': pivot_indices(df['close'].to_numpy(), 'high')[-1]}
+        expected = [r for r in full if r.levels['current_price_idx'] == last_idx[r.direction]]
+        assert _key(newest) == _key(expected)
+        checked += len(newest)
+    assert checked > 0
+
+
+def test_runner_passes_newest_pivot_only():
+    from types import SimpleNamespace
+    from engine.result_cache import settings_hash
+    from scanner.analysis_pool import module_kwargs, run_modules
+    calls = []
+    recorder = SimpleNamespace(analyze=lambda df, ctx=None, settings=None: calls.append(settings) or [])
+    df = random_walk(220, seed=3, vol=0.02)
+    full_hash = settings_hash(**module_kwargs('rsi_divergence'))
+    os.environ['RSI_NEWEST_PIVOT_ONLY'] = '1'
+    try:
+        assert settings_hash(**module_kwargs('rsi_divergence')) != full_hash  # separate result cache entries
+        run_modules(df, IndicatorContext(df), {'rsi_divergence': recorder}, ['rsi_divergence'])
+    finally:
+        del os.environ['RSI_NEWEST_PIVOT_ONLY']
+    run_modules(df, IndicatorContext(df), {'rsi_divergence': recorder}, ['rsi_divergence'])
+    assert calls == [{'newest_pivot_only': True}, None]
+    assert rsi_divergence.RSIDivergenceSettings(**calls[0]).newest_pivot_only
+
+if __name__ == "__main__":
+    test_pivots_match_swing_masks()
+    test_matcher_matches_golden()
+    test_tolerance_window()
+    test_newest_pivot_only_is_last_full_result()
+    test_runner_passes_newest_pivot_only()
+    print("✅ RSI divergence matcher tests passed")
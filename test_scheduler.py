@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test the candle-close aligned scheduler with a simulated clock
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scanner import scheduler
+from scanner.scheduler import AlignedScheduler, last_close, TF_SECONDS
+from scanner.runner import get_scan_symbols
+
+DAY = 1_700_006_400  # a UTC midnight (multiple of 4h)
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(calls, clock, **kwargs):
+    def scan_fn(timeframes):
+        calls.append((clock.now, list(timeframes)))
+        clock.now += 3  # analysis takes 3s
+    sched = AlignedScheduler(scan_fn, settle_seconds=5, **kwargs)
+    sched.last_cleanup = float('inf')  # no DB cleanup in tests
+    return sched
+
+
+def test_last_close():
+    assert last_close('4h', DAY + 3 * 3600) == DAY
+    assert last_close('1h', DAY + 3 * 3600 + 59) == DAY + 3 * 3600
+    assert last_close('15m', DAY + 899) == DAY
+
+
+def test_fires_per_timeframe_on_close():
+    calls = []
+    clock = FakeClock(DAY + 100)
+    sched = _scheduler(calls, clock)
+    for _ in range(40):  # simulate a day of sleeping until the next wake-up
+        sleep = sched.tick(clock=clock)
+        clock.now += sleep
+        if clock.now > DAY + 86400:
+            break
+    # startup scan of everything, then only the TFs whose candle closed
+    assert calls[0] == (DAY + 100, ['15m', '1h', '4h'])
+    assert calls[1] == (DAY + 900 + 5, ['15m'])
+    assert (DAY + 3600 + 5, ['15m', '1h']) in calls
+    assert (DAY + 4 * 3600 + 5, ['15m', '1h', '4h']) in calls
+    assert sched.lag_stats['15m'][1] == 8  # 5s settle + 3s analysis
+
+
+def test_day_of_work_per_timeframe():
+    calls = []
+    clock = FakeClock(DAY + 5)
+    sched = _scheduler(calls, clock)
+    while clock.now < DAY + 86400:
+        clock.now += sched.tick(clock=clock)
+    counts = {tf: sum(tf in tfs for _, tfs in calls) for tf in ['15m', '1h', '4h']}
+    assert counts == {'15m': 96, '1h': 24, '4h': 6}
+
+
+def test_every_symbol_once_per_close():
+    symbols = [f"SYM{i}USDT" for i in range(250)]  # more than one 100-symbol chunk
+    analyzed = {}  # (tf, close) -> analyzed symbols
+    cursor = {'idx': 0}
+    clock = FakeClock(DAY + 5)
+
+    def scan_fn(timeframes):
+        chunk, next_cursor = get_scan_symbols(symbols, cursor['idx'], 100, timeframes)
+        if next_cursor is not None:
+            cursor['idx'] = next_cursor
+        for tf in timeframes:
+            analyzed.setdefault((tf, last_close(tf, clock.now - 5)), []).extend(chunk)
+        clock.now += 3
+
+    sched = AlignedScheduler(scan_fn, settle_seconds=5)
+    sched.last_cleanup = float('inf')
+    while clock.now < DAY + 86400:
+        clock.now += sched.tick(clock=clock)
+    for tf in ['15m', '1h', '4h']:
+        closes = [close for t, close in analyzed if t == tf]
+        assert len(closes) == 86400 // TF_SECONDS[tf]
+        for close in closes:
+            assert sorted(analyzed[(tf, close)]) == sorted(symbols), (tf, close)
+
+
+def test_interval_and_forming_scans_rotate_chunks():
+    symbols = [f"SYM{i}USDT" for i in range(250)]
+    seen, cursor = [], 0
+    for _ in range(3):
+        chunk, cursor = get_scan_symbols(symbols, cursor, 100, ['15m'], forming=True)
+        seen.extend(chunk)
+    assert sorted(set(seen)) == sorted(symbols)
+    assert get_scan_symbols(symbols, 0, 100)[0] == symbols[:100]
+
+
+def test_forming_fast_path_between_closes():
+    calls, forming = [], []
+    clock = FakeClock(DAY + 100)
+    sched = _scheduler(calls, clock, forming_fn=lambda: forming.append(clock.now), forming_interval=60)
+    while clock.now <= DAY + 905:
+        clock.now += sched.tick(clock=clock)
+    assert calls[-1][1] == ['15m']
+    assert 12 <= len(forming) <= 14
+    assert all(b - a >= 60 for a, b in zip(forming, forming[1:]))
+
+
+def test_skips_while_scan_running():
+    calls = []
+    clock = FakeClock(DAY + 100)
+    sched = _scheduler(calls, clock)
+    scheduler.SCAN_RUNNING = True
+    try:
+        assert sched.tick(clock=clock) == 0.0  # retry soon, nothing marked as handled
+    finally:
+        scheduler.SCAN_RUNNING = False
+    assert calls == [] and sched.handled == {}
+
+
+if __name__ == "__main__":
+    test_last_close()
+    test_fires_per_timeframe_on_close()
+    test_day_of_work_per_timeframe()
+    test_every_symbol_once_per_close()
+    test_interval_and_forming_scans_rotate_chunks()
+    test_forming_fast_path_between_closes()
+    test_skips_while_scan_running()
+    print("✅ Scheduler tests passed")
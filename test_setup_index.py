@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory active setup index and the Repo write-through
+"""
+
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.database import init_db, SCHEMA_PATH
+from db.repo import Repo
+from db.setup_index import ActiveSetupIndex
+
+
+def _repos():
+    conn = init_db(os.path.join(tempfile.mkdtemp(), 'bot.db'), SCHEMA_PATH)
+    return Repo(conn), Repo(conn, setup_index=ActiveSetupIndex.load(conn, 'u1'))
+
+
+def test_load_matches_queries():
+    plain, _ = _repos()
+    plain.save_active_setup('u1', 'BTCUSDT', '15m', 'bullish', 'IDEA', idea_score=80, levels={'sl': 1.0})
+    plain.save_active_setup('u1', 'ETHUSDT', '1h', 'bearish', 'TRADE', idea_score=70)
+    plain.save_active_setup('u1', 'SOLUSDT', '15m', 'bullish', 'IDEA', expires_in_minutes=-1)  # expired
+    plain.save_active_setup('u2', 'BTCUSDT', '1h', 'bullish', 'IDEA')
+    indexed = Repo(plain.conn, setup_index=ActiveSetupIndex.load(plain.conn, 'u1'))
+    assert len(indexed.setup_index) == 2
+    for symbol, tf in (('BTCUSDT', '15m'), ('ETHUSDT', '1h'), ('SOLUSDT', '15m'), ('XRPUSDT', '4h')):
+        assert indexed.get_existing_idea('u1', symbol, tf) == plain.get_existing_idea('u1', symbol, tf)
+    assert indexed.get_existing_idea('u1', 'BTCUSDT', '15m')['levels'] == {'sl': 1.0}
+    assert indexed.get_active_setups('u1', 'TRADE') == plain.get_active_setups('u1', 'TRADE')
+    # Other users are not indexed: their lookups still query
+    assert indexed.get_existing_idea('u2', 'BTCUSDT', '1h')['symbol'] == 'BTCUSDT'
+
+
+def test_write_through():
+    plain, indexed = _repos()
+    setup_id = indexed.save_active_setup('u1', 'BTCUSDT', '15m', 'bullish', 'IDEA', idea_score=80)
+    idea = indexed.get_existing_idea('u1', 'BTCUSDT', '15m')
+    assert idea['setup_id'] == setup_id
+    assert plain.get_existing_idea('u1', 'BTCUSDT', '15m')['setup_id'] == setup_id
+    idea['idea_score'] = 0  # callers get copies
+    assert indexed.get_existing_idea('u1', 'BTCUSDT', '15m')['idea_score'] == 80
+
+    assert indexed.upgrade_setup_to_trade(setup_id, 95)
+    assert indexed.get_existing_idea('u1', 'BTCUSDT', '15m') is None
+    assert indexed.get_active_setups('u1', 'TRADE')[0]['trade_score'] == 95
+
+    ids = indexed.save_active_setups([{'user_id': 'u1', 'symbol': 'ETHUSDT', 'timeframe': '1h',
+                                       'side': 'bearish', 'status': 'IDEA'}])
+    assert indexed.get_existing_idea('u1', 'ETHUSDT', '1h')['setup_id'] == ids[0]
+    assert indexed.invalidate_setup(ids[0])
+    assert indexed.get_existing_idea('u1', 'ETHUSDT', '1h') is None
+    assert plain.get_existing_idea('u1', 'ETHUSDT', '1h') is None
+
+
+def test_expiry_heap():
+    index = ActiveSetupIndex('u1')
+    now = int(time.time())
+    for i, expires_at in enumerate((now + 30, now + 10, now + 20)):
+        index.add({'user_id': 'u1', 'symbol': f"S{i}", 'timeframe': '15m', 'setup_id': f"id{i}",
+                   'status': 'IDEA', 'expires_at': expires_at, 'levels_json': None})
+    assert index.expire(now) == 0
+    assert index.expire(now + 15) == 1
+    assert index.get_existing_idea('u1', 'S1', '15m', now + 15) is None
+    assert index.get_existing_idea('u1', 'S0', '15m', now + 15) is not None
+    assert index.expire(now + 30) == 2
+    assert len(index) == 0
+
+
+class _FailingCommit:
+    """Connection whose commit fails (e.g. disk full)"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def commit(self):
+        raise OSError('disk full')
+
+
+def test_rollback_marks_index_stale():
+    plain, indexed = _repos()
+    failing = Repo(_FailingCommit(plain.conn), setup_index=indexed.setup_index)
+    try:
+        with failing.batch():
+            failing.save_active_setup('u1', 'BTCUSDT', '15m', 'bullish', 'IDEA')
+        assert False, "expected the commit to fail"
+    except OSError:
+        pass
+    assert plain.get_existing_idea('u1', 'BTCUSDT', '15m') is None
+    assert indexed.setup_index.stale  # it holds the rolled back setup until reloaded
+
+
+if __name__ == "__main__":
+    test_load_matches_queries()
+    test_write_through()
+    test_expiry_heap()
+    test_rollback_marks_index_stale()
+    print("✅ Setup index tests passed")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory cooldown map, the hashed dedup set and write-behind persistence
+"""
+
+import sys
+import os
+import subprocess
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import db.signal_state as signal_state
+from db.database import init_db, get_conn, SCHEMA_PATH
+from db.repo import Repo
+from db.signal_state import CooldownMap, DedupSet, SignalState, dedup_hash
+from scanner.runner import cooldown_for, dedup_key_for
+
+
+def _db():
+    path = os.path.join(tempfile.mkdtemp(), 'bot.db')
+    return path, Repo(init_db(path, SCHEMA_PATH))
+
+
+def _count(path, table):
+    conn = get_conn(path)
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_cooldown_map_expiry():
+    cooldowns = CooldownMap()
+    cooldowns.set('u1', 'a', 100)
+    cooldowns.set('u1', 'b', 200)
+    cooldowns.set('u1', 'a', 300)  # extended: the old heap entry must not remove it
+    assert cooldowns.active('u1', 'a', 150) and cooldowns.active('u1', 'b', 150)
+    assert cooldowns.expire(250) == 1
+    assert cooldowns.active('u1', 'a', 250) and not cooldowns.active('u1', 'b', 250)
+    assert len(cooldowns) == 1
+
+
+def test_dedup_set_compaction():
+    old = signal_state.COMPACT_AFTER
+    signal_state.COMPACT_AFTER = 3
+    try:
+        dedup = DedupSet()
+        for key in ('k1', 'k2', 'k3', 'k4'):
+            dedup.add(key)
+        assert len(dedup._sorted) == 3 and len(dedup._recent) == 1
+        assert all(key in dedup for key in ('k1', 'k2', 'k3', 'k4'))
+        assert 'k5' not in dedup
+        assert dedup.nbytes == 4 * 8
+    finally:
+        signal_state.COMPACT_AFTER = old
+
+
+def test_hydrate_and_write_behind():
+    path, repo = _db()
+    repo.set_cooldown('u1', 'live', 600)
+    repo.set_cooldown('u1', 'over', -1)
+    repo.save_sent_signal('u1', 'old', 'BTCUSDT', '15m', 'COMBO', 1, 80, {})
+    cached = Repo(repo.conn, signal_state=SignalState.load(repo.conn))
+    assert cached.is_in_cooldown('u1', 'live') and not cached.is_in_cooldown('u1', 'over')
+    assert cached.has_dedup_key('old') and not cached.has_dedup_key('new')
+
+    cached.set_cooldowns('u1', {'next': 600})
+    cached.save_sent_signals([{'tg_user_id': 'u1', 'dedup_key': 'new', 'symbol': 'ETHUSDT', 'timeframe': '1h',
+                               'signal_type': 'IDEA', 'candle_ts': 2}])
+    assert cached.is_in_cooldown('u1', 'next') and cached.has_dedup_key('new')
+    assert not repo.has_dedup_key('new')  # not written yet
+    assert cached.signal_state.pending == 2
+    with cached.batch():
+        try:
+            cached.flush_signal_state()
+            assert False, "flush must not commit inside a batch"
+        except RuntimeError:
+            pass
+    assert cached.flush_signal_state() == 2
+    assert repo.has_dedup_key('new') and repo.is_in_cooldown('u1', 'next')
+    assert _count(path, 'signals_sent') == 2
+    assert cached.flush_signal_state() == 0
+
+
+def test_outbox_uses_and_updates_dedup_keys():
+    _, repo = _db()
+    cached = Repo(repo.conn, signal_state=SignalState.load(repo.conn))
+    alert = {'tg_user_id': 'u1', 'dedup_key': 'a', 'symbol': 'BTCUSDT', 'timeframe': '15m',
+             'signal_type': 'COMBO', 'candle_ts': int(time.time()), 'text': 'a'}
+    assert cached.enqueue_outbox([alert]) == 1
+    rows = cached.claim_outbox(10)
+    cached.complete_outbox([rows[0]['id']])
+    assert cached.signal_state.has_dedup_key('a')  # delivered keys are remembered
+    assert cached.enqueue_outbox([alert]) == 0
+
+
+def test_dedup_hash_is_stable_across_processes():
+    code = "from db.signal_state import dedup_hash; print(dedup_hash('u1:BTCUSDT:15m:COMBO:1'))"
+    other = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                           capture_output=True, text=True, check=True).stdout
+    assert int(other) == dedup_hash('u1:BTCUSDT:15m:COMBO:1')
+
+
+def test_prune_to_dedup_window():
+    path, repo = _db()
+    now = int(time.time())
+    repo.save_sent_signal('u1', 'recent', 'BTCUSDT', '15m', 'COMBO', 1, 80, {})
+    repo.conn.execute(
+        "INSERT INTO signals_sent(tg_user_id,dedup_key,symbol,timeframe,signal_type,candle_ts,score_total,payload_json,sent_at) "
+        "VALUES('u1','old','BTCUSDT','15m','COMBO',1,80,'{}',?)", (now - 10 * 86400,))
+    repo.conn.commit()
+    assert not SignalState.load(repo.conn).has_dedup_key('old')  # outside the window: not hydrated
+    repo.set_cooldown('u1', 'over', -1)
+    repo.set_cooldown('u1', 'live', 600)
+    assert repo.prune_signal_state(7 * 86400) == 2
+    assert _count(path, 'signals_sent') == 1 and _count(path, 'cooldowns') == 1
+
+
+def test_cooldown_keys_by_message_type():
+    decision = {'symbol': 'BTCUSDT', 'timeframe': '1h', 'type': 'IDEA', 'message_type': 'WATCHLIST', 'setup_id': 's1'}
+    assert cooldown_for(decision, 7200) == ('idea:BTCUSDT:1h:s1', 1800)
+    assert cooldown_for(dict(decision, message_type='FIB_ALERT'), 7200) == ('fib_alert:BTCUSDT:1h', 5400)
+    assert cooldown_for(dict(decision, type='PUMP', message_type='PUMP_ALERT'), 7200) == ('PUMP:BTCUSDT:1h', 7200)
+
+
+def test_forming_pump_dedup_ignores_the_moving_levels():
+    pump = {'symbol': 'BTCUSDT', 'timeframe': '15m', 'message_type': 'PUMP_ALERT', 'candle_ts': 1000,
+            'side': 'long', 'levels': {'pump_pct': 3.2}}
+    grown = dict(pump, levels={'pump_pct': 4.7})  # same forming candle, a later scan
+    assert dedup_key_for('u1', pump, forming=True) == dedup_key_for('u1', grown, forming=True)
+    assert dedup_key_for('u1', pump, forming=True) != dedup_key_for('u1', dict(pump, candle_ts=1900), forming=True)
+    assert dedup_key_for('u1', pump, forming=True) != dedup_key_for('u1', dict(pump, side='short'), forming=True)
+    assert dedup_key_for('u1', pump) != dedup_key_for('u1', grown)  # closed candles keep the level in the key
+
+
+if __name__ == "__main__":
+    test_cooldown_map_expiry()
+    test_dedup_set_compaction()
+    test_hydrate_and_write_behind()
+    test_outbox_uses_and_updates_dedup_keys()
+    test_dedup_hash_is_stable_across_processes()
+    test_prune_to_dedup_window()
+    test_cooldown_keys_by_message_type()
+    test_forming_pump_dedup_ignores_the_moving_levels()
+    print("✅ Signal state tests passed")
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Test that the vectorized SMC detectors match the golden outputs of the loop implementation
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.golden import load_golden, smc_outputs
+from modules import smc
+
+
+def test_detectors_match_golden():
+    expected = load_golden('smc')
+    outputs = smc_outputs(smc)
+    assert outputs.keys() == expected.keys()
+    mismatches = [case for case in expected if outputs[case] != expected[case]]
+    assert mismatches == []
+    assert sum(bool(expected[case]) for case in expected if '/ob' in case or '/fvg/' in case) > 0  # corpus exercises the detectors
+
+
+if __name__ == "__main__":
+    test_detectors_match_golden()
+    print("✅ Vectorized SMC tests passed")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test the Telegram dispatcher against the local fake Bot API server
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from telegram import Bot
+
+from benchmarks.fake_telegram import start_fake_telegram
+from engine.telegram_dispatcher import TelegramDispatcher
+
+FAST = 1000.0
+
+
+def _dispatcher(server, **kwargs):
+    kwargs.setdefault('global_rate', FAST)
+    kwargs.setdefault('chat_rate', FAST)
+    kwargs.setdefault('group_rate', FAST)
+    return TelegramDispatcher(Bot("123:TEST", base_url=server.base_url), **kwargs).start()
+
+
+def test_trade_signals_go_first():
+    server = start_fake_telegram(latency=0.01)
+    dispatcher = _dispatcher(server, pool_size=1)
+    dispatcher.submit("-100", "blocker", {'message_type': 'FIB_ALERT'})
+    time.sleep(0.3)  # the first message occupies the only slot
+    for i in range(3):
+        dispatcher.submit("-100", f"idea {i}", {'message_type': 'WATCHLIST'})
+    dispatcher.submit("-100", "pump", {'message_type': 'PUMP_ALERT'})
+    dispatcher.submit("-100", "trade", {'message_type': 'TRADE_FREIGABE'})
+    assert dispatcher.flush(10)
+    texts = [text for _, _, text in server.received]
+    assert texts[0] == "blocker"
+    assert texts[1:3] == ["trade", "pump"]
+    assert texts[3:] == ["idea 0", "idea 1", "idea 2"]
+    dispatcher.close()
+    server.shutdown()
+
+
+def test_retry_after_is_honoured():
+    server = start_fake_telegram(chat_limit=2)
+    dispatcher = _dispatcher(server)
+    futures = [dispatcher.submit("42", f"msg {i}") for i in range(4)]
+    assert dispatcher.flush(15)
+    assert all(f.result() for f in futures)
+    stats = dispatcher.stats()
+    assert stats['sent'] == 4 and stats['failed'] == 0
+    assert stats['retry_after'] >= 1
+    assert len(server.received) == 4
+    dispatcher.close()
+    server.shutdown()
+
+
+def test_chat_rate_paces_sends():
+    server = start_fake_telegram(chat_limit=1, window=0.05)
+    dispatcher = _dispatcher(server, chat_rate=10.0)
+    start = time.perf_counter()
+    for i in range(6):
+        dispatcher.submit("7", f"msg {i}")
+    assert dispatcher.flush(10)
+    assert time.perf_counter() - start >= 0.45  # 6 messages at 10/s
+    assert server.throttled_count == 0
+    dispatcher.close()
+    server.shutdown()
+
+
+def test_topic_routing_and_fixed_chat():
+    server = start_fake_telegram()
+    dispatcher = _dispatcher(server, chat_id="-100123")
+    future = dispatcher.submit("999", "📐 Fibonacci Golden Zone", {'module': 'fibonacci'})
+    assert future.result(10) is True
+    chat_id, thread_id, _ = server.received[0]
+    assert chat_id == "-100123" and thread_id == "9"
+    dispatcher.close()
+    server.shutdown()
+
+
+def test_chart_bytes_sent_as_photo():
+    server = start_fake_telegram()
+    dispatcher = _dispatcher(server)
+    png = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 4
+    assert dispatcher.submit("42", "mit Chart", chart=png).result(10) is True
+    assert server.received[0][2] == "mit Chart"
+    assert server.uploads == [png]
+    dispatcher.close()
+    server.shutdown()
+
+
+def test_submit_starts_the_loop_and_flush_times_out():
+    server = start_fake_telegram(latency=0.5)
+    dispatcher = TelegramDispatcher(Bot("123:TEST", base_url=server.base_url), global_rate=FAST, chat_rate=FAST)
+    assert dispatcher.flush(1)  # never started: nothing to wait for
+    future = dispatcher.submit("42", "ohne start()")
+    assert dispatcher.flush(0.05) is False  # concurrent.futures.TimeoutError, caught on every Python
+    assert future.result(10) is True
+    dispatcher.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_trade_signals_go_first()
+    test_retry_after_is_honoured()
+    test_chat_rate_paces_sends()
+    test_topic_routing_and_fixed_chat()
+    test_chart_bytes_sent_as_photo()
+    test_submit_starts_the_loop_and_flush_times_out()
+    print("✅ Telegram dispatcher tests passed")
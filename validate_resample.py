@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Skript zur Validierung des Resamplings (15m -> 1h/4h)
+Vergleicht aus 15m-Kerzen gebaute Bars mit den von Bitget gelieferten Bars im Candle-Store
+
+Aufruf:
+    python validate_resample.py                        # aufgezeichnete Daten in ./data/bot.db
+    python validate_resample.py --record URL --symbols 20   # vorher frische Daten aufzeichnen
+"""
+
+import argparse
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.database import init_db
+from db.candle_store import CandleStore
+from scanner.bitget_client import AsyncBitgetClient
+from scanner.candle_sync import sync_candles
+from scanner.resample import resample_candles, base_window_for
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def record(store: CandleStore, base_url: str, symbol_count: int, window: int = 220):
+    """Speichert Exchange-Bars (1h/4h) und genügend 15m-Historie für den Vergleich"""
+    client = AsyncBitgetClient(base_url=base_url)
+    symbols = client.list_usdt_perp_symbols()[:symbol_count]
+    sync_candles(client, store, symbols, ['1h', '4h'], window=window)
+    sync_candles(client, store, symbols, ['15m'], window=base_window_for(['1h', '4h'], '15m', window))
+    client.close()
+
+
+def compare_series(resampled: list, exchange: list, tolerance: float):
+    """Vergleicht abgeschlossene Bars mit gleichem ts; gibt (verglichen, Abweichungen, max. rel. Fehler) zurück"""
+    by_ts = {c['ts']: c for c in resampled[:-1]}  # forming bar auslassen
+    compared = mismatches = 0
+    max_error = 0.0
+    for bar in exchange[:-1]:
+        own = by_ts.get(bar['ts'])
+        if own is None:
+            continue
+        compared += 1
+        errors = [abs(own[f] - bar[f]) / max(abs(bar[f]), 1e-12) for f in FIELDS]
+        max_error = max(max_error, *errors)
+        if max(errors) > tolerance:
+            mismatches += 1
+    return compared, mismatches, max_error
+
+
+def validate(store: CandleStore, tolerance: float) -> bool:
+    rows = store.conn.execute(
+        "SELECT DISTINCT symbol FROM candles WHERE timeframe = '15m' ORDER BY symbol"
+    ).fetchall()
+    symbols = [row[0] for row in rows]
+    if not symbols:
+        print("❌ Keine 15m-Kerzen im Candle-Store gefunden")
+        return False
+
+    ok = True
+    for tf in ['1h', '4h']:
+        total = bad = 0
+        worst = 0.0
+        for symbol in symbols:
+            base = store.get_window(symbol, '15m', 100000)
+            exchange = store.get_window(symbol, tf, 100000)
+            if not base or not exchange:
+                continue
+            compared, mismatches, max_error = compare_series(resample_candles(base, '15m', tf), exchange, tolerance)
+            total += compared
+            bad += mismatches
+            worst = max(worst, max_error)
+            if mismatches:
+                print(f"   ⚠️ {symbol} {tf}: {mismatches}/{compared} Bars weichen ab (max. {max_error:.2e})")
+        status = "✅" if bad == 0 else "❌"
+        print(f"{status} {tf}: {total} Bars über {len(symbols)} Symbole verglichen, {bad} Abweichungen, max. rel. Fehler {worst:.2e}")
+        ok &= bad == 0 and total > 0
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='./data/bot.db')
+    parser.add_argument('--record', metavar='BASE_URL', help='vorher Daten von dieser Bitget-URL aufzeichnen')
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--tolerance', type=float, default=1e-6, help='erlaubter relativer Fehler')
+    args = parser.parse_args()
+
+    store = CandleStore(init_db(args.db, './db/schema.sql'))
+    if args.record:
+        record(store, args.record, args.symbols)
+
+    print("🔍 Validiere Resampling 15m -> 1h/4h...")
+    ok = validate(store, args.tolerance)
+    store.conn.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()